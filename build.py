@@ -232,6 +232,12 @@ def _build_application(
         else:
             print(f"⚠ 警告: 静态文件目录不存在: {static_dir}")
 
+        # 预编译MIB缓存（运行时不访问网络MIB源）
+        mib_cache_dir = app_dir / "mibs" / "compiled"
+        if mib_cache_dir.exists():
+            cmd.append(f"--include-data-dir={mib_cache_dir}=mibs/compiled")
+            print(f"✓ 包含预编译MIB目录: {mib_cache_dir}")
+
     # 如果指定了编译器选项，添加到命令中
     if compiler_option:
         cmd.append(compiler_option)
@@ -366,6 +372,39 @@ def build_dashboard():
         os.chdir(original_dir)
 
 
+def build_mib_cache():
+    """从server/mibs/asn1中的MIB源文件编译离线MIB缓存（没有源文件时跳过）"""
+    source_dir = SERVER_DIR / "mibs" / "asn1"
+    if not source_dir.exists():
+        print(f"⚠ MIB源文件目录不存在，跳过MIB缓存编译: {source_dir}")
+        return True
+
+    python_path = sys.executable
+    if VENV_DIR.exists():
+        if os.name == "nt":  # Windows
+            venv_python = VENV_DIR / "Scripts" / "python.exe"
+        else:  # Unix/Linux/macOS
+            venv_python = VENV_DIR / "bin" / "python"
+        if venv_python.exists():
+            python_path = str(venv_python)
+
+    try:
+        result = subprocess.run(
+            [python_path, "-m", "src.snmp.mib_cache"],
+            cwd=SERVER_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        print(result.stdout.strip())
+        print("✓ MIB缓存编译成功")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"✗ MIB缓存编译失败: {e}")
+        print(f"错误详情: {e.stdout}{e.stderr}")
+        return False
+
+
 def build_server():
     """打包服务端"""
     # 在打包server之前先打包dashboard
@@ -377,7 +416,14 @@ def build_server():
         return False
 
     print("\n" + "=" * 50)
-    print("步骤2: 打包服务端")
+    print("步骤2: 编译离线MIB缓存")
+    print("=" * 50)
+    if not build_mib_cache():
+        print("✗ MIB缓存编译失败，无法继续打包服务端")
+        return False
+
+    print("\n" + "=" * 50)
+    print("步骤3: 打包服务端")
     print("=" * 50)
     return _build_application(
         app_type="server",
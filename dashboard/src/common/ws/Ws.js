@@ -12,6 +12,64 @@ export const wsCode = {
   SNMP_INTERFACE_UPDATE: "snmpInterfaceUpdate",  // 单接口实时更新
   SERVER_PERFORMANCE: "server_performance",       // 服务器性能数据
 }
+/**
+ * 按点分路径设置字段（沿路径复制对象，不修改原对象）
+ */
+function setPath(target, path, value, remove = false) {
+  const keys = path.split(".");
+  const root = { ...target };
+  let node = root;
+  for (let i = 0; i < keys.length - 1; i++) {
+    const child = node[keys[i]];
+    node[keys[i]] = child && typeof child === "object" && !Array.isArray(child) ? { ...child } : {};
+    node = node[keys[i]];
+  }
+  const last = keys[keys.length - 1];
+  if (remove) {
+    delete node[last];
+  } else {
+    node[last] = value;
+  }
+  return root;
+}
+
+function applyFields(target, set = {}, unset = []) {
+  let result = target;
+  for (const [path, value] of Object.entries(set)) {
+    result = setPath(result, path, value);
+  }
+  for (const path of unset) {
+    result = setPath(result, path, undefined, true);
+  }
+  return result;
+}
+
+/**
+ * 将服务端的增量应用到上一次的完整结果上
+ */
+function applySnmpDelta(previous, delta) {
+  let result = applyFields(previous, delta.set, delta.unset);
+  const patch = delta.interfaces;
+  if (patch) {
+    const rows = new Map((previous.interface_info || []).map((row) => [row.index, row]));
+    for (const index of patch.removed || []) {
+      rows.delete(index);
+    }
+    for (const change of patch.changed || []) {
+      const row = rows.get(change.index);
+      if (row) {
+        rows.set(change.index, applyFields(row, change.set, change.unset));
+      }
+    }
+    for (const row of patch.added || []) {
+      rows.set(row.index, row);
+    }
+    const order = patch.order || (previous.interface_info || []).map((row) => row.index);
+    result = { ...result, interface_info: order.map((index) => rows.get(index)).filter(Boolean) };
+  }
+  return result;
+}
+
 export class Ws {
   constructor() {
     if (!Ws.instance) {
@@ -24,6 +82,11 @@ export class Ws {
       // 记录上一次设备更新的时间戳（用于计算实时推送频率）
       this.lastDeviceUpdateTime = null;
       this.lastInterfaceUpdateTime = null;
+      // 增量广播状态：{ device|interface: { switchId: { seq, data, resync } } }
+      this.snmpState = { device: {}, interface: {} };
+      // 待发送的快照请求（合并后发送）
+      this.pendingSnapshots = { device: new Set(), interface: new Set() };
+      this.snapshotTimer = null;
       Ws.instance = this;
     }
     return Ws.instance;
@@ -39,6 +102,9 @@ export class Ws {
     this.socket = new WebSocket(this.url);
     this.socket.onopen = (e) => {
       this.flag = true;
+      // 重新连接后从完整快照开始应用增量
+      this.snmpState = { device: {}, interface: {} };
+      this.sendMessage({ type: "requestSnmpSnapshot", data: { poll_type: "all" } });
       notification.success({
         key,
         message: `恭喜`,
@@ -70,16 +136,26 @@ export class Ws {
         case "deviceStatus":
           PubSub.publish(wsCode.DEVICE_STATUS, data.data);
           break;
-        // 单设备实时更新（快进快出队列模式）
+        // 单设备实时更新（快进快出队列模式，完整结果/关键帧）
         case "snmpDeviceUpdate":
-          this.handleDeviceUpdate(data.data);
-          PubSub.publish(wsCode.SNMP_DEVICE_UPDATE, data.data);
+        case "snmpDeviceDelta": {
+          const deviceData = this.applySnmpMessage("device", data);
+          if (deviceData) {
+            this.handleDeviceUpdate(deviceData);
+            PubSub.publish(wsCode.SNMP_DEVICE_UPDATE, deviceData);
+          }
           break;
-        // 单接口实时更新（快进快出队列模式）
+        }
+        // 单接口实时更新（快进快出队列模式，完整结果/关键帧）
         case "snmpInterfaceUpdate":
-          this.handleInterfaceUpdate(data.data);
-          PubSub.publish(wsCode.SNMP_INTERFACE_UPDATE, data.data);
+        case "snmpInterfaceDelta": {
+          const interfaceData = this.applySnmpMessage("interface", data);
+          if (interfaceData) {
+            this.handleInterfaceUpdate(interfaceData);
+            PubSub.publish(wsCode.SNMP_INTERFACE_UPDATE, interfaceData);
+          }
           break;
+        }
         // 服务器性能数据
         case "server_performance":
           PubSub.publish(wsCode.SERVER_PERFORMANCE, data.data);
@@ -90,6 +166,79 @@ export class Ws {
       }
     }
   }
+  sendMessage(message) {
+    if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify(message));
+    }
+  }
+
+  /**
+   * 应用SNMP轮询结果消息（关键帧或增量），返回重建后的完整结果
+   * 序号不连续或缺少基准时请求快照，返回null
+   * @param {String} pollType - device 或 interface
+   * @param {Object} message - WebSocket消息
+   */
+  applySnmpMessage(pollType, message) {
+    const states = this.snmpState[pollType];
+    const switchId = message.data.switch_id ?? message.data.ip;
+    const state = states[switchId];
+    const seq = message.seq;
+
+    if (message.keyframe !== false) {
+      // 旧版服务端不带序号，直接使用完整结果
+      if (seq === undefined) {
+        return message.data;
+      }
+      if (state && !state.resync && seq <= state.seq) {
+        return null;
+      }
+      states[switchId] = { seq, data: message.data, resync: false };
+      return message.data;
+    }
+
+    if (!state || state.resync) {
+      this.requestSnapshot(pollType, switchId);
+      return null;
+    }
+    if (seq <= state.seq) {
+      return null;
+    }
+    if (seq !== state.seq + 1) {
+      state.resync = true;
+      this.requestSnapshot(pollType, switchId);
+      return null;
+    }
+    state.seq = seq;
+    state.data = applySnmpDelta(state.data, message.data);
+    return state.data;
+  }
+
+  /**
+   * 请求交换机的完整快照（短时间内的请求合并发送）
+   */
+  requestSnapshot(pollType, switchId) {
+    if (typeof switchId !== "number") {
+      return;
+    }
+    this.pendingSnapshots[pollType].add(switchId);
+    if (this.snapshotTimer) {
+      return;
+    }
+    this.snapshotTimer = setTimeout(() => {
+      this.snapshotTimer = null;
+      for (const type of ["device", "interface"]) {
+        const switchIds = [...this.pendingSnapshots[type]];
+        this.pendingSnapshots[type].clear();
+        if (switchIds.length) {
+          this.sendMessage({
+            type: "requestSnmpSnapshot",
+            data: { poll_type: type, switch_ids: switchIds },
+          });
+        }
+      }
+    }, 200);
+  }
+
   reconnect() {
     const that = this;
     if (this.flag) {
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原生BER编解码器与pysnmp的性能对比
+
+1. 编解码基准：同一个GETBULK请求/响应分别用两种实现编码和解码，比较每个PDU的CPU时间
+2. 端到端基准：在子进程中启动模拟SNMP代理（48个接口的ifTable/ifXTable），
+   用SNMPMonitor.walk_columns分别以 codec='pysnmp' 和 codec='native' 遍历接口表，
+   统计客户端进程每CPU秒处理的PDU数
+
+用法: python examples/benchmark_ber_codec.py [--ports 48] [--walks 50] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import bisect
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.snmp import ber_codec
+from src.snmp.ber_codec import (
+    Counter32,
+    Counter64,
+    Gauge32,
+    OctetString,
+    TimeTicks,
+    ObjectIdentifier,
+    END_OF_MIB_VIEW,
+    NO_SUCH_OBJECT,
+    PDU_GET,
+    PDU_GETNEXT,
+    PDU_GETBULK,
+    PDU_RESPONSE,
+)
+from src.snmp.snmp_monitor import SNMPMonitor
+
+AGENT_HOST = "127.0.0.1"
+AGENT_PORT = 16161
+COMMUNITY = "public"
+
+
+def build_mib(ports: int):
+    """构造模拟设备的MIB：[(OID元组, 值)]，按OID排序"""
+    mib = {
+        (1, 3, 6, 1, 2, 1, 1, 1, 0): OctetString(b"Benchmark switch"),
+        (1, 3, 6, 1, 2, 1, 1, 2, 0): ObjectIdentifier((1, 3, 6, 1, 4, 1, 9, 1, 1)),
+        (1, 3, 6, 1, 2, 1, 1, 3, 0): TimeTicks(123456),
+        (1, 3, 6, 1, 2, 1, 1, 5, 0): OctetString(b"bench"),
+        (1, 3, 6, 1, 2, 1, 2, 1, 0): ports,
+    }
+    for index in range(1, ports + 1):
+        if_entry = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+        if_x_entry = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1)
+        mib[if_entry + (1, index)] = index
+        mib[if_entry + (2, index)] = OctetString(f"GigabitEthernet0/{index}".encode())
+        mib[if_entry + (3, index)] = 6
+        mib[if_entry + (5, index)] = Gauge32(1000000000)
+        mib[if_entry + (6, index)] = OctetString(bytes([0, 0x1C, 0, 0, 0, index]))
+        mib[if_entry + (7, index)] = 1
+        mib[if_entry + (8, index)] = 1
+        for column in range(10, 21):
+            mib[if_entry + (column, index)] = Counter32(index * 1000 + column)
+        mib[if_x_entry + (1, index)] = OctetString(f"Gi0/{index}".encode())
+        for column in range(6, 14):
+            mib[if_x_entry + (column, index)] = Counter64(2**40 + index * column)
+        mib[if_x_entry + (15, index)] = Gauge32(1000)
+    return sorted(mib.items())
+
+
+def run_agent(ports: int, ready):
+    """模拟SNMP代理进程入口"""
+    mib = build_mib(ports)
+    keys = [oid for oid, _ in mib]
+    lookup = dict(mib)
+
+    def get_next(oid):
+        position = bisect.bisect_right(keys, oid)
+        return mib[position] if position < len(mib) else (oid, END_OF_MIB_VIEW)
+
+    class AgentProtocol(asyncio.DatagramProtocol):
+        def connection_made(self, transport):
+            self.transport = transport
+
+        def datagram_received(self, data, addr):
+            request = ber_codec.decode_message(data)
+            oids = [oid for oid, _ in request.var_binds]
+            var_binds = []
+            if request.pdu_type == PDU_GET:
+                var_binds = [(oid, lookup.get(oid, NO_SUCH_OBJECT)) for oid in oids]
+            elif request.pdu_type == PDU_GETNEXT:
+                var_binds = [get_next(oid) for oid in oids]
+            elif request.pdu_type == PDU_GETBULK:
+                cursors = list(oids)
+                for _ in range(max(1, request.error_index)):
+                    for position, cursor in enumerate(cursors):
+                        oid, value = get_next(cursor)
+                        var_binds.append((oid, value))
+                        cursors[position] = oid
+            self.transport.sendto(
+                ber_codec.encode_message(
+                    request.version,
+                    request.community,
+                    PDU_RESPONSE,
+                    request.request_id,
+                    var_binds,
+                ),
+                addr,
+            )
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            AgentProtocol, local_addr=(AGENT_HOST, AGENT_PORT)
+        )
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def bench_codec(rounds: int):
+    """编解码基准：GETBULK请求编码 + 100个变量绑定的响应解码"""
+    from pyasn1.codec.ber import decoder, encoder
+    from pysnmp.proto import api
+
+    proto = api.PROTOCOL_MODULES[api.SNMP_VERSION_2C]
+    oids = [(1, 3, 6, 1, 2, 1, 31, 1, 1, 1, column) for column in (6, 10, 7, 11)]
+    response_binds = [
+        (oid + (index,), Counter64(2**40 + index))
+        for index in range(1, 26)
+        for oid in oids
+    ]
+    response = ber_codec.encode_message(1, b"public", PDU_RESPONSE, 1, response_binds)
+
+    start = time.process_time()
+    for request_id in range(rounds):
+        ber_codec.encode_request(1, b"public", PDU_GETBULK, request_id, oids, 0, 25)
+        ber_codec.decode_message(response)
+    native = time.process_time() - start
+
+    message_spec = proto.Message()
+    start = time.process_time()
+    for request_id in range(rounds):
+        pdu = proto.GetBulkRequestPDU()
+        proto.apiBulkPDU.set_defaults(pdu)
+        proto.apiBulkPDU.set_request_id(pdu, request_id)
+        proto.apiBulkPDU.set_max_repetitions(pdu, 25)
+        proto.apiBulkPDU.set_varbinds(pdu, [(oid, proto.Null("")) for oid in oids])
+        message = proto.Message()
+        proto.apiMessage.set_defaults(message)
+        proto.apiMessage.set_community(message, "public")
+        proto.apiMessage.set_pdu(message, pdu)
+        encoder.encode(message)
+        decoded, _ = decoder.decode(response, asn1Spec=message_spec)
+        proto.apiPDU.get_varbinds(proto.apiMessage.get_pdu(decoded))
+    pysnmp = time.process_time() - start
+
+    print(f"编解码基准（{rounds}轮，每轮1个请求 + 100个变量绑定的响应）")
+    print(f"  pysnmp: {pysnmp / rounds * 1e6:8.1f} µs/PDU")
+    print(f"  native: {native / rounds * 1e6:8.1f} µs/PDU")
+    print(f"  加速比: {pysnmp / native:.1f}x")
+
+
+async def bench_walk(monitor: SNMPMonitor, codec: str, walks: int, concurrency: int):
+    """端到端基准：并发遍历接口表，返回 (PDU数, CPU秒, 墙钟秒)"""
+    columns = {
+        name: monitor.OIDS[name]
+        for name in monitor.INTERFACE_INFO_COLUMNS
+        + monitor.INTERFACE_HC_COUNTER_COLUMNS
+    }
+    pdus = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    original = monitor._send_pdu
+
+    async def counting_send(*args, **kwargs):
+        nonlocal pdus
+        pdus += 1
+        return await original(*args, **kwargs)
+
+    monitor._send_pdu = counting_send
+
+    async def one_walk():
+        async with semaphore:
+            rows, success = await monitor.walk_columns(
+                AGENT_HOST,
+                "v2c",
+                columns,
+                community=COMMUNITY,
+                port=AGENT_PORT,
+                codec=codec,
+            )
+            assert success and rows, "接口表遍历失败"
+
+    # 预热（创建套接字、填充缓存）
+    await one_walk()
+    pdus = 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*[one_walk() for _ in range(walks)])
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    monitor._send_pdu = original
+    return pdus, cpu, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原生BER编解码器性能对比")
+    parser.add_argument("--ports", type=int, default=48, help="模拟设备端口数")
+    parser.add_argument("--walks", type=int, default=50, help="接口表遍历次数")
+    parser.add_argument("--concurrency", type=int, default=20, help="并发遍历数")
+    parser.add_argument("--rounds", type=int, default=2000, help="编解码基准轮数")
+    args = parser.parse_args()
+
+    bench_codec(args.rounds)
+
+    ready = multiprocessing.Event()
+    agent = multiprocessing.Process(
+        target=run_agent, args=(args.ports, ready), daemon=True
+    )
+    agent.start()
+    if not ready.wait(10):
+        print("模拟代理启动失败")
+        return
+
+    try:
+        monitor = SNMPMonitor()
+        results = {}
+        for codec in (SNMPMonitor.CODEC_PYSNMP, SNMPMonitor.CODEC_NATIVE):
+            results[codec] = asyncio.run(
+                bench_walk(monitor, codec, args.walks, args.concurrency)
+            )
+
+        print(
+            f"\n端到端基准（{args.walks}次遍历，{args.ports}个接口，并发{args.concurrency}）"
+        )
+        for codec, (pdus, cpu, wall) in results.items():
+            print(
+                f"  {codec:7s}: {pdus} PDU, CPU {cpu:.2f}s, 墙钟 {wall:.2f}s, "
+                f"{pdus / cpu:8.0f} PDU/CPU秒"
+            )
+        pysnmp_rate = results["pysnmp"][0] / results["pysnmp"][1]
+        native_rate = results["native"][0] / results["native"][1]
+        print(f"  加速比: {native_rate / pysnmp_rate:.1f}x")
+    finally:
+        agent.terminate()
+        agent.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP轮询器基准测试
+
+在子进程中启动模拟SNMP代理（N台交换机×M个端口，每台交换机使用不同的127.x地址），
+用SNMPPoller的单设备轮询路径（熔断、超时、厂商OID探测、静态列缓存、速率计算）
+按指定并发轮询全部交换机若干轮，分别统计设备轮询和接口轮询的：
+- 轮询数/秒、PDU数/秒
+- 单次轮询延迟 p50 / p99
+- 每次轮询的CPU时间（只统计轮询进程，模拟代理在另一个进程中）
+
+第一轮包含厂商OID探测、静态列读取和速率基线建立，单独报告为“首轮”，其余轮次汇总为“稳定”。
+
+用法:
+    python examples/benchmark_poller.py --switches 200 --ports 48 --rounds 5
+    python examples/benchmark_poller.py --codec both --latency 0.002 --jitter 0.003 --loss 0.01
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.snmp.agent_simulator import (
+    run_simulator,
+    simulator_switch_configs,
+    simulator_targets,
+)
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.manager import SNMPManager
+from src.snmp.snmp_monitor import SNMPMonitor
+from src.snmp.unified_poller import SNMPPoller
+
+
+def raise_file_limit(required: int) -> None:
+    """每台模拟交换机占用一个套接字，按需提高进程的文件描述符上限"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < required:
+        target = required if hard == resource.RLIM_INFINITY else min(required, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def bench_poller(
+    poller: SNMPPoller,
+    switches: List[Dict[str, Any]],
+    rounds: int,
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    """按并发轮询全部交换机若干轮，返回每轮的统计"""
+    monitor = poller.snmp_manager.monitor
+    pdus = 0
+    original = monitor._send_pdu
+
+    async def counting_send(*args, **kwargs):
+        nonlocal pdus
+        pdus += 1
+        return await original(*args, **kwargs)
+
+    monitor._send_pdu = counting_send
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def poll_one(switch, latencies, failures):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await poller._poll_single_switch(switch, use_cache=False)
+            latencies.append(time.perf_counter() - started)
+            if result.get("type") != "success":
+                failures.append(result.get("error"))
+
+    results = []
+    try:
+        for _ in range(rounds):
+            latencies: List[float] = []
+            failures: List[str] = []
+            pdus = 0
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            await asyncio.gather(
+                *[poll_one(switch, latencies, failures) for switch in switches]
+            )
+            results.append(
+                {
+                    "polls": len(latencies),
+                    "failures": len(failures),
+                    "pdus": pdus,
+                    "cpu": time.process_time() - cpu_start,
+                    "wall": time.perf_counter() - wall_start,
+                    "latencies": latencies,
+                }
+            )
+    finally:
+        monitor._send_pdu = original
+        close_loop_engine(asyncio.get_running_loop())
+    return results
+
+
+def summarize(rounds: List[Dict[str, Any]]) -> Dict[str, float]:
+    polls = sum(r["polls"] for r in rounds)
+    wall = sum(r["wall"] for r in rounds) or 1e-9
+    latencies = [latency for r in rounds for latency in r["latencies"]]
+    return {
+        "polls": polls,
+        "failures": sum(r["failures"] for r in rounds),
+        "polls_per_sec": polls / wall,
+        "pdus_per_sec": sum(r["pdus"] for r in rounds) / wall,
+        "pdus_per_poll": sum(r["pdus"] for r in rounds) / max(polls, 1),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "cpu_ms_per_poll": sum(r["cpu"] for r in rounds) / max(polls, 1) * 1000,
+    }
+
+
+def print_summary(label: str, summary: Dict[str, float]) -> None:
+    print(
+        f"  {label:18s} {summary['polls']:6d} {summary['failures']:5d} "
+        f"{summary['polls_per_sec']:9.1f} {summary['pdus_per_sec']:9.1f} "
+        f"{summary['pdus_per_poll']:7.1f} {summary['p50_ms']:8.1f} "
+        f"{summary['p99_ms']:8.1f} {summary['cpu_ms_per_poll']:9.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SNMP轮询器基准测试")
+    parser.add_argument("--switches", type=int, default=100, help="模拟交换机数")
+    parser.add_argument("--ports", type=int, default=48, help="每台交换机的端口数")
+    parser.add_argument("--rounds", type=int, default=3, help="轮询轮数（含首轮）")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发轮询数")
+    parser.add_argument(
+        "--poll-type",
+        choices=["device", "interface", "both"],
+        default="both",
+        help="轮询类型",
+    )
+    parser.add_argument(
+        "--codec",
+        choices=[SNMPMonitor.CODEC_PYSNMP, SNMPMonitor.CODEC_NATIVE, "both"],
+        default="both",
+        help="v1/v2c编解码实现",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="代理响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟抖动上限（秒）")
+    parser.add_argument("--loss", type=float, default=0.0, help="丢包率（0~1）")
+    parser.add_argument("--if-index-gap", type=int, default=0, help="ifIndex间隔")
+    parser.add_argument("--timeout", type=int, default=10, help="单设备轮询超时（秒）")
+    parser.add_argument(
+        "--host", default="127.1.0.1", help="第一台模拟交换机的地址（依次递增）"
+    )
+    parser.add_argument("--port", type=int, default=16161, help="模拟代理端口")
+    args = parser.parse_args()
+
+    raise_file_limit(args.switches + 256)
+    targets = simulator_targets(args.switches, args.host, args.port, True)
+
+    ready = multiprocessing.Event()
+    agent = multiprocessing.Process(
+        target=run_simulator,
+        kwargs=dict(
+            ready=ready,
+            switches=args.switches,
+            ports=args.ports,
+            host=args.host,
+            port=args.port,
+            distinct_addresses=True,
+            latency=args.latency,
+            jitter=args.jitter,
+            loss=args.loss,
+            if_index_gap=args.if_index_gap,
+        ),
+        daemon=True,
+    )
+    agent.start()
+    if not ready.wait(30):
+        print("模拟代理启动失败")
+        agent.terminate()
+        return
+
+    codecs = (
+        [SNMPMonitor.CODEC_PYSNMP, SNMPMonitor.CODEC_NATIVE]
+        if args.codec == "both"
+        else [args.codec]
+    )
+    poll_types = (
+        ["device", "interface"] if args.poll_type == "both" else [args.poll_type]
+    )
+
+    print(
+        f"模拟代理: {args.switches}台交换机 × {args.ports}端口, "
+        f"延迟{args.latency * 1000:.1f}ms(+{args.jitter * 1000:.1f}ms), "
+        f"丢包{args.loss:.1%}, 并发{args.concurrency}, {args.rounds}轮"
+    )
+    print(
+        f"  {'':18s} {'轮询':>6s} {'失败':>5s} {'轮询/秒':>9s} {'PDU/秒':>9s} "
+        f"{'PDU/次':>7s} {'p50(ms)':>8s} {'p99(ms)':>8s} {'CPU(ms/次)':>9s}"
+    )
+    try:
+        for poll_type in poll_types:
+            for codec in codecs:
+                poller = SNMPPoller(
+                    None,
+                    poll_type=poll_type,
+                    poll_interval=3600,
+                    device_timeout=args.timeout,
+                    enable_cache=False,
+                    dynamic_adjustment=False,
+                )
+                poller.snmp_manager = SNMPManager()
+                switches = simulator_switch_configs(targets, codec=codec)
+                rounds = asyncio.run(
+                    bench_poller(poller, switches, args.rounds, args.concurrency)
+                )
+                print_summary(f"{poll_type}/{codec} 首轮", summarize(rounds[:1]))
+                if len(rounds) > 1:
+                    print_summary(f"{poll_type}/{codec} 稳定", summarize(rounds[1:]))
+    finally:
+        agent.terminate()
+        agent.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -80,6 +80,38 @@ def cleanup_on_exit():
     except Exception as e:
         logger.error(f"停止SNMP轮询器时出错: {e}")
 
+    # 清除轮询结果增量广播状态
+    try:
+        from src.snmp.poll_delta import stop_poll_delta_encoder
+
+        stop_poll_delta_encoder()
+    except Exception as e:
+        logger.error(f"清除轮询结果增量广播状态时出错: {e}")
+
+    # 停止SNMP Trap接收器
+    try:
+        from src.snmp.trap_receiver import stop_trap_receiver
+
+        stop_trap_receiver()
+    except Exception as e:
+        logger.error(f"停止SNMP Trap接收器时出错: {e}")
+
+    # 停止网络扫描任务（未完成的任务下次启动时恢复）
+    try:
+        from src.snmp.scan_jobs import stop_scan_job_runner
+
+        stop_scan_job_runner()
+    except Exception as e:
+        logger.error(f"停止网络扫描任务时出错: {e}")
+
+    # 停止实时速率采样
+    try:
+        from src.snmp.live_rates import stop_live_rate_streamer
+
+        stop_live_rate_streamer()
+    except Exception as e:
+        logger.error(f"停止实时速率采样时出错: {e}")
+
     # 停止TCP服务器
     if "tcp_server" in globals() and tcp_server is not None:
         try:
@@ -212,6 +244,19 @@ def main():
         snmp_manager = SNMPManager(db_manager=db_manager)
         snmp_manager.start_pollers()
 
+        # 恢复服务重启前未完成的网络扫描任务（从最后一个检查点继续）
+        from src.snmp.scan_jobs import get_scan_job_runner
+
+        get_scan_job_runner(db_manager.scan_job_manager).resume_interrupted()
+
+        # 启动SNMP Trap/Inform接收器（通知到达后立即广播并刷新受影响的接口）
+        from src.core.config import SNMP_TRAP_ENABLED
+
+        if SNMP_TRAP_ENABLED:
+            from src.snmp.trap_receiver import start_trap_receiver
+
+            start_trap_receiver(db_manager.switch_manager.registry)
+
         # 9. 启动服务器性能监控器
         logger.info("启动服务器性能监控器...")
         from src.monitor import get_server_monitor
@@ -26,3 +26,52 @@ LOG_FILE = Path(__file__).parent.parent.parent / "logs" / "net_manager_server"
 
 # 服务器性能监控配置
 SERVER_MONITOR_INTERVAL = 10  # 服务器性能数据采集间隔（秒）
+
+# SNMP轮询配置
+SNMP_POLL_PROCESSES = 0  # SNMP轮询工作进程数（0表示在服务进程内以线程方式轮询）
+SNMP_CODEC = "pysnmp"  # 轮询v1/v2c设备使用的编解码实现（"pysnmp" 或 "native"），单次请求可通过get_data等方法的codec参数指定
+SNMP_VENDOR_PROFILE_TTL = 86400  # 交换机CPU/内存/温度OID探测结果的有效期（秒），过期后重新探测
+SNMP_INTERFACE_STATIC_TTL = 3600  # 接口静态属性（描述、类型、速率、MAC、MTU）的强制刷新间隔（秒），期间只在设备重启或接口变化时刷新
+SNMP_ON_DEMAND_WORKERS = 2  # 每个轮询器为按需轮询（打开交换机详情时立即轮询）预留的并发数，与后台轮询的并发互不占用
+SNMP_ON_DEMAND_QUEUE_LIMIT = 32  # 每个轮询器排队中的按需轮询请求上限，超出时拒绝请求
+SNMP_ON_DEMAND_TIMEOUT = 30  # 等待按需轮询结果的超时时间（秒）
+SNMP_LIVE_RATE_MIN_INTERVAL = 1  # 实时端口速率订阅的最短采样间隔（秒）
+SNMP_LIVE_RATE_MAX_INTERVAL = 60  # 实时端口速率订阅的最长采样间隔（秒）
+SNMP_LIVE_RATE_MAX_STREAMS = 20  # 同时进行实时速率采样的交换机数上限（同一交换机的多个订阅共用一路采样）
+SNMP_DELTA_ENABLED = True  # 轮询结果是否增量广播（只发送相对上一次的变化，定期发送完整关键帧）
+SNMP_DELTA_KEYFRAME_INTERVAL = 20  # 每台交换机每隔多少条轮询结果发送一次完整关键帧
+SNMP_DELTA_KEYFRAME_MAX_AGE = 300  # 两次完整关键帧之间的最长间隔（秒）
+SNMP_TRAP_ENABLED = True  # 是否启动SNMP Trap/Inform接收器（收到linkUp/linkDown等通知后立即广播并刷新对应接口）
+SNMP_TRAP_HOST = "0.0.0.0"  # Trap接收器监听地址
+SNMP_TRAP_PORT = 162  # Trap接收器监听端口（低于1024的端口需要管理员权限，无权限时可改用如10162并在交换机上配置对应端口）
+SNMP_TRAP_COMMUNITIES = []  # 除交换机配置的团体名外额外接受的v1/v2c Trap团体名（交换机单独配置Trap团体名时使用）
+SNMP_CONCURRENCY_GROUP_PREFIX = 24  # 后台轮询并发按站点/子网分组限制：未归入SNMP_CONCURRENCY_SITES的交换机按该前缀长度的IPv4子网分组
+SNMP_CONCURRENCY_SITES = {}  # 站点划分 {"站点名": ["10.1.0.0/16", ...]}，同一站点的交换机共用一个并发限制（最长前缀匹配）
+SNMP_CONCURRENCY_TIMEOUT_RATIO = 0.1  # 一个采样窗口内超时比例超过该值时按乘性减小该分组的并发
+SNMP_CONCURRENCY_LATENCY_TARGET = 0.5  # 窗口p90延迟超过单设备超时时间的该比例时按乘性减小该分组的并发
+SNMP_CONCURRENCY_DECREASE_FACTOR = 0.7  # 乘性减小系数（并发打满且延迟正常时每个窗口加1）
+
+# SNMP子网扫描配置
+SNMP_SWEEP_RATE = 10000  # 扫描探测报文的全局发送速率上限（包/秒，进程内所有扫描任务共享）
+SNMP_SWEEP_TIMEOUT = 2  # 每次探测等待响应的时间（秒），超时未响应的主机立即重发
+SNMP_SWEEP_RETRIES = 1  # 对未响应主机的重扫次数
+SNMP_SCAN_MAX_JOBS = 2  # 同时执行的扫描任务数（其余任务排队，所有任务共享SNMP_SWEEP_RATE）
+SNMP_SCAN_BLOCK_PREFIX = 24  # 扫描任务的地址块大小（IPv4前缀长度），每完成一个地址块记录一次检查点
+SNMP_SCAN_MAX_ADDRESSES = 2**24  # 单个扫描任务的最大地址数
+
+# SNMP MIB配置（运行时只加载预编译模块，不访问网络MIB源）
+SNMP_MIB_SOURCE_DIR = Path(__file__).parent.parent.parent / "mibs" / "asn1"  # 构建时编译所用的MIB源文件目录
+SNMP_MIB_CACHE_DIR = Path(__file__).parent.parent.parent / "mibs" / "compiled"  # 预编译MIB模块目录
+
+# SNMP指标时序存储配置
+METRICS_FLUSH_INTERVAL = 5  # 指标缓冲区批量写入间隔（秒）
+METRICS_MAINTENANCE_INTERVAL = 60  # 指标汇总和过期清理间隔（秒）
+METRICS_RETENTION = {
+    0: 2 * 86400,  # 原始采样保留2天
+    60: 7 * 86400,  # 1分钟汇总保留7天
+    300: 30 * 86400,  # 5分钟汇总保留30天
+    3600: 365 * 86400,  # 1小时汇总保留1年
+}
+
+# SNMP轮询状态持久化配置（服务重启后恢复最后一次轮询结果和速率基线）
+SNMP_STATE_FLUSH_INTERVAL = 15  # 最后一次轮询结果和计数器基线的批量写入间隔（秒）
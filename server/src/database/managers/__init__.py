@@ -10,6 +10,10 @@ from src.database.managers.base_manager import BaseDatabaseManager
 from src.database.managers.device_manager import DeviceManager
 from src.database.managers.switch_manager import SwitchManager
 from src.database.managers.topology_manager import TopologyManager
+from src.database.managers.metrics_manager import MetricsManager
+from src.database.managers.scan_job_manager import ScanJobManager
+from src.database.managers.vendor_profile_manager import VendorProfileManager
+from src.database.managers.poll_state_manager import PollStateManager
 
 __all__ = [
     "DatabaseManager",
@@ -17,4 +21,8 @@ __all__ = [
     "DeviceManager",
     "SwitchManager",
     "TopologyManager",
+    "MetricsManager",
+    "ScanJobManager",
+    "VendorProfileManager",
+    "PollStateManager",
 ]
@@ -23,6 +23,10 @@ from src.database.managers.base_manager import BaseDatabaseManager
 from src.database.managers.device_manager import DeviceManager
 from src.database.managers.switch_manager import SwitchManager
 from src.database.managers.topology_manager import TopologyManager
+from src.database.managers.metrics_manager import MetricsManager
+from src.database.managers.scan_job_manager import ScanJobManager
+from src.database.managers.vendor_profile_manager import VendorProfileManager
+from src.database.managers.poll_state_manager import PollStateManager
 
 
 class DatabaseManager:
@@ -98,6 +102,42 @@ class DatabaseManager:
                 shared_pool=self.shared_pool,
             )
 
+            # 创建 metrics_manager（SNMP指标时序存储），使用共享连接池
+            self.metrics_manager = MetricsManager(
+                db_path,
+                max_connections,
+                cleanup_interval,
+                max_idle_time,
+                shared_pool=self.shared_pool,
+            )
+
+            # 创建 scan_job_manager（网络扫描任务持久化），使用共享连接池
+            self.scan_job_manager = ScanJobManager(
+                db_path,
+                max_connections,
+                cleanup_interval,
+                max_idle_time,
+                shared_pool=self.shared_pool,
+            )
+
+            # 创建 vendor_profile_manager（厂商监控OID探测结果），使用共享连接池
+            self.vendor_profile_manager = VendorProfileManager(
+                db_path,
+                max_connections,
+                cleanup_interval,
+                max_idle_time,
+                shared_pool=self.shared_pool,
+            )
+
+            # 创建 poll_state_manager（最后一次轮询结果和计数器基线），使用共享连接池
+            self.poll_state_manager = PollStateManager(
+                db_path,
+                max_connections,
+                cleanup_interval,
+                max_idle_time,
+                shared_pool=self.shared_pool,
+            )
+
             # 初始化异步连接池
             self.async_pool = None
             logger.info("数据库管理器初始化成功（所有管理器共享一个连接池）")
@@ -0,0 +1,731 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP指标时序存储管理器 - 保存接口速率和交换机CPU/内存的历史数据
+
+- 轮询器写入的采样先进入内存缓冲区，由后台线程定期批量写入
+- 原始数据逐级汇总为 1分钟 → 5分钟 → 1小时 粒度（按采样数加权平均，保留最大值）
+- 各粒度按保留期分批清理，每批使用独立的短事务，避免长时间占用写锁
+- 范围查询根据时间跨度和保留期自动选择汇总粒度
+"""
+
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.core.logger import logger
+from src.core.config import (
+    METRICS_FLUSH_INTERVAL,
+    METRICS_MAINTENANCE_INTERVAL,
+    METRICS_RETENTION,
+)
+from src.database.db_exceptions import DatabaseError, DatabaseQueryError
+from src.database.managers.base_manager import BaseDatabaseManager
+
+
+class MetricsManager(BaseDatabaseManager):
+    """SNMP指标时序存储管理器类
+
+    提供指标批量写入、逐级汇总、过期清理和范围查询功能。
+    """
+
+    # 数据粒度（秒），0表示原始采样
+    RESOLUTIONS = (0, 60, 300, 3600)
+
+    # 汇总链路: (源粒度, 目标粒度)
+    ROLLUP_CHAIN = ((0, 60), (60, 300), (300, 3600))
+
+    # 接口指标字段（与InterfaceRateCalculator输出的速率字段一致）
+    INTERFACE_FIELDS = (
+        "in_bps",
+        "out_bps",
+        "in_pps",
+        "out_pps",
+        "in_errors_ps",
+        "out_errors_ps",
+        "in_discards_ps",
+        "out_discards_ps",
+        "in_utilization",
+        "out_utilization",
+    )
+
+    # 接口指标中保留最大值的字段
+    INTERFACE_PEAK_FIELDS = ("in_bps", "out_bps")
+
+    # 交换机指标字段
+    SWITCH_FIELDS = ("cpu_usage", "memory_usage")
+
+    # 交换机指标中保留最大值的字段
+    SWITCH_PEAK_FIELDS = ("cpu_usage", "memory_usage")
+
+    # 原始采样的估计间隔（秒），用于估算原始粒度的查询点数
+    RAW_INTERVAL = 30
+
+    # 查询默认返回的最大点数（每个序列）
+    DEFAULT_MAX_POINTS = 1500
+
+    # 桶结束后等待迟到采样的时间（秒），超过后才进行汇总
+    ROLLUP_GRACE = 60
+
+    # 单个汇总事务处理的最大目标桶数
+    ROLLUP_MAX_BUCKETS = 60
+
+    # 单次清理删除的最大行数及批次间隔（秒）
+    PRUNE_BATCH_SIZE = 2000
+    PRUNE_PAUSE = 0.05
+
+    # 缓冲区最大行数，超过后立即写入
+    MAX_BUFFER_ROWS = 5000
+
+    def __init__(
+        self,
+        db_path: str = "net_manager_server.db",
+        max_connections: int = 10,
+        cleanup_interval: int = 60,
+        max_idle_time: int = 300,
+        shared_pool=None,
+        retention: Optional[Dict[int, int]] = None,
+    ):
+        """
+        初始化指标时序存储管理器
+
+        Args:
+            db_path: 数据库文件路径
+            max_connections: 最大连接数
+            cleanup_interval: 连接池清理间隔（秒）
+            max_idle_time: 连接最大空闲时间（秒）
+            shared_pool: 共享的连接池实例（可选）
+            retention: 各粒度的保留期（秒），默认使用配置文件中的METRICS_RETENTION
+        """
+        super().__init__(
+            db_path, max_connections, cleanup_interval, max_idle_time, shared_pool
+        )
+        self.retention = dict(retention or METRICS_RETENTION)
+        self.flush_interval = METRICS_FLUSH_INTERVAL
+        self.maintenance_interval = METRICS_MAINTENANCE_INTERVAL
+
+        # 写入缓冲区
+        self._interface_buffer: List[Tuple] = []
+        self._switch_buffer: List[Tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        # 后台写入/维护线程
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self._stats = {
+            "written_rows": 0,
+            "rolled_up_rows": 0,
+            "pruned_rows": 0,
+            "last_flush_duration": 0.0,
+            "last_maintenance_duration": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+        self.init_tables()
+
+    def init_tables(self) -> None:
+        """初始化指标表结构"""
+        interface_columns = ",\n".join(
+            f"{field} REAL" for field in self.INTERFACE_FIELDS
+        )
+        interface_peaks = ",\n".join(
+            f"max_{field} REAL" for field in self.INTERFACE_PEAK_FIELDS
+        )
+        switch_columns = ",\n".join(f"{field} REAL" for field in self.SWITCH_FIELDS)
+        switch_peaks = ",\n".join(
+            f"max_{field} REAL" for field in self.SWITCH_PEAK_FIELDS
+        )
+
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+
+                # 接口指标表：resolution为0表示原始采样，ts为桶起始时间（Unix秒）
+                cursor.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS interface_metrics (
+                        switch_id INTEGER NOT NULL,
+                        if_index INTEGER NOT NULL,
+                        resolution INTEGER NOT NULL,
+                        ts INTEGER NOT NULL,
+                        samples INTEGER NOT NULL DEFAULT 1,
+                        {interface_columns},
+                        {interface_peaks},
+                        PRIMARY KEY (switch_id, if_index, resolution, ts)
+                    )
+                """
+                )
+
+                # 交换机指标表
+                cursor.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS switch_metrics (
+                        switch_id INTEGER NOT NULL,
+                        resolution INTEGER NOT NULL,
+                        ts INTEGER NOT NULL,
+                        samples INTEGER NOT NULL DEFAULT 1,
+                        {switch_columns},
+                        {switch_peaks},
+                        PRIMARY KEY (switch_id, resolution, ts)
+                    )
+                """
+                )
+
+                # 汇总和清理按 (粒度, 时间) 扫描
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_interface_metrics_resolution_ts
+                    ON interface_metrics(resolution, ts)
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_switch_metrics_resolution_ts
+                    ON switch_metrics(resolution, ts)
+                """
+                )
+
+                # 汇总进度（每个表每个目标粒度已汇总到的时间）
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS metrics_rollup_state (
+                        table_name TEXT NOT NULL,
+                        resolution INTEGER NOT NULL,
+                        last_ts INTEGER NOT NULL,
+                        PRIMARY KEY (table_name, resolution)
+                    )
+                """
+                )
+
+                conn.commit()
+                logger.info("指标时序表初始化成功")
+        except Exception as e:
+            logger.error(f"指标时序表初始化失败: {e}")
+            raise DatabaseError(f"指标时序表初始化失败: {e}") from e
+
+    # ==================== 写入 ====================
+
+    def record_interface_rates(
+        self,
+        switch_id: int,
+        interfaces: List[Dict[str, Any]],
+        timestamp: Optional[float] = None,
+    ) -> int:
+        """
+        记录一次接口速率采样（写入缓冲区）
+
+        Args:
+            switch_id: 交换机ID
+            interfaces: 接口列表（含index和速率字段，无速率的接口被忽略）
+            timestamp: 采样时间戳，默认当前时间
+
+        Returns:
+            加入缓冲区的行数
+        """
+        ts = int(timestamp if timestamp is not None else time.time())
+        rows = []
+        for interface in interfaces:
+            if_index = interface.get("index")
+            if if_index is None or "in_bps" not in interface:
+                continue
+            values = [interface.get(field) for field in self.INTERFACE_FIELDS]
+            peaks = [interface.get(field) for field in self.INTERFACE_PEAK_FIELDS]
+            rows.append((switch_id, if_index, 0, ts, 1, *values, *peaks))
+
+        if rows:
+            self._append_rows(self._interface_buffer, rows)
+        return len(rows)
+
+    def record_switch_usage(
+        self,
+        switch_id: int,
+        cpu_usage: Optional[float],
+        memory_usage: Optional[float],
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        记录一次交换机CPU/内存采样（写入缓冲区）
+
+        Args:
+            switch_id: 交换机ID
+            cpu_usage: CPU使用率（%）
+            memory_usage: 内存使用率（%）
+            timestamp: 采样时间戳，默认当前时间
+
+        Returns:
+            是否加入缓冲区（两项都为空时不记录）
+        """
+        if cpu_usage is None and memory_usage is None:
+            return False
+        ts = int(timestamp if timestamp is not None else time.time())
+        self._append_rows(
+            self._switch_buffer,
+            [(switch_id, 0, ts, 1, cpu_usage, memory_usage, cpu_usage, memory_usage)],
+        )
+        return True
+
+    def _append_rows(self, buffer: List[Tuple], rows: List[Tuple]) -> None:
+        """将行加入缓冲区，缓冲区过大时立即写入"""
+        with self._buffer_lock:
+            buffer.extend(rows)
+            pending = len(self._interface_buffer) + len(self._switch_buffer)
+        if pending >= self.MAX_BUFFER_ROWS:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        将缓冲区中的采样批量写入数据库
+
+        Returns:
+            写入的行数
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                interface_rows = self._interface_buffer
+                switch_rows = self._switch_buffer
+                self._interface_buffer = []
+                self._switch_buffer = []
+
+            if not interface_rows and not switch_rows:
+                return 0
+
+            start_time = time.time()
+            try:
+                with self.transaction() as conn:
+                    if interface_rows:
+                        conn.executemany(
+                            self._insert_sql(
+                                "interface_metrics",
+                                ("switch_id", "if_index"),
+                                self.INTERFACE_FIELDS,
+                                self.INTERFACE_PEAK_FIELDS,
+                            ),
+                            interface_rows,
+                        )
+                    if switch_rows:
+                        conn.executemany(
+                            self._insert_sql(
+                                "switch_metrics",
+                                ("switch_id",),
+                                self.SWITCH_FIELDS,
+                                self.SWITCH_PEAK_FIELDS,
+                            ),
+                            switch_rows,
+                        )
+            except Exception as e:
+                logger.error(
+                    f"批量写入指标失败，丢弃 {len(interface_rows) + len(switch_rows)} 行: {e}"
+                )
+                return 0
+
+            written = len(interface_rows) + len(switch_rows)
+            with self._stats_lock:
+                self._stats["written_rows"] += written
+                self._stats["last_flush_duration"] = time.time() - start_time
+            logger.debug(f"批量写入 {written} 行指标")
+            return written
+
+    @staticmethod
+    def _insert_sql(
+        table: str,
+        key_columns: Tuple[str, ...],
+        fields: Tuple[str, ...],
+        peak_fields: Tuple[str, ...],
+    ) -> str:
+        """生成指标插入语句"""
+        columns = (
+            list(key_columns)
+            + ["resolution", "ts", "samples"]
+            + list(fields)
+            + [f"max_{field}" for field in peak_fields]
+        )
+        placeholders = ", ".join("?" for _ in columns)
+        return (
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({placeholders})"
+        )
+
+    # ==================== 汇总 ====================
+
+    def rollup(self, now: Optional[float] = None) -> int:
+        """
+        将已结束的时间桶逐级汇总到更粗的粒度
+
+        每个事务最多处理ROLLUP_MAX_BUCKETS个目标桶，落后较多时分多个短事务追赶。
+
+        Args:
+            now: 当前时间戳，默认当前时间
+
+        Returns:
+            写入的汇总行数
+        """
+        now = int(now if now is not None else time.time())
+        total = 0
+        for source, target in self.ROLLUP_CHAIN:
+            total += self._rollup_table(
+                "interface_metrics",
+                ("switch_id", "if_index"),
+                self.INTERFACE_FIELDS,
+                self.INTERFACE_PEAK_FIELDS,
+                source,
+                target,
+                now,
+            )
+            total += self._rollup_table(
+                "switch_metrics",
+                ("switch_id",),
+                self.SWITCH_FIELDS,
+                self.SWITCH_PEAK_FIELDS,
+                source,
+                target,
+                now,
+            )
+
+        with self._stats_lock:
+            self._stats["rolled_up_rows"] += total
+        return total
+
+    def _rollup_table(
+        self,
+        table: str,
+        key_columns: Tuple[str, ...],
+        fields: Tuple[str, ...],
+        peak_fields: Tuple[str, ...],
+        source: int,
+        target: int,
+        now: int,
+    ) -> int:
+        """汇总单个表的一个粒度层级"""
+        closed_end = (now - self.ROLLUP_GRACE) // target * target
+        keys = ", ".join(key_columns)
+
+        # 平均值按采样数加权，空值不参与计算
+        averages = ", ".join(
+            f"SUM({field} * samples) / SUM(CASE WHEN {field} IS NOT NULL "
+            f"THEN samples END)"
+            for field in fields
+        )
+        peaks = ", ".join(f"MAX(max_{field})" for field in peak_fields)
+        insert_sql = f"""
+            INSERT OR REPLACE INTO {table} (
+                {keys}, resolution, ts, samples,
+                {', '.join(fields)},
+                {', '.join(f'max_{field}' for field in peak_fields)}
+            )
+            SELECT {keys}, ?, (ts / ?) * ?, SUM(samples), {averages}, {peaks}
+            FROM {table}
+            WHERE resolution = ? AND ts >= ? AND ts < ?
+            GROUP BY {keys}, ts / ?
+        """
+
+        total = 0
+        try:
+            watermark = self._get_rollup_watermark(table, source, target)
+            while watermark is not None and watermark < closed_end:
+                batch_end = min(
+                    closed_end, watermark + target * self.ROLLUP_MAX_BUCKETS
+                )
+                with self.transaction() as conn:
+                    cursor = conn.execute(
+                        insert_sql,
+                        (target, target, target, source, watermark, batch_end, target),
+                    )
+                    total += max(cursor.rowcount, 0)
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO metrics_rollup_state (table_name, resolution, last_ts)
+                        VALUES (?, ?, ?)
+                    """,
+                        (table, target, batch_end),
+                    )
+                watermark = batch_end
+        except Exception as e:
+            logger.error(f"汇总指标失败: {table} {source}s -> {target}s, {e}")
+        return total
+
+    def _get_rollup_watermark(
+        self, table: str, source: int, target: int
+    ) -> Optional[int]:
+        """获取汇总进度；首次汇总时从源粒度最早的数据开始"""
+        with self.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT last_ts FROM metrics_rollup_state
+                WHERE table_name = ? AND resolution = ?
+            """,
+                (table, target),
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+
+            cursor.execute(
+                f"SELECT MIN(ts) FROM {table} WHERE resolution = ?", (source,)
+            )
+            row = cursor.fetchone()
+            if row is None or row[0] is None:
+                return None
+            return row[0] // target * target
+
+    # ==================== 清理 ====================
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        按保留期分批清理过期指标
+
+        每批最多删除PRUNE_BATCH_SIZE行并单独提交，批次之间短暂让出写锁。
+
+        Args:
+            now: 当前时间戳，默认当前时间
+
+        Returns:
+            删除的行数
+        """
+        now = int(now if now is not None else time.time())
+        total = 0
+        for table in ("interface_metrics", "switch_metrics"):
+            for resolution in self.RESOLUTIONS:
+                retention = self.retention.get(resolution)
+                if not retention:
+                    continue
+                cutoff = now - retention
+                try:
+                    while True:
+                        with self.transaction() as conn:
+                            cursor = conn.execute(
+                                f"""
+                                DELETE FROM {table} WHERE rowid IN (
+                                    SELECT rowid FROM {table}
+                                    WHERE resolution = ? AND ts < ?
+                                    LIMIT ?
+                                )
+                            """,
+                                (resolution, cutoff, self.PRUNE_BATCH_SIZE),
+                            )
+                            deleted = max(cursor.rowcount, 0)
+                        total += deleted
+                        if deleted < self.PRUNE_BATCH_SIZE:
+                            break
+                        time.sleep(self.PRUNE_PAUSE)
+                except Exception as e:
+                    logger.error(f"清理过期指标失败: {table} {resolution}s, {e}")
+
+        if total:
+            logger.debug(f"清理 {total} 行过期指标")
+        with self._stats_lock:
+            self._stats["pruned_rows"] += total
+        return total
+
+    # ==================== 查询 ====================
+
+    def select_resolution(
+        self,
+        start: float,
+        end: float,
+        max_points: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        根据时间范围选择查询粒度
+
+        选择保留期覆盖查询起点、且点数不超过max_points的最细粒度。
+
+        Args:
+            start: 起始时间戳
+            end: 结束时间戳
+            max_points: 每个序列的最大点数
+            now: 当前时间戳，默认当前时间
+
+        Returns:
+            粒度（秒），0表示原始采样
+        """
+        now = now if now is not None else time.time()
+        max_points = max_points or self.DEFAULT_MAX_POINTS
+        span = max(end - start, 0)
+        for resolution in self.RESOLUTIONS:
+            retention = self.retention.get(resolution)
+            if retention and start < now - retention:
+                continue
+            step = resolution or self.RAW_INTERVAL
+            if span / step <= max_points:
+                return resolution
+        return self.RESOLUTIONS[-1]
+
+    def query_interface_metrics(
+        self,
+        switch_id: int,
+        start: float,
+        end: float,
+        if_index: Optional[int] = None,
+        resolution: Optional[int] = None,
+        max_points: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        查询接口指标历史
+
+        Args:
+            switch_id: 交换机ID
+            start: 起始时间戳
+            end: 结束时间戳
+            if_index: 接口索引，为空时返回该交换机所有接口
+            resolution: 指定粒度（秒），为空时自动选择
+            max_points: 自动选择粒度时每个序列的最大点数
+
+        Returns:
+            {"resolution": 粒度, "points": [{if_index, ts, samples, 指标...}]}
+
+        Raises:
+            DatabaseQueryError: 查询失败时抛出
+        """
+        if resolution is None:
+            resolution = self.select_resolution(start, end, max_points)
+
+        columns = (
+            ["if_index", "ts", "samples"]
+            + list(self.INTERFACE_FIELDS)
+            + [f"max_{field}" for field in self.INTERFACE_PEAK_FIELDS]
+        )
+        conditions = "switch_id = ? AND resolution = ? AND ts >= ? AND ts <= ?"
+        params: List[Any] = [switch_id, resolution, int(start), int(end)]
+        if if_index is not None:
+            conditions = "switch_id = ? AND if_index = ? AND resolution = ? AND ts >= ? AND ts <= ?"
+            params.insert(1, if_index)
+
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(columns)} FROM interface_metrics
+                    WHERE {conditions}
+                    ORDER BY if_index, ts
+                """,
+                    params,
+                )
+                rows = cursor.fetchall()
+            return {
+                "resolution": resolution,
+                "points": [dict(zip(columns, row)) for row in rows],
+            }
+        except Exception as e:
+            logger.error(f"查询接口指标失败: {e}")
+            raise DatabaseQueryError(f"查询接口指标失败: {e}") from e
+
+    def query_switch_metrics(
+        self,
+        switch_id: int,
+        start: float,
+        end: float,
+        resolution: Optional[int] = None,
+        max_points: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        查询交换机CPU/内存历史
+
+        Args:
+            switch_id: 交换机ID
+            start: 起始时间戳
+            end: 结束时间戳
+            resolution: 指定粒度（秒），为空时自动选择
+            max_points: 自动选择粒度时的最大点数
+
+        Returns:
+            {"resolution": 粒度, "points": [{ts, samples, 指标...}]}
+
+        Raises:
+            DatabaseQueryError: 查询失败时抛出
+        """
+        if resolution is None:
+            resolution = self.select_resolution(start, end, max_points)
+
+        columns = (
+            ["ts", "samples"]
+            + list(self.SWITCH_FIELDS)
+            + [f"max_{field}" for field in self.SWITCH_PEAK_FIELDS]
+        )
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(columns)} FROM switch_metrics
+                    WHERE switch_id = ? AND resolution = ? AND ts >= ? AND ts <= ?
+                    ORDER BY ts
+                """,
+                    (switch_id, resolution, int(start), int(end)),
+                )
+                rows = cursor.fetchall()
+            return {
+                "resolution": resolution,
+                "points": [dict(zip(columns, row)) for row in rows],
+            }
+        except Exception as e:
+            logger.error(f"查询交换机指标失败: {e}")
+            raise DatabaseQueryError(f"查询交换机指标失败: {e}") from e
+
+    # ==================== 后台线程 ====================
+
+    def start(self) -> None:
+        """启动后台写入与维护线程"""
+        if self.running:
+            return
+
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="MetricsWriter", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"指标时序存储已启动: 写入间隔{self.flush_interval}秒, "
+            f"维护间隔{self.maintenance_interval}秒"
+        )
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余缓冲数据"""
+        if not self.running:
+            return
+
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self._thread = None
+        self.flush()
+        logger.info("指标时序存储已停止")
+
+    def _writer_loop(self) -> None:
+        """后台循环：定期批量写入，并定期执行汇总和清理"""
+        last_maintenance = time.time()
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.time() - last_maintenance >= self.maintenance_interval:
+                    last_maintenance = time.time()
+                    self.run_maintenance()
+            except Exception as e:
+                logger.error(f"指标后台任务出错: {e}", exc_info=True)
+
+    def run_maintenance(self, now: Optional[float] = None) -> None:
+        """执行一次汇总和过期清理"""
+        start_time = time.time()
+        self.rollup(now)
+        self.prune(now)
+        with self._stats_lock:
+            self._stats["last_maintenance_duration"] = time.time() - start_time
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取指标存储统计信息"""
+        with self._stats_lock:
+            stats = self._stats.copy()
+        with self._buffer_lock:
+            stats["buffered_rows"] = len(self._interface_buffer) + len(
+                self._switch_buffer
+            )
+        stats["running"] = self.running
+        return stats
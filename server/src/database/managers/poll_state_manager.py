@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP轮询状态管理器 - 保存每台交换机最后一次轮询结果和接口计数器基线
+
+- 最新状态保存在内存中（API和WebSocket快照直接读取），由后台线程定期批量写入，
+  同一交换机在一个写入周期内的多次更新只写入最后一次
+- 启动时加载上次保存的状态：重启后立即有数据可展示，
+  接口轮询器恢复计数器基线后第一次轮询即可计算速率
+- 交换机删除后清除其状态
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.logger import logger
+from src.core.config import SNMP_STATE_FLUSH_INTERVAL
+from src.database.db_exceptions import DatabaseError, DatabaseQueryError
+from src.database.managers.base_manager import BaseDatabaseManager
+from src.database.switch_registry import EVENT_REMOVED
+
+
+class PollStateManager(BaseDatabaseManager):
+    """SNMP轮询状态管理器类
+
+    提供最后一次轮询结果和计数器基线的内存读写、批量持久化和启动加载功能。
+    """
+
+    # 保存最后一次结果的轮询类型
+    POLL_TYPES = ("device", "interface")
+
+    def __init__(
+        self,
+        db_path: str = "net_manager_server.db",
+        max_connections: int = 10,
+        cleanup_interval: int = 60,
+        max_idle_time: int = 300,
+        shared_pool=None,
+    ):
+        """
+        初始化SNMP轮询状态管理器
+
+        Args:
+            db_path: 数据库文件路径
+            max_connections: 最大连接数
+            cleanup_interval: 连接池清理间隔（秒）
+            max_idle_time: 连接最大空闲时间（秒）
+            shared_pool: 共享的连接池实例（可选）
+        """
+        super().__init__(
+            db_path, max_connections, cleanup_interval, max_idle_time, shared_pool
+        )
+        self.flush_interval = SNMP_STATE_FLUSH_INTERVAL
+
+        # 内存中的最新状态及待写入的键
+        self._results: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._baselines: Dict[int, Dict[str, Any]] = {}
+        self._dirty_results: Set[Tuple[int, str]] = set()
+        self._dirty_baselines: Set[int] = set()
+        self._deleted: Set[int] = set()
+        self._state_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        # 后台写入线程
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._unsubscribe_registry = None
+
+        self._stats = {
+            "written_results": 0,
+            "written_baselines": 0,
+            "loaded_results": 0,
+            "loaded_baselines": 0,
+            "last_flush_duration": 0.0,
+        }
+
+        self.init_tables()
+        self.load()
+
+    def init_tables(self) -> None:
+        """初始化轮询状态表结构"""
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+
+                # result为轮询结果的JSON
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS snmp_poll_state (
+                        switch_id INTEGER NOT NULL,
+                        poll_type TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        poll_time REAL,
+                        PRIMARY KEY (switch_id, poll_type)
+                    )
+                """
+                )
+
+                # baselines为InterfaceRateCalculator.baselines_of()生成的JSON
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS snmp_counter_baselines (
+                        switch_id INTEGER PRIMARY KEY,
+                        baselines TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """
+                )
+
+                conn.commit()
+                logger.info("SNMP轮询状态表初始化成功")
+        except Exception as e:
+            logger.error(f"SNMP轮询状态表初始化失败: {e}")
+            raise DatabaseError(f"SNMP轮询状态表初始化失败: {e}") from e
+
+    def load(self) -> None:
+        """从数据库加载上次保存的轮询结果和计数器基线（内存中已有的更新状态优先）"""
+        try:
+            with self.get_db_connection() as conn:
+                result_rows = conn.execute(
+                    "SELECT switch_id, poll_type, result FROM snmp_poll_state"
+                ).fetchall()
+                baseline_rows = conn.execute(
+                    "SELECT switch_id, baselines FROM snmp_counter_baselines"
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"加载SNMP轮询状态失败: {e}")
+            raise DatabaseQueryError(f"加载SNMP轮询状态失败: {e}") from e
+
+        with self._state_lock:
+            for switch_id, poll_type, result in result_rows:
+                self._results.setdefault((switch_id, poll_type), json.loads(result))
+            for switch_id, baselines in baseline_rows:
+                self._baselines.setdefault(switch_id, json.loads(baselines))
+            self._stats["loaded_results"] = len(result_rows)
+            self._stats["loaded_baselines"] = len(baseline_rows)
+        if result_rows or baseline_rows:
+            logger.info(
+                f"已加载SNMP轮询状态: {len(result_rows)} 条轮询结果, "
+                f"{len(baseline_rows)} 台交换机的计数器基线"
+            )
+
+    # ==================== 读写 ====================
+
+    def record_result(self, poll_type: str, result: Dict[str, Any]) -> bool:
+        """
+        记录交换机最后一次成功的轮询结果
+
+        Args:
+            poll_type: 轮询类型 ("device" 或 "interface")
+            result: 轮询结果
+
+        Returns:
+            是否记录（失败的结果和没有交换机ID的结果不记录）
+        """
+        switch_id = result.get("switch_id")
+        if (
+            poll_type not in self.POLL_TYPES
+            or not isinstance(switch_id, int)
+            or result.get("type") != "success"
+        ):
+            return False
+        key = (switch_id, poll_type)
+        with self._state_lock:
+            self._results[key] = result
+            self._dirty_results.add(key)
+            self._deleted.discard(switch_id)
+        return True
+
+    def record_baselines(self, switch_id: Any, baselines: Dict[str, Any]) -> bool:
+        """
+        记录交换机最新的接口计数器基线
+
+        Args:
+            switch_id: 交换机ID
+            baselines: InterfaceRateCalculator.baselines_of()生成的采样基线
+
+        Returns:
+            是否记录
+        """
+        if not isinstance(switch_id, int) or not baselines.get("interfaces"):
+            return False
+        with self._state_lock:
+            self._baselines[switch_id] = baselines
+            self._dirty_baselines.add(switch_id)
+            self._deleted.discard(switch_id)
+        return True
+
+    def get_result(self, switch_id: int, poll_type: str) -> Optional[Dict[str, Any]]:
+        """获取交换机最后一次成功的轮询结果，不存在时返回None"""
+        with self._state_lock:
+            return self._results.get((switch_id, poll_type))
+
+    def get_results(
+        self, poll_types: Iterable[str] = POLL_TYPES
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        获取全部交换机最后一次成功的轮询结果
+
+        Returns:
+            [(轮询类型, 轮询结果), ...]
+        """
+        poll_types = set(poll_types)
+        with self._state_lock:
+            return [
+                (poll_type, result)
+                for (_, poll_type), result in self._results.items()
+                if poll_type in poll_types
+            ]
+
+    def get_baselines(
+        self, switch_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        获取交换机的计数器基线
+
+        Args:
+            switch_ids: 交换机ID（未指定时返回全部）
+
+        Returns:
+            {交换机ID: 采样基线}
+        """
+        with self._state_lock:
+            if switch_ids is None:
+                return dict(self._baselines)
+            return {
+                switch_id: self._baselines[switch_id]
+                for switch_id in switch_ids
+                if switch_id in self._baselines
+            }
+
+    def forget(self, switch_id: int) -> None:
+        """清除交换机的全部轮询状态（下次写入时从数据库删除）"""
+        with self._state_lock:
+            for poll_type in self.POLL_TYPES:
+                self._results.pop((switch_id, poll_type), None)
+                self._dirty_results.discard((switch_id, poll_type))
+            self._baselines.pop(switch_id, None)
+            self._dirty_baselines.discard(switch_id)
+            self._deleted.add(switch_id)
+
+    def attach_registry(self, registry) -> None:
+        """订阅交换机注册表，交换机删除后清除其轮询状态（只订阅一次）"""
+        with self._state_lock:
+            if self._unsubscribe_registry is None:
+                self._unsubscribe_registry = registry.subscribe(self._on_switch_event)
+
+    def _on_switch_event(self, event: str, switch: Dict[str, Any]) -> None:
+        if event == EVENT_REMOVED and switch.get("id") is not None:
+            self.forget(switch["id"])
+
+    # ==================== 持久化 ====================
+
+    def flush(self) -> int:
+        """
+        将有变化的轮询状态批量写入数据库
+
+        Returns:
+            写入（含删除）的行数
+        """
+        with self._flush_lock:
+            with self._state_lock:
+                results = [
+                    (key, self._results[key])
+                    for key in self._dirty_results
+                    if key in self._results
+                ]
+                baselines = [
+                    (switch_id, self._baselines[switch_id])
+                    for switch_id in self._dirty_baselines
+                    if switch_id in self._baselines
+                ]
+                deleted = list(self._deleted)
+                self._dirty_results = set()
+                self._dirty_baselines = set()
+                self._deleted = set()
+
+            if not results and not baselines and not deleted:
+                return 0
+
+            start_time = time.time()
+            now = time.time()
+            try:
+                result_rows = [
+                    (
+                        switch_id,
+                        poll_type,
+                        json.dumps(result, ensure_ascii=False),
+                        result.get("poll_time"),
+                    )
+                    for (switch_id, poll_type), result in results
+                ]
+                baseline_rows = [
+                    (switch_id, json.dumps(data), now) for switch_id, data in baselines
+                ]
+                with self.transaction() as conn:
+                    if deleted:
+                        conn.executemany(
+                            "DELETE FROM snmp_poll_state WHERE switch_id = ?",
+                            [(switch_id,) for switch_id in deleted],
+                        )
+                        conn.executemany(
+                            "DELETE FROM snmp_counter_baselines WHERE switch_id = ?",
+                            [(switch_id,) for switch_id in deleted],
+                        )
+                    if result_rows:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO snmp_poll_state "
+                            "(switch_id, poll_type, result, poll_time) "
+                            "VALUES (?, ?, ?, ?)",
+                            result_rows,
+                        )
+                    if baseline_rows:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO snmp_counter_baselines "
+                            "(switch_id, baselines, updated_at) VALUES (?, ?, ?)",
+                            baseline_rows,
+                        )
+            except Exception as e:
+                # 写入失败的键重新标记，下个周期重试（期间有更新的以内存中最新状态为准）
+                with self._state_lock:
+                    self._dirty_results.update(key for key, _ in results)
+                    self._dirty_baselines.update(
+                        switch_id for switch_id, _ in baselines
+                    )
+                    self._deleted.update(deleted)
+                logger.error(f"批量写入SNMP轮询状态失败: {e}")
+                return 0
+
+            written = len(results) + len(baselines) + len(deleted)
+            with self._state_lock:
+                self._stats["written_results"] += len(results)
+                self._stats["written_baselines"] += len(baselines)
+                self._stats["last_flush_duration"] = time.time() - start_time
+            logger.debug(
+                f"批量写入SNMP轮询状态: {len(results)} 条轮询结果, "
+                f"{len(baselines)} 条计数器基线"
+            )
+            return written
+
+    # ==================== 后台线程 ====================
+
+    def start(self) -> None:
+        """启动后台写入线程"""
+        if self.running:
+            return
+
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="PollStateWriter", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"SNMP轮询状态存储已启动: 写入间隔{self.flush_interval}秒")
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余状态"""
+        if self._unsubscribe_registry is not None:
+            self._unsubscribe_registry()
+            self._unsubscribe_registry = None
+        if not self.running:
+            return
+
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self._thread = None
+        self.flush()
+        logger.info("SNMP轮询状态存储已停止")
+
+    def _writer_loop(self) -> None:
+        """后台循环：定期批量写入"""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"SNMP轮询状态写入出错: {e}", exc_info=True)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取轮询状态存储统计信息"""
+        with self._state_lock:
+            stats = self._stats.copy()
+            stats["results"] = len(self._results)
+            stats["baselines"] = len(self._baselines)
+            stats["pending"] = (
+                len(self._dirty_results)
+                + len(self._dirty_baselines)
+                + len(self._deleted)
+            )
+        stats["running"] = self.running
+        return stats
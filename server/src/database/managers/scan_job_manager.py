@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+网络扫描任务管理器 - 持久化扫描任务状态、地址块检查点和已发现设备
+
+扫描任务按地址块推进，每完成一个地址块就在同一事务中写入该块发现的设备和检查点，
+服务重启或任务恢复时跳过已完成的地址块。
+"""
+
+import json
+import time
+from typing import List, Dict, Any, Optional, Set
+
+from src.core.logger import logger
+from src.database.db_exceptions import DatabaseError, DatabaseQueryError
+from src.database.managers.base_manager import BaseDatabaseManager
+
+
+class ScanJobManager(BaseDatabaseManager):
+    """网络扫描任务管理器类
+
+    提供扫描任务的创建、状态更新、地址块检查点和结果查询功能。
+    """
+
+    # 任务状态
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_FAILED = "failed"
+
+    # 未结束的任务状态（服务重启后需要恢复）
+    UNFINISHED_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    def __init__(
+        self,
+        db_path: str = "net_manager_server.db",
+        max_connections: int = 10,
+        cleanup_interval: int = 60,
+        max_idle_time: int = 300,
+        shared_pool=None,
+    ):
+        """
+        初始化扫描任务管理器
+
+        Args:
+            db_path: 数据库文件路径
+            max_connections: 最大连接数
+            cleanup_interval: 连接池清理间隔（秒）
+            max_idle_time: 连接最大空闲时间（秒）
+            shared_pool: 共享的连接池实例（可选）
+        """
+        super().__init__(
+            db_path, max_connections, cleanup_interval, max_idle_time, shared_pool
+        )
+        self.init_tables()
+
+    def init_tables(self) -> None:
+        """初始化扫描任务表结构"""
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+
+                # 扫描任务表：params为扫描参数（团体名或SNMPv3认证参数）的JSON
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scan_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        network TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        params TEXT NOT NULL DEFAULT '{}',
+                        status TEXT NOT NULL,
+                        total_blocks INTEGER NOT NULL DEFAULT 0,
+                        completed_blocks INTEGER NOT NULL DEFAULT 0,
+                        found_count INTEGER NOT NULL DEFAULT 0,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """
+                )
+
+                # 地址块检查点
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scan_job_blocks (
+                        job_id TEXT NOT NULL,
+                        block TEXT NOT NULL,
+                        found_count INTEGER NOT NULL DEFAULT 0,
+                        completed_at REAL NOT NULL,
+                        PRIMARY KEY (job_id, block)
+                    )
+                """
+                )
+
+                # 已发现的设备
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scan_job_results (
+                        job_id TEXT NOT NULL,
+                        ip TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        found_at REAL NOT NULL,
+                        PRIMARY KEY (job_id, ip)
+                    )
+                """
+                )
+
+                conn.commit()
+                logger.info("扫描任务表初始化成功")
+        except Exception as e:
+            logger.error(f"扫描任务表初始化失败: {e}")
+            raise DatabaseError(f"扫描任务表初始化失败: {e}") from e
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        """将scan_jobs行转换为任务字典"""
+        (
+            job_id,
+            network,
+            version,
+            params,
+            status,
+            total_blocks,
+            completed_blocks,
+            found_count,
+            error,
+            created_at,
+            updated_at,
+        ) = row
+        return {
+            "job_id": job_id,
+            "network": network,
+            "version": version,
+            "params": json.loads(params or "{}"),
+            "status": status,
+            "total_blocks": total_blocks,
+            "completed_blocks": completed_blocks,
+            "found_count": found_count,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    _JOB_COLUMNS = (
+        "job_id, network, version, params, status, total_blocks, "
+        "completed_blocks, found_count, error, created_at, updated_at"
+    )
+
+    def create_job(
+        self,
+        job_id: str,
+        network: str,
+        version: str,
+        params: Dict[str, Any],
+        total_blocks: int,
+    ) -> Dict[str, Any]:
+        """
+        创建扫描任务（状态为pending）
+
+        Args:
+            job_id: 任务ID
+            network: 扫描网段
+            version: SNMP版本
+            params: 扫描参数（团体名或SNMPv3认证参数）
+            total_blocks: 地址块总数
+
+        Returns:
+            任务字典
+        """
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                conn.execute(
+                    f"INSERT INTO scan_jobs ({self._JOB_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0, 0, NULL, ?, ?)",
+                    (
+                        job_id,
+                        network,
+                        version,
+                        json.dumps(params, ensure_ascii=False),
+                        self.STATUS_PENDING,
+                        total_blocks,
+                        now,
+                        now,
+                    ),
+                )
+        except Exception as e:
+            logger.error(f"创建扫描任务失败: {e}")
+            raise DatabaseQueryError(f"创建扫描任务失败: {e}") from e
+        return self.get_job(job_id)
+
+    def update_job_status(
+        self, job_id: str, status: str, error: Optional[str] = None
+    ) -> bool:
+        """
+        更新扫描任务状态
+
+        Args:
+            job_id: 任务ID
+            status: 新状态
+            error: 失败原因（可选）
+
+        Returns:
+            任务存在时返回True
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "UPDATE scan_jobs SET status = ?, error = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (status, error, time.time(), job_id),
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"更新扫描任务状态失败: {e}")
+            raise DatabaseQueryError(f"更新扫描任务状态失败: {e}") from e
+
+    def complete_block(
+        self, job_id: str, block: str, devices: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        记录地址块检查点及该块发现的设备（同一事务）
+
+        Args:
+            job_id: 任务ID
+            block: 地址块（CIDR）
+            devices: 该地址块发现的设备列表（含ip字段）
+
+        Returns:
+            更新后的任务字典
+        """
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scan_job_results (job_id, ip, result, found_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            job_id,
+                            device["ip"],
+                            json.dumps(device, ensure_ascii=False),
+                            now,
+                        )
+                        for device in devices
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO scan_job_blocks "
+                    "(job_id, block, found_count, completed_at) VALUES (?, ?, ?, ?)",
+                    (job_id, block, len(devices), now),
+                )
+                conn.execute(
+                    """
+                    UPDATE scan_jobs SET
+                        completed_blocks = (
+                            SELECT COUNT(*) FROM scan_job_blocks WHERE job_id = ?
+                        ),
+                        found_count = (
+                            SELECT COUNT(*) FROM scan_job_results WHERE job_id = ?
+                        ),
+                        updated_at = ?
+                    WHERE job_id = ?
+                """,
+                    (job_id, job_id, now, job_id),
+                )
+        except Exception as e:
+            logger.error(f"记录扫描检查点失败: {e}")
+            raise DatabaseQueryError(f"记录扫描检查点失败: {e}") from e
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取扫描任务，不存在时返回None"""
+        with self.get_db_connection() as conn:
+            row = conn.execute(
+                f"SELECT {self._JOB_COLUMNS} FROM scan_jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(
+        self, limit: int = 50, statuses: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按创建时间倒序列出扫描任务
+
+        Args:
+            limit: 最多返回的任务数
+            statuses: 只返回这些状态的任务（可选）
+        """
+        sql = f"SELECT {self._JOB_COLUMNS} FROM scan_jobs"
+        args: list = []
+        if statuses:
+            sql += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            args.extend(statuses)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self.get_db_connection() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def get_unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """获取未结束的扫描任务（按创建时间顺序）"""
+        jobs = self.list_jobs(limit=-1, statuses=list(self.UNFINISHED_STATUSES))
+        return list(reversed(jobs))
+
+    def get_completed_blocks(self, job_id: str) -> Set[str]:
+        """获取任务已完成的地址块"""
+        with self.get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT block FROM scan_job_blocks WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_job_results(self, job_id: str) -> List[Dict[str, Any]]:
+        """获取任务已发现的设备（按发现时间顺序）"""
+        with self.get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT result FROM scan_job_results WHERE job_id = ? "
+                "ORDER BY found_at, rowid",
+                (job_id,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def delete_job(self, job_id: str) -> bool:
+        """删除扫描任务及其检查点和结果"""
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM scan_job_results WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM scan_job_blocks WHERE job_id = ?", (job_id,))
+                cursor = conn.execute(
+                    "DELETE FROM scan_jobs WHERE job_id = ?", (job_id,)
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"删除扫描任务失败: {e}")
+            raise DatabaseQueryError(f"删除扫描任务失败: {e}") from e
@@ -5,6 +5,7 @@
 交换机信息管理器 - 用于管理交换机配置信息的数据库操作
 """
 
+import json
 import sqlite3
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import asynccontextmanager
@@ -20,6 +21,7 @@ from src.database.db_exceptions import (
 )
 from src.database.managers.base_manager import BaseDatabaseManager
 from src.database.connection_pool import AsyncConnectionPool
+from src.database.switch_registry import SwitchRegistry
 
 
 class SwitchManager(BaseDatabaseManager):
@@ -52,6 +54,8 @@ class SwitchManager(BaseDatabaseManager):
         self.init_tables()
         # 初始化异步连接池引用
         self.async_pool = None
+        # 内存中的交换机注册表（首次访问时加载，增删改后同步更新并通知订阅者）
+        self.registry = SwitchRegistry(self.get_all_switches)
 
     @asynccontextmanager
     async def get_async_connection(self):
@@ -159,6 +163,18 @@ class SwitchManager(BaseDatabaseManager):
                 """
                 )
 
+                # 接口轮询配置表（每台交换机一条，profile为JSON）
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS switch_poll_profiles (
+                        switch_id INTEGER PRIMARY KEY
+                            REFERENCES switch_info(id) ON DELETE CASCADE,
+                        profile TEXT NOT NULL DEFAULT '{}',
+                        updated_at DATETIME DEFAULT (datetime('now', 'localtime'))
+                    )
+                """
+                )
+
                 conn.commit()
                 logger.info("交换机信息表初始化成功，已启用外键约束和优化设置")
         except Exception as e:
@@ -219,16 +235,19 @@ class SwitchManager(BaseDatabaseManager):
                         switch_info.device_type,
                     ),
                 )
+                switch_id = cursor.lastrowid
 
                 # 事务会在退出时自动提交
                 logger.info(f"交换机配置添加成功，IP地址: {switch_info.ip}")
-                return True, "交换机配置添加成功"
         except DeviceAlreadyExistsError:
             raise
         except Exception as e:
             logger.error(f"添加交换机配置失败: {e}")
             raise DatabaseQueryError(f"添加交换机配置失败: {e}") from e
 
+        self._sync_registry(switch_id)
+        return True, "交换机配置添加成功"
+
     def update_switch(self, switch_info: "SwitchInfo") -> Tuple[bool, str]:
         """
         更新交换机配置
@@ -287,13 +306,15 @@ class SwitchManager(BaseDatabaseManager):
 
                 # 事务会在退出时自动提交
                 logger.info(f"交换机配置更新成功，ID: {switch_info.id}")
-                return True, "交换机配置更新成功"
         except DeviceNotFoundError:
             raise
         except Exception as e:
             logger.error(f"更新交换机配置失败: {e}")
             raise DatabaseQueryError(f"更新交换机配置失败: {e}") from e
 
+        self._sync_registry(switch_info.id)
+        return True, "交换机配置更新成功"
+
     def delete_switch(self, switch_id: int) -> Tuple[bool, str]:
         """
         删除交换机配置
@@ -324,7 +345,11 @@ class SwitchManager(BaseDatabaseManager):
                 if count == 0:
                     raise DeviceNotFoundError(f"交换机不存在，ID: {switch_id}")
 
-                # 删除交换机配置
+                # 删除交换机配置及其接口轮询配置
+                cursor.execute(
+                    "DELETE FROM switch_poll_profiles WHERE switch_id = ?",
+                    (switch_id,),
+                )
                 cursor.execute(
                     """
                     DELETE FROM switch_info WHERE id = ?
@@ -334,7 +359,6 @@ class SwitchManager(BaseDatabaseManager):
 
                 # 事务会在退出时自动提交
                 logger.info(f"交换机配置删除成功，ID: {switch_id}")
-                return True, "交换机配置删除成功"
         except DeviceNotFoundError:
             # 重新抛出DeviceNotFoundError，不包装在DatabaseQueryError中
             raise
@@ -342,6 +366,9 @@ class SwitchManager(BaseDatabaseManager):
             logger.error(f"删除交换机配置失败: {e}")
             raise DatabaseQueryError(f"删除交换机配置失败: {e}") from e
 
+        self._sync_registry(switch_id)
+        return True, "交换机配置删除成功"
+
     def get_switch_by_id(self, switch_id: int) -> Optional[Dict[str, Any]]:
         """
         根据ID获取交换机配置
@@ -388,6 +415,9 @@ class SwitchManager(BaseDatabaseManager):
                         "alias": row[12],
                         "created_at": row[13],
                         "updated_at": row[14],
+                        "poll_profile": self._load_poll_profiles(conn, row[0]).get(
+                            row[0]
+                        ),
                     }
                 return None
         except Exception as e:
@@ -440,6 +470,9 @@ class SwitchManager(BaseDatabaseManager):
                         "alias": row[12],
                         "created_at": row[13],
                         "updated_at": row[14],
+                        "poll_profile": self._load_poll_profiles(conn, row[0]).get(
+                            row[0]
+                        ),
                     }
                 return None
         except Exception as e:
@@ -470,6 +503,7 @@ class SwitchManager(BaseDatabaseManager):
                 )
 
                 rows = cursor.fetchall()
+                profiles = self._load_poll_profiles(conn)
 
                 # 转换为字典列表
                 result = []
@@ -491,6 +525,7 @@ class SwitchManager(BaseDatabaseManager):
                             "alias": row[12],
                             "created_at": row[13],
                             "updated_at": row[14],
+                            "poll_profile": profiles.get(row[0]),
                         }
                     )
 
@@ -499,6 +534,120 @@ class SwitchManager(BaseDatabaseManager):
             logger.error(f"查询所有交换机配置失败: {e}")
             raise DatabaseQueryError(f"查询所有交换机配置失败: {e}") from e
 
+    def _load_poll_profiles(
+        self, conn: sqlite3.Connection, switch_id: Optional[int] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """读取接口轮询配置，返回 {交换机ID: 配置字典}"""
+        sql = "SELECT switch_id, profile FROM switch_poll_profiles"
+        args: tuple = ()
+        if switch_id is not None:
+            sql += " WHERE switch_id = ?"
+            args = (switch_id,)
+        return {row[0]: json.loads(row[1] or "{}") for row in conn.execute(sql, args)}
+
+    def get_poll_profile(self, switch_id: int) -> Optional[Dict[str, Any]]:
+        """
+        获取交换机的接口轮询配置
+
+        Args:
+            switch_id: 交换机ID
+
+        Returns:
+            配置字典，未配置时返回None
+
+        Raises:
+            DatabaseQueryError: 查询失败时抛出
+        """
+        try:
+            with self.get_db_connection() as conn:
+                return self._load_poll_profiles(conn, switch_id).get(switch_id)
+        except Exception as e:
+            logger.error(f"查询接口轮询配置失败: {e}")
+            raise DatabaseQueryError(f"查询接口轮询配置失败: {e}") from e
+
+    def set_poll_profile(
+        self, switch_id: int, profile: Dict[str, Any]
+    ) -> Tuple[bool, str]:
+        """
+        保存交换机的接口轮询配置（已存在时覆盖）
+
+        Args:
+            switch_id: 交换机ID
+            profile: 配置字典（由调用方校验）
+
+        Returns:
+            (成功标志, 消息) 的元组
+
+        Raises:
+            DatabaseQueryError: 保存失败时抛出
+            DeviceNotFoundError: 交换机不存在时抛出
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*) FROM switch_info WHERE id = ?", (switch_id,)
+                )
+                if cursor.fetchone()[0] == 0:
+                    raise DeviceNotFoundError(f"交换机不存在，ID: {switch_id}")
+
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO switch_poll_profiles (switch_id, profile, updated_at)
+                    VALUES (?, ?, datetime('now', 'localtime'))
+                """,
+                    (switch_id, json.dumps(profile, ensure_ascii=False)),
+                )
+                logger.info(f"接口轮询配置保存成功，ID: {switch_id}")
+        except DeviceNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"保存接口轮询配置失败: {e}")
+            raise DatabaseQueryError(f"保存接口轮询配置失败: {e}") from e
+
+        self._sync_registry(switch_id)
+        return True, "接口轮询配置保存成功"
+
+    def delete_poll_profile(self, switch_id: int) -> bool:
+        """
+        删除交换机的接口轮询配置（恢复为轮询全部接口）
+
+        Returns:
+            配置存在并已删除时返回True
+
+        Raises:
+            DatabaseQueryError: 删除失败时抛出
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM switch_poll_profiles WHERE switch_id = ?",
+                    (switch_id,),
+                )
+                deleted = cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"删除接口轮询配置失败: {e}")
+            raise DatabaseQueryError(f"删除接口轮询配置失败: {e}") from e
+
+        if deleted:
+            self._sync_registry(switch_id)
+        return deleted
+
+    def _sync_registry(self, switch_id: int) -> None:
+        """
+        事务提交后将交换机的最新配置同步到注册表（交换机已删除时移除）
+
+        同步失败只记录日志，不影响已提交的数据库操作。
+        """
+        try:
+            switch = self.get_switch_by_id(switch_id)
+            if switch is None:
+                self.registry.remove(switch_id)
+            else:
+                self.registry.upsert(switch)
+        except Exception as e:
+            logger.error(f"同步交换机注册表失败，ID: {switch_id}: {e}")
+
     def switch_exists(self, ip: str, snmp_version: str) -> bool:
         """
         检查交换机是否已存在（基于IP地址和SNMP版本）
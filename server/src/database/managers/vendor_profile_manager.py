@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+厂商监控配置管理器 - 持久化每台交换机探测到的CPU/内存/温度OID
+
+首次连接交换机时探测出实际可用的厂商OID，之后的轮询直接使用保存的结果，
+服务重启后也不需要重新探测。
+"""
+
+import json
+import time
+from typing import Dict, Any, Optional
+
+from src.core.logger import logger
+from src.database.db_exceptions import DatabaseError, DatabaseQueryError
+from src.database.managers.base_manager import BaseDatabaseManager
+
+
+class VendorProfileManager(BaseDatabaseManager):
+    """厂商监控配置管理器类
+
+    按交换机IP保存探测结果（sysObjectID、厂商和各指标使用的OID）。
+    """
+
+    def __init__(
+        self,
+        db_path: str = "net_manager_server.db",
+        max_connections: int = 10,
+        cleanup_interval: int = 60,
+        max_idle_time: int = 300,
+        shared_pool=None,
+    ):
+        """
+        初始化厂商监控配置管理器
+
+        Args:
+            db_path: 数据库文件路径
+            max_connections: 最大连接数
+            cleanup_interval: 连接池清理间隔（秒）
+            max_idle_time: 连接最大空闲时间（秒）
+            shared_pool: 共享的连接池实例（可选）
+        """
+        super().__init__(
+            db_path, max_connections, cleanup_interval, max_idle_time, shared_pool
+        )
+        self.init_tables()
+
+    def init_tables(self) -> None:
+        """初始化厂商监控配置表结构"""
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.cursor()
+
+                # profile为探测结果的JSON
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS switch_vendor_profiles (
+                        ip TEXT PRIMARY KEY,
+                        sys_object_id TEXT,
+                        vendor TEXT,
+                        profile TEXT NOT NULL DEFAULT '{}',
+                        detected_at REAL NOT NULL
+                    )
+                """
+                )
+
+                conn.commit()
+                logger.info("厂商监控配置表初始化成功")
+        except Exception as e:
+            logger.error(f"厂商监控配置表初始化失败: {e}")
+            raise DatabaseError(f"厂商监控配置表初始化失败: {e}") from e
+
+    def get_profile(self, ip: str) -> Optional[Dict[str, Any]]:
+        """获取交换机的探测结果，不存在时返回None"""
+        try:
+            with self.get_db_connection() as conn:
+                row = conn.execute(
+                    "SELECT profile FROM switch_vendor_profiles WHERE ip = ?", (ip,)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"查询厂商监控配置失败: {e}")
+            raise DatabaseQueryError(f"查询厂商监控配置失败: {e}") from e
+
+    def save_profile(self, ip: str, profile: Dict[str, Any]) -> None:
+        """
+        保存交换机的探测结果（已存在时覆盖）
+
+        Args:
+            ip: 交换机IP
+            profile: 探测结果（含sys_object_id、vendor、detected_at）
+        """
+        try:
+            with self.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO switch_vendor_profiles "
+                    "(ip, sys_object_id, vendor, profile, detected_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        ip,
+                        profile.get("sys_object_id"),
+                        profile.get("vendor"),
+                        json.dumps(profile, ensure_ascii=False),
+                        profile.get("detected_at") or time.time(),
+                    ),
+                )
+        except Exception as e:
+            logger.error(f"保存厂商监控配置失败: {e}")
+            raise DatabaseQueryError(f"保存厂商监控配置失败: {e}") from e
+
+    def delete_profile(self, ip: str) -> bool:
+        """删除交换机的探测结果（下次轮询时重新探测）"""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM switch_vendor_profiles WHERE ip = ?", (ip,)
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"删除厂商监控配置失败: {e}")
+            raise DatabaseQueryError(f"删除厂商监控配置失败: {e}") from e
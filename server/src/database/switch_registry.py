@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+交换机注册表 - 内存中的交换机配置列表，变更时通知订阅者
+
+首次访问时从数据库加载一次，之后由SwitchManager在增删改成功后同步更新，
+轮询器等组件订阅变更事件，不再周期性地查询数据库。
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.logger import logger
+
+# 变更事件类型
+EVENT_ADDED = "added"
+EVENT_UPDATED = "updated"
+EVENT_REMOVED = "removed"
+
+# 订阅者回调：(事件类型, 交换机配置)，删除事件携带删除前的配置
+SwitchListener = Callable[[str, Dict[str, Any]], None]
+
+
+class SwitchRegistry:
+    """
+    交换机注册表（线程安全）
+
+    以交换机ID为键保存配置。订阅者回调在触发变更的线程中、锁外调用，
+    需要在其他线程/事件循环中处理时由订阅者自行转交。
+    修改IP的更新拆分为旧IP的删除事件和新IP的新增事件，
+    订阅者可以始终以IP为调度标识。
+
+    Args:
+        loader: 加载全部交换机配置的函数（首次访问时调用）
+    """
+
+    def __init__(self, loader: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        self._loader = loader
+        self._switches: Dict[Any, Dict[str, Any]] = {}
+        self._loaded = loader is None
+        self._listeners: List[SwitchListener] = []
+        self._lock = threading.RLock()
+        self._stats = {"loads": 0, EVENT_ADDED: 0, EVENT_UPDATED: 0, EVENT_REMOVED: 0}
+
+    def _ensure_loaded_locked(self) -> None:
+        """首次访问时从数据源加载（调用方需持有锁）"""
+        if self._loaded:
+            return
+        switches = self._loader()
+        self._switches = {s["id"]: dict(s) for s in switches}
+        self._loaded = True
+        self._stats["loads"] += 1
+        logger.info(f"交换机注册表已加载 {len(self._switches)} 台交换机")
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """获取全部交换机配置（副本）"""
+        with self._lock:
+            self._ensure_loaded_locked()
+            return [dict(s) for s in self._switches.values()]
+
+    def get(self, switch_id: Any) -> Optional[Dict[str, Any]]:
+        """根据ID获取交换机配置（副本），不存在时返回None"""
+        with self._lock:
+            self._ensure_loaded_locked()
+            switch = self._switches.get(switch_id)
+            return dict(switch) if switch is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded_locked()
+            return len(self._switches)
+
+    def subscribe(self, listener: SwitchListener) -> Callable[[], None]:
+        """
+        订阅变更事件
+
+        Args:
+            listener: 回调函数 (事件类型, 交换机配置)
+
+        Returns:
+            取消订阅的函数
+        """
+        with self._lock:
+            # 订阅时加载，之后的变更都以加载的内容为基准发布
+            self._ensure_loaded_locked()
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def upsert(self, switch: Dict[str, Any]) -> None:
+        """新增或更新单台交换机并发布事件（配置未变化时不发布）"""
+        with self._lock:
+            self._ensure_loaded_locked()
+            events = self._upsert_locked(switch)
+        self._publish(events)
+
+    def remove(self, switch_id: Any) -> None:
+        """移除单台交换机并发布删除事件"""
+        with self._lock:
+            self._ensure_loaded_locked()
+            events = self._remove_locked(switch_id)
+        self._publish(events)
+
+    def replace(self, switches: List[Dict[str, Any]]) -> None:
+        """
+        用完整列表替换注册表内容，按差异发布事件
+
+        Args:
+            switches: 交换机配置列表（以id为标识）
+        """
+        events = []
+        with self._lock:
+            self._loaded = True
+            current = {s["id"] for s in switches}
+            for switch_id in [i for i in self._switches if i not in current]:
+                events.extend(self._remove_locked(switch_id))
+            for switch in switches:
+                events.extend(self._upsert_locked(switch))
+        self._publish(events)
+
+    def _upsert_locked(self, switch: Dict[str, Any]) -> List[tuple]:
+        """更新配置并返回待发布的事件（调用方需持有锁）"""
+        switch = dict(switch)
+        previous = self._switches.get(switch["id"])
+        if previous == switch:
+            return []
+        self._switches[switch["id"]] = switch
+        if previous is None:
+            return [(EVENT_ADDED, switch)]
+        if previous.get("ip") != switch.get("ip"):
+            return [(EVENT_REMOVED, previous), (EVENT_ADDED, switch)]
+        return [(EVENT_UPDATED, switch)]
+
+    def _remove_locked(self, switch_id: Any) -> List[tuple]:
+        """移除配置并返回待发布的事件（调用方需持有锁）"""
+        previous = self._switches.pop(switch_id, None)
+        return [(EVENT_REMOVED, previous)] if previous is not None else []
+
+    def _publish(self, events: List[tuple]) -> None:
+        """在锁外依次通知订阅者，单个订阅者出错不影响其他订阅者"""
+        if not events:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+            for event, _ in events:
+                self._stats[event] += 1
+        for event, switch in events:
+            logger.debug(f"交换机注册表变更: {event} {switch.get('ip')}")
+            for listener in listeners:
+                try:
+                    listener(event, dict(switch))
+                except Exception as e:
+                    logger.error(f"处理交换机变更事件失败: {e}", exc_info=True)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取注册表统计信息"""
+        with self._lock:
+            return {
+                **self._stats,
+                "switches": len(self._switches),
+                "subscribers": len(self._listeners),
+            }
+
+
+__all__ = [
+    "EVENT_ADDED",
+    "EVENT_UPDATED",
+    "EVENT_REMOVED",
+    "SwitchListener",
+    "SwitchRegistry",
+]
@@ -32,11 +32,18 @@ from src.network.api.handlers.switches_handlers import (
     SwitchUpdateHandler,
     SwitchDeleteHandler,
     SwitchHandler,
+    SwitchPollHandler,
+    SwitchPollProfileHandler,
+    SwitchStateHandler,
     SwitchesHandler,
 )
 from src.network.api.handlers.snmp_scan_handler import (
     SNMPScanHandler,
     SNMPScanHandlerSimple,
+    ScanJobsHandler,
+    ScanJobHandler,
+    ScanJobCancelHandler,
+    ScanJobResumeHandler,
 )
 from src.network.api.handlers.topology_handlers import (
     TopologyCreateHandler,
@@ -48,6 +55,10 @@ from src.network.api.handlers.topology_handlers import (
 )
 from src.network.api.handlers.health_handler import HealthHandler
 from src.network.api.handlers.performance_handler import PerformanceHandler
+from src.network.api.handlers.metrics_handlers import (
+    InterfaceMetricsHandler,
+    SwitchMetricsHandler,
+)
 from src.network.api.websocket_handler import WebSocketHandler
 from src.network.api.handlers.static_handler import StaticFileHandler
 
@@ -101,7 +112,7 @@ class APIServer:
 
         routes = [
             # API路由必须在静态文件路由之前，避免被静态文件处理器拦截
-            (r"/ws", WebSocketHandler),
+            (r"/ws", WebSocketHandler, dict(db_manager=self.db_manager)),
             (r"/api/performance", PerformanceHandler),
             (r"/health", HealthHandler),
             (r"/healthz", HealthHandler),  # Kubernetes健康检查标准端点
@@ -167,11 +178,58 @@ class APIServer:
                 SNMPScanHandlerSimple,
                 dict(db_manager=self.db_manager),
             ),
+            # 扫描任务路由
+            (
+                r"/api/switches/scan/jobs",
+                ScanJobsHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/scan/jobs/(?P<job_id>[^/]+)/cancel",
+                ScanJobCancelHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/scan/jobs/(?P<job_id>[^/]+)/resume",
+                ScanJobResumeHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/scan/jobs/(?P<job_id>[^/]+)",
+                ScanJobHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/([^/]+)/poll",
+                SwitchPollHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/([^/]+)/state",
+                SwitchStateHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/switches/([^/]+)/poll-profile",
+                SwitchPollProfileHandler,
+                dict(db_manager=self.db_manager),
+            ),
             (
                 r"/api/switches/([^/]+)",
                 SwitchHandler,
                 dict(db_manager=self.db_manager),
             ),
+            # SNMP指标历史路由
+            (
+                r"/api/metrics/interfaces",
+                InterfaceMetricsHandler,
+                dict(db_manager=self.db_manager),
+            ),
+            (
+                r"/api/metrics/switches",
+                SwitchMetricsHandler,
+                dict(db_manager=self.db_manager),
+            ),
             # 拓扑图相关路由（注意：具体路径必须放在通配符路由之前）
             (
                 r"/api/topologies/latest",
@@ -203,7 +261,7 @@ class APIServer:
                 TopologyHandler,
                 dict(topology_manager=self.topology_manager),
             ),
-            (r"/ws", WebSocketHandler),
+            (r"/ws", WebSocketHandler, dict(db_manager=self.db_manager)),
             (r"/api/performance", PerformanceHandler),
             (r"/health", HealthHandler),
             (r"/healthz", HealthHandler),  # Kubernetes健康检查标准端点
@@ -21,6 +21,8 @@ from src.network.api.handlers.switches_handlers import (
     SwitchUpdateHandler,
     SwitchDeleteHandler,
     SwitchHandler,
+    SwitchPollHandler,
+    SwitchPollProfileHandler,
     SwitchesHandler,
 )
 from src.network.api.handlers.topology_handlers import (
@@ -34,8 +36,16 @@ from src.network.api.handlers.topology_handlers import (
 from src.network.api.handlers.snmp_scan_handler import (
     SNMPScanHandler,
     SNMPScanHandlerSimple,
+    ScanJobsHandler,
+    ScanJobHandler,
+    ScanJobCancelHandler,
+    ScanJobResumeHandler,
 )
 from src.network.api.handlers.performance_handler import PerformanceHandler
+from src.network.api.handlers.metrics_handlers import (
+    InterfaceMetricsHandler,
+    SwitchMetricsHandler,
+)
 
 __all__ = [
     "BaseHandler",
@@ -51,6 +61,8 @@ __all__ = [
     "SwitchUpdateHandler",
     "SwitchDeleteHandler",
     "SwitchHandler",
+    "SwitchPollHandler",
+    "SwitchPollProfileHandler",
     "SwitchesHandler",
     "TopologyCreateHandler",
     "TopologyUpdateHandler",
@@ -60,5 +72,11 @@ __all__ = [
     "TopologyLatestHandler",
     "SNMPScanHandler",
     "SNMPScanHandlerSimple",
+    "ScanJobsHandler",
+    "ScanJobHandler",
+    "ScanJobCancelHandler",
+    "ScanJobResumeHandler",
     "PerformanceHandler",
+    "InterfaceMetricsHandler",
+    "SwitchMetricsHandler",
 ]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP指标历史处理器
+"""
+
+import time
+from src.network.api.handlers.base_handler import BaseHandler
+
+
+class MetricsQueryMixin:
+    """指标查询参数解析"""
+
+    # 未指定起始时间时默认查询最近1小时
+    DEFAULT_RANGE = 3600
+
+    def parse_range_arguments(self):
+        """
+        解析通用查询参数
+
+        Returns:
+            (switch_id, start, end, resolution, max_points)
+
+        Raises:
+            ValueError: 参数无效时抛出
+        """
+        switch_id = int(self.get_argument("switch_id"))
+        end = float(self.get_argument("end", time.time()))
+        start = float(self.get_argument("start", end - self.DEFAULT_RANGE))
+        if start > end:
+            raise ValueError("start不能大于end")
+
+        resolution = self.get_argument("resolution", None)
+        if resolution is not None:
+            resolution = int(resolution)
+        max_points = self.get_argument("max_points", None)
+        if max_points is not None:
+            max_points = int(max_points)
+        return switch_id, start, end, resolution, max_points
+
+
+class InterfaceMetricsHandler(MetricsQueryMixin, BaseHandler):
+    """接口指标历史处理器 - 查询接口速率历史（自动选择汇总粒度）"""
+
+    def initialize(self, db_manager):
+        self.db_manager = db_manager
+
+    def get(self):
+        try:
+            switch_id, start, end, resolution, max_points = self.parse_range_arguments()
+            if_index = self.get_argument("if_index", None)
+            if if_index is not None:
+                if_index = int(if_index)
+        except Exception as e:
+            self.set_status(400)
+            self.write({"status": "error", "message": f"无效的查询参数: {str(e)}"})
+            return
+
+        try:
+            data = self.db_manager.metrics_manager.query_interface_metrics(
+                switch_id,
+                start,
+                end,
+                if_index=if_index,
+                resolution=resolution,
+                max_points=max_points,
+            )
+            self.write(
+                {"status": "success", "data": data, "count": len(data["points"])}
+            )
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+
+class SwitchMetricsHandler(MetricsQueryMixin, BaseHandler):
+    """交换机指标历史处理器 - 查询CPU/内存使用率历史（自动选择汇总粒度）"""
+
+    def initialize(self, db_manager):
+        self.db_manager = db_manager
+
+    def get(self):
+        try:
+            switch_id, start, end, resolution, max_points = self.parse_range_arguments()
+        except Exception as e:
+            self.set_status(400)
+            self.write({"status": "error", "message": f"无效的查询参数: {str(e)}"})
+            return
+
+        try:
+            data = self.db_manager.metrics_manager.query_switch_metrics(
+                switch_id,
+                start,
+                end,
+                resolution=resolution,
+                max_points=max_points,
+            )
+            self.write(
+                {"status": "success", "data": data, "count": len(data["points"])}
+            )
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
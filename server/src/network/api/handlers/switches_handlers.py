@@ -9,6 +9,9 @@ import json
 import tornado.escape
 from src.network.api.handlers.base_handler import BaseHandler
 from src.models.switch_info import SwitchInfo
+from src.database.db_exceptions import DeviceNotFoundError
+from src.snmp.poll_profile import InterfacePollProfile
+from src.snmp.unified_poller import ON_DEMAND_POLL_TYPES, poll_switch_now
 
 
 class SwitchCreateHandler(BaseHandler):
@@ -210,6 +213,172 @@ class SwitchHandler(BaseHandler):
             self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
 
 
+class SwitchPollHandler(BaseHandler):
+    """交换机按需轮询处理器 - 立即轮询单台交换机并返回最新结果
+
+    请求走轮询器的优先队列和预留并发，不等待后台轮询周期，也不使用结果缓存；
+    同一交换机的并发请求共享一次轮询。
+    查询参数type: all（默认）、device 或 interface。
+    """
+
+    def initialize(self, db_manager):
+        self.db_manager = db_manager
+
+    async def post(self, switch_id):
+        try:
+            switch_id = int(switch_id)
+        except (ValueError, TypeError):
+            self.set_status(400)
+            self.write({"status": "error", "message": "交换机ID必须是有效的整数"})
+            return
+
+        poll_type = self.get_argument("type", "all")
+        if poll_type not in ON_DEMAND_POLL_TYPES:
+            self.set_status(400)
+            self.write(
+                {
+                    "status": "error",
+                    "message": f"无效的轮询类型: {poll_type}，"
+                    f"可选: {', '.join(ON_DEMAND_POLL_TYPES)}",
+                }
+            )
+            return
+
+        try:
+            switch = self.db_manager.switch_manager.registry.get(switch_id)
+            if switch is None:
+                self.set_status(404)
+                self.write(
+                    {"status": "error", "message": f"交换机不存在，ID: {switch_id}"}
+                )
+                return
+
+            results = await poll_switch_now(switch, ON_DEMAND_POLL_TYPES[poll_type])
+            self.write({"status": "success", "data": results})
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+
+class SwitchStateHandler(BaseHandler):
+    """交换机最后一次轮询结果处理器 - 返回已保存的设备/接口轮询结果
+
+    不发起轮询，服务重启后也立即返回重启前保存的结果；
+    未轮询过的类型为null，结果中的poll_time为该结果的轮询时间。
+    """
+
+    def initialize(self, db_manager):
+        self.db_manager = db_manager
+
+    def get(self, switch_id):
+        try:
+            switch_id = int(switch_id)
+        except (ValueError, TypeError):
+            self.set_status(400)
+            self.write({"status": "error", "message": "交换机ID必须是有效的整数"})
+            return
+
+        try:
+            if self.db_manager.switch_manager.registry.get(switch_id) is None:
+                self.set_status(404)
+                self.write(
+                    {"status": "error", "message": f"交换机不存在，ID: {switch_id}"}
+                )
+                return
+
+            poll_state_manager = self.db_manager.poll_state_manager
+            self.write(
+                {
+                    "status": "success",
+                    "data": {
+                        poll_type: poll_state_manager.get_result(switch_id, poll_type)
+                        for poll_type in poll_state_manager.POLL_TYPES
+                    },
+                }
+            )
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+
+class SwitchPollProfileHandler(BaseHandler):
+    """交换机接口轮询配置处理器 - 查询、保存、删除接口轮询配置"""
+
+    def initialize(self, db_manager):
+        self.db_manager = db_manager
+
+    def _switch_id(self, switch_id):
+        """校验交换机ID，无效时写入400响应并返回None"""
+        try:
+            return int(switch_id)
+        except (ValueError, TypeError):
+            self.set_status(400)
+            self.write({"status": "error", "message": "交换机ID必须是有效的整数"})
+            return None
+
+    def get(self, switch_id):
+        switch_id = self._switch_id(switch_id)
+        if switch_id is None:
+            return
+        try:
+            profile = self.db_manager.switch_manager.get_poll_profile(switch_id)
+            self.write(
+                {
+                    "status": "success",
+                    "data": InterfacePollProfile.from_dict(profile).to_dict(),
+                    "configured": profile is not None,
+                }
+            )
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+    def post(self, switch_id):
+        switch_id = self._switch_id(switch_id)
+        if switch_id is None:
+            return
+        try:
+            data = tornado.escape.json_decode(self.request.body)
+            if not isinstance(data, dict):
+                raise ValueError("接口轮询配置必须是JSON对象")
+            profile = InterfacePollProfile.from_dict(data).to_dict()
+
+            success, message = self.db_manager.switch_manager.set_poll_profile(
+                switch_id, profile
+            )
+            self.write({"status": "success", "message": message, "data": profile})
+        except json.JSONDecodeError:
+            self.set_status(400)
+            self.write({"status": "error", "message": "无效的JSON格式"})
+        except ValueError as e:
+            self.set_status(400)
+            self.write({"status": "error", "message": str(e)})
+        except DeviceNotFoundError as e:
+            self.set_status(404)
+            self.write({"status": "error", "message": str(e)})
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+    def delete(self, switch_id):
+        switch_id = self._switch_id(switch_id)
+        if switch_id is None:
+            return
+        try:
+            deleted = self.db_manager.switch_manager.delete_poll_profile(switch_id)
+            self.write(
+                {
+                    "status": "success",
+                    "message": (
+                        "接口轮询配置已删除" if deleted else "未配置接口轮询配置"
+                    ),
+                }
+            )
+        except Exception as e:
+            self.set_status(500)
+            self.write({"status": "error", "message": f"内部服务器错误: {str(e)}"})
+
+
 class SwitchesHandler(BaseHandler):
     """交换机信息处理器 - 获取所有交换机信息"""
 
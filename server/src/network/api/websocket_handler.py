@@ -17,10 +17,18 @@ import tornado.ioloop
 import tornado.websocket
 from src.core.logger import logger
 from src.core.state_manager import state_manager
+from src.snmp.live_rates import get_live_rate_streamer
+from src.snmp.poll_delta import get_poll_delta_encoder
+from src.snmp.unified_poller import ON_DEMAND_POLL_TYPES, poll_switch_now
 
 
 # WebSocket处理器
 class WebSocketHandler(tornado.websocket.WebSocketHandler):
+    def initialize(self, db_manager=None):
+        self.db_manager = db_manager
+        # 本连接的实时速率订阅ID
+        self.live_rate_subscriptions = set()
+
     def check_origin(self, origin):
         # 允许所有来源的WebSocket连接
         return True
@@ -48,14 +56,157 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
         try:
             data = json.loads(message)
 
+            # 按需轮询：{"type": "pollSwitch", "data": {"switch_id": 1, "poll_type": "all"}}
+            if data.get("type") == "pollSwitch":
+                tornado.ioloop.IOLoop.current().spawn_callback(
+                    self.poll_switch, data.get("data") or {}
+                )
+            # 实时速率：{"type": "subscribeLiveRates", "data": {"switch_id": 1, "ports": [1, 2], "interval": 2}}
+            elif data.get("type") == "subscribeLiveRates":
+                self.subscribe_live_rates(data.get("data") or {})
+            elif data.get("type") == "unsubscribeLiveRates":
+                self.unsubscribe_live_rates(data.get("data") or {})
+            # 增量广播重新同步：{"type": "requestSnmpSnapshot", "data": {"poll_type": "all", "switch_ids": [1]}}
+            elif data.get("type") == "requestSnmpSnapshot":
+                self.send_snmp_snapshot(data.get("data") or {})
+
         except json.JSONDecodeError:
             self.send_error_message("无效的JSON格式")
         except Exception as e:
             self.send_error_message(f"处理消息时发生错误: {str(e)}")
 
+    async def poll_switch(self, params):
+        """立即轮询单台交换机，完成后向本连接发送pollResult消息
+
+        结果同时会以snmpDeviceUpdate/snmpInterfaceUpdate广播给所有连接。
+
+        Args:
+            params: 请求参数，包含switch_id和可选的poll_type（all/device/interface）
+        """
+        poll_type = params.get("poll_type", "all")
+        try:
+            switch_id = int(params.get("switch_id"))
+        except (ValueError, TypeError):
+            self.send_error_message("交换机ID必须是有效的整数")
+            return
+        if poll_type not in ON_DEMAND_POLL_TYPES:
+            self.send_error_message(f"无效的轮询类型: {poll_type}")
+            return
+        if self.db_manager is None:
+            self.send_error_message("按需轮询不可用")
+            return
+
+        try:
+            switch = self.db_manager.switch_manager.registry.get(switch_id)
+            if switch is None:
+                self.send_error_message(f"交换机不存在，ID: {switch_id}")
+                return
+
+            results = await poll_switch_now(switch, ON_DEMAND_POLL_TYPES[poll_type])
+            if self.ws_connection is None:
+                # 等待期间连接已关闭
+                return
+            self.send_message(
+                {
+                    "type": "pollResult",
+                    "data": {"switch_id": switch_id, "results": results},
+                }
+            )
+        except Exception as e:
+            self.send_error_message(f"按需轮询失败: {str(e)}")
+
+    def subscribe_live_rates(self, params):
+        """订阅交换机端口的实时速率，成功后回复liveRatesSubscribed消息
+
+        同一交换机的多个订阅共享一路采样，采样结果以liveRates消息推送给本连接。
+
+        Args:
+            params: 请求参数，包含switch_id、可选的ports（ifIndex列表）和interval（秒）
+        """
+        try:
+            switch_id = int(params.get("switch_id"))
+        except (ValueError, TypeError):
+            self.send_error_message("交换机ID必须是有效的整数")
+            return
+        if self.db_manager is None:
+            self.send_error_message("实时速率不可用")
+            return
+
+        registry = self.db_manager.switch_manager.registry
+        switch = registry.get(switch_id)
+        if switch is None:
+            self.send_error_message(f"交换机不存在，ID: {switch_id}")
+            return
+
+        # 采样线程中回调，转交到当前IOLoop发送
+        io_loop = tornado.ioloop.IOLoop.current()
+
+        def on_rates(message):
+            io_loop.add_callback(self.send_message, message)
+
+        try:
+            subscription_id = get_live_rate_streamer(registry).subscribe(
+                switch,
+                ports=params.get("ports"),
+                interval=params.get("interval", 2),
+                callback=on_rates,
+            )
+        except ValueError as e:
+            self.send_error_message(str(e))
+            return
+
+        self.live_rate_subscriptions.add(subscription_id)
+        self.send_message(
+            {
+                "type": "liveRatesSubscribed",
+                "data": {"subscription_id": subscription_id, "switch_id": switch_id},
+            }
+        )
+
+    def unsubscribe_live_rates(self, params):
+        """取消本连接的实时速率订阅
+
+        Args:
+            params: 请求参数，包含subscription_id
+        """
+        subscription_id = params.get("subscription_id")
+        if subscription_id not in self.live_rate_subscriptions:
+            self.send_error_message(f"实时速率订阅不存在: {subscription_id}")
+            return
+        self.live_rate_subscriptions.discard(subscription_id)
+        get_live_rate_streamer().unsubscribe(subscription_id)
+
+    def send_snmp_snapshot(self, params):
+        """向本连接发送交换机当前的完整轮询结果（关键帧），用于连接后或序号不连续时重新同步
+
+        Args:
+            params: 请求参数，包含可选的poll_type（all/device/interface）和switch_ids
+        """
+        poll_type = params.get("poll_type", "all")
+        if poll_type not in ON_DEMAND_POLL_TYPES:
+            self.send_error_message(f"无效的轮询类型: {poll_type}")
+            return
+        switch_ids = params.get("switch_ids")
+        if switch_ids is not None:
+            try:
+                switch_ids = [int(switch_id) for switch_id in switch_ids]
+            except (ValueError, TypeError):
+                self.send_error_message("交换机ID必须是有效的整数")
+                return
+
+        for message in get_poll_delta_encoder().snapshot(
+            ON_DEMAND_POLL_TYPES[poll_type], switch_ids
+        ):
+            self.send_message(message)
+
     def on_close(self):
         """WebSocket连接关闭"""
         state_manager.remove_client(self)
+        if self.live_rate_subscriptions:
+            streamer = get_live_rate_streamer()
+            for subscription_id in self.live_rate_subscriptions:
+                streamer.unsubscribe(subscription_id)
+            self.live_rate_subscriptions.clear()
 
     def send_message(self, message):
         """向客户端发送WebSocket消息"""
@@ -9,6 +9,8 @@ SNMP监控模块
 from .snmp_monitor import SNMPMonitor
 from .oid_classifier import OIDClassifier
 from .manager import SNMPManager
+from .rate_calculator import InterfaceRateCalculator
+from .process_pool import ShardedPollerPool
 from .unified_poller import (
     start_device_poller,
     stop_device_poller,
@@ -22,6 +24,8 @@ __all__ = [
     "SNMPMonitor",
     "OIDClassifier",
     "SNMPManager",
+    "InterfaceRateCalculator",
+    "ShardedPollerPool",
     "start_device_poller",
     "stop_device_poller",
     "start_interface_poller",
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模拟SNMP代理 - 在本机模拟N台交换机×M个端口，用于压测轮询器和SNMP监控器
+
+- 每台模拟交换机占用一个UDP端点：同一地址的不同端口（127.0.0.1:16100起），
+  或127.0.0.0/8内的不同地址、同一端口（Linux默认整个127/8都是本机地址）
+- 提供system组、ifTable、ifXTable、ifTableLastChange和华为实体表的CPU/内存/温度，
+  轮询器的厂商OID探测、静态列缓存和速率计算都按真实设备的路径执行
+- 流量计数器按时间线性增长（每个端口速率不同），Counter32由64位计数器取模得到，会自然回绕
+- 可配置响应延迟/抖动、丢包率和ifIndex间隔（模拟堆叠/板卡编号不连续的设备）
+
+只支持团体名认证的v1/v2c GET/GETNEXT/GETBULK（报文由原生BER编解码器处理）。
+
+用法:
+    python -m src.snmp.agent_simulator --switches 100 --ports 48 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import bisect
+import ipaddress
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.logger import logger
+from src.snmp.ber_codec import (
+    END_OF_MIB_VIEW,
+    NO_SUCH_INSTANCE,
+    NO_SUCH_OBJECT,
+    PDU_GET,
+    PDU_GETBULK,
+    PDU_GETNEXT,
+    PDU_RESPONSE,
+    VERSION_V1,
+    BERDecodeError,
+    Counter32,
+    Counter64,
+    Gauge32,
+    ObjectIdentifier,
+    OctetString,
+    TimeTicks,
+    decode_message,
+    encode_message,
+)
+
+OID = Tuple[int, ...]
+
+SYSTEM = (1, 3, 6, 1, 2, 1, 1)
+IF_NUMBER = (1, 3, 6, 1, 2, 1, 2, 1, 0)
+IF_ENTRY = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+IF_X_ENTRY = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1)
+IF_TABLE_LAST_CHANGE = (1, 3, 6, 1, 2, 1, 31, 1, 5, 0)
+HW_ENTITY_STATE = (1, 3, 6, 1, 4, 1, 2011, 5, 25, 31, 1, 1, 1, 1)
+HW_SYS_OBJECT_ID = ObjectIdentifier((1, 3, 6, 1, 4, 1, 2011, 2, 23, 96))
+
+# 华为实体表中带CPU/内存/温度的单板（主控板）和不带的单板（取值为0，探测时跳过）
+HW_ENTITY_INDEXES = (16842753, 16842754, 16908289)
+
+# 流量计数器: (ifXTable 64位列, ifTable 32位列, 相对字节速率的比例)，两列取自同一个计数值
+TRAFFIC_COUNTERS = (
+    (6, 10, 1.0),  # ifHCInOctets / ifInOctets
+    (10, 16, 1.0),  # ifHCOutOctets / ifOutOctets
+    (7, 11, 1 / 500),  # ifHCInUcastPkts / ifInUcastPkts
+    (11, 17, 1 / 500),  # ifHCOutUcastPkts / ifOutUcastPkts
+)
+# 丢弃/错误等低速ifTable计数器列
+SLOW_COLUMNS = (13, 14, 19, 20)
+
+# v1错误状态
+_NO_SUCH_NAME = 2
+
+_COUNTER32_MOD = 2**32
+_COUNTER64_MOD = 2**64
+
+
+class SimulatedSwitch:
+    """
+    单台模拟交换机的MIB
+
+    静态值在构造时生成，计数器和sysUpTime在读取时按当前时间计算。
+
+    Args:
+        number: 交换机序号（用于生成名称和随机种子）
+        ports: 端口数
+        if_index_gap: 相邻端口ifIndex之间的间隔（0表示连续编号）
+        counter_rate: 端口平均流量（字节/秒），各端口在0.5~1.5倍之间随机
+        seed: 随机种子，默认使用交换机序号
+    """
+
+    def __init__(
+        self,
+        number: int,
+        ports: int = 48,
+        if_index_gap: int = 0,
+        counter_rate: float = 1e6,
+        seed: Optional[int] = None,
+    ):
+        rng = random.Random(number if seed is None else seed)
+        self.number = number
+        self.started = time.time()
+        self.boot_time = self.started - rng.uniform(3600, 86400 * 30)
+        self.if_indexes = [1 + i * (if_index_gap + 1) for i in range(ports)]
+
+        self._static: Dict[OID, Any] = {
+            SYSTEM
+            + (1, 0): OctetString(
+                b"Huawei Versatile Routing Platform Software, "
+                b"S5735-L48T4X (simulated)"
+            ),
+            SYSTEM + (2, 0): HW_SYS_OBJECT_ID,
+            SYSTEM + (4, 0): OctetString(b"noc@example.com"),
+            SYSTEM + (5, 0): OctetString(f"sim-switch-{number}".encode()),
+            SYSTEM + (6, 0): OctetString(b"lab"),
+            IF_NUMBER: ports,
+            IF_TABLE_LAST_CHANGE: TimeTicks(0),
+        }
+        # 计数器: OID -> (64位基数, 每秒增量, 位数)
+        self._counters: Dict[OID, Tuple[int, float, int]] = {}
+
+        for port, if_index in enumerate(self.if_indexes, 1):
+            speed = 10_000_000_000 if port > ports - 4 else 1_000_000_000
+            self._static.update(
+                {
+                    IF_ENTRY + (1, if_index): if_index,
+                    IF_ENTRY
+                    + (2, if_index): OctetString(f"GigabitEthernet0/0/{port}".encode()),
+                    IF_ENTRY + (3, if_index): 6,
+                    IF_ENTRY + (4, if_index): 1500,
+                    IF_ENTRY + (5, if_index): Gauge32(min(speed, 2**32 - 1)),
+                    IF_ENTRY
+                    + (6, if_index): OctetString(
+                        bytes([0x00, 0xE0, 0xFC, number >> 8 & 0xFF, number & 0xFF])
+                        + bytes([port & 0xFF])
+                    ),
+                    IF_ENTRY + (7, if_index): 1,
+                    # 约每8个端口有一个down
+                    IF_ENTRY + (8, if_index): 2 if port % 8 == 0 else 1,
+                    IF_ENTRY + (9, if_index): TimeTicks(rng.randint(0, 100000)),
+                    IF_X_ENTRY + (1, if_index): OctetString(f"GE0/0/{port}".encode()),
+                    IF_X_ENTRY + (15, if_index): Gauge32(speed // 1_000_000),
+                    IF_X_ENTRY + (18, if_index): OctetString(b""),
+                }
+            )
+            rate = 0.0 if port % 8 == 0 else counter_rate * rng.uniform(0.5, 1.5)
+            for hc_column, column, scale in TRAFFIC_COUNTERS:
+                base = rng.randrange(2**40)
+                self._counters[IF_X_ENTRY + (hc_column, if_index)] = (
+                    base,
+                    rate * scale,
+                    64,
+                )
+                self._counters[IF_ENTRY + (column, if_index)] = (base, rate * scale, 32)
+            for column in SLOW_COLUMNS:
+                self._counters[IF_ENTRY + (column, if_index)] = (
+                    rng.randrange(1000),
+                    rate * 1e-6,
+                    32,
+                )
+
+        # 华为实体表：CPU(5)、内存(7)、温度(11)
+        for position, entity in enumerate(HW_ENTITY_INDEXES):
+            board = position < 2
+            self._static[HW_ENTITY_STATE + (5, entity)] = (
+                rng.randint(5, 60) if board else 0
+            )
+            self._static[HW_ENTITY_STATE + (7, entity)] = (
+                rng.randint(20, 80) if board else 0
+            )
+            self._static[HW_ENTITY_STATE + (11, entity)] = (
+                rng.randint(30, 55) if board else 0
+            )
+
+        self._oids: List[OID] = sorted(
+            list(self._static) + list(self._counters) + [SYSTEM + (3, 0)]
+        )
+        # 已定义的对象（标量或表格列），用于区分noSuchObject和noSuchInstance
+        self._objects = {oid[:-1] for oid in self._oids}
+
+    def get(self, oid: OID, now: Optional[float] = None) -> Any:
+        """读取单个OID，不存在时返回None"""
+        if oid == SYSTEM + (3, 0):
+            return TimeTicks(int(((now or time.time()) - self.boot_time) * 100))
+        counter = self._counters.get(oid)
+        if counter is not None:
+            base, rate, bits = counter
+            value = base + int(rate * ((now or time.time()) - self.started))
+            if bits == 64:
+                return Counter64(value % _COUNTER64_MOD)
+            return Counter32(value % _COUNTER32_MOD)
+        return self._static.get(oid)
+
+    def get_exact(self, oid: OID, now: Optional[float] = None) -> Any:
+        """GET语义：不存在时返回noSuchObject/noSuchInstance"""
+        value = self.get(oid, now)
+        if value is not None:
+            return value
+        return NO_SUCH_INSTANCE if oid[:-1] in self._objects else NO_SUCH_OBJECT
+
+    def get_next(
+        self, oid: OID, now: Optional[float] = None, skip_counter64: bool = False
+    ) -> Tuple[OID, Any]:
+        """
+        读取字典序的下一个OID，已到末尾时返回endOfMibView
+
+        Args:
+            skip_counter64: 跳过Counter64对象（v1代理的行为）
+        """
+        position = bisect.bisect_right(self._oids, oid)
+        while position < len(self._oids):
+            next_oid = self._oids[position]
+            value = self.get(next_oid, now)
+            if not (skip_counter64 and isinstance(value, Counter64)):
+                return next_oid, value
+            position += 1
+        return oid, END_OF_MIB_VIEW
+
+    def __len__(self) -> int:
+        return len(self._oids)
+
+
+def simulator_targets(
+    switches: int,
+    host: str = "127.0.0.1",
+    port: int = 16100,
+    distinct_addresses: bool = False,
+) -> List[Tuple[str, int]]:
+    """
+    计算模拟交换机的 (地址, 端口) 列表
+
+    轮询器按IP区分交换机，压测轮询器时需要distinct_addresses=True。
+    """
+    first = ipaddress.ip_address(host)
+    return [
+        (str(first + i), port) if distinct_addresses else (host, port + i)
+        for i in range(switches)
+    ]
+
+
+def simulator_switch_configs(
+    targets: List[Tuple[str, int]],
+    community: str = "public",
+    codec: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """生成对应模拟交换机的交换机配置（可直接交给轮询器）"""
+    configs = []
+    for number, (ip, port) in enumerate(targets, 1):
+        config = {
+            "id": number,
+            "ip": ip,
+            "snmp_version": "v2c",
+            "community": community,
+            "snmp_port": port,
+            "device_name": f"sim-switch-{number}",
+        }
+        if codec:
+            config["snmp_codec"] = codec
+        configs.append(config)
+    return configs
+
+
+class _AgentProtocol(asyncio.DatagramProtocol):
+    """单台模拟交换机的UDP端点"""
+
+    def __init__(self, simulator: "AgentSimulator", switch: SimulatedSwitch):
+        self.simulator = simulator
+        self.switch = switch
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.simulator._on_request(self, data, addr)
+
+
+class AgentSimulator:
+    """
+    模拟SNMP代理
+
+    Args:
+        switches: 模拟交换机数
+        ports: 每台交换机的端口数
+        host: 第一台交换机的地址
+        port: 第一台交换机的端口
+        distinct_addresses: True时每台交换机使用不同地址（host起依次递增）、相同端口；
+            False时使用相同地址、不同端口（port起依次递增，适合直接压测SNMPMonitor）
+        community: 团体名
+        latency: 响应延迟（秒）
+        jitter: 响应延迟的随机抖动上限（秒）
+        loss: 丢包率（0~1），被丢弃的请求不响应
+        if_index_gap: 相邻端口ifIndex之间的间隔
+        counter_rate: 端口平均流量（字节/秒）
+        seed: 随机种子
+    """
+
+    def __init__(
+        self,
+        switches: int = 1,
+        ports: int = 48,
+        host: str = "127.0.0.1",
+        port: int = 16100,
+        distinct_addresses: bool = False,
+        community: str = "public",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        loss: float = 0.0,
+        if_index_gap: int = 0,
+        counter_rate: float = 1e6,
+        seed: int = 0,
+    ):
+        self.community = community.encode()
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self._rng = random.Random(seed)
+
+        self.targets = simulator_targets(switches, host, port, distinct_addresses)
+        self.switches = [
+            SimulatedSwitch(
+                i + 1,
+                ports=ports,
+                if_index_gap=if_index_gap,
+                counter_rate=counter_rate,
+                seed=seed + i,
+            )
+            for i in range(switches)
+        ]
+        self._transports: List[asyncio.DatagramTransport] = []
+        self._stats = {
+            "requests": 0,
+            "responses": 0,
+            "dropped": 0,
+            "bad_community": 0,
+            "decode_errors": 0,
+            "var_binds": 0,
+        }
+
+    def switch_configs(self, codec: Optional[str] = None) -> List[Dict[str, Any]]:
+        """生成对应模拟交换机的交换机配置"""
+        return simulator_switch_configs(self.targets, self.community.decode(), codec)
+
+    async def start(self) -> None:
+        """在当前事件循环中绑定全部端点"""
+        loop = asyncio.get_running_loop()
+        for switch, target in zip(self.switches, self.targets):
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda switch=switch: _AgentProtocol(self, switch), local_addr=target
+            )
+            self._transports.append(transport)
+        logger.info(
+            f"模拟SNMP代理已启动: {len(self.switches)}台交换机, "
+            f"{self.targets[0][0]}:{self.targets[0][1]} 起"
+        )
+
+    def stop(self) -> None:
+        """关闭全部端点"""
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+
+    def _on_request(self, protocol: _AgentProtocol, data: bytes, addr) -> None:
+        self._stats["requests"] += 1
+        if self.loss and self._rng.random() < self.loss:
+            self._stats["dropped"] += 1
+            return
+        try:
+            request = decode_message(data)
+        except BERDecodeError:
+            self._stats["decode_errors"] += 1
+            return
+        if request.community != self.community:
+            # 与真实设备一样，团体名错误时不响应
+            self._stats["bad_community"] += 1
+            return
+
+        response = self._respond(protocol.switch, request)
+        if response is None:
+            return
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            asyncio.get_running_loop().call_later(
+                delay, self._send, protocol, response, addr
+            )
+        else:
+            self._send(protocol, response, addr)
+
+    def _send(self, protocol: _AgentProtocol, response: bytes, addr) -> None:
+        if protocol.transport is not None and not protocol.transport.is_closing():
+            protocol.transport.sendto(response, addr)
+            self._stats["responses"] += 1
+
+    def _respond(self, switch: SimulatedSwitch, request) -> Optional[bytes]:
+        """按请求类型构造响应报文"""
+        now = time.time()
+        oids = [tuple(oid) for oid, _ in request.var_binds]
+        error_status = error_index = 0
+        var_binds: List[Tuple[OID, Any]] = []
+
+        v1 = request.version == VERSION_V1
+        if request.pdu_type == PDU_GET:
+            var_binds = [(oid, switch.get_exact(oid, now)) for oid in oids]
+        elif request.pdu_type == PDU_GETNEXT:
+            var_binds = [switch.get_next(oid, now, skip_counter64=v1) for oid in oids]
+        elif request.pdu_type == PDU_GETBULK and not v1:
+            non_repeaters = max(0, request.error_status)
+            max_repetitions = max(1, request.error_index)
+            var_binds = [switch.get_next(oid, now) for oid in oids[:non_repeaters]]
+            cursors = oids[non_repeaters:]
+            for _ in range(max_repetitions):
+                row = [switch.get_next(oid, now) for oid in cursors]
+                var_binds.extend(row)
+                cursors = [oid for oid, _ in row]
+                if all(value is END_OF_MIB_VIEW for _, value in row):
+                    break
+        else:
+            return None
+
+        if v1:
+            # v1没有异常值和Counter64，第一个无法返回的变量绑定以noSuchName报告
+            for position, (_, value) in enumerate(var_binds, 1):
+                if value in (NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW) or (
+                    isinstance(value, Counter64)
+                ):
+                    error_status, error_index = _NO_SUCH_NAME, position
+                    var_binds = [(oid, None) for oid in oids]
+                    break
+
+        self._stats["var_binds"] += len(var_binds)
+        return encode_message(
+            request.version,
+            request.community,
+            PDU_RESPONSE,
+            request.request_id,
+            var_binds,
+            error_status,
+            error_index,
+        )
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取模拟代理统计信息"""
+        return dict(self._stats)
+
+
+def run_simulator(ready=None, **kwargs) -> None:
+    """
+    在当前进程中运行模拟代理直到进程结束（用作multiprocessing.Process的入口）
+
+    Args:
+        ready: 端点绑定完成后设置的事件（可选）
+        **kwargs: 传给AgentSimulator的参数
+    """
+
+    async def serve():
+        simulator = AgentSimulator(**kwargs)
+        await simulator.start()
+        if ready is not None:
+            ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟SNMP代理")
+    parser.add_argument("--switches", type=int, default=10, help="模拟交换机数")
+    parser.add_argument("--ports", type=int, default=48, help="每台交换机的端口数")
+    parser.add_argument("--host", default="127.0.0.1", help="第一台交换机的地址")
+    parser.add_argument("--port", type=int, default=16100, help="第一台交换机的端口")
+    parser.add_argument(
+        "--distinct-addresses",
+        action="store_true",
+        help="每台交换机使用不同的127.x地址和相同端口",
+    )
+    parser.add_argument("--community", default="public", help="团体名")
+    parser.add_argument("--latency", type=float, default=0.0, help="响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟抖动上限（秒）")
+    parser.add_argument("--loss", type=float, default=0.0, help="丢包率（0~1）")
+    parser.add_argument("--if-index-gap", type=int, default=0, help="ifIndex间隔")
+    parser.add_argument(
+        "--counter-rate", type=float, default=1e6, help="端口平均流量（字节/秒）"
+    )
+    args = parser.parse_args()
+    run_simulator(**vars(args))
+
+
+__all__ = [
+    "AgentSimulator",
+    "SimulatedSwitch",
+    "run_simulator",
+    "simulator_switch_configs",
+    "simulator_targets",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP v1/v2c 轻量级BER编解码器
+
+只实现轮询和通知接收需要的报文：团体名认证的 GET / GETNEXT / GETBULK 请求和 Response，
+以及 v1 Trap、v2c SNMPv2-Trap / InformRequest 通知，
+不经过pysnmp的SMI/MIB层，编码和解码都是对字节串的直接操作：
+- OID编码结果按OID缓存，重复轮询同一组OID时只需拼接字节串
+- 解码时按偏移量直接读取，不构造中间的ASN.1对象
+- 解码得到的值是int/bytes/tuple/str的轻量子类，可以像pysnmp的值一样用int()/str()转换
+
+遇到不支持的数据类型或格式错误时抛出BERDecodeError，由调用方回退到pysnmp。
+"""
+
+import socket
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+# 通用类型标签
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OBJECT_IDENTIFIER = 0x06
+TAG_SEQUENCE = 0x30
+
+# SNMP应用类型标签
+TAG_IP_ADDRESS = 0x40
+TAG_COUNTER32 = 0x41
+TAG_GAUGE32 = 0x42
+TAG_TIMETICKS = 0x43
+TAG_OPAQUE = 0x44
+TAG_COUNTER64 = 0x46
+
+# SNMPv2异常值标签
+TAG_NO_SUCH_OBJECT = 0x80
+TAG_NO_SUCH_INSTANCE = 0x81
+TAG_END_OF_MIB_VIEW = 0x82
+
+# PDU类型标签
+PDU_GET = 0xA0
+PDU_GETNEXT = 0xA1
+PDU_RESPONSE = 0xA2
+PDU_SET = 0xA3
+PDU_TRAP_V1 = 0xA4
+PDU_GETBULK = 0xA5
+PDU_INFORM = 0xA6
+PDU_TRAP_V2 = 0xA7
+
+# 报文中的版本号
+VERSION_V1 = 0
+VERSION_V2C = 1
+
+# 请求中变量绑定的值（NULL）
+_NULL_VALUE = b"\x05\x00"
+
+
+class BERDecodeError(ValueError):
+    """报文格式错误或包含不支持的数据类型"""
+
+
+class Counter32(int):
+    """Counter32值"""
+
+    __slots__ = ()
+    tag = TAG_COUNTER32
+
+
+class Gauge32(int):
+    """Gauge32/Unsigned32值"""
+
+    __slots__ = ()
+    tag = TAG_GAUGE32
+
+
+class TimeTicks(int):
+    """TimeTicks值（百分之一秒）"""
+
+    __slots__ = ()
+    tag = TAG_TIMETICKS
+
+
+class Counter64(int):
+    """Counter64值"""
+
+    __slots__ = ()
+    tag = TAG_COUNTER64
+
+
+class OctetString(bytes):
+    """OCTET STRING值，str()按UTF-8解码"""
+
+    __slots__ = ()
+    tag = TAG_OCTET_STRING
+
+    def __str__(self) -> str:
+        return self.decode("utf-8", "replace")
+
+
+class Opaque(OctetString):
+    """Opaque值"""
+
+    __slots__ = ()
+    tag = TAG_OPAQUE
+
+
+class ObjectIdentifier(tuple):
+    """OBJECT IDENTIFIER值，str()为点分格式"""
+
+    __slots__ = ()
+    tag = TAG_OBJECT_IDENTIFIER
+
+    def __str__(self) -> str:
+        return ".".join(map(str, self))
+
+
+class IpAddress(str):
+    """IpAddress值（点分格式）"""
+
+    __slots__ = ()
+    tag = TAG_IP_ADDRESS
+
+
+class SNMPExceptionValue:
+    """SNMPv2异常值（noSuchObject/noSuchInstance/endOfMibView）"""
+
+    __slots__ = ("tag", "name")
+
+    def __init__(self, tag: int, name: str):
+        self.tag = tag
+        self.name = name
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __str__(self) -> str:
+        return self.name
+
+    __repr__ = __str__
+
+
+NO_SUCH_OBJECT = SNMPExceptionValue(TAG_NO_SUCH_OBJECT, "noSuchObject")
+NO_SUCH_INSTANCE = SNMPExceptionValue(TAG_NO_SUCH_INSTANCE, "noSuchInstance")
+END_OF_MIB_VIEW = SNMPExceptionValue(TAG_END_OF_MIB_VIEW, "endOfMibView")
+
+_EXCEPTION_VALUES = {
+    TAG_NO_SUCH_OBJECT: NO_SUCH_OBJECT,
+    TAG_NO_SUCH_INSTANCE: NO_SUCH_INSTANCE,
+    TAG_END_OF_MIB_VIEW: END_OF_MIB_VIEW,
+}
+
+_UNSIGNED_TYPES = {
+    TAG_COUNTER32: Counter32,
+    TAG_GAUGE32: Gauge32,
+    TAG_TIMETICKS: TimeTicks,
+    TAG_COUNTER64: Counter64,
+}
+
+
+class SNMPMessage(NamedTuple):
+    """解码后的SNMP报文"""
+
+    version: int
+    community: bytes
+    pdu_type: int
+    request_id: int
+    # GETBULK请求中分别为non-repeaters和max-repetitions
+    error_status: int
+    error_index: int
+    var_binds: List[Tuple[ObjectIdentifier, Any]]
+
+
+class V1Trap(NamedTuple):
+    """解码后的SNMP v1 Trap报文"""
+
+    community: bytes
+    enterprise: ObjectIdentifier
+    agent_addr: str
+    generic_trap: int
+    specific_trap: int
+    time_stamp: int
+    var_binds: List[Tuple[ObjectIdentifier, Any]]
+
+
+# ---------------------------------------------------------------------------
+# 编码
+# ---------------------------------------------------------------------------
+
+
+def _encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x100:
+        return bytes((0x81, length))
+    if length < 0x10000:
+        return bytes((0x82, length >> 8, length & 0xFF))
+    return b"\x83" + length.to_bytes(3, "big")
+
+
+def _tlv(tag: int, content: bytes) -> bytes:
+    return bytes((tag,)) + _encode_length(len(content)) + content
+
+
+def _encode_integer(tag: int, value: int) -> bytes:
+    size = ((value if value >= 0 else ~value).bit_length() + 8) // 8
+    return _tlv(tag, value.to_bytes(size, "big", signed=True))
+
+
+@lru_cache(maxsize=8192)
+def encode_oid(oid: Tuple[int, ...]) -> bytes:
+    """
+    编码OBJECT IDENTIFIER（含标签和长度，结果缓存）
+
+    Args:
+        oid: 整数元组形式的OID
+
+    Returns:
+        BER编码字节串
+    """
+    if len(oid) < 2:
+        raise ValueError(f"OID至少需要两段: {oid}")
+    body = bytearray()
+    for arc in (oid[0] * 40 + oid[1],) + tuple(oid[2:]):
+        if arc < 0x80:
+            body.append(arc)
+            continue
+        chunk = bytearray()
+        while arc:
+            chunk.append((arc & 0x7F) | 0x80)
+            arc >>= 7
+        chunk[0] &= 0x7F
+        chunk.reverse()
+        body += chunk
+    return _tlv(TAG_OBJECT_IDENTIFIER, bytes(body))
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    编码变量绑定的值
+
+    None编码为NULL；带tag属性的类型按其标签编码；
+    普通int为INTEGER，bytes/str为OCTET STRING，tuple为OBJECT IDENTIFIER。
+    """
+    if value is None:
+        return _NULL_VALUE
+    tag = getattr(value, "tag", None)
+    if isinstance(value, SNMPExceptionValue):
+        return bytes((value.tag, 0))
+    if tag in _UNSIGNED_TYPES:
+        return _encode_integer(tag, int(value))
+    if tag == TAG_IP_ADDRESS:
+        return _tlv(TAG_IP_ADDRESS, socket.inet_aton(value))
+    if isinstance(value, bool):
+        return _encode_integer(TAG_INTEGER, int(value))
+    if isinstance(value, int):
+        return _encode_integer(TAG_INTEGER, value)
+    if isinstance(value, tuple):
+        return encode_oid(value)
+    if isinstance(value, bytes):
+        return _tlv(tag or TAG_OCTET_STRING, value)
+    if isinstance(value, str):
+        return _tlv(TAG_OCTET_STRING, value.encode("utf-8"))
+    raise ValueError(f"不支持编码的值类型: {type(value)}")
+
+
+def _encode_envelope(
+    version: int,
+    community: bytes,
+    pdu_type: int,
+    request_id: int,
+    error_status: int,
+    error_index: int,
+    bindings: bytes,
+) -> bytes:
+    """将已编码的变量绑定列表封装为完整报文"""
+    pdu = _tlv(
+        pdu_type,
+        _encode_integer(TAG_INTEGER, request_id)
+        + _encode_integer(TAG_INTEGER, error_status)
+        + _encode_integer(TAG_INTEGER, error_index)
+        + _tlv(TAG_SEQUENCE, bindings),
+    )
+    return _tlv(
+        TAG_SEQUENCE,
+        _encode_integer(TAG_INTEGER, version) + _tlv(TAG_OCTET_STRING, community) + pdu,
+    )
+
+
+def encode_message(
+    version: int,
+    community: bytes,
+    pdu_type: int,
+    request_id: int,
+    var_binds: Sequence[Tuple[Tuple[int, ...], Any]],
+    error_status: int = 0,
+    error_index: int = 0,
+) -> bytes:
+    """
+    编码完整的SNMP v1/v2c报文
+
+    Args:
+        version: VERSION_V1 或 VERSION_V2C
+        community: 团体名
+        pdu_type: PDU类型标签
+        request_id: 请求ID
+        var_binds: [(OID元组, 值)]，请求中值为None
+        error_status: 错误状态（GETBULK为non-repeaters）
+        error_index: 错误索引（GETBULK为max-repetitions）
+
+    Returns:
+        报文字节串
+    """
+    bindings = b"".join(
+        [
+            _tlv(TAG_SEQUENCE, encode_oid(tuple(oid)) + encode_value(value))
+            for oid, value in var_binds
+        ]
+    )
+    return _encode_envelope(
+        version, community, pdu_type, request_id, error_status, error_index, bindings
+    )
+
+
+def encode_request(
+    version: int,
+    community: bytes,
+    pdu_type: int,
+    request_id: int,
+    oids: Sequence[Tuple[int, ...]],
+    non_repeaters: int = 0,
+    max_repetitions: int = 0,
+) -> bytes:
+    """
+    编码GET/GETNEXT/GETBULK请求（变量绑定的值均为NULL）
+
+    Args:
+        version: VERSION_V1 或 VERSION_V2C
+        community: 团体名
+        pdu_type: PDU_GET / PDU_GETNEXT / PDU_GETBULK
+        request_id: 请求ID
+        oids: OID元组列表
+        non_repeaters: GETBULK的non-repeaters
+        max_repetitions: GETBULK的max-repetitions
+
+    Returns:
+        报文字节串
+    """
+    bindings = b"".join(
+        [_tlv(TAG_SEQUENCE, encode_oid(oid) + _NULL_VALUE) for oid in oids]
+    )
+    if pdu_type == PDU_GETBULK:
+        error_status, error_index = non_repeaters, max_repetitions
+    else:
+        error_status = error_index = 0
+    return _encode_envelope(
+        version, community, pdu_type, request_id, error_status, error_index, bindings
+    )
+
+
+# ---------------------------------------------------------------------------
+# 解码
+# ---------------------------------------------------------------------------
+
+
+def _read_length(data: bytes, pos: int) -> Tuple[int, int]:
+    """读取长度字段，返回 (长度, 内容起始偏移)"""
+    first = data[pos]
+    if first < 0x80:
+        return first, pos + 1
+    count = first & 0x7F
+    if count == 0 or count > 4:
+        raise BERDecodeError(f"不支持的长度编码: 0x{first:02x}")
+    return int.from_bytes(data[pos + 1 : pos + 1 + count], "big"), pos + 1 + count
+
+
+def _read_integer(data: bytes, pos: int) -> Tuple[int, int]:
+    """读取INTEGER，返回 (值, 下一个元素偏移)"""
+    if data[pos] != TAG_INTEGER:
+        raise BERDecodeError(f"期望INTEGER，实际标签0x{data[pos]:02x}")
+    length, pos = _read_length(data, pos + 1)
+    end = pos + length
+    return int.from_bytes(data[pos:end], "big", signed=True), end
+
+
+def _decode_oid(data: bytes, start: int, end: int) -> ObjectIdentifier:
+    if start >= end:
+        raise BERDecodeError("空的OBJECT IDENTIFIER")
+    arcs: List[int] = []
+    value = 0
+    for pos in range(start, end):
+        byte = data[pos]
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(value)
+            value = 0
+    if data[end - 1] & 0x80:
+        raise BERDecodeError("OBJECT IDENTIFIER被截断")
+    first = arcs[0]
+    if first < 80:
+        head = (first // 40, first % 40)
+    else:
+        head = (2, first - 80)
+    return ObjectIdentifier(head + tuple(arcs[1:]))
+
+
+def _decode_value(tag: int, data: bytes, start: int, end: int) -> Any:
+    """按标签解码变量绑定的值"""
+    unsigned_type = _UNSIGNED_TYPES.get(tag)
+    if unsigned_type is not None:
+        return unsigned_type(int.from_bytes(data[start:end], "big"))
+    if tag == TAG_OCTET_STRING:
+        return OctetString(data[start:end])
+    if tag == TAG_INTEGER:
+        return int.from_bytes(data[start:end], "big", signed=True)
+    if tag == TAG_OBJECT_IDENTIFIER:
+        return _decode_oid(data, start, end)
+    if tag == TAG_NULL:
+        return None
+    if tag in _EXCEPTION_VALUES:
+        return _EXCEPTION_VALUES[tag]
+    if tag == TAG_IP_ADDRESS and end - start == 4:
+        return IpAddress(socket.inet_ntoa(data[start:end]))
+    if tag == TAG_OPAQUE:
+        return Opaque(data[start:end])
+    raise BERDecodeError(f"不支持的值类型标签: 0x{tag:02x}")
+
+
+def _decode_var_binds(data: bytes, pos: int) -> List[Tuple[ObjectIdentifier, Any]]:
+    """从变量绑定列表的偏移开始解码全部变量绑定"""
+    if data[pos] != TAG_SEQUENCE:
+        raise BERDecodeError("缺少变量绑定列表")
+    length, pos = _read_length(data, pos + 1)
+    end = pos + length
+    if end > len(data):
+        raise BERDecodeError("变量绑定列表被截断")
+
+    var_binds = []
+    while pos < end:
+        if data[pos] != TAG_SEQUENCE:
+            raise BERDecodeError("变量绑定不是SEQUENCE")
+        _, pos = _read_length(data, pos + 1)
+        if data[pos] != TAG_OBJECT_IDENTIFIER:
+            raise BERDecodeError("变量绑定缺少OID")
+        length, pos = _read_length(data, pos + 1)
+        oid = _decode_oid(data, pos, pos + length)
+        pos += length
+        tag = data[pos]
+        length, pos = _read_length(data, pos + 1)
+        if pos + length > end:
+            raise BERDecodeError("变量绑定值被截断")
+        var_binds.append((oid, _decode_value(tag, data, pos, pos + length)))
+        pos += length
+    return var_binds
+
+
+def _decode_header(data: bytes) -> Tuple[int, bytes, int, int, int, int, int]:
+    """
+    解码报文头部（到error-index为止）
+
+    Returns:
+        (版本, 团体名, PDU类型, 请求ID, 错误状态, 错误索引, 变量绑定列表偏移)
+    """
+    if data[0] != TAG_SEQUENCE:
+        raise BERDecodeError("报文不是SEQUENCE")
+    _, pos = _read_length(data, 1)
+    version, pos = _read_integer(data, pos)
+    if data[pos] != TAG_OCTET_STRING:
+        raise BERDecodeError("缺少团体名")
+    length, pos = _read_length(data, pos + 1)
+    community = data[pos : pos + length]
+    pos += length
+    pdu_type = data[pos]
+    _, pos = _read_length(data, pos + 1)
+    request_id, pos = _read_integer(data, pos)
+    error_status, pos = _read_integer(data, pos)
+    error_index, pos = _read_integer(data, pos)
+    return version, community, pdu_type, request_id, error_status, error_index, pos
+
+
+def peek_request_id(data: bytes) -> Optional[int]:
+    """只解码报文头部取得请求ID，报文格式错误时返回None"""
+    try:
+        return _decode_header(data)[3]
+    except (BERDecodeError, IndexError, ValueError):
+        return None
+
+
+def peek_version(data: bytes) -> Optional[int]:
+    """只解码报文的版本号（0=v1, 1=v2c, 3=v3），报文格式错误时返回None"""
+    try:
+        if data[0] != TAG_SEQUENCE:
+            return None
+        _, pos = _read_length(data, 1)
+        return _read_integer(data, pos)[0]
+    except (BERDecodeError, IndexError, ValueError):
+        return None
+
+
+def decode_message(data: bytes) -> SNMPMessage:
+    """
+    解码SNMP v1/v2c报文
+
+    Args:
+        data: 报文字节串
+
+    Returns:
+        SNMPMessage
+
+    Raises:
+        BERDecodeError: 报文格式错误或包含不支持的数据类型
+    """
+    try:
+        version, community, pdu_type, request_id, error_status, error_index, pos = (
+            _decode_header(data)
+        )
+        var_binds = _decode_var_binds(data, pos)
+    except BERDecodeError:
+        raise
+    except (IndexError, ValueError) as e:
+        raise BERDecodeError(f"报文格式错误: {e}") from e
+
+    return SNMPMessage(
+        version,
+        community,
+        pdu_type,
+        request_id,
+        error_status,
+        error_index,
+        var_binds,
+    )
+
+
+def decode_v1_trap(data: bytes) -> V1Trap:
+    """
+    解码SNMP v1 Trap报文
+
+    Args:
+        data: 报文字节串
+
+    Returns:
+        V1Trap
+
+    Raises:
+        BERDecodeError: 报文格式错误、不是v1 Trap或包含不支持的数据类型
+    """
+    try:
+        if data[0] != TAG_SEQUENCE:
+            raise BERDecodeError("报文不是SEQUENCE")
+        _, pos = _read_length(data, 1)
+        version, pos = _read_integer(data, pos)
+        if version != VERSION_V1:
+            raise BERDecodeError(f"v1 Trap的版本号错误: {version}")
+        if data[pos] != TAG_OCTET_STRING:
+            raise BERDecodeError("缺少团体名")
+        length, pos = _read_length(data, pos + 1)
+        community = data[pos : pos + length]
+        pos += length
+        if data[pos] != PDU_TRAP_V1:
+            raise BERDecodeError(f"不是v1 Trap PDU: 0x{data[pos]:02x}")
+        _, pos = _read_length(data, pos + 1)
+        if data[pos] != TAG_OBJECT_IDENTIFIER:
+            raise BERDecodeError("缺少enterprise")
+        length, pos = _read_length(data, pos + 1)
+        enterprise = _decode_oid(data, pos, pos + length)
+        pos += length
+        if data[pos] != TAG_IP_ADDRESS:
+            raise BERDecodeError("缺少agent-addr")
+        length, pos = _read_length(data, pos + 1)
+        agent_addr = _decode_value(TAG_IP_ADDRESS, data, pos, pos + length)
+        pos += length
+        generic_trap, pos = _read_integer(data, pos)
+        specific_trap, pos = _read_integer(data, pos)
+        if data[pos] != TAG_TIMETICKS:
+            raise BERDecodeError("缺少time-stamp")
+        length, pos = _read_length(data, pos + 1)
+        time_stamp = _decode_value(TAG_TIMETICKS, data, pos, pos + length)
+        pos += length
+        var_binds = _decode_var_binds(data, pos)
+    except BERDecodeError:
+        raise
+    except (IndexError, ValueError) as e:
+        raise BERDecodeError(f"报文格式错误: {e}") from e
+
+    return V1Trap(
+        community,
+        enterprise,
+        agent_addr,
+        generic_trap,
+        specific_trap,
+        time_stamp,
+        var_binds,
+    )
+
+
+__all__ = [
+    "BERDecodeError",
+    "SNMPMessage",
+    "V1Trap",
+    "SNMPExceptionValue",
+    "Counter32",
+    "Gauge32",
+    "TimeTicks",
+    "Counter64",
+    "OctetString",
+    "Opaque",
+    "ObjectIdentifier",
+    "IpAddress",
+    "NO_SUCH_OBJECT",
+    "NO_SUCH_INSTANCE",
+    "END_OF_MIB_VIEW",
+    "PDU_GET",
+    "PDU_GETNEXT",
+    "PDU_GETBULK",
+    "PDU_RESPONSE",
+    "PDU_SET",
+    "PDU_TRAP_V1",
+    "PDU_INFORM",
+    "PDU_TRAP_V2",
+    "VERSION_V1",
+    "VERSION_V2C",
+    "encode_oid",
+    "encode_value",
+    "encode_message",
+    "encode_request",
+    "decode_message",
+    "decode_v1_trap",
+    "peek_version",
+    "peek_request_id",
+]
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+设备熔断器 - 对连续轮询失败的设备进行指数退避，避免不可达设备长期占用工作协程
+
+状态流转：
+- closed（正常）：正常轮询，连续失败达到阈值后进入 open
+- open（熔断）：在退避时间内不轮询；退避时间随熔断次数指数增长，并有上限
+- half_open（半开）：退避到期后只发送一个sysUpTime探测请求，
+  探测成功后恢复完整轮询，轮询成功即回到 closed；探测失败则重新熔断并加倍退避
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# 熔断器状态
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# acquire() 的决策结果
+DECISION_POLL = "poll"
+DECISION_PROBE = "probe"
+DECISION_SKIP = "skip"
+
+
+class _BreakerEntry:
+    """单台设备的熔断状态"""
+
+    __slots__ = (
+        "state",
+        "consecutive_failures",
+        "open_count",
+        "open_until",
+        "backoff",
+        "last_failure",
+        "last_success",
+        "skipped",
+    )
+
+    def __init__(self):
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.backoff = 0.0
+        self.last_failure: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.skipped = 0
+
+
+class DeviceCircuitBreaker:
+    """
+    按设备维护的熔断器（线程安全）
+
+    时间均使用 time.monotonic()。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 30.0,
+        max_backoff: float = 600.0,
+        jitter_ratio: float = 0.1,
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            base_backoff: 首次熔断的退避时间（秒）
+            max_backoff: 退避时间上限（秒）
+            jitter_ratio: 退避时间随机抖动比例（±），避免大量设备同时探测
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max(max_backoff, base_backoff)
+        self.jitter_ratio = jitter_ratio
+        self._entries: Dict[str, _BreakerEntry] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> str:
+        """
+        轮询前决定如何处理该设备
+
+        Args:
+            key: 设备标识（IP）
+            now: 当前时间，默认time.monotonic()
+
+        Returns:
+            DECISION_POLL: 正常轮询
+            DECISION_PROBE: 退避到期，进入半开状态，先发送探测请求
+            DECISION_SKIP: 熔断中（或半开探测进行中），跳过本次轮询
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.state == STATE_CLOSED:
+                return DECISION_POLL
+            # 退避到期，或上一次探测长时间没有结果（如任务被取消），发起新的探测
+            if now >= entry.open_until:
+                entry.state = STATE_HALF_OPEN
+                entry.open_until = now + self.max_backoff
+                return DECISION_PROBE
+            entry.skipped += 1
+            return DECISION_SKIP
+
+    def is_half_open(self, key: str) -> bool:
+        """设备是否处于半开（待探测）状态"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.state == STATE_HALF_OPEN
+
+    def record_success(self, key: str, now: Optional[float] = None) -> None:
+        """记录一次成功，关闭熔断器并重置退避"""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.state = STATE_CLOSED
+            entry.consecutive_failures = 0
+            entry.open_count = 0
+            entry.backoff = 0.0
+            entry.open_until = 0.0
+            entry.last_success = now
+
+    def record_failure(self, key: str, now: Optional[float] = None) -> bool:
+        """
+        记录一次失败
+
+        Args:
+            key: 设备标识
+            now: 当前时间，默认time.monotonic()
+
+        Returns:
+            本次失败是否导致熔断（进入或重新进入open状态）
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            entry = self._entries.setdefault(key, _BreakerEntry())
+            entry.consecutive_failures += 1
+            entry.last_failure = now
+
+            if (
+                entry.state == STATE_HALF_OPEN
+                or entry.consecutive_failures >= self.failure_threshold
+            ):
+                entry.open_count += 1
+                backoff = min(
+                    self.base_backoff * (2 ** (entry.open_count - 1)),
+                    self.max_backoff,
+                )
+                if self.jitter_ratio:
+                    backoff *= 1 + random.uniform(-self.jitter_ratio, self.jitter_ratio)
+                entry.state = STATE_OPEN
+                entry.backoff = backoff
+                entry.open_until = now + backoff
+                return True
+            return False
+
+    def get_state(self, key: str) -> str:
+        """获取设备的熔断状态"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.state if entry is not None else STATE_CLOSED
+
+    def get_failure_count(self, key: str) -> int:
+        """获取设备的连续失败次数"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.consecutive_failures if entry is not None else 0
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """只保留指定设备的状态（设备被删除后清理）"""
+        keep = set(keys)
+        with self._lock:
+            for key in [key for key in self._entries if key not in keep]:
+                del self._entries[key]
+
+    def forget(self, key: str) -> None:
+        """清除指定设备的熔断状态"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_statistics(
+        self, include_devices: bool = True, now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        获取熔断器统计信息
+
+        Args:
+            include_devices: 是否包含每台非正常状态设备的详情
+            now: 当前时间，默认time.monotonic()
+
+        Returns:
+            统计字典
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            items = list(self._entries.items())
+
+            stats: Dict[str, Any] = {
+                "closed": sum(1 for _, e in items if e.state == STATE_CLOSED),
+                "open": sum(1 for _, e in items if e.state == STATE_OPEN),
+                "half_open": sum(1 for _, e in items if e.state == STATE_HALF_OPEN),
+                "skipped_polls": sum(e.skipped for _, e in items),
+            }
+            if include_devices:
+                stats["devices"] = {
+                    key: {
+                        "state": e.state,
+                        "consecutive_failures": e.consecutive_failures,
+                        "open_count": e.open_count,
+                        "backoff": round(e.backoff, 1),
+                        "retry_in": (
+                            round(max(0.0, e.open_until - now), 1)
+                            if e.state == STATE_OPEN
+                            else 0.0
+                        ),
+                        "skipped_polls": e.skipped,
+                    }
+                    for key, e in items
+                    if e.state != STATE_CLOSED or e.consecutive_failures
+                }
+        return stats
+
+
+__all__ = [
+    "DeviceCircuitBreaker",
+    "STATE_CLOSED",
+    "STATE_OPEN",
+    "STATE_HALF_OPEN",
+    "DECISION_POLL",
+    "DECISION_PROBE",
+    "DECISION_SKIP",
+]
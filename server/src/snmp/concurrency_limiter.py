@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自适应并发限制 - 按站点/子网分组，用AIMD（加性增、乘性减）调整后台轮询的在途请求数
+
+- 分组：交换机按配置的站点网段（最长前缀匹配）归入站点，未归入站点的按IPv4子网分组，
+  每个分组独立限制在途轮询数，慢速的广域网分支不会拖慢本地机房
+- 采样窗口：每个分组每完成 max(当前限制, MIN_WINDOW) 次轮询评估一次
+- 乘性减：窗口内超时比例超过阈值，或p90延迟超过目标延迟时，限制乘以减小系数；
+  减小后忽略减小前已发出请求的结果，避免同一次拥塞被重复计算
+- 加性增：窗口内并发被打满（有请求因达到限制而等待）且延迟、超时正常时限制加1
+- 达到限制的设备暂存在分组的等待队列中，由该分组释放出的并发按顺序接手，不阻塞其他分组；
+  限制增大后多出的并发取出等待中的设备交给其他工作协程
+"""
+
+import ipaddress
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 调整决策
+DECISION_INCREASE = "increase"
+DECISION_DECREASE = "decrease"
+DECISION_HOLD = "hold"
+
+# 减小并发的原因
+REASON_TIMEOUT = "timeout"
+REASON_LATENCY = "latency"
+
+# 每个采样窗口的最少轮询数
+MIN_WINDOW = 5
+
+# 保留的最近调整记录数
+RECENT_DECISIONS = 50
+
+
+class _GroupState:
+    """单个分组的并发限制状态"""
+
+    __slots__ = (
+        "limit",
+        "inflight",
+        "waiting",
+        "latencies",
+        "timeouts",
+        "saturated",
+        "ignore",
+        "completed",
+        "timeouts_total",
+        "increases",
+        "decreases",
+        "p90",
+        "timeout_ratio",
+        "last_decision",
+        "last_reason",
+        "last_change",
+        "last_active",
+    )
+
+    def __init__(self, limit: float, now: float):
+        self.limit = limit
+        self.inflight = 0
+        self.waiting: deque = deque()
+        self.latencies: List[float] = []
+        self.timeouts = 0
+        self.saturated = False
+        self.ignore = 0
+        self.completed = 0
+        self.timeouts_total = 0
+        self.increases = 0
+        self.decreases = 0
+        self.p90: Optional[float] = None
+        self.timeout_ratio: Optional[float] = None
+        self.last_decision: Optional[str] = None
+        self.last_reason: Optional[str] = None
+        self.last_change: Optional[float] = None
+        self.last_active = now
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    按分组的AIMD并发限制器（线程安全，时间使用 time.monotonic()）
+
+    Args:
+        initial_limit: 新分组的初始并发限制
+        min_limit: 每个分组的最小并发限制
+        max_limit: 每个分组的最大并发限制
+        latency_target: 目标p90延迟（秒），超过时减小并发
+        timeout_ratio: 窗口内超时比例阈值，超过时减小并发
+        decrease_factor: 乘性减小系数
+        group_prefix: 未归入站点的交换机按该前缀长度的IPv4子网分组
+        sites: 站点划分 {站点名: [网段, ...]}
+
+    Raises:
+        ValueError: 站点网段无效时抛出
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 5,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        latency_target: float = 2.5,
+        timeout_ratio: float = 0.1,
+        decrease_factor: float = 0.7,
+        group_prefix: int = 24,
+        sites: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.initial_limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.latency_target = latency_target
+        self.timeout_ratio = timeout_ratio
+        self.decrease_factor = min(max(decrease_factor, 0.1), 0.95)
+        self.group_prefix = min(max(group_prefix, 0), 32)
+
+        self._sites: List[Tuple[Any, str]] = []
+        for site, networks in (sites or {}).items():
+            for network in networks:
+                try:
+                    self._sites.append(
+                        (ipaddress.ip_network(network, strict=False), str(site))
+                    )
+                except ValueError as e:
+                    raise ValueError(f"站点 {site} 的网段无效: {e}")
+        # 最长前缀优先匹配
+        self._sites.sort(key=lambda item: item[0].prefixlen, reverse=True)
+
+        self._groups: Dict[str, _GroupState] = {}
+        self._group_of: Dict[str, str] = {}
+        self._recent: deque = deque(maxlen=RECENT_DECISIONS)
+        self._lock = threading.Lock()
+
+    def group_of(self, ip: str) -> str:
+        """获取交换机所属的分组（站点名或子网）"""
+        group = self._group_of.get(ip)
+        if group is not None:
+            return group
+
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            # 主机名等无法解析为地址的交换机单独成组
+            group = ip
+        else:
+            group = next(
+                (site for network, site in self._sites if address in network), None
+            )
+            if group is None:
+                prefix = self.group_prefix if address.version == 4 else 64
+                group = str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+        self._group_of[ip] = group
+        return group
+
+    def try_acquire(self, group: str, now: Optional[float] = None) -> bool:
+        """
+        尝试占用分组的一个并发
+
+        Returns:
+            未达到限制时占用并返回True；已达到限制时返回False（本窗口记为并发打满）
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            state = self._state(group, now)
+            state.last_active = now
+            if state.inflight < int(state.limit):
+                state.inflight += 1
+                return True
+            state.saturated = True
+            return False
+
+    def release(
+        self,
+        group: str,
+        latency: Optional[float],
+        timed_out: bool = False,
+        now: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        释放分组的一个并发并记录本次轮询的结果
+
+        Args:
+            group: 分组
+            latency: 轮询耗时（秒），None表示不计入采样（如内部错误）
+            timed_out: 本次轮询是否超时
+            now: 当前时间，默认time.monotonic()
+
+        Returns:
+            本次释放触发窗口评估时的决策，否则返回None
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            state = self._state(group, now)
+            state.inflight = max(0, state.inflight - 1)
+            state.last_active = now
+            if state.waiting:
+                # 有设备在等待，说明需求超过了当前限制
+                state.saturated = True
+            if latency is None:
+                return None
+            state.completed += 1
+            if timed_out:
+                state.timeouts_total += 1
+            if state.ignore > 0:
+                # 减小并发前已发出的请求，结果不计入新的窗口
+                state.ignore -= 1
+                return None
+
+            state.latencies.append(latency)
+            if timed_out:
+                state.timeouts += 1
+            if len(state.latencies) < max(int(state.limit), MIN_WINDOW):
+                return None
+            return self._evaluate(group, state, now)
+
+    def _evaluate(self, group: str, state: _GroupState, now: float) -> str:
+        """评估一个采样窗口并调整分组的并发限制"""
+        samples = len(state.latencies)
+        state.p90 = statistics.quantiles(state.latencies, n=10)[8]
+        state.timeout_ratio = state.timeouts / samples
+
+        previous = state.limit
+        reason = None
+        if state.timeout_ratio > self.timeout_ratio:
+            reason = REASON_TIMEOUT
+        elif state.p90 > self.latency_target:
+            reason = REASON_LATENCY
+
+        if reason is not None:
+            decision = DECISION_DECREASE
+            state.limit = max(self.min_limit, state.limit * self.decrease_factor)
+            state.ignore = state.inflight
+        elif state.saturated and state.limit < self.max_limit:
+            decision = DECISION_INCREASE
+            state.limit = min(self.max_limit, state.limit + 1)
+        else:
+            decision = DECISION_HOLD
+
+        state.latencies = []
+        state.timeouts = 0
+        state.saturated = False
+        state.last_decision = decision
+        state.last_reason = reason
+
+        if int(state.limit) != int(previous):
+            if decision == DECISION_INCREASE:
+                state.increases += 1
+            else:
+                state.decreases += 1
+            state.last_change = now
+            self._recent.append(
+                {
+                    "group": group,
+                    "decision": decision,
+                    "reason": reason,
+                    "from": int(previous),
+                    "to": int(state.limit),
+                    "p90": round(state.p90, 3),
+                    "timeout_ratio": round(state.timeout_ratio, 3),
+                    "time": time.time(),
+                }
+            )
+        return decision
+
+    def defer(self, group: str, item: Any, front: bool = False) -> None:
+        """将达到并发限制的轮询暂存到分组的等待队列"""
+        with self._lock:
+            waiting = self._state(group, time.monotonic()).waiting
+            if front:
+                waiting.appendleft(item)
+            else:
+                waiting.append(item)
+
+    def pop_deferred(self, group: str) -> Optional[Any]:
+        """取出分组等待队列中最早的轮询，没有时返回None"""
+        with self._lock:
+            state = self._groups.get(group)
+            if state is None or not state.waiting:
+                return None
+            return state.waiting.popleft()
+
+    def pop_spare(self, group: str, reserved: int = 0) -> List[Any]:
+        """
+        取出分组空闲并发可以立即开始的等待中轮询（限制增大后交给其他工作协程）
+
+        Args:
+            group: 分组
+            reserved: 调用方已取出、即将占用的并发数
+        """
+        with self._lock:
+            state = self._groups.get(group)
+            if state is None:
+                return []
+            spare = int(state.limit) - state.inflight - reserved
+            items = []
+            while spare > 0 and state.waiting:
+                items.append(state.waiting.popleft())
+                spare -= 1
+            return items
+
+    def get_limit(self, group: str) -> int:
+        """获取分组当前的并发限制"""
+        with self._lock:
+            state = self._groups.get(group)
+            return int(state.limit) if state is not None else int(self.initial_limit)
+
+    def total_limit(self) -> int:
+        """所有分组的并发限制之和"""
+        with self._lock:
+            return sum(int(state.limit) for state in self._groups.values())
+
+    def deferred_count(self) -> int:
+        """所有分组等待队列中的轮询数"""
+        with self._lock:
+            return sum(len(state.waiting) for state in self._groups.values())
+
+    def cleanup(self, max_idle: float, now: Optional[float] = None) -> int:
+        """
+        清理长时间没有轮询的分组（交换机已删除或改址）
+
+        Returns:
+            清理的分组数
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            idle = [
+                group
+                for group, state in self._groups.items()
+                if not state.inflight
+                and not state.waiting
+                and now - state.last_active > max_idle
+            ]
+            for group in idle:
+                del self._groups[group]
+            if idle:
+                self._group_of.clear()
+            return len(idle)
+
+    def _state(self, group: str, now: float) -> _GroupState:
+        state = self._groups.get(group)
+        if state is None:
+            state = self._groups[group] = _GroupState(float(self.initial_limit), now)
+        return state
+
+    def get_statistics(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        获取并发限制统计
+
+        Returns:
+            包含每个分组的限制、在途数、等待数、最近窗口的p90和超时比例、
+            调整次数和最近一次决策，以及最近的调整记录
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            groups = {
+                group: {
+                    "limit": int(state.limit),
+                    "inflight": state.inflight,
+                    "waiting": len(state.waiting),
+                    "completed": state.completed,
+                    "timeouts": state.timeouts_total,
+                    "p90": round(state.p90, 3) if state.p90 is not None else None,
+                    "timeout_ratio": (
+                        round(state.timeout_ratio, 3)
+                        if state.timeout_ratio is not None
+                        else None
+                    ),
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                    "last_decision": state.last_decision,
+                    "last_reason": state.last_reason,
+                    "seconds_since_change": (
+                        round(now - state.last_change, 1)
+                        if state.last_change is not None
+                        else None
+                    ),
+                }
+                for group, state in self._groups.items()
+            }
+            return {
+                "groups": groups,
+                "total_limit": sum(g["limit"] for g in groups.values()),
+                "waiting": sum(g["waiting"] for g in groups.values()),
+                "latency_target": self.latency_target,
+                "timeout_ratio_threshold": self.timeout_ratio,
+                "recent_decisions": list(self._recent),
+            }
+
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "DECISION_INCREASE",
+    "DECISION_DECREASE",
+    "DECISION_HOLD",
+    "REASON_TIMEOUT",
+    "REASON_LATENCY",
+]
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP引擎共享池 - 每个事件循环共享一个长生命周期的SnmpEngine
+
+pysnmp的SnmpEngine绑定到创建它时所在的事件循环，因此按事件循环维护一个共享引擎：
+- 同一事件循环内的所有SNMP请求（设备轮询、接口轮询、扫描）复用同一个引擎和同一个UDP套接字
+- 响应由引擎的消息处理子系统按request-id与请求匹配，多个并发请求可安全共用一个套接字
+- UdpTransportTarget和认证对象按 (ip, port, 凭据) 缓存，重复请求只需编码一个PDU
+- SNMP v3按设备缓存会话（权威引擎ID、boots/time、固定引擎ID的认证对象），见 v3_session
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from pysnmp.hlapi.asyncio import (
+    SnmpEngine,
+    CommunityData,
+    UdpTransportTarget,
+    UsmUserData,
+    usmNoAuthProtocol,
+    usmNoPrivProtocol,
+    usmHMACMD5AuthProtocol,
+    usmHMACSHAAuthProtocol,
+    usmDESPrivProtocol,
+)
+from pysnmp.proto.rfc1902 import OctetString
+import logging
+
+from .v3_session import V3SessionCache
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 默认请求超时（秒）与重试次数
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RETRIES = 0
+
+# 单个事件循环内缓存的传输目标上限，超过后整体清空（防止扫描大网段时无限增长）
+MAX_CACHED_SESSIONS = 4096
+
+# 认证对象缓存键: (版本, 社区/用户名, 认证密钥, 认证协议, 加密密钥)
+AuthKey = Tuple[str, str, str, str, str]
+
+
+class _LoopEngineContext:
+    """单个事件循环内的共享引擎上下文"""
+
+    def __init__(self):
+        self.engine = SnmpEngine()
+        self.auth_cache: Dict[AuthKey, Any] = {}
+        self.target_cache: Dict[Tuple[str, int, float, int], UdpTransportTarget] = {}
+        self.v3_sessions = V3SessionCache()
+        self.request_count = 0
+
+
+class SNMPEnginePool:
+    """
+    SNMP引擎共享池
+
+    以事件循环为键维护共享的SnmpEngine、传输目标和认证对象缓存。
+    事件循环被回收后，对应的上下文随弱引用自动释放。
+    """
+
+    def __init__(self):
+        # 事件循环 -> _LoopEngineContext
+        self._contexts = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_context(self) -> _LoopEngineContext:
+        """获取当前运行事件循环的引擎上下文（不存在则创建）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            context = self._contexts.get(loop)
+            if context is None:
+                context = _LoopEngineContext()
+                self._contexts[loop] = context
+                logger.debug(f"为事件循环 {id(loop)} 创建共享SNMP引擎")
+            return context
+
+    def get_engine(self) -> SnmpEngine:
+        """
+        获取当前事件循环的共享SNMP引擎
+
+        Returns:
+            SnmpEngine实例
+        """
+        return self._get_context().engine
+
+    def get_auth_data(self, version: str, **kwargs) -> Any:
+        """
+        获取（缓存的）认证对象
+
+        Args:
+            version: SNMP版本 ('v1', 'v2c', 'v3')
+            **kwargs: 认证参数
+                对于v1/v2c: community
+                对于v3: user, auth_key(可选), priv_key(可选), auth_protocol(可选，默认'md5')
+
+        Returns:
+            CommunityData 或 UsmUserData 实例
+        """
+        context = self._get_context()
+        key = self._make_auth_key(version, **kwargs)
+        auth_data = context.auth_cache.get(key)
+        if auth_data is None:
+            auth_data = self._build_auth_data(version, **kwargs)
+            context.auth_cache[key] = auth_data
+        return auth_data
+
+    async def get_target(
+        self,
+        ip: str,
+        port: int = 161,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+    ) -> UdpTransportTarget:
+        """
+        获取（缓存的）UDP传输目标
+
+        Args:
+            ip: 设备IP地址
+            port: 端口号，默认161
+            timeout: 超时时间（秒）
+            retries: 重试次数
+
+        Returns:
+            UdpTransportTarget实例
+        """
+        context = self._get_context()
+        key = (ip, port, timeout, retries)
+        target = context.target_cache.get(key)
+        if target is None:
+            if len(context.target_cache) >= MAX_CACHED_SESSIONS:
+                context.target_cache.clear()
+            target = await UdpTransportTarget.create(
+                (ip, port), timeout=timeout, retries=retries
+            )
+            context.target_cache[key] = target
+        context.request_count += 1
+        return target
+
+    async def get_session(
+        self,
+        ip: str,
+        version: str,
+        port: int = 161,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        **kwargs,
+    ) -> Tuple[SnmpEngine, Any, UdpTransportTarget]:
+        """
+        获取发送请求所需的 (引擎, 认证对象, 传输目标) 三元组
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            port: 端口号，默认161
+            timeout: 超时时间（秒）
+            retries: 重试次数
+            **kwargs: 认证参数
+
+        Returns:
+            (SnmpEngine, 认证对象, UdpTransportTarget)
+        """
+        engine = self.get_engine()
+        auth_data = None
+        if version.lower() == "v3":
+            # 优先使用固定了设备引擎ID的会话认证对象，发现失败时退回共用的认证对象
+            auth_data = await self._get_context().v3_sessions.get_auth_data(
+                engine, self._build_auth_data, ip, port, timeout, retries, **kwargs
+            )
+        if auth_data is None:
+            auth_data = self.get_auth_data(version, **kwargs)
+        target = await self.get_target(ip, port, timeout, retries)
+        return engine, auth_data, target
+
+    def handle_v3_error(
+        self, ip: str, error_indication: Any, port: int = 161, **kwargs
+    ) -> bool:
+        """
+        处理SNMP v3请求的错误指示，时间窗口/引擎ID类错误时使设备会话失效
+
+        Args:
+            ip: 设备IP地址
+            error_indication: pysnmp返回的错误指示
+            port: 端口号
+            **kwargs: v3认证参数
+
+        Returns:
+            是否使会话失效
+        """
+        context = self._get_context()
+        if not context.v3_sessions.is_invalidating_error(error_indication):
+            return False
+        return context.v3_sessions.invalidate(
+            context.engine, ip, port, error_indication, **kwargs
+        )
+
+    def close_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        关闭指定事件循环的共享引擎（应在事件循环关闭前调用）
+
+        Args:
+            loop: 事件循环，默认为当前事件循环
+        """
+        if loop is None:
+            try:
+                loop = asyncio.get_event_loop()
+            except RuntimeError:
+                return
+
+        with self._lock:
+            context = self._contexts.pop(loop, None)
+
+        if context is None:
+            return
+
+        try:
+            dispatcher = context.engine.transport_dispatcher
+            if dispatcher is not None:
+                dispatcher.close_dispatcher()
+        except Exception as e:
+            logger.debug(f"关闭共享SNMP引擎时出错: {e}")
+        logger.debug(f"事件循环 {id(loop)} 的共享SNMP引擎已关闭")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取共享池统计信息"""
+        with self._lock:
+            contexts = list(self._contexts.values())
+        return {
+            "engines": len(contexts),
+            "cached_targets": sum(len(c.target_cache) for c in contexts),
+            "cached_auth": sum(len(c.auth_cache) for c in contexts),
+            "requests": sum(c.request_count for c in contexts),
+            "v3_sessions": self._sum_stats(
+                [c.v3_sessions.get_statistics() for c in contexts]
+            ),
+        }
+
+    @staticmethod
+    def _sum_stats(stats_list: List[Dict[str, int]]) -> Dict[str, int]:
+        """按字段累加多个事件循环的统计信息"""
+        total: Dict[str, int] = {}
+        for stats in stats_list:
+            for name, value in stats.items():
+                total[name] = total.get(name, 0) + value
+        return total
+
+    @staticmethod
+    def _make_auth_key(version: str, **kwargs) -> AuthKey:
+        """生成认证对象缓存键"""
+        version = version.lower()
+        if version == "v3":
+            return (
+                version,
+                kwargs.get("user") or "",
+                kwargs.get("auth_key") or "",
+                (kwargs.get("auth_protocol") or "md5").lower(),
+                kwargs.get("priv_key") or "",
+            )
+        return (version, kwargs.get("community", "public"), "", "", "")
+
+    @staticmethod
+    def _build_auth_data(version: str, **kwargs) -> Any:
+        """根据版本和参数构造认证对象"""
+        version = version.lower()
+        if version == "v1":
+            return CommunityData(kwargs.get("community", "public"), mpModel=0)
+        if version in ("v2c", "2c"):
+            return CommunityData(kwargs.get("community", "public"))
+
+        user = kwargs.get("user")
+        auth_key = kwargs.get("auth_key")
+        priv_key = kwargs.get("priv_key")
+        auth_protocol = (kwargs.get("auth_protocol") or "md5").lower()
+        auth_proto = (
+            usmHMACSHAAuthProtocol if auth_protocol == "sha" else usmHMACMD5AuthProtocol
+        )
+
+        # 指定后USM用户行按设备引擎ID登记，本地化密钥只计算一次
+        security_engine_id = kwargs.get("security_engine_id")
+        if security_engine_id is not None:
+            security_engine_id = OctetString(security_engine_id)
+
+        if priv_key and auth_key:
+            return UsmUserData(
+                user,
+                authKey=auth_key,
+                privKey=priv_key,
+                authProtocol=auth_proto,
+                privProtocol=usmDESPrivProtocol,
+                securityEngineId=security_engine_id,
+            )
+        elif auth_key:
+            return UsmUserData(
+                user,
+                authKey=auth_key,
+                authProtocol=auth_proto,
+                privProtocol=usmNoPrivProtocol,
+                securityEngineId=security_engine_id,
+            )
+        return UsmUserData(
+            user,
+            authProtocol=usmNoAuthProtocol,
+            privProtocol=usmNoPrivProtocol,
+            securityEngineId=security_engine_id,
+        )
+
+
+# 全局共享池实例
+_engine_pool: Optional[SNMPEnginePool] = None
+_engine_pool_lock = threading.Lock()
+
+
+def get_engine_pool() -> SNMPEnginePool:
+    """获取全局SNMP引擎共享池"""
+    global _engine_pool
+    if _engine_pool is None:
+        with _engine_pool_lock:
+            if _engine_pool is None:
+                _engine_pool = SNMPEnginePool()
+    return _engine_pool
+
+
+def close_loop_engine(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """关闭指定事件循环的共享SNMP引擎（同时关闭该事件循环的原生SNMP客户端）"""
+    from .native_client import close_loop_native_client
+
+    get_engine_pool().close_loop(loop)
+    close_loop_native_client(loop)
+
+
+__all__ = ["SNMPEnginePool", "get_engine_pool", "close_loop_engine"]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+接口静态属性缓存 - 按 (交换机, ifIndex) 缓存几乎不变的ifTable列
+
+ifDescr/ifType/ifSpeed/ifPhysAddress/ifMtu/ifHighSpeed 只在以下情况重新读取：
+- 整表刷新：首次轮询、sysUpTime减小（设备重启）、ifTableLastChange变化（接口增删）或超过TTL
+- 单接口刷新：ifLastChange变化（链路状态变化后速率等属性可能改变）或出现新的ifIndex
+其余轮询只读取状态列和计数器列。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.core.config import SNMP_INTERFACE_STATIC_TTL
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 整表刷新原因
+REFRESH_MISSING = "missing"
+REFRESH_REBOOT = "reboot"
+REFRESH_TABLE_CHANGED = "table_changed"
+REFRESH_EXPIRED = "expired"
+
+
+class _DeviceEntry:
+    """单个交换机的接口静态属性"""
+
+    __slots__ = (
+        "rows",
+        "last_changes",
+        "sys_uptime",
+        "table_last_change",
+        "refreshed_at",
+    )
+
+    def __init__(self):
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.last_changes: Dict[int, Optional[int]] = {}
+        self.sys_uptime: Optional[int] = None
+        self.table_last_change: Optional[int] = None
+        self.refreshed_at = 0.0
+
+
+class InterfaceStaticCache:
+    """
+    接口静态属性缓存（线程安全）
+
+    Args:
+        ttl: 整表强制刷新的间隔（秒）
+    """
+
+    def __init__(self, ttl: float = SNMP_INTERFACE_STATIC_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, _DeviceEntry] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "full_refreshes": 0,
+            "partial_refreshes": 0,
+            "refreshed_interfaces": 0,
+        }
+        self._refresh_reasons: Dict[str, int] = {}
+
+    def refresh_reason(
+        self,
+        switch_key: Hashable,
+        sys_uptime: Optional[int] = None,
+        table_last_change: Optional[int] = None,
+        now: Optional[float] = None,
+        check_device: bool = True,
+    ) -> Optional[str]:
+        """
+        判断是否需要整表刷新静态列
+
+        Args:
+            switch_key: 交换机标识
+            sys_uptime: 本次读取的sysUpTime
+            table_last_change: 本次读取的ifTableLastChange
+            now: 当前时间，默认time.time()
+            check_device: 是否比较sysUpTime/ifTableLastChange（为False时只检查缓存是否存在和过期）
+
+        Returns:
+            刷新原因，不需要刷新时返回None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None or not entry.rows:
+                return REFRESH_MISSING
+            if now - entry.refreshed_at >= self.ttl:
+                return REFRESH_EXPIRED
+            if not check_device:
+                return None
+            if (
+                sys_uptime is not None
+                and entry.sys_uptime is not None
+                and sys_uptime < entry.sys_uptime
+            ):
+                return REFRESH_REBOOT
+            if table_last_change != entry.table_last_change:
+                return REFRESH_TABLE_CHANGED
+            return None
+
+    def stale_indexes(
+        self, switch_key: Hashable, last_changes: Dict[int, Optional[int]]
+    ) -> List[int]:
+        """
+        找出需要单独刷新静态列的接口（新出现的ifIndex或ifLastChange变化）
+
+        Args:
+            switch_key: 交换机标识
+            last_changes: 本次读取的 {ifIndex: ifLastChange}
+        """
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None:
+                return sorted(last_changes)
+            return sorted(
+                if_index
+                for if_index, last_change in last_changes.items()
+                if if_index not in entry.rows
+                or entry.last_changes.get(if_index) != last_change
+            )
+
+    def store(
+        self,
+        switch_key: Hashable,
+        rows: Dict[int, Dict[str, Any]],
+        full: bool,
+        reason: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        保存读取到的静态列
+
+        Args:
+            switch_key: 交换机标识
+            rows: {ifIndex: {列名: 值}}
+            full: 是否为整表刷新（整表刷新会替换该交换机的全部接口）
+            reason: 整表刷新原因（用于统计）
+            now: 当前时间，默认time.time()
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None or full:
+                entry = _DeviceEntry()
+                self._entries[switch_key] = entry
+            if full:
+                entry.refreshed_at = now
+                self._stats["full_refreshes"] += 1
+                if reason:
+                    self._refresh_reasons[reason] = (
+                        self._refresh_reasons.get(reason, 0) + 1
+                    )
+            elif rows:
+                self._stats["partial_refreshes"] += 1
+            self._stats["refreshed_interfaces"] += len(rows)
+            for if_index, row in rows.items():
+                entry.rows[if_index] = dict(row)
+
+    def update_state(
+        self,
+        switch_key: Hashable,
+        sys_uptime: Optional[int],
+        table_last_change: Optional[int],
+        last_changes: Dict[int, Optional[int]],
+        prune: bool = True,
+    ) -> None:
+        """
+        记录本次轮询的sysUpTime、ifTableLastChange和各接口ifLastChange
+
+        Args:
+            prune: last_changes是否覆盖全部接口（为True时删除已消失的接口；
+                只轮询部分接口时为False）
+        """
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None:
+                return
+            entry.sys_uptime = sys_uptime
+            entry.table_last_change = table_last_change
+            if not prune:
+                entry.last_changes.update(last_changes)
+                return
+            entry.last_changes = dict(last_changes)
+            # 已消失的接口不再保留
+            for if_index in [i for i in entry.rows if i not in last_changes]:
+                del entry.rows[if_index]
+
+    def update_columns(
+        self, switch_key: Hashable, rows: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """更新缓存中已有接口的部分列（如选择接口所需的ifAdminStatus），不计入刷新统计"""
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None:
+                return
+            for if_index, columns in rows.items():
+                row = entry.rows.get(if_index)
+                if row is not None:
+                    row.update(columns)
+
+    def select(
+        self, switch_key: Hashable, predicate: Callable[[Dict[str, Any]], bool]
+    ) -> List[int]:
+        """返回缓存中静态列满足条件的ifIndex（升序）"""
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None:
+                return []
+            return sorted(
+                if_index for if_index, row in entry.rows.items() if predicate(row)
+            )
+
+    def merge(
+        self, switch_key: Hashable, rows: Iterable[Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """将缓存的静态列合并到本次读取的接口行数据（原地更新）"""
+        with self._lock:
+            entry = self._entries.get(switch_key)
+            if entry is None:
+                return
+            self._stats["hits"] += 1
+            for if_index, row in rows:
+                static = entry.rows.get(if_index)
+                if static:
+                    for column, value in static.items():
+                        row.setdefault(column, value)
+
+    def invalidate(self, switch_key: Optional[Hashable] = None) -> None:
+        """清除指定交换机（默认全部）的缓存"""
+        with self._lock:
+            if switch_key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(switch_key, None)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                **self._stats,
+                "devices": len(self._entries),
+                "interfaces": sum(len(e.rows) for e in self._entries.values()),
+                "refresh_reasons": dict(self._refresh_reasons),
+            }
+
+
+__all__ = ["InterfaceStaticCache"]
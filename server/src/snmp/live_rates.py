@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+实时端口速率 - 按订阅对单台交换机的指定端口进行高频（1~5秒）速率采样
+
+- 每台交换机只有一路采样，多个订阅者共享：端口取所有订阅的并集，间隔取最短的订阅间隔
+- 每次采样只读取sysUpTime和字节计数器（指定端口时GET，全部端口时GETBULK），
+  速率由独立的速率计算器计算，不影响后台接口轮询的基线
+- 第一个订阅到来时启动采样，最后一个订阅取消时停止
+- 交换机被删除时结束其采样并通知订阅者，修改配置后下次采样使用新配置
+
+采样在独立线程的事件循环中进行，订阅者回调也在该线程中调用，
+需要在其他线程中处理时由订阅者自行转交（如WebSocket通过IOLoop.add_callback）。
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.core.config import (
+    SNMP_LIVE_RATE_MAX_INTERVAL,
+    SNMP_LIVE_RATE_MAX_STREAMS,
+    SNMP_LIVE_RATE_MIN_INTERVAL,
+)
+from src.core.logger import logger
+from src.database.switch_registry import EVENT_REMOVED, EVENT_UPDATED
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.rate_calculator import InterfaceRateCalculator
+from src.snmp.snmp_monitor import SNMPMonitor
+from src.snmp.unified_poller import prepare_snmp_kwargs
+
+# 订阅者回调: (消息) -> None
+LiveRateCallback = Callable[[Dict[str, Any]], None]
+
+
+class _Subscription:
+    """单个实时速率订阅"""
+
+    __slots__ = ("subscription_id", "switch_id", "ports", "interval", "callback")
+
+    def __init__(
+        self,
+        subscription_id: str,
+        switch_id: Any,
+        ports: Optional[Set[int]],
+        interval: float,
+        callback: LiveRateCallback,
+    ):
+        self.subscription_id = subscription_id
+        self.switch_id = switch_id
+        self.ports = ports
+        self.interval = interval
+        self.callback = callback
+
+
+class _LiveStream:
+    """单台交换机的一路采样"""
+
+    __slots__ = ("switch", "subscriptions", "future", "polls", "errors", "started_at")
+
+    def __init__(self, switch: Dict[str, Any]):
+        self.switch = switch
+        self.subscriptions: Dict[str, _Subscription] = {}
+        self.future = None
+        self.polls = 0
+        self.errors = 0
+        self.started_at = time.time()
+
+    def ports(self) -> Optional[List[int]]:
+        """所有订阅端口的并集，任一订阅需要全部端口时返回None"""
+        ports: Set[int] = set()
+        for subscription in self.subscriptions.values():
+            if subscription.ports is None:
+                return None
+            ports |= subscription.ports
+        return sorted(ports)
+
+    def interval(self) -> float:
+        """所有订阅中最短的采样间隔"""
+        return min(s.interval for s in self.subscriptions.values())
+
+
+class LiveRateStreamer:
+    """
+    实时端口速率采样器（线程安全）
+
+    Args:
+        monitor: SNMP监控器（可选），默认新建SNMPMonitor
+        registry: 交换机注册表（可选），用于跟踪交换机配置修改和删除
+    """
+
+    def __init__(self, monitor: Optional[SNMPMonitor] = None, registry=None):
+        self.monitor = monitor
+        self._streams: Dict[Any, _LiveStream] = {}
+        self._subscriptions: Dict[str, _Subscription] = {}
+        # 基线只需覆盖最长的采样间隔
+        self._rate_calculator = InterfaceRateCalculator(
+            max_sample_age=SNMP_LIVE_RATE_MAX_INTERVAL * 3
+        )
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._unsubscribe_registry = (
+            registry.subscribe(self._on_switch_event) if registry is not None else None
+        )
+
+    def subscribe(
+        self,
+        switch: Dict[str, Any],
+        ports: Optional[List[int]] = None,
+        interval: float = 2,
+        callback: Optional[LiveRateCallback] = None,
+    ) -> str:
+        """
+        订阅交换机指定端口的实时速率
+
+        Args:
+            switch: 交换机配置
+            ports: ifIndex列表，None或空表示全部端口
+            interval: 采样间隔（秒）
+            callback: 接收速率消息的回调函数
+
+        Returns:
+            订阅ID
+
+        Raises:
+            ValueError: 参数无效或同时采样的交换机数达到上限时抛出
+        """
+        if callback is None:
+            raise ValueError("必须提供回调函数")
+        try:
+            interval = float(interval)
+        except (TypeError, ValueError):
+            raise ValueError("采样间隔必须为数字")
+        if not SNMP_LIVE_RATE_MIN_INTERVAL <= interval <= SNMP_LIVE_RATE_MAX_INTERVAL:
+            raise ValueError(
+                f"采样间隔必须在 {SNMP_LIVE_RATE_MIN_INTERVAL}-"
+                f"{SNMP_LIVE_RATE_MAX_INTERVAL} 秒之间"
+            )
+        try:
+            port_set = {int(port) for port in ports} if ports else None
+        except (TypeError, ValueError):
+            raise ValueError("端口必须为ifIndex整数列表")
+
+        switch_id = switch.get("id")
+        subscription = _Subscription(
+            uuid.uuid4().hex, switch_id, port_set, interval, callback
+        )
+        with self._lock:
+            stream = self._streams.get(switch_id)
+            if stream is None:
+                if len(self._streams) >= SNMP_LIVE_RATE_MAX_STREAMS:
+                    raise ValueError(
+                        f"同时进行实时速率采样的交换机数已达上限"
+                        f"({SNMP_LIVE_RATE_MAX_STREAMS})"
+                    )
+                stream = _LiveStream(dict(switch))
+                self._streams[switch_id] = stream
+            stream.subscriptions[subscription.subscription_id] = subscription
+            self._subscriptions[subscription.subscription_id] = subscription
+            start = stream.future is None
+
+        if start:
+            loop = self._ensure_loop()
+            stream.future = asyncio.run_coroutine_threadsafe(
+                self._run_stream(switch_id, stream), loop
+            )
+            logger.info(
+                f"开始实时速率采样: IP={switch.get('ip')}, 间隔{interval}秒, "
+                f"端口{sorted(port_set) if port_set else '全部'}"
+            )
+        return subscription.subscription_id
+
+    def unsubscribe(self, subscription_id: str) -> bool:
+        """
+        取消订阅，交换机没有剩余订阅时停止其采样
+
+        Returns:
+            订阅存在并已取消时返回True
+        """
+        with self._lock:
+            subscription = self._subscriptions.pop(subscription_id, None)
+            if subscription is None:
+                return False
+            stream = self._streams.get(subscription.switch_id)
+            if stream is None:
+                return True
+            stream.subscriptions.pop(subscription_id, None)
+            if stream.subscriptions:
+                return True
+            del self._streams[subscription.switch_id]
+
+        self._stop_stream(subscription.switch_id, stream)
+        return True
+
+    def _stop_stream(self, switch_id: Any, stream: _LiveStream) -> None:
+        """停止交换机的采样并清除其速率基线"""
+        if stream.future is not None:
+            stream.future.cancel()
+        self._rate_calculator.forget(switch_id)
+        logger.info(f"停止实时速率采样: IP={stream.switch.get('ip')}")
+
+    def _on_switch_event(self, event: str, switch: Dict[str, Any]) -> None:
+        """交换机注册表变更：修改后使用新配置，删除后结束采样并通知订阅者"""
+        switch_id = switch.get("id")
+        with self._lock:
+            stream = self._streams.get(switch_id)
+            if stream is None:
+                return
+            if event == EVENT_UPDATED:
+                stream.switch = dict(switch)
+                return
+            if event != EVENT_REMOVED:
+                return
+            del self._streams[switch_id]
+            subscriptions = list(stream.subscriptions.values())
+            for subscription in subscriptions:
+                self._subscriptions.pop(subscription.subscription_id, None)
+
+        self._stop_stream(switch_id, stream)
+        for subscription in subscriptions:
+            self._notify(
+                subscription,
+                {
+                    "type": "liveRatesEnded",
+                    "data": {
+                        "subscription_id": subscription.subscription_id,
+                        "switch_id": switch_id,
+                        "reason": "交换机已删除",
+                    },
+                },
+            )
+
+    async def _run_stream(self, switch_id: Any, stream: _LiveStream) -> None:
+        """单台交换机的采样循环，直到没有订阅者"""
+        while True:
+            with self._lock:
+                if self._streams.get(switch_id) is not stream:
+                    return
+                switch = stream.switch
+                ports = stream.ports()
+                interval = stream.interval()
+
+            started = time.monotonic()
+            message = await self._sample(switch_id, switch, ports, interval)
+            with self._lock:
+                stream.polls += 1
+                if not message["success"]:
+                    stream.errors += 1
+                subscriptions = list(stream.subscriptions.values())
+
+            for subscription in subscriptions:
+                self._notify(subscription, self._message_for(subscription, message))
+
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def _sample(
+        self,
+        switch_id: Any,
+        switch: Dict[str, Any],
+        ports: Optional[List[int]],
+        interval: float,
+    ) -> Dict[str, Any]:
+        """采样一次字节计数器并计算速率"""
+        ip = switch.get("ip", "")
+        message: Dict[str, Any] = {
+            "switch_id": switch_id,
+            "ip": ip,
+            "interval": interval,
+            "success": False,
+            "interfaces": [],
+        }
+        try:
+            # 采样超时不超过一个间隔（最少1秒），避免慢设备堆积请求
+            interfaces, sys_uptime = await asyncio.wait_for(
+                self.monitor.get_port_octets(
+                    ip,
+                    switch.get("snmp_version", "v2c"),
+                    ports,
+                    **prepare_snmp_kwargs(switch),
+                ),
+                timeout=max(interval, 1.0),
+            )
+        except asyncio.TimeoutError:
+            message["error"] = "实时速率采样超时"
+            return message
+        except Exception as e:
+            message["error"] = f"实时速率采样失败: {e}"
+            return message
+
+        message["poll_time"] = time.time()
+        if interfaces is None:
+            message["error"] = "SNMP连接超时或配置错误"
+            return message
+
+        message["success"] = True
+        message["interfaces"] = self._rate_calculator.update(
+            switch_id, interfaces, sys_uptime=sys_uptime, timestamp=message["poll_time"]
+        )
+        return message
+
+    @staticmethod
+    def _message_for(
+        subscription: _Subscription, message: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """按订阅的端口过滤采样结果"""
+        interfaces = message["interfaces"]
+        if subscription.ports is not None:
+            interfaces = [i for i in interfaces if i.get("index") in subscription.ports]
+        return {
+            "type": "liveRates",
+            "data": {
+                **message,
+                "subscription_id": subscription.subscription_id,
+                "interfaces": interfaces,
+            },
+        }
+
+    @staticmethod
+    def _notify(subscription: _Subscription, message: Dict[str, Any]) -> None:
+        try:
+            subscription.callback(message)
+        except Exception as e:
+            logger.error(f"发送实时速率消息失败: {e}")
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """首次订阅时启动采样线程和事件循环"""
+        with self._lock:
+            if self._loop is None:
+                if self.monitor is None:
+                    self.monitor = SNMPMonitor()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(self._loop,),
+                    name="snmp-live-rates",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            close_loop_engine(loop)
+            loop.close()
+
+    def stop(self) -> None:
+        """取消全部订阅并停止采样线程"""
+        if self._unsubscribe_registry is not None:
+            self._unsubscribe_registry()
+            self._unsubscribe_registry = None
+        with self._lock:
+            streams = list(self._streams.items())
+            self._streams.clear()
+            self._subscriptions.clear()
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        for switch_id, stream in streams:
+            self._stop_stream(switch_id, stream)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取实时速率采样统计信息"""
+        with self._lock:
+            return {
+                "streams": len(self._streams),
+                "subscriptions": len(self._subscriptions),
+                "switches": {
+                    str(switch_id): {
+                        "ip": stream.switch.get("ip"),
+                        "subscribers": len(stream.subscriptions),
+                        "ports": stream.ports(),
+                        "interval": stream.interval(),
+                        "polls": stream.polls,
+                        "errors": stream.errors,
+                    }
+                    for switch_id, stream in self._streams.items()
+                },
+            }
+
+
+# 全局采样器实例
+_live_rate_streamer: Optional[LiveRateStreamer] = None
+_live_rate_streamer_lock = threading.Lock()
+
+
+def get_live_rate_streamer(registry=None) -> LiveRateStreamer:
+    """
+    获取进程内共享的实时速率采样器
+
+    Args:
+        registry: 交换机注册表（第一次调用时传入，用于跟踪交换机修改和删除）
+    """
+    global _live_rate_streamer
+    if _live_rate_streamer is None:
+        with _live_rate_streamer_lock:
+            if _live_rate_streamer is None:
+                _live_rate_streamer = LiveRateStreamer(registry=registry)
+    return _live_rate_streamer
+
+
+def stop_live_rate_streamer() -> None:
+    """停止实时速率采样器"""
+    global _live_rate_streamer
+    with _live_rate_streamer_lock:
+        streamer, _live_rate_streamer = _live_rate_streamer, None
+    if streamer is not None:
+        streamer.stop()
+
+
+__all__ = [
+    "LiveRateStreamer",
+    "get_live_rate_streamer",
+    "stop_live_rate_streamer",
+]
@@ -13,6 +13,14 @@ from .unified_poller import (
     stop_device_poller,
     stop_interface_poller,
 )
+from .process_pool import ShardedPollerPool
+from .subnet_sweep import SubnetSweeper
+from .vendor_profiles import (
+    SYS_OBJECT_ID_OID,
+    detect_profile,
+    evaluate,
+    get_vendor_profile_registry,
+)
 
 # 注意：SNMPMonitor已经处理了pysnmp的导入，这里不需要重复导入
 
@@ -37,7 +45,12 @@ class SNMPManager:
         self.classifier = OIDClassifier()
         self._device_poller = None
         self._interface_poller = None
+        self._process_pool: Optional[ShardedPollerPool] = None
         self.db_manager = db_manager
+        # 厂商监控OID探测结果（进程内所有SNMPManager共享，有db_manager时持久化）
+        self.vendor_profiles = get_vendor_profile_registry(
+            getattr(db_manager, "vendor_profile_manager", None)
+        )
 
     async def get_device_overview(
         self, ip: str, version: str, **kwargs
@@ -98,6 +111,60 @@ class SNMPManager:
 
         return overview
 
+    async def get_system_metrics(
+        self, ip: str, version: str, **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        获取CPU/内存/温度指标（一次GET请求）
+
+        首次连接时探测交换机实际可用的厂商OID并保存到厂商监控配置注册表，
+        之后直接请求保存的OID；sysObjectID变化或OID不再返回值时下次轮询重新探测。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            **kwargs: 认证参数
+
+        Returns:
+            {"cpu": {...}, "memory": {...}, "temperature": {...}}，
+            只包含设备支持的指标；cpu/memory含usage（百分比），temperature含value（摄氏度）
+        """
+        registry = self.vendor_profiles
+        profile = registry.get(ip)
+        if profile is None:
+            profile = await detect_profile(
+                self.monitor,
+                self.classifier.identify_device_type,
+                ip,
+                version,
+                **kwargs,
+            )
+            if profile is None:
+                return {}
+            registry.save(ip, profile)
+
+        oids = [SYS_OBJECT_ID_OID]
+        for info in profile["metrics"].values():
+            for oid_row in info["oids"]:
+                oids.extend(oid_row)
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+        values, success = await self.monitor.get_multi(ip, version, oids, **get_kwargs)
+        if not success:
+            return {}
+
+        stale = str(values.get(SYS_OBJECT_ID_OID) or "") != profile["sys_object_id"]
+        metrics = {}
+        for metric, info in profile["metrics"].items():
+            result = evaluate(metric, info["source"], values, info["oids"])
+            if result is None:
+                stale = True
+            else:
+                metrics[metric] = result
+        if stale:
+            logger.info(f"设备 {ip} 的厂商监控OID已失效，下次轮询重新探测")
+            registry.invalidate(ip)
+        return metrics
+
     async def get_cpu_usage(self, ip: str, version: str, **kwargs) -> Dict[str, Any]:
         """
         获取CPU使用率信息
@@ -113,46 +180,9 @@ class SNMPManager:
         cpu_info = {"usage": None, "details": {}}
 
         try:
-            # 尝试获取Cisco设备的CPU使用率
-            value, success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.9.9.109.1.1.1.1.7", **kwargs
-            )
-            if success and value is not None:
-                cpu_info["usage"] = float(value)
-                cpu_info["source"] = "Cisco CPM CPU"
-                return cpu_info
-
-            # 尝试获取UCD-SNMP-MIB的CPU使用率
-            # 用户态CPU
-            user_value, user_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.2021.11.9.0", **kwargs
-            )
-            # 系统态CPU
-            system_value, system_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.2021.11.10.0", **kwargs
-            )
-            # 空闲CPU
-            idle_value, idle_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.2021.11.11.0", **kwargs
+            cpu_info.update(
+                (await self.get_system_metrics(ip, version, **kwargs)).get("cpu", {})
             )
-
-            if user_success and system_success and idle_success:
-                user_cpu = float(user_value) if user_value else 0
-                system_cpu = float(system_value) if system_value else 0
-                idle_cpu = float(idle_value) if idle_value else 0
-
-                total = user_cpu + system_cpu + idle_cpu
-                if total > 0:
-                    usage = ((user_cpu + system_cpu) / total) * 100
-                    cpu_info["usage"] = usage
-                    cpu_info["details"] = {
-                        "user": user_cpu,
-                        "system": system_cpu,
-                        "idle": idle_cpu,
-                    }
-                    cpu_info["source"] = "UCD-SNMP-MIB"
-                return cpu_info
-
         except Exception as e:
             logger.error(f"获取CPU使用率时出错: {e}")
             cpu_info["error"] = str(e)
@@ -174,54 +204,9 @@ class SNMPManager:
         memory_info = {"usage": None, "details": {}}
 
         try:
-            # 尝试获取Cisco设备的内存使用率
-            used_value, used_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.9.9.48.1.1.1.5.1", **kwargs
-            )
-            free_value, free_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.9.9.48.1.1.1.6.1", **kwargs
-            )
-
-            if used_success and free_success:
-                used_mem = int(used_value) if used_value else 0
-                free_mem = int(free_value) if free_value else 0
-                total_mem = used_mem + free_mem
-
-                if total_mem > 0:
-                    usage = (used_mem / total_mem) * 100
-                    memory_info["usage"] = usage
-                    memory_info["details"] = {
-                        "used": used_mem,
-                        "free": free_mem,
-                        "total": total_mem,
-                    }
-                    memory_info["source"] = "Cisco Memory Pool"
-                return memory_info
-
-            # 尝试获取UCD-SNMP-MIB的内存信息
-            total_value, total_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.2021.4.5.0", **kwargs
-            )
-            avail_value, avail_success = await self.monitor.get_data(
-                ip, version, "1.3.6.1.4.1.2021.4.6.0", **kwargs
+            memory_info.update(
+                (await self.get_system_metrics(ip, version, **kwargs)).get("memory", {})
             )
-
-            if total_success and avail_success:
-                total_mem = int(total_value) if total_value else 0
-                avail_mem = int(avail_value) if avail_value else 0
-                used_mem = total_mem - avail_mem
-
-                if total_mem > 0:
-                    usage = (used_mem / total_mem) * 100
-                    memory_info["usage"] = usage
-                    memory_info["details"] = {
-                        "used": used_mem,
-                        "available": avail_mem,
-                        "total": total_mem,
-                    }
-                    memory_info["source"] = "UCD-SNMP-MIB"
-                return memory_info
-
         except Exception as e:
             logger.error(f"获取内存使用率时出错: {e}")
             memory_info["error"] = str(e)
@@ -331,35 +316,28 @@ class SNMPManager:
         results = {}
 
         try:
-            # 并行获取所有OID的数据
-            tasks = [self.monitor.get_data(ip, version, oid, **kwargs) for oid in oids]
+            # 所有OID合并到同一个（或少量分片的）GET请求中
+            values, success = await self.monitor.get_multi(ip, version, oids, **kwargs)
 
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for i, result in enumerate(task_results):
-                oid = oids[i]
-                if isinstance(result, Exception):
-                    results[oid] = {
-                        "error": str(result),
-                        "name": self.classifier.get_oid_name(oid),
-                        "category": self.classifier.classify_oid(oid),
-                    }
-                elif isinstance(result, tuple) and len(result) == 2:
-                    value, success = result
-                    if success:
-                        parsed_data = self.classifier.parse_oid_value(oid, value)
-                        results[oid] = parsed_data
-                    else:
-                        results[oid] = {
-                            "error": "Failed to retrieve data",
-                            "name": self.classifier.get_oid_name(oid),
-                            "category": self.classifier.classify_oid(oid),
-                        }
+            # 名称和分类批量查找
+            parsed = self.classifier.parse_oid_values(
+                {oid: values[oid] for oid in oids if oid in values}
+            )
+            missing = self.classifier.classify_many(
+                [oid for oid in oids if oid not in values]
+            )
+            for oid in oids:
+                if oid in parsed:
+                    results[oid] = parsed[oid]
                 else:
                     results[oid] = {
-                        "error": "Unexpected result format",
-                        "name": self.classifier.get_oid_name(oid),
-                        "category": self.classifier.classify_oid(oid),
+                        "error": (
+                            "Failed to retrieve data"
+                            if not success
+                            else "No such object on device"
+                        ),
+                        "name": missing[oid]["name"],
+                        "category": missing[oid]["category"],
                     }
 
         except Exception as e:
@@ -368,6 +346,38 @@ class SNMPManager:
 
         return results
 
+    async def walk_custom_table(
+        self, ip: str, version: str, column_oids: List[str], **kwargs
+    ) -> Dict[str, Any]:
+        """
+        遍历自定义表列并解析每个实例的值
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            column_oids: 表列OID列表（如 ["1.3.6.1.2.1.2.2.1.2"]）
+            **kwargs: 认证参数
+
+        Returns:
+            {"rows": {索引: {列OID: 解析结果}}, "success": 是否成功}
+        """
+        rows, success = await self.monitor.walk_columns(
+            ip, version, {oid: oid for oid in column_oids}, **kwargs
+        )
+
+        # 所有实例OID一次性批量分类
+        values = {
+            f"{column}.{index}": value
+            for index, row in rows.items()
+            for column, value in row.items()
+        }
+        parsed = self.classifier.parse_oid_values(values)
+        table = {
+            index: {column: parsed[f"{column}.{index}"] for column in row}
+            for index, row in rows.items()
+        }
+        return {"rows": table, "success": success}
+
     @staticmethod
     def snmp_discovery_arp(network, iface=None):
         """使用Ping方式发现本地网络设备"""
@@ -496,53 +506,78 @@ class SNMPManager:
         version="v2c",
         communities=["public"],
         iface=None,
+        on_found=None,
+        on_host_done=None,
         **kwargs,
     ) -> List[Dict[str, Any]]:
         """综合SNMP发现
 
+        v1/v2c: 单套接字异步扫描整个网段，所有团体名并行探测；
+        v3: 先用引擎发现报文找出SNMPv3设备，再对这些设备做带认证的探测。
+
         Args:
-            network: 要扫描的网络地址段
+            network: 要扫描的网络地址段（CIDR）或主机地址列表
             version: SNMP版本 (v1, v2c, v3)
             communities: 社区字符串列表 (用于v1和v2c)
             iface: 网络接口名称
+            on_found: 每发现一个设备立即调用的回调（用于流式推送结果）
+            on_host_done: 每个主机扫描结束（无响应，或响应后的探测已完成）时调用的回调，
+                参数为主机地址（用于按地址块记录进度）
             **kwargs: SNMPv3认证参数 (user, auth_key, auth_protocol, priv_key, priv_protocol)
         """
-        # 使用ARP发现设备，支持指定网络接口
-        devices = SNMPManager.snmp_discovery_arp(network, iface=iface)
-
-        # 异步SNMP扫描，控制并发数
-        snmp_devices = []
-
-        # 分批处理设备，每批最多30个设备以控制并发数
-        batch_size = 30
-        for i in range(0, len(devices), batch_size):
-            batch = devices[i : i + batch_size]
-
-            # 对每批设备进行并发扫描
-            batch_tasks = []
-            for ip in batch:
-                # 根据版本传递不同的参数
-                if version in ["v1", "v2c"]:
-                    task = asyncio.create_task(
-                        self.snmp_scan_device(ip, version, communities)
-                    )
-                else:  # v3
-                    task = asyncio.create_task(
-                        self.snmp_scan_device(ip, version, communities, **kwargs)
-                    )
-                batch_tasks.append(task)
+        sweeper = SubnetSweeper(iface=iface)
+        if version in ["v1", "v2c"]:
+            snmp_devices = await sweeper.sweep(
+                network,
+                version,
+                communities,
+                on_found=on_found,
+                on_resolved=(
+                    (lambda ip, responded: on_host_done(ip))
+                    if on_host_done is not None
+                    else None
+                ),
+            )
+        else:  # v3
+
+            def on_discovered(ip, responded):
+                # 有响应的主机在带认证的探测完成后才算结束
+                if not responded:
+                    on_host_done(ip)
 
-            # 等待批次内所有任务完成
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+            candidates = await sweeper.discover_v3(
+                network,
+                on_resolved=on_discovered if on_host_done is not None else None,
+            )
+            semaphore = asyncio.Semaphore(30)
 
-            # 处理批次结果
-            for result in batch_results:
+            async def probe(ip):
+                try:
+                    async with semaphore:
+                        result = await self.snmp_scan_device(
+                            ip, version, communities, **kwargs
+                        )
+                except Exception as e:
+                    logger.error(f"扫描设备 {ip} 时出错: {e}")
+                    result = None
+                if result and on_found is not None:
+                    on_found(result)
+                if on_host_done is not None:
+                    on_host_done(ip)
+                return result
+
+            results = await asyncio.gather(
+                *[probe(candidate["ip"]) for candidate in candidates],
+                return_exceptions=True,
+            )
+            snmp_devices = []
+            for result in results:
                 if isinstance(result, Exception):
                     logger.error(f"扫描设备时出错: {result}")
                 elif result:
                     snmp_devices.append(result)
 
-        logger.info(f"发现 {len(snmp_devices)} 个SNMP设备:\n {snmp_devices}")
+        logger.debug(f"发现 {len(snmp_devices)} 个SNMP设备:\n {snmp_devices}")
         return snmp_devices
 
     def scan_snmp_devices(self, network="192.168.1.0/24") -> List[str]:
@@ -573,6 +608,7 @@ class SNMPManager:
         enable_cache: bool = True,
         cache_ttl: int = 300,
         dynamic_adjustment: bool = True,
+        processes: Optional[int] = None,
     ):
         """
         启动SNMP设备和接口轮询器
@@ -589,9 +625,12 @@ class SNMPManager:
             enable_cache: 是否启用缓存，默认True
             cache_ttl: 缓存TTL（秒），默认300秒
             dynamic_adjustment: 是否启用动态并发调整，默认True
+            processes: 轮询工作进程数，默认取配置SNMP_POLL_PROCESSES；
+                大于0时交换机按一致性哈希分片到多个工作进程中轮询
 
         Returns:
-            包含两个轮询器实例的元组 (device_poller, interface_poller)
+            包含两个轮询器实例的元组 (device_poller, interface_poller)，
+            多进程模式下轮询器运行在工作进程中，返回 (None, None)
         """
         logger.info("启动SNMP统一轮询器...")
 
@@ -606,6 +645,63 @@ class SNMPManager:
             switch_manager = SwitchManager()
             logger.warning("未提供 db_manager，创建新的 SwitchManager（不推荐）")
 
+        # 指标时序存储（持久化接口速率和CPU/内存历史）
+        metrics_manager = None
+        if self.db_manager is not None:
+            metrics_manager = getattr(self.db_manager, "metrics_manager", None)
+            if metrics_manager is not None:
+                metrics_manager.start()
+
+        # 增量广播跟踪交换机删除，清除已删除交换机的发送状态
+        from src.snmp.poll_delta import get_poll_delta_encoder
+
+        encoder = get_poll_delta_encoder(switch_manager.registry)
+
+        # 轮询状态存储（最后一次轮询结果和计数器基线）：
+        # 用上次保存的结果初始化广播状态，客户端连接后立即可以获取快照
+        poll_state_manager = None
+        if self.db_manager is not None:
+            poll_state_manager = getattr(self.db_manager, "poll_state_manager", None)
+            if poll_state_manager is not None:
+                poll_state_manager.attach_registry(switch_manager.registry)
+                poll_state_manager.start()
+                for poll_type, result in poll_state_manager.get_results():
+                    encoder.seed(poll_type, result)
+
+        if processes is None:
+            from src.core.config import SNMP_POLL_PROCESSES
+
+            processes = SNMP_POLL_PROCESSES
+
+        if processes and processes > 0:
+            logger.info(f"以多进程模式启动SNMP轮询: 工作进程数{processes}")
+            self._process_pool = ShardedPollerPool(
+                switch_manager,
+                processes,
+                device_options={
+                    "poll_interval": device_poll_interval,
+                    "min_workers": device_min_workers,
+                    "max_workers": device_max_workers,
+                    "device_timeout": device_timeout,
+                    "enable_cache": enable_cache,
+                    "cache_ttl": cache_ttl,
+                    "dynamic_adjustment": dynamic_adjustment,
+                },
+                interface_options={
+                    "poll_interval": interface_poll_interval,
+                    "min_workers": interface_min_workers,
+                    "max_workers": interface_max_workers,
+                    "device_timeout": interface_timeout,
+                    "enable_cache": enable_cache,
+                    "cache_ttl": cache_ttl,
+                    "dynamic_adjustment": dynamic_adjustment,
+                },
+                metrics_manager=metrics_manager,
+                poll_state_manager=poll_state_manager,
+            )
+            self._process_pool.start()
+            return None, None
+
         # 启动设备信息轮询器
         logger.info(
             f"启动SNMP设备轮询器: 间隔{device_poll_interval}秒, "
@@ -620,6 +716,8 @@ class SNMPManager:
             enable_cache=enable_cache,
             cache_ttl=cache_ttl,
             dynamic_adjustment=dynamic_adjustment,
+            metrics_manager=metrics_manager,
+            poll_state_manager=poll_state_manager,
         )
 
         # 启动接口信息轮询器
@@ -636,6 +734,8 @@ class SNMPManager:
             enable_cache=enable_cache,
             cache_ttl=cache_ttl,
             dynamic_adjustment=dynamic_adjustment,
+            metrics_manager=metrics_manager,
+            poll_state_manager=poll_state_manager,
         )
 
         logger.info("所有SNMP轮询器启动完成")
@@ -645,6 +745,14 @@ class SNMPManager:
         """停止所有SNMP轮询器"""
         logger.info("停止SNMP轮询器...")
 
+        if self._process_pool is not None:
+            try:
+                self._process_pool.stop()
+                logger.info("多进程轮询池已停止")
+            except Exception as e:
+                logger.error(f"停止多进程轮询池时出错: {e}")
+            self._process_pool = None
+
         try:
             stop_device_poller()
             logger.info("设备轮询器已停止")
@@ -657,6 +765,20 @@ class SNMPManager:
         except Exception as e:
             logger.error(f"停止接口轮询器时出错: {e}")
 
+        metrics_manager = getattr(self.db_manager, "metrics_manager", None)
+        if metrics_manager is not None:
+            try:
+                metrics_manager.stop()
+            except Exception as e:
+                logger.error(f"停止指标时序存储时出错: {e}")
+
+        poll_state_manager = getattr(self.db_manager, "poll_state_manager", None)
+        if poll_state_manager is not None:
+            try:
+                poll_state_manager.stop()
+            except Exception as e:
+                logger.error(f"停止轮询状态存储时出错: {e}")
+
         self._device_poller = None
         self._interface_poller = None
         logger.info("所有SNMP轮询器已停止")
@@ -680,6 +802,21 @@ class SNMPManager:
         else:
             stats["interface_poller"] = {"status": "not_running"}
 
+        # 多进程模式：汇总各工作进程的轮询统计
+        if self._process_pool is not None:
+            pool_stats = self._process_pool.get_statistics()
+            stats["device_poller"] = pool_stats.pop("device_poller")
+            stats["interface_poller"] = pool_stats.pop("interface_poller")
+            stats["process_pool"] = pool_stats
+
+        metrics_manager = getattr(self.db_manager, "metrics_manager", None)
+        if metrics_manager is not None:
+            stats["metrics_store"] = metrics_manager.get_statistics()
+
+        poll_state_manager = getattr(self.db_manager, "poll_state_manager", None)
+        if poll_state_manager is not None:
+            stats["poll_state_store"] = poll_state_manager.get_statistics()
+
         return stats
 
 
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程级共享的离线MIB缓存
+
+运行时只从磁盘加载预编译的pysnmp MIB模块，不访问任何网络MIB源：
+- pysnmp自带的核心MIB（SNMPv2-MIB、RFC1213-MIB等）
+- 构建时由 compile_mib_cache() 从本地ASN.1源文件编译生成的MIB模块目录（SNMP_MIB_CACHE_DIR）
+
+MIB视图在第一次解析OID名称时才创建和加载，之后整个进程共享；
+OID名称解析结果按OID缓存，解析到的表列/标量节点按前缀缓存，
+同一列的其他实例不再经过pysnmp解析。SNMPMonitor/OIDClassifier的构造因此不再涉及任何MIB工作。
+
+构建时编译MIB缓存:
+    python -m src.snmp.mib_cache [--source 源目录] [--dest 输出目录] [模块名 ...]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from pysnmp.smi import builder, view
+from pysnmp.smi.rfc1902 import ObjectIdentity
+import logging
+
+from src.core.config import SNMP_MIB_CACHE_DIR, SNMP_MIB_SOURCE_DIR
+from .oid_trie import OIDTrie, oid_to_arcs
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# OID名称解析结果缓存上限，超过后整体清空
+MAX_CACHED_NAMES = 65536
+
+
+class _OfflineMibCompiler:
+    """
+    占位MIB编译器
+
+    pysnmp在解析OID时如果MIB构建器没有编译器，会自动添加一个使用默认源的编译器。
+    注册这个不做任何事的编译器可以阻止运行时编译和访问外部MIB源，
+    缺失的模块直接按未找到处理。
+    """
+
+    def compile(self, *mib_names, **options) -> Dict[str, str]:
+        return {}
+
+
+def get_mib_cache_dir() -> str:
+    """获取预编译MIB模块目录（打包后优先使用可执行文件旁的目录，其次是打包的数据目录）"""
+    if getattr(sys, "frozen", False):
+        exe_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+        candidates = [
+            os.path.join(exe_dir, "mibs", "compiled"),
+            os.path.join(os.path.dirname(__file__), "..", "..", "mibs", "compiled"),
+        ]
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                return os.path.abspath(candidate)
+        return os.path.abspath(candidates[0])
+    return os.path.abspath(str(SNMP_MIB_CACHE_DIR))
+
+
+class MibCache:
+    """
+    离线MIB缓存（进程内共享，线程安全）
+
+    Args:
+        cache_dir: 预编译MIB模块目录，默认为 get_mib_cache_dir()
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or get_mib_cache_dir()
+        self._lock = threading.Lock()
+        self._mib_builder: Optional[builder.MibBuilder] = None
+        self._mib_view: Optional[view.MibViewController] = None
+        self._names: Dict[str, Optional[str]] = {}
+        # 已解析的叶子节点（表列/标量）OID前缀 -> 符号名
+        self._leaf_names = OIDTrie()
+        self._leaf_types: tuple = ()
+        self._load_seconds = 0.0
+        self._loaded_modules = 0
+
+    @property
+    def loaded(self) -> bool:
+        """MIB视图是否已加载"""
+        return self._mib_view is not None
+
+    def get_mib_view(self) -> view.MibViewController:
+        """获取MIB视图控制器（第一次调用时加载所有预编译模块）"""
+        if self._mib_view is None:
+            with self._lock:
+                if self._mib_view is None:
+                    self._mib_view = self._load()
+        return self._mib_view
+
+    def get_mib_builder(self) -> builder.MibBuilder:
+        """获取MIB构建器（第一次调用时加载所有预编译模块）"""
+        self.get_mib_view()
+        return self._mib_builder
+
+    def _load(self) -> view.MibViewController:
+        start = time.perf_counter()
+        mib_builder = builder.MibBuilder()
+        # 预编译模块目录作为"编译输出目录"加入搜索路径，同时注册占位编译器
+        mib_builder.set_mib_compiler(_OfflineMibCompiler(), self.cache_dir)
+        if not os.path.isdir(self.cache_dir):
+            logger.info(f"预编译MIB目录不存在，仅使用pysnmp自带MIB: {self.cache_dir}")
+
+        modules = set()
+        for mib_source in mib_builder.get_mib_sources():
+            modules.update(mib_source.listdir())
+        for module in sorted(modules):
+            try:
+                mib_builder.load_modules(module)
+            except Exception as e:
+                logger.debug(f"加载MIB模块 {module} 失败: {e}")
+
+        mib_view = view.MibViewController(mib_builder)
+        self._leaf_types = mib_builder.import_symbols(
+            "SNMPv2-SMI", "MibScalar", "MibTableColumn"
+        )
+        self._mib_builder = mib_builder
+        self._loaded_modules = len(mib_builder.mibSymbols)
+        self._load_seconds = time.perf_counter() - start
+        logger.info(
+            f"MIB缓存加载完成: {self._loaded_modules} 个模块，"
+            f"耗时 {self._load_seconds:.2f} 秒"
+        )
+        return mib_view
+
+    def resolve_name(self, oid: str) -> Optional[str]:
+        """
+        将数字OID解析为MIB符号名
+
+        Args:
+            oid: 数字OID字符串
+
+        Returns:
+            符号名（如 'ifInOctets'），无法解析时返回None
+        """
+        if oid in self._names:
+            return self._names[oid]
+        depth, name = self._leaf_names.longest_prefix(oid_to_arcs(oid))
+        if depth:
+            return name
+
+        name = None
+        try:
+            object_identity = ObjectIdentity(oid)
+            object_identity.resolve_with_mib(self.get_mib_view())
+            name = str(object_identity.get_mib_symbol()[1])
+            mib_node = object_identity.get_mib_node()
+            if isinstance(mib_node, self._leaf_types):
+                # 叶子节点下不会有更长的匹配，整列/标量按前缀缓存
+                self._leaf_names.insert(
+                    ".".join(str(arc) for arc in mib_node.getName()), name
+                )
+                return name
+        except Exception as e:
+            logger.debug(f"无法解析OID {oid}: {e}")
+
+        if len(self._names) >= MAX_CACHED_NAMES:
+            self._names.clear()
+        self._names[oid] = name
+        return name
+
+    def get_statistics(self) -> Dict[str, object]:
+        """获取MIB缓存统计信息"""
+        return {
+            "cache_dir": self.cache_dir,
+            "loaded": self.loaded,
+            "modules": self._loaded_modules,
+            "load_seconds": round(self._load_seconds, 3),
+            "cached_names": len(self._names),
+            "cached_leaf_nodes": len(self._leaf_names),
+        }
+
+
+# 全局共享实例
+_mib_cache: Optional[MibCache] = None
+_mib_cache_lock = threading.Lock()
+
+
+def get_mib_cache() -> MibCache:
+    """获取进程级共享的MIB缓存（不会触发加载）"""
+    global _mib_cache
+    if _mib_cache is None:
+        with _mib_cache_lock:
+            if _mib_cache is None:
+                _mib_cache = MibCache()
+    return _mib_cache
+
+
+def compile_mib_cache(
+    source_dirs: Sequence[str],
+    dest_dir: str,
+    modules: Optional[Sequence[str]] = None,
+) -> Dict[str, str]:
+    """
+    从本地ASN.1源文件编译MIB缓存（构建时使用，需要pysmi）
+
+    源目录中需要同时包含被导入的基础MIB（SNMPv2-SMI、SNMPv2-TC、SNMPv2-CONF等）的源文件，
+    pysmi依赖它们的符号表完成编译。
+
+    Args:
+        source_dirs: MIB源文件目录列表
+        dest_dir: 预编译模块输出目录
+        modules: 要编译的模块名，默认编译源目录中的所有文件
+
+    Returns:
+        {模块名: 编译状态}
+    """
+    from pysmi.codegen.pysnmp import PySnmpCodeGen, baseMibs
+    from pysmi.compiler import MibCompiler
+    from pysmi.parser.dialect import smiV1Relaxed
+    from pysmi.parser.smi import parserFactory
+    from pysmi.reader.localfile import FileReader
+    from pysmi.searcher.pyfile import PyFileSearcher
+    from pysmi.searcher.pypackage import PyPackageSearcher
+    from pysmi.searcher.stub import StubSearcher
+    from pysmi.writer.pyfile import PyFileWriter
+
+    if modules is None:
+        names = set()
+        for source_dir in source_dirs:
+            if os.path.isdir(source_dir):
+                for filename in os.listdir(source_dir):
+                    if not filename.startswith("."):
+                        names.add(os.path.splitext(filename)[0])
+        modules = sorted(names)
+    if not modules:
+        logger.warning(f"没有需要编译的MIB模块: {list(source_dirs)}")
+        return {}
+
+    os.makedirs(dest_dir, exist_ok=True)
+    mib_compiler = MibCompiler(
+        parserFactory(**smiV1Relaxed)(), PySnmpCodeGen(), PyFileWriter(dest_dir)
+    )
+    mib_compiler.add_sources(*[FileReader(path) for path in source_dirs])
+    mib_compiler.add_searchers(
+        StubSearcher(*baseMibs),
+        PyFileSearcher(dest_dir),
+        PyPackageSearcher("pysnmp.smi.mibs"),
+    )
+    status = mib_compiler.compile(*modules)
+    for name, result in status.items():
+        if result == "failed":
+            logger.warning(f"编译MIB模块 {name} 失败: {getattr(result, 'error', '')}")
+    return {name: str(result) for name, result in status.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="编译离线MIB缓存")
+    parser.add_argument(
+        "--source",
+        action="append",
+        help=f"MIB源文件目录，可重复指定，默认 {SNMP_MIB_SOURCE_DIR}",
+    )
+    parser.add_argument(
+        "--dest", default=str(SNMP_MIB_CACHE_DIR), help="预编译模块输出目录"
+    )
+    parser.add_argument("modules", nargs="*", help="要编译的模块名，默认全部")
+    args = parser.parse_args(argv)
+
+    status = compile_mib_cache(
+        args.source or [str(SNMP_MIB_SOURCE_DIR)], args.dest, args.modules or None
+    )
+    failed = {name: result for name, result in status.items() if result == "failed"}
+    print(f"编译完成: {len(status) - len(failed)} 个模块成功，{len(failed)} 个失败")
+    for name in sorted(failed):
+        print(f"  失败: {name}")
+    return 1 if failed else 0
+
+
+__all__ = ["MibCache", "get_mib_cache", "get_mib_cache_dir", "compile_mib_cache"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
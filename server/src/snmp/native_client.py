@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原生SNMP v1/v2c客户端 - 基于asyncio DatagramProtocol和轻量级BER编解码器
+
+每个事件循环共享一个UDP套接字，响应按request-id与请求匹配。
+请求结果与pysnmp的 get_cmd/next_cmd/bulk_cmd 返回格式一致：
+(error_indication, error_status, error_index, var_binds)，
+便于SNMPMonitor在两种实现之间切换。
+"""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .ber_codec import (
+    BERDecodeError,
+    PDU_RESPONSE,
+    VERSION_V1,
+    VERSION_V2C,
+    decode_message,
+    encode_request,
+    peek_request_id,
+)
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 请求结果: (error_indication, error_status, error_index, var_binds)
+RequestResult = Tuple[Optional[str], int, int, List[Tuple[Any, Any]]]
+
+
+class _PendingRequest:
+    """等待响应的请求"""
+
+    __slots__ = ("future", "host", "community")
+
+    def __init__(self, future: asyncio.Future, host: str, community: bytes):
+        self.future = future
+        self.host = host
+        self.community = community
+
+
+class _SNMPDatagramProtocol(asyncio.DatagramProtocol):
+    """将收到的数据报转交给客户端"""
+
+    def __init__(self, client: "NativeSNMPClient"):
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.client._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"原生SNMP套接字错误: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.client._on_connection_lost()
+
+
+class NativeSNMPClient:
+    """
+    原生SNMP v1/v2c客户端（绑定到单个事件循环）
+
+    只支持IPv4地址和团体名认证；不满足条件时调用方应使用pysnmp。
+    """
+
+    def __init__(self):
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._transport_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, _PendingRequest] = {}
+        self._next_request_id = random.randint(1, 2**30)
+        self._stats = {
+            "requests": 0,
+            "responses": 0,
+            "timeouts": 0,
+            "decode_errors": 0,
+            "unmatched": 0,
+        }
+
+    @staticmethod
+    def supports(version: str, ip: str) -> bool:
+        """是否可以使用原生客户端（v1/v2c且目标为IPv4地址）"""
+        if version.lower() not in ("v1", "v2c", "2c"):
+            return False
+        try:
+            return isinstance(ipaddress.ip_address(ip), ipaddress.IPv4Address)
+        except ValueError:
+            return False
+
+    async def _get_transport(self) -> asyncio.DatagramTransport:
+        """获取（必要时创建）共享的UDP套接字"""
+        if self._transport is not None and not self._transport.is_closing():
+            return self._transport
+        if self._transport_lock is None:
+            self._transport_lock = asyncio.Lock()
+        async with self._transport_lock:
+            if self._transport is None or self._transport.is_closing():
+                loop = asyncio.get_running_loop()
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _SNMPDatagramProtocol(self), local_addr=("0.0.0.0", 0)
+                )
+        return self._transport
+
+    def _allocate_request_id(self) -> int:
+        request_id = self._next_request_id
+        self._next_request_id = request_id + 1 if request_id < 2**31 - 1 else 1
+        return request_id
+
+    async def request(
+        self,
+        ip: str,
+        port: int,
+        version: str,
+        community: str,
+        pdu_type: int,
+        oids: Sequence[Tuple[int, ...]],
+        max_repetitions: int = 0,
+        non_repeaters: int = 0,
+        timeout: float = 2.0,
+        retries: int = 0,
+    ) -> RequestResult:
+        """
+        发送GET/GETNEXT/GETBULK请求并等待响应
+
+        Args:
+            ip: 设备IPv4地址
+            port: 端口号
+            version: SNMP版本 ('v1', 'v2c')
+            community: 团体名
+            pdu_type: PDU_GET / PDU_GETNEXT / PDU_GETBULK
+            oids: OID元组列表
+            max_repetitions: GETBULK的max-repetitions
+            non_repeaters: GETBULK的non-repeaters
+            timeout: 每次发送的等待时间（秒）
+            retries: 超时后的重发次数
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds)
+
+        Raises:
+            BERDecodeError: 响应无法解码（调用方可回退到pysnmp）
+        """
+        transport = await self._get_transport()
+        community_bytes = community.encode("utf-8")
+        request_id = self._allocate_request_id()
+        packet = encode_request(
+            VERSION_V1 if version.lower() == "v1" else VERSION_V2C,
+            community_bytes,
+            pdu_type,
+            request_id,
+            oids,
+            non_repeaters=non_repeaters,
+            max_repetitions=max_repetitions,
+        )
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = _PendingRequest(future, ip, community_bytes)
+        self._stats["requests"] += 1
+        try:
+            for _ in range(retries + 1):
+                transport.sendto(packet, (ip, port))
+                try:
+                    message = await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    continue
+                self._stats["responses"] += 1
+                return (
+                    None,
+                    message.error_status,
+                    message.error_index,
+                    message.var_binds,
+                )
+        finally:
+            self._pending.pop(request_id, None)
+            if not future.done():
+                future.cancel()
+
+        self._stats["timeouts"] += 1
+        return "请求超时", 0, 0, []
+
+    def _on_datagram(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """按request-id匹配响应"""
+        request_id = peek_request_id(data)
+        pending = self._pending.get(request_id) if request_id is not None else None
+        if pending is None or pending.future.done() or addr[0] != pending.host:
+            self._stats["unmatched"] += 1
+            return
+
+        try:
+            message = decode_message(data)
+        except BERDecodeError as e:
+            self._stats["decode_errors"] += 1
+            pending.future.set_exception(e)
+            return
+
+        if message.pdu_type != PDU_RESPONSE or message.community != pending.community:
+            self._stats["unmatched"] += 1
+            return
+        pending.future.set_result(message)
+
+    def _on_connection_lost(self) -> None:
+        self._transport = None
+
+    def close(self) -> None:
+        """关闭套接字并取消所有等待中的请求"""
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.cancel()
+        self._pending.clear()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取客户端统计信息"""
+        stats = dict(self._stats)
+        stats["pending"] = len(self._pending)
+        return stats
+
+
+# 事件循环 -> NativeSNMPClient
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_native_client() -> NativeSNMPClient:
+    """获取当前事件循环的原生SNMP客户端（不存在则创建）"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = NativeSNMPClient()
+            _clients[loop] = client
+        return client
+
+
+def close_loop_native_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """关闭指定事件循环的原生SNMP客户端（应在事件循环关闭前调用）"""
+    if loop is None:
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            return
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        client.close()
+
+
+__all__ = [
+    "NativeSNMPClient",
+    "get_native_client",
+    "close_loop_native_client",
+]
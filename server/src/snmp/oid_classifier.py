@@ -1,15 +1,21 @@
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Iterable, Optional
 import re
-from pysnmp.smi import builder, view, compiler
-from pysnmp.smi.rfc1902 import ObjectIdentity
+import threading
 import logging
 
+from .mib_cache import get_mib_cache
+from .oid_trie import OIDTrie, oid_to_arcs
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
+
 class OIDClassifier:
     """
     OID分类器，用于智能识别和分类OID
+    
+    分类、名称和厂商都用OID前缀树做最长前缀匹配。前缀树在进程内共享，
+    可以通过 register_vendor_profile() 在运行时扩展。
     """
     
     # OID分类映射
@@ -100,16 +106,86 @@ class OIDClassifier:
         '1.3.6.1.4.1.2011.6.3.5.1.1.3': 'hwMemoryDevSize',   # 华为内存总量
     }
     
+    # 企业OID前缀
+    ENTERPRISE_OIDS = {
+        '1.3.6.1.4.1.9': 'Cisco',
+        '1.3.6.1.4.1.1991': 'Brocade',
+        '1.3.6.1.4.1.25506': 'H3C',
+        '1.3.6.1.4.1.2011': 'Huawei',
+        '1.3.6.1.4.1.1916': 'Extreme',
+        '1.3.6.1.4.1.2272': 'Nortel',
+        '1.3.6.1.4.1.311': 'Microsoft',
+        '1.3.6.1.4.1.318': 'APC',
+        '1.3.6.1.4.1.11': 'HP',
+    }
+    
+    # 进程内共享的前缀树（第一次创建分类器时构建）
+    _category_trie: Optional[OIDTrie] = None
+    _name_trie: Optional[OIDTrie] = None
+    _vendor_trie: Optional[OIDTrie] = None
+    # 厂商名（小写） -> 厂商配置
+    _vendor_profiles: Dict[str, Dict[str, Any]] = {}
+    _tables_lock = threading.Lock()
+    
     def __init__(self):
         """初始化OID分类器"""
-        self.mib_builder = builder.MibBuilder()
-        self.mib_view_controller = view.MibViewController(self.mib_builder)
+        # 进程级共享的离线MIB缓存（第一次解析OID名称时才加载）
+        self.mib_cache = get_mib_cache()
+        self._ensure_tables()
+    
+    @classmethod
+    def _ensure_tables(cls) -> None:
+        """从类属性中的映射表构建共享前缀树"""
+        if cls._category_trie is not None:
+            return
+        with cls._tables_lock:
+            if cls._category_trie is not None:
+                return
+            category_trie = OIDTrie()
+            for category, oid_prefixes in cls.OID_CATEGORIES.items():
+                for prefix in oid_prefixes:
+                    category_trie.insert(prefix, category)
+            cls._name_trie = OIDTrie(cls.OID_NAMES.items())
+            cls._vendor_trie = OIDTrie(cls.ENTERPRISE_OIDS.items())
+            cls._category_trie = category_trie
+    
+    @classmethod
+    def register_vendor_profile(cls, profile: Dict[str, Any]) -> None:
+        """
+        注册厂商配置（进程内所有分类器立即生效）
         
-        # 尝试编译一些常用的MIB
-        try:
-            compiler.addMibCompiler(self.mib_builder, sources=['file:///usr/share/snmp/mibs', 'http://mibs.snmplabs.com/asn1/@mib@'])
-        except Exception as e:
-            logger.warning(f"无法加载MIB文件: {e}")
+        Args:
+            profile: 厂商配置
+                vendor: 厂商名（identify_device_type的返回值）
+                enterprise_oid: 企业OID前缀（可选，用于识别厂商）
+                categories: {分类: [OID前缀]}（可选）
+                names: {OID: 名称}（可选）
+                recommended_oids: 推荐监控的OID列表（可选）
+        """
+        vendor = profile.get('vendor')
+        if not vendor:
+            raise ValueError('厂商配置缺少vendor')
+        cls._ensure_tables()
+        with cls._tables_lock:
+            if profile.get('enterprise_oid'):
+                cls._vendor_trie.insert(profile['enterprise_oid'], vendor)
+            for category, oid_prefixes in (profile.get('categories') or {}).items():
+                for prefix in oid_prefixes:
+                    cls._category_trie.insert(prefix, category)
+            for oid, name in (profile.get('names') or {}).items():
+                cls._name_trie.insert(oid, name)
+            cls._vendor_profiles[vendor.lower()] = dict(profile)
+        logger.info(f"已注册厂商配置: {vendor}")
+    
+    @classmethod
+    def get_vendor_profile(cls, vendor: str) -> Optional[Dict[str, Any]]:
+        """获取已注册的厂商配置"""
+        return cls._vendor_profiles.get((vendor or '').lower())
+    
+    @property
+    def mib_view_controller(self):
+        """共享的MIB视图控制器（访问时加载预编译MIB）"""
+        return self.mib_cache.get_mib_view()
     
     def classify_oid(self, oid: str) -> str:
         """
@@ -121,11 +197,7 @@ class OIDClassifier:
         Returns:
             OID的分类名称
         """
-        for category, oid_prefixes in self.OID_CATEGORIES.items():
-            for prefix in oid_prefixes:
-                if oid.startswith(prefix):
-                    return category
-        return 'unknown'
+        return self._category_trie.get(oid, 'unknown')
     
     def get_oid_name(self, oid: str) -> str:
         """
@@ -137,18 +209,45 @@ class OIDClassifier:
         Returns:
             OID的名称，如果未找到则返回原始OID
         """
-        # 首先尝试从预定义映射中查找
-        if oid in self.OID_NAMES:
-            return self.OID_NAMES[oid]
+        # 首先尝试从预定义映射中查找（最长前缀匹配，表列实例返回列名）
+        name = self._name_trie.get(oid)
+        if name is not None:
+            return name
+        
+        # 尝试使用MIB解析（结果在进程内缓存）
+        return self.mib_cache.resolve_name(oid) or oid
+    
+    def classify_many(self, oids: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """
+        批量分类OID
         
-        # 尝试使用MIB解析
-        try:
-            object_identity = ObjectIdentity(oid)
-            object_identity.resolveWithMib(self.mib_view_controller)
-            return str(object_identity.getMibSymbol()[1])
-        except Exception as e:
-            logger.debug(f"无法解析OID {oid}: {e}")
-            return oid
+        每个OID只转换一次为整数弧元组，再分别在分类、名称、厂商前缀树中做最长前缀匹配。
+        
+        Args:
+            oids: OID字符串列表
+            
+        Returns:
+            {OID: {'name': 名称, 'category': 分类, 'vendor': 厂商}}
+        """
+        category_trie = self._category_trie
+        name_trie = self._name_trie
+        vendor_trie = self._vendor_trie
+        results = {}
+        for oid in oids:
+            if oid in results:
+                continue
+            arcs = oid_to_arcs(oid)
+            depth, category = category_trie.longest_prefix(arcs)
+            if not depth:
+                category = 'unknown'
+            depth, name = name_trie.longest_prefix(arcs)
+            if not depth:
+                name = self.mib_cache.resolve_name(oid) or oid
+            depth, vendor = vendor_trie.longest_prefix(arcs)
+            if not depth:
+                vendor = 'Unknown'
+            results[oid] = {'name': name, 'category': category, 'vendor': vendor}
+        return results
     
     def parse_oid_value(self, oid: str, value: Any) -> Dict[str, Any]:
         """
@@ -161,10 +260,36 @@ class OIDClassifier:
         Returns:
             包含解析后信息的字典
         """
+        return self._build_value_result(
+            oid, value, self.get_oid_name(oid), self.classify_oid(oid)
+        )
+    
+    def parse_oid_values(self, values: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量解析OID值（分类和名称查找使用classify_many）
+        
+        Args:
+            values: {OID: 值}
+            
+        Returns:
+            {OID: parse_oid_value的结果}
+        """
+        classified = self.classify_many(values.keys())
+        return {
+            oid: self._build_value_result(
+                oid, value, classified[oid]['name'], classified[oid]['category']
+            )
+            for oid, value in values.items()
+        }
+    
+    def _build_value_result(
+        self, oid: str, value: Any, name: str, category: str
+    ) -> Dict[str, Any]:
+        """根据已知的名称和分类构造OID值的解析结果"""
         result = {
             'oid': oid,
-            'name': self.get_oid_name(oid),
-            'category': self.classify_oid(oid),
+            'name': name,
+            'category': category,
             'raw_value': value,
             'formatted_value': str(value),
             'value_type': type(value).__name__
@@ -179,7 +304,7 @@ class OIDClassifier:
                 result['formatted_value'] = f"{speed_mbps} Mbps"
             except (ValueError, TypeError):
                 pass
-        elif 'Octets' in self.get_oid_name(oid) and value:
+        elif 'Octets' in name and value:
             # 流量数据转换为更可读的格式
             try:
                 bytes_value = int(value)
@@ -220,24 +345,7 @@ class OIDClassifier:
         Returns:
             设备类型字符串
         """
-        # 企业OID前缀
-        enterprise_oids = {
-            '1.3.6.1.4.1.9': 'Cisco',
-            '1.3.6.1.4.1.1991': 'Brocade',
-            '1.3.6.1.4.1.25506': 'H3C',
-            '1.3.6.1.4.1.2011': 'Huawei',
-            '1.3.6.1.4.1.1916': 'Extreme',
-            '1.3.6.1.4.1.2272': 'Nortel',
-            '1.3.6.1.4.1.311': 'Microsoft',
-            '1.3.6.1.4.1.318': 'APC',
-            '1.3.6.1.4.1.11': 'HP',
-        }
-        
-        for oid_prefix, vendor in enterprise_oids.items():
-            if sys_object_id.startswith(oid_prefix):
-                return vendor
-                
-        return 'Unknown'
+        return self._vendor_trie.get(sys_object_id, 'Unknown')
     
     def get_recommended_oids(self, device_type: str = 'generic') -> List[str]:
         """
@@ -266,6 +374,9 @@ class OIDClassifier:
                 '1.3.6.1.4.1.2011.6.3.5.1.1.2', # 华为内存使用
                 '1.3.6.1.4.1.2011.6.3.5.1.1.3', # 华为内存总量
             ])
+        elif (self.get_vendor_profile(device_type) or {}).get('recommended_oids'):
+            # 运行时注册的厂商配置
+            base_oids.extend(self.get_vendor_profile(device_type)['recommended_oids'])
         elif device_type.lower() == 'generic':
             # 通用设备使用标准OID
             base_oids.extend([
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OID前缀树 - 按OID弧（整数）做最长前缀匹配
+
+供OID分类器（分类/名称/厂商）和MIB缓存（已解析的表列/标量节点）共用。
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+
+@lru_cache(maxsize=65536)
+def oid_to_arcs(oid: str) -> Tuple[int, ...]:
+    """将点分OID字符串转换为整数弧元组（结果缓存），格式错误时返回空元组"""
+    try:
+        return tuple(int(arc) for arc in oid.strip().strip(".").split("."))
+    except ValueError:
+        return ()
+
+
+class OIDTrie:
+    """
+    按OID弧（整数）组织的前缀树
+
+    每个节点为 [子节点字典, 值]，查找只需沿OID逐弧下降，
+    耗时与OID深度成正比，与表中前缀数量无关。
+    """
+
+    _EMPTY = object()
+
+    def __init__(self, items: Optional[Iterable[Tuple[str, Any]]] = None):
+        self._root = [{}, self._EMPTY]
+        self._size = 0
+        for oid, value in items or ():
+            self.insert(oid, value)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, oid: str, value: Any) -> None:
+        """插入（或覆盖）前缀对应的值"""
+        node = self._root
+        for arc in oid_to_arcs(oid):
+            node = node[0].setdefault(arc, [{}, self._EMPTY])
+        if node[1] is self._EMPTY:
+            self._size += 1
+        node[1] = value
+
+    def remove(self, oid: str) -> bool:
+        """删除前缀对应的值（保留节点），返回是否存在"""
+        node = self._root
+        for arc in oid_to_arcs(oid):
+            node = node[0].get(arc)
+            if node is None:
+                return False
+        if node[1] is self._EMPTY:
+            return False
+        node[1] = self._EMPTY
+        self._size -= 1
+        return True
+
+    def longest_prefix(self, arcs: Tuple[int, ...]) -> Tuple[int, Any]:
+        """
+        最长前缀匹配
+
+        Args:
+            arcs: 整数弧元组形式的OID
+
+        Returns:
+            (匹配的前缀长度, 值)，没有匹配时返回 (0, None)
+        """
+        node = self._root
+        matched = (0, None)
+        for depth, arc in enumerate(arcs, 1):
+            node = node[0].get(arc)
+            if node is None:
+                break
+            if node[1] is not self._EMPTY:
+                matched = (depth, node[1])
+        return matched
+
+    def get(self, oid: str, default: Any = None) -> Any:
+        """最长前缀匹配（字符串OID），没有匹配时返回default"""
+        depth, value = self.longest_prefix(oid_to_arcs(oid))
+        return value if depth else default
+
+
+__all__ = ["OIDTrie", "oid_to_arcs"]
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP轮询结果增量广播 - 每台交换机只广播相对上一次发送内容的变化
+
+- 按(轮询类型, 交换机)保存上一次发送的完整结果和序号，每条消息序号加1
+- 第一次发送、每隔固定条数或超过最长间隔时发送关键帧（完整结果，消息类型不变：
+  snmpDeviceUpdate/snmpInterfaceUpdate），其余发送增量（snmpDeviceDelta/snmpInterfaceDelta）
+- 增量中字段用点分路径表示（如 "device_info.uptime"），set为新值，unset为删除的字段；
+  接口列表按ifIndex对比，只携带变化的接口和变化的字段
+- 客户端发现序号不连续时可请求快照（当前完整结果 + 当前序号）重新同步
+
+增量消息格式:
+    {
+        "type": "snmpInterfaceDelta",
+        "seq": 12,
+        "keyframe": false,
+        "data": {
+            "switch_id": 1,
+            "ip": "192.168.1.1",
+            "set": {"poll_time": 1700000000.0, "sys_uptime": 123456},
+            "unset": [],
+            "interfaces": {
+                "changed": [{"index": 3, "set": {"in_rate": 1024.0}}],
+                "added": [{...完整接口...}],
+                "removed": [7],
+                "order": [1, 2, 3]
+            }
+        }
+    }
+interfaces中没有变化的部分省略；order只在接口顺序或集合变化时携带。
+"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.core.config import (
+    SNMP_DELTA_KEYFRAME_INTERVAL,
+    SNMP_DELTA_KEYFRAME_MAX_AGE,
+)
+from src.database.switch_registry import EVENT_REMOVED
+
+# 完整结果（关键帧）和增量的消息类型
+KEYFRAME_MESSAGE_TYPES = {
+    "device": "snmpDeviceUpdate",
+    "interface": "snmpInterfaceUpdate",
+}
+DELTA_MESSAGE_TYPES = {
+    "device": "snmpDeviceDelta",
+    "interface": "snmpInterfaceDelta",
+}
+
+# 按ifIndex逐行对比的列表字段
+ROWS_FIELD = "interface_info"
+
+_MISSING = object()
+
+
+def _diff_fields(
+    old: Dict[str, Any], new: Dict[str, Any], prefix: str = ""
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    对比两个字典
+
+    Returns:
+        (变化或新增的字段, 删除的字段)，嵌套字典展开为点分路径
+    """
+    changed: Dict[str, Any] = {}
+    removed: List[str] = []
+    for key, value in new.items():
+        path = f"{prefix}{key}"
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            sub_changed, sub_removed = _diff_fields(previous, value, path + ".")
+            changed.update(sub_changed)
+            removed.extend(sub_removed)
+        elif previous is _MISSING or previous != value:
+            changed[path] = value
+    removed.extend(f"{prefix}{key}" for key in old if key not in new)
+    return changed, removed
+
+
+def _row_indexes(rows: Any) -> Optional[List[Any]]:
+    """接口列表的ifIndex顺序，无法按ifIndex对比（缺少或重复）时返回None"""
+    if not isinstance(rows, list):
+        return None
+    indexes = [row.get("index") if isinstance(row, dict) else None for row in rows]
+    if None in indexes or len(set(indexes)) != len(indexes):
+        return None
+    return indexes
+
+
+def _diff_rows(
+    old_rows: List[Dict[str, Any]],
+    new_rows: List[Dict[str, Any]],
+    old_indexes: List[Any],
+    new_indexes: List[Any],
+) -> Dict[str, Any]:
+    """按ifIndex对比接口列表，返回接口增量（无变化时为空字典）"""
+    old_by_index = dict(zip(old_indexes, old_rows))
+    changed = []
+    added = []
+    for index, row in zip(new_indexes, new_rows):
+        previous = old_by_index.get(index)
+        if previous is None:
+            added.append(row)
+            continue
+        row_changed, row_removed = _diff_fields(previous, row)
+        if row_changed or row_removed:
+            entry: Dict[str, Any] = {"index": index, "set": row_changed}
+            if row_removed:
+                entry["unset"] = row_removed
+            changed.append(entry)
+
+    patch: Dict[str, Any] = {}
+    if changed:
+        patch["changed"] = changed
+    if added:
+        patch["added"] = added
+    current = set(new_indexes)
+    removed = [index for index in old_indexes if index not in current]
+    if removed:
+        patch["removed"] = removed
+    if new_indexes != old_indexes:
+        patch["order"] = new_indexes
+    return patch
+
+
+def diff_result(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    计算两次轮询结果之间的增量
+
+    Returns:
+        包含switch_id、ip、set、unset和可选interfaces的增量
+    """
+    old_rows, new_rows = old.get(ROWS_FIELD, _MISSING), new.get(ROWS_FIELD, _MISSING)
+    old_indexes, new_indexes = _row_indexes(old_rows), _row_indexes(new_rows)
+    rows_patch = None
+    if old_indexes is not None and new_indexes is not None:
+        rows_patch = _diff_rows(old_rows, new_rows, old_indexes, new_indexes)
+        old = {k: v for k, v in old.items() if k != ROWS_FIELD}
+        new = {k: v for k, v in new.items() if k != ROWS_FIELD}
+
+    changed, removed = _diff_fields(old, new)
+    delta: Dict[str, Any] = {
+        "switch_id": new.get("switch_id"),
+        "ip": new.get("ip"),
+        "set": changed,
+        "unset": removed,
+    }
+    if rows_patch:
+        delta["interfaces"] = rows_patch
+    return delta
+
+
+class _DeltaState:
+    """单台交换机单个轮询类型的发送状态"""
+
+    __slots__ = ("seq", "last", "since_keyframe", "keyframe_time")
+
+    def __init__(self):
+        self.seq = 0
+        self.last: Optional[Dict[str, Any]] = None
+        self.since_keyframe = 0
+        self.keyframe_time = 0.0
+
+
+class PollDeltaEncoder:
+    """
+    轮询结果增量编码器（线程安全）
+
+    保存的是结果字典的引用，轮询结果在广播后不应再被修改。
+
+    Args:
+        keyframe_interval: 每台交换机每隔多少条消息发送一次关键帧
+        keyframe_max_age: 两次关键帧之间的最长间隔（秒）
+        registry: 交换机注册表（可选），交换机删除后清除其发送状态
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: int = SNMP_DELTA_KEYFRAME_INTERVAL,
+        keyframe_max_age: float = SNMP_DELTA_KEYFRAME_MAX_AGE,
+        registry=None,
+    ):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.keyframe_max_age = keyframe_max_age
+        self._states: Dict[Tuple[str, Hashable], _DeltaState] = {}
+        self._lock = threading.Lock()
+        self._stats = {"keyframes": 0, "deltas": 0, "snapshots": 0}
+        self._unsubscribe_registry = None
+        if registry is not None:
+            self.attach_registry(registry)
+
+    def attach_registry(self, registry) -> None:
+        """订阅交换机注册表，交换机删除后清除其发送状态（只订阅一次）"""
+        with self._lock:
+            if self._unsubscribe_registry is None:
+                self._unsubscribe_registry = registry.subscribe(self._on_switch_event)
+
+    @staticmethod
+    def _switch_key(result: Dict[str, Any]) -> Hashable:
+        switch_id = result.get("switch_id")
+        return switch_id if switch_id is not None else result.get("ip")
+
+    @staticmethod
+    def _keyframe(poll_type: str, result: Dict[str, Any], seq: int) -> Dict[str, Any]:
+        return {
+            "type": KEYFRAME_MESSAGE_TYPES[poll_type],
+            "data": result,
+            "seq": seq,
+            "keyframe": True,
+            "poll_time": time.time(),
+        }
+
+    def encode(
+        self, poll_type: str, result: Dict[str, Any], now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        记录一次轮询结果并生成要广播的消息（关键帧或增量）
+
+        Args:
+            poll_type: 轮询类型 ("device" 或 "interface")
+            result: 完整轮询结果
+            now: 当前时间（用于判断关键帧最长间隔），默认time.time()
+
+        Returns:
+            WebSocket消息
+        """
+        if now is None:
+            now = time.time()
+        key = (poll_type, self._switch_key(result))
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _DeltaState()
+            state.seq += 1
+            previous, state.last = state.last, result
+
+            if (
+                previous is None
+                or state.since_keyframe + 1 >= self.keyframe_interval
+                or now - state.keyframe_time >= self.keyframe_max_age
+            ):
+                state.since_keyframe = 0
+                state.keyframe_time = now
+                self._stats["keyframes"] += 1
+                return self._keyframe(poll_type, result, state.seq)
+
+            state.since_keyframe += 1
+            self._stats["deltas"] += 1
+            seq = state.seq
+
+        return {
+            "type": DELTA_MESSAGE_TYPES[poll_type],
+            "data": diff_result(previous, result),
+            "seq": seq,
+            "keyframe": False,
+            "poll_time": time.time(),
+        }
+
+    def seed(
+        self, poll_type: str, result: Dict[str, Any], now: Optional[float] = None
+    ) -> bool:
+        """
+        用上次保存的结果初始化发送状态（不广播），服务重启后快照立即可用，
+        之后的轮询结果相对该结果以增量发送
+
+        Returns:
+            是否初始化（已有发送状态时忽略）
+        """
+        key = (poll_type, self._switch_key(result))
+        with self._lock:
+            if key in self._states:
+                return False
+            state = self._states[key] = _DeltaState()
+            state.last = result
+            state.keyframe_time = time.time() if now is None else now
+        return True
+
+    def snapshot(
+        self,
+        poll_types: Iterable[str] = ("device", "interface"),
+        switch_ids: Optional[Iterable[Hashable]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        获取当前完整结果的关键帧（用于客户端连接或序号不连续后重新同步，不改变序号）
+
+        Args:
+            poll_types: 轮询类型
+            switch_ids: 交换机ID（未指定时返回全部交换机）
+
+        Returns:
+            关键帧消息列表
+        """
+        poll_types = set(poll_types)
+        wanted = set(switch_ids) if switch_ids is not None else None
+        with self._lock:
+            messages = [
+                self._keyframe(poll_type, state.last, state.seq)
+                for (poll_type, switch_key), state in self._states.items()
+                if poll_type in poll_types
+                and state.last is not None
+                and (wanted is None or switch_key in wanted)
+            ]
+            self._stats["snapshots"] += len(messages)
+        return messages
+
+    def forget(self, switch_key: Hashable) -> None:
+        """清除交换机的发送状态（下次发送关键帧）"""
+        with self._lock:
+            for key in [key for key in self._states if key[1] == switch_key]:
+                del self._states[key]
+
+    def _on_switch_event(self, event: str, switch: Dict[str, Any]) -> None:
+        if event != EVENT_REMOVED:
+            return
+        switch_id = switch.get("id")
+        self.forget(switch_id if switch_id is not None else switch.get("ip"))
+
+    def close(self) -> None:
+        """取消注册表订阅并清除全部发送状态"""
+        if self._unsubscribe_registry is not None:
+            self._unsubscribe_registry()
+            self._unsubscribe_registry = None
+        with self._lock:
+            self._states.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取增量编码统计信息"""
+        with self._lock:
+            return {"tracked": len(self._states), **self._stats}
+
+
+# 全局编码器实例
+_poll_delta_encoder: Optional[PollDeltaEncoder] = None
+_poll_delta_encoder_lock = threading.Lock()
+
+
+def get_poll_delta_encoder(registry=None) -> PollDeltaEncoder:
+    """
+    获取进程内共享的轮询结果增量编码器
+
+    Args:
+        registry: 交换机注册表（可选，传入后跟踪交换机删除）
+    """
+    global _poll_delta_encoder
+    if _poll_delta_encoder is None:
+        with _poll_delta_encoder_lock:
+            if _poll_delta_encoder is None:
+                _poll_delta_encoder = PollDeltaEncoder()
+    if registry is not None:
+        _poll_delta_encoder.attach_registry(registry)
+    return _poll_delta_encoder
+
+
+def stop_poll_delta_encoder() -> None:
+    """关闭轮询结果增量编码器"""
+    global _poll_delta_encoder
+    with _poll_delta_encoder_lock:
+        encoder, _poll_delta_encoder = _poll_delta_encoder, None
+    if encoder is not None:
+        encoder.close()
+
+
+__all__ = [
+    "DELTA_MESSAGE_TYPES",
+    "KEYFRAME_MESSAGE_TYPES",
+    "PollDeltaEncoder",
+    "diff_result",
+    "get_poll_delta_encoder",
+    "stop_poll_delta_encoder",
+]
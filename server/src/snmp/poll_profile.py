@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+接口轮询配置 - 按交换机选择需要轮询的接口行、列和轮询间隔
+
+- 行过滤：按ifType包含/排除、ifDescr正则包含/排除、只轮询管理状态为up的接口
+- 列选择：status（管理/运行状态）、traffic（字节数）、packets（包数）、errors（错误/丢弃）
+- 轮询间隔：覆盖接口轮询器的默认间隔
+
+行过滤依据接口静态属性缓存中的ifType/ifDescr/ifAdminStatus，
+缓存整表刷新（设备重启、接口增删或过期）时重新选择接口。
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# 列分组（未归入任何分组的列，如ifLastChange/ifHighSpeed，始终轮询）
+COLUMN_GROUPS: Dict[str, tuple] = {
+    "status": ("ifAdminStatus", "ifOperStatus"),
+    "traffic": ("ifHCInOctets", "ifHCOutOctets", "ifInOctets", "ifOutOctets"),
+    "packets": (
+        "ifHCInUcastPkts",
+        "ifHCInMulticastPkts",
+        "ifHCInBroadcastPkts",
+        "ifHCOutUcastPkts",
+        "ifHCOutMulticastPkts",
+        "ifHCOutBroadcastPkts",
+        "ifInUcastPkts",
+        "ifInNUcastPkts",
+        "ifOutUcastPkts",
+        "ifOutNUcastPkts",
+    ),
+    "errors": ("ifInErrors", "ifOutErrors", "ifInDiscards", "ifOutDiscards"),
+}
+
+_COLUMN_GROUP = {
+    column: group for group, columns in COLUMN_GROUPS.items() for column in columns
+}
+
+# 轮询间隔的取值范围（秒）
+MIN_INTERVAL = 5
+MAX_INTERVAL = 3600
+
+# ifAdminStatus: up(1)
+ADMIN_STATUS_UP = 1
+
+
+class InterfacePollProfile:
+    """
+    单台交换机的接口轮询配置
+
+    Args:
+        include_types: 只轮询这些ifType（为空表示不限制）
+        exclude_types: 不轮询这些ifType
+        include_descr: ifDescr需匹配的正则（为空表示不限制）
+        exclude_descr: ifDescr匹配该正则时不轮询
+        admin_up_only: 是否只轮询管理状态为up的接口（会自动包含status列分组）
+        interval: 轮询间隔（秒），None表示使用轮询器默认间隔
+        columns: 轮询的列分组，None表示全部分组
+
+    Raises:
+        ValueError: 参数无效时抛出
+    """
+
+    def __init__(
+        self,
+        include_types: Optional[List[int]] = None,
+        exclude_types: Optional[List[int]] = None,
+        include_descr: str = "",
+        exclude_descr: str = "",
+        admin_up_only: bool = False,
+        interval: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        try:
+            self.include_types = sorted({int(t) for t in include_types or []})
+            self.exclude_types = sorted({int(t) for t in exclude_types or []})
+        except (TypeError, ValueError):
+            raise ValueError("ifType必须为整数列表")
+
+        self.include_descr = include_descr or ""
+        self.exclude_descr = exclude_descr or ""
+        try:
+            self._include_re = (
+                re.compile(self.include_descr) if self.include_descr else None
+            )
+            self._exclude_re = (
+                re.compile(self.exclude_descr) if self.exclude_descr else None
+            )
+        except re.error as e:
+            raise ValueError(f"ifDescr正则表达式无效: {e}")
+
+        self.admin_up_only = bool(admin_up_only)
+
+        if interval is not None:
+            try:
+                interval = int(interval)
+            except (TypeError, ValueError):
+                raise ValueError("轮询间隔必须为整数")
+            if not MIN_INTERVAL <= interval <= MAX_INTERVAL:
+                raise ValueError(f"轮询间隔必须在 {MIN_INTERVAL}-{MAX_INTERVAL} 秒之间")
+        self.interval = interval
+
+        if columns is None:
+            columns = list(COLUMN_GROUPS)
+        unknown = [c for c in columns if c not in COLUMN_GROUPS]
+        if unknown:
+            raise ValueError(
+                f"未知的列分组: {', '.join(map(str, unknown))}，"
+                f"可选: {', '.join(COLUMN_GROUPS)}"
+            )
+        if not columns:
+            raise ValueError("至少需要选择一个列分组")
+        if self.admin_up_only and "status" not in columns:
+            # 按管理状态选择接口需要读取ifAdminStatus
+            columns = [*columns, "status"]
+        self.columns = [group for group in COLUMN_GROUPS if group in columns]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "InterfacePollProfile":
+        """从字典创建轮询配置（字典为空时返回默认配置）"""
+        data = data or {}
+        return cls(
+            include_types=data.get("include_types"),
+            exclude_types=data.get("exclude_types"),
+            include_descr=data.get("include_descr", ""),
+            exclude_descr=data.get("exclude_descr", ""),
+            admin_up_only=data.get("admin_up_only", False),
+            interval=data.get("interval"),
+            columns=data.get("columns"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "include_types": self.include_types,
+            "exclude_types": self.exclude_types,
+            "include_descr": self.include_descr,
+            "exclude_descr": self.exclude_descr,
+            "admin_up_only": self.admin_up_only,
+            "interval": self.interval,
+            "columns": self.columns,
+        }
+
+    @property
+    def filters_rows(self) -> bool:
+        """是否只轮询部分接口"""
+        return bool(
+            self.include_types
+            or self.exclude_types
+            or self._include_re
+            or self._exclude_re
+            or self.admin_up_only
+        )
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """
+        判断接口是否需要轮询
+
+        Args:
+            row: 接口行数据 {列名: 值}，缺少的列不参与过滤
+        """
+        if_type = row.get("ifType")
+        if if_type is not None:
+            if_type = int(if_type)
+            if self.include_types and if_type not in self.include_types:
+                return False
+            if if_type in self.exclude_types:
+                return False
+
+        descr = row.get("ifDescr")
+        if descr is not None:
+            descr = str(descr)
+            if self._include_re and not self._include_re.search(descr):
+                return False
+            if self._exclude_re and self._exclude_re.search(descr):
+                return False
+
+        admin_status = row.get("ifAdminStatus")
+        if self.admin_up_only and admin_status is not None:
+            return int(admin_status) == ADMIN_STATUS_UP
+        return True
+
+    def select_columns(self, columns: List[str]) -> List[str]:
+        """从列名列表中去掉未选择分组的列"""
+        return [
+            column
+            for column in columns
+            if _COLUMN_GROUP.get(column) in (None, *self.columns)
+        ]
+
+    def wants(self, group: str) -> bool:
+        """是否轮询指定的列分组"""
+        return group in self.columns
+
+
+def profile_interval(switch_config: Dict[str, Any]) -> Optional[float]:
+    """从交换机配置中读取接口轮询间隔（未配置时返回None）"""
+    profile = switch_config.get("poll_profile")
+    if not profile:
+        return None
+    return profile.get("interval")
+
+
+__all__ = [
+    "COLUMN_GROUPS",
+    "InterfacePollProfile",
+    "profile_interval",
+]
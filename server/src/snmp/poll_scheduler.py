@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP轮询调度器 - 按到期时间调度每台交换机，将轮询负载均匀分布在整个轮询间隔内
+
+- 每台交换机根据IP哈希得到固定的相位偏移（0 ~ 轮询间隔），重启后保持不变
+- 使用按到期时间排序的最小堆，只取出已到期的交换机入队
+- 每个周期在基准到期时间上叠加少量随机抖动，避免多台设备长期同步
+- 记录每台交换机的调度漂移（实际开始轮询时间与到期时间之差），用于判断轮询器是否跟得上
+- 可按交换机配置覆盖轮询间隔（如接口轮询配置中的interval）
+"""
+
+import heapq
+import random
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _ScheduleEntry:
+    """单台交换机的调度状态"""
+
+    __slots__ = (
+        "key",
+        "config",
+        "interval",
+        "phase",
+        "base_due",
+        "due",
+        "version",
+        "dispatched",
+        "skipped",
+        "late_count",
+        "last_drift",
+        "avg_drift",
+        "max_drift",
+    )
+
+    def __init__(self, key: str, config: Dict[str, Any], interval: float, phase: float):
+        self.key = key
+        self.config = config
+        self.interval = interval
+        self.phase = phase
+        self.base_due = 0.0
+        self.due = 0.0
+        self.version = 0
+        self.dispatched = 0
+        self.skipped = 0
+        self.late_count = 0
+        self.last_drift = 0.0
+        self.avg_drift = 0.0
+        self.max_drift = 0.0
+
+
+class PollScheduler:
+    """
+    轮询调度器（线程安全）
+
+    时间均使用 time.monotonic()。
+    """
+
+    # 漂移滑动平均的平滑系数
+    DRIFT_EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        interval: float,
+        jitter_ratio: float = 0.05,
+        late_threshold: Optional[float] = None,
+        interval_of: Optional[Callable[[Dict[str, Any]], Optional[float]]] = None,
+    ):
+        """
+        初始化轮询调度器
+
+        Args:
+            interval: 默认轮询间隔（秒）
+            jitter_ratio: 每个周期随机抖动占轮询间隔的比例（±）
+            late_threshold: 漂移超过该值（秒）时计为迟到，默认为轮询间隔的10%
+            interval_of: 从交换机配置读取轮询间隔的函数（返回None时使用默认间隔）
+        """
+        self.interval = float(interval)
+        self.jitter_ratio = max(0.0, jitter_ratio)
+        self.jitter = self.interval * self.jitter_ratio
+        self.interval_of = interval_of
+        self.late_threshold = (
+            late_threshold if late_threshold is not None else self.interval * 0.1
+        )
+        self._entries: Dict[str, _ScheduleEntry] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._lock = threading.Lock()
+
+    def phase_of(self, key: str, interval: Optional[float] = None) -> float:
+        """根据交换机标识计算固定的相位偏移（秒）"""
+        interval = self.interval if interval is None else interval
+        return (zlib.crc32(key.encode("utf-8")) / 2**32) * interval
+
+    def interval_for(self, config: Dict[str, Any]) -> float:
+        """获取交换机的轮询间隔（秒）"""
+        if self.interval_of is not None:
+            interval = self.interval_of(config)
+            if interval:
+                return float(interval)
+        return self.interval
+
+    def sync(self, switches: List[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """
+        同步交换机列表：新增交换机按相位加入调度，已删除的交换机移出调度
+
+        Args:
+            switches: 交换机配置列表（以ip为标识）
+            now: 当前时间，默认time.monotonic()
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            current = set()
+            for config in switches:
+                key = config.get("ip")
+                if not key:
+                    continue
+                current.add(key)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # 配置可能已修改（如凭据），下次轮询使用新配置
+                    self._update_locked(entry, config, now)
+                    continue
+                self._add_locked(key, config, now)
+
+            for key in [key for key in self._entries if key not in current]:
+                del self._entries[key]
+
+    def add(
+        self,
+        config: Dict[str, Any],
+        now: Optional[float] = None,
+        immediate: bool = False,
+    ) -> None:
+        """
+        加入或更新单台交换机
+
+        Args:
+            config: 交换机配置（以ip为标识）
+            now: 当前时间，默认time.monotonic()
+            immediate: 新加入的交换机是否立即到期（之后按相位对齐），
+                否则首次轮询等到本周期内的相位时刻
+        """
+        key = config.get("ip")
+        if not key:
+            return
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._update_locked(entry, config, now)
+            else:
+                self._add_locked(key, config, now)
+                if immediate:
+                    # 基准到期时间退回上一周期，首次轮询后回到相位时刻
+                    entry = self._entries[key]
+                    entry.base_due -= entry.interval
+                    self._push_locked(entry, now)
+
+    def remove(self, key: str) -> None:
+        """移出单台交换机（堆中的旧条目在出堆时丢弃）"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _add_locked(self, key: str, config: Dict[str, Any], now: float) -> None:
+        """按相位偏移计算首次到期时间并入堆（调用方需持有锁）"""
+        interval = self.interval_for(config)
+        entry = _ScheduleEntry(key, config, interval, self.phase_of(key, interval))
+        self._entries[key] = entry
+        self._schedule_first_locked(entry, now)
+
+    def _update_locked(
+        self, entry: _ScheduleEntry, config: Dict[str, Any], now: float
+    ) -> None:
+        """更新配置，轮询间隔变化时按新间隔重新安排（调用方需持有锁）"""
+        entry.config = config
+        interval = self.interval_for(config)
+        if interval != entry.interval:
+            entry.interval = interval
+            entry.phase = self.phase_of(entry.key, interval)
+            self._schedule_first_locked(entry, now)
+
+    def _schedule_first_locked(self, entry: _ScheduleEntry, now: float) -> None:
+        """首次到期时间：当前周期内该相位对应的时刻（已过则取下一周期）"""
+        cycle_start = now - (now % entry.interval)
+        base_due = cycle_start + entry.phase
+        if base_due < now:
+            base_due += entry.interval
+        entry.base_due = base_due
+        self._push_locked(entry, base_due)
+
+    def _push_locked(self, entry: _ScheduleEntry, due: float) -> None:
+        """将条目按到期时间入堆（调用方需持有锁）"""
+        entry.version += 1
+        entry.due = due
+        heapq.heappush(self._heap, (due, entry.version, entry.key))
+
+    def pop_due(
+        self, now: Optional[float] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        取出所有已到期的交换机，并安排其下一次轮询
+
+        Args:
+            now: 当前时间，默认time.monotonic()
+
+        Returns:
+            [(交换机配置, 到期时间)]
+        """
+        now = now if now is not None else time.monotonic()
+        due_items = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due, version, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None or entry.version != version:
+                    continue
+                due_items.append((entry.config, due))
+                entry.dispatched += 1
+                self._reschedule_locked(entry, now)
+        return due_items
+
+    def _reschedule_locked(self, entry: _ScheduleEntry, now: float) -> None:
+        """计算下一周期的到期时间（落后超过一个周期时跳过错过的周期）"""
+        entry.base_due += entry.interval
+        if entry.base_due <= now:
+            missed = int((now - entry.base_due) // entry.interval) + 1
+            entry.base_due += missed * entry.interval
+            entry.skipped += missed
+        max_jitter = entry.interval * self.jitter_ratio
+        jitter = random.uniform(-max_jitter, max_jitter) if max_jitter else 0.0
+        self._push_locked(entry, max(now, entry.base_due + jitter))
+
+    def next_due_time(self) -> Optional[float]:
+        """获取最早的到期时间，没有调度项时返回None"""
+        with self._lock:
+            while self._heap:
+                due, version, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    return due
+                heapq.heappop(self._heap)
+        return None
+
+    def record_drift(self, key: str, drift: float) -> None:
+        """
+        记录一次调度漂移
+
+        Args:
+            key: 交换机标识
+            drift: 实际开始轮询时间 - 到期时间（秒）
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            drift = max(0.0, drift)
+            entry.last_drift = drift
+            entry.avg_drift += self.DRIFT_EWMA_ALPHA * (drift - entry.avg_drift)
+            entry.max_drift = max(entry.max_drift, drift)
+            if drift > self.late_threshold:
+                entry.late_count += 1
+
+    def record_skip(self, key: str) -> None:
+        """记录一次因上一次轮询未结束而跳过的周期"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.skipped += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_statistics(self, include_switches: bool = True) -> Dict[str, Any]:
+        """
+        获取调度统计信息
+
+        Args:
+            include_switches: 是否包含每台交换机的漂移详情
+
+        Returns:
+            调度统计字典
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+
+        stats: Dict[str, Any] = {
+            "scheduled_switches": len(entries),
+            "interval": self.interval,
+            "avg_drift": (
+                round(sum(e.avg_drift for e in entries) / len(entries), 3)
+                if entries
+                else 0.0
+            ),
+            "max_drift": round(max((e.max_drift for e in entries), default=0.0), 3),
+            "late_switches": sum(
+                1 for e in entries if e.avg_drift > self.late_threshold
+            ),
+            "skipped_cycles": sum(e.skipped for e in entries),
+        }
+        if include_switches:
+            stats["switches"] = {
+                e.key: {
+                    "interval": e.interval,
+                    "phase": round(e.phase, 3),
+                    "last_drift": round(e.last_drift, 3),
+                    "avg_drift": round(e.avg_drift, 3),
+                    "max_drift": round(e.max_drift, 3),
+                    "late_count": e.late_count,
+                    "skipped_cycles": e.skipped,
+                    "dispatched": e.dispatched,
+                }
+                for e in entries
+            }
+        return stats
+
+
+__all__ = ["PollScheduler"]
@@ -0,0 +1,702 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP多进程分片轮询 - 将SNMP轮询放到独立的工作进程中，避免与Tornado/TCP服务争用GIL
+
+- 主进程订阅交换机注册表，列表变化时按一致性哈希分片后下发给各工作进程
+- 每个工作进程运行自己的设备/接口轮询器（各自独立的事件循环和SNMP引擎）
+- 轮询结果通过结果队列回传主进程，由主进程统一广播和写入指标存储
+- 一致性哈希保证进程数变化时只有少量交换机迁移，速率基线和熔断状态基本保持
+- 工作进程意外退出时自动重启并重新下发分片
+- 按需轮询请求转发给交换机所在分片的工作进程，结果通过结果队列回传给请求方
+- 接口计数器基线回传主进程保存，交换机分配到工作进程时（启动、重新分片、进程重启）
+  随分片一起下发，新进程第一次轮询即可计算速率
+"""
+
+import bisect
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from src.database.switch_registry import SwitchRegistry
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 工作进程上报统计信息的间隔（秒）
+STATS_REPORT_INTERVAL = 5.0
+
+
+class ConsistentHashRing:
+    """
+    一致性哈希环
+
+    使用MD5作为哈希函数（与进程无关，不受PYTHONHASHSEED影响），
+    每个节点在环上放置多个虚拟节点以均衡负载。
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 128):
+        """
+        初始化哈希环
+
+        Args:
+            nodes: 节点列表
+            replicas: 每个节点的虚拟节点数
+        """
+        self.replicas = replicas
+        self._ring: List[int] = []
+        self._owners: Dict[int, Hashable] = {}
+        self._nodes: List[Hashable] = []
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def nodes(self) -> List[Hashable]:
+        return list(self._nodes)
+
+    def add_node(self, node: Hashable) -> None:
+        """加入节点"""
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            self._owners[point] = node
+            bisect.insort(self._ring, point)
+
+    def remove_node(self, node: Hashable) -> None:
+        """移除节点"""
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                index = bisect.bisect_left(self._ring, point)
+                if index < len(self._ring) and self._ring[index] == point:
+                    del self._ring[index]
+
+    def get_node(self, key: str) -> Optional[Hashable]:
+        """获取键所属的节点，环为空时返回None"""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._ring, self._hash(key)) % len(self._ring)
+        return self._owners[self._ring[index]]
+
+    def shard(
+        self, items: Iterable[Any], key_func: Callable[[Any], str]
+    ) -> Dict[Hashable, List[Any]]:
+        """
+        将元素按键分配到各节点
+
+        Args:
+            items: 元素列表
+            key_func: 取元素键的函数
+
+        Returns:
+            {节点: [元素]}，每个节点都有对应的列表（可能为空）
+        """
+        shards: Dict[Hashable, List[Any]] = {node: [] for node in self._nodes}
+        for item in items:
+            node = self.get_node(key_func(item))
+            if node is not None:
+                shards[node].append(item)
+        return shards
+
+
+def _error_result(switch_config: Dict[str, Any], error: str) -> Dict[str, Any]:
+    """构造按需轮询失败时返回的结果"""
+    return {
+        "type": "error",
+        "ip": switch_config.get("ip"),
+        "switch_id": switch_config.get("id"),
+        "error": error,
+        "poll_time": time.time(),
+    }
+
+
+def _forward_on_demand(
+    poller,
+    poll_type: str,
+    switch_config: Dict[str, Any],
+    shard_index: int,
+    result_queue,
+) -> None:
+    """在工作进程中发起按需轮询，完成后将结果回传主进程"""
+    ip = switch_config.get("ip")
+
+    def reply(result: Dict[str, Any]):
+        result_queue.put(("poll_result", shard_index, poll_type, (ip, result)))
+
+    def on_done(future: concurrent.futures.Future):
+        if future.cancelled():
+            reply(_error_result(switch_config, "按需轮询已取消"))
+        elif future.exception() is not None:
+            reply(_error_result(switch_config, f"按需轮询失败: {future.exception()}"))
+        else:
+            reply(future.result())
+
+    try:
+        poller.request_poll(switch_config).add_done_callback(on_done)
+    except RuntimeError as e:
+        reply(_error_result(switch_config, str(e)))
+
+
+class _ShardSwitchSource:
+    """工作进程内的交换机来源，代替SwitchManager向轮询器提供本分片的交换机注册表"""
+
+    def __init__(self):
+        self.registry = SwitchRegistry()
+
+    def update(self, switches: List[Dict[str, Any]]) -> None:
+        """替换本分片的交换机列表，按差异向轮询器发布新增/修改/删除事件"""
+        self.registry.replace(switches)
+
+    def get_all_switches(self) -> List[Dict[str, Any]]:
+        return self.registry.get_all()
+
+
+class _ShardStateSink:
+    """工作进程内的轮询状态存储，代替PollStateManager将计数器基线回传主进程
+
+    轮询结果已经通过结果队列回传，由主进程记录；计数器基线由主进程随分片下发。
+    """
+
+    def __init__(self, shard_index: int, result_queue):
+        self.shard_index = shard_index
+        self.result_queue = result_queue
+
+    def record_result(self, poll_type: str, result: Dict[str, Any]) -> bool:
+        return False
+
+    def record_baselines(self, switch_id: Any, baselines: Dict[str, Any]) -> bool:
+        self.result_queue.put(
+            ("baselines", self.shard_index, "interface", (switch_id, baselines))
+        )
+        return True
+
+    def get_baselines(self, switch_ids=None) -> Dict[int, Dict[str, Any]]:
+        return {}
+
+    def flush(self) -> int:
+        return 0
+
+
+def _shard_process_main(
+    shard_index: int,
+    inbox,
+    result_queue,
+    device_options: Dict[str, Any],
+    interface_options: Dict[str, Any],
+):
+    """
+    工作进程入口：运行本分片的设备/接口轮询器，直到收到停止指令
+
+    Args:
+        shard_index: 分片编号
+        inbox: 接收主进程指令的队列（("switches", 列表)、("poll", (轮询类型, 交换机配置))、
+            ("baselines", {交换机ID: 计数器基线}) 或 ("stop", None)）
+        result_queue: 回传轮询结果和统计信息的队列
+        device_options: 设备轮询器参数
+        interface_options: 接口轮询器参数
+    """
+    from src.snmp.unified_poller import SNMPPoller
+
+    source = _ShardSwitchSource()
+
+    def sink(poll_type: str, result: Dict[str, Any]):
+        result_queue.put(("result", shard_index, poll_type, result))
+
+    pollers = {
+        "device": SNMPPoller(
+            source, poll_type="device", result_sink=sink, **device_options
+        ),
+        "interface": SNMPPoller(
+            source,
+            poll_type="interface",
+            result_sink=sink,
+            poll_state_manager=_ShardStateSink(shard_index, result_queue),
+            **interface_options,
+        ),
+    }
+
+    try:
+        # 先接收首个分片再启动轮询器，首批交换机按相位错开而不是同时立即轮询
+        command, payload = inbox.get()
+        while command in ("poll", "baselines"):
+            if command == "baselines":
+                pollers["interface"].restore_baselines(payload)
+                command, payload = inbox.get()
+                continue
+            poll_type, switch_config = payload
+            result_queue.put(
+                (
+                    "poll_result",
+                    shard_index,
+                    poll_type,
+                    (
+                        switch_config.get("ip"),
+                        _error_result(switch_config, "轮询工作进程尚未就绪"),
+                    ),
+                )
+            )
+            command, payload = inbox.get()
+        if command == "stop":
+            return
+        if command == "switches":
+            source.update(payload)
+
+        for poller in pollers.values():
+            poller.start()
+
+        while True:
+            try:
+                command, payload = inbox.get(timeout=STATS_REPORT_INTERVAL)
+            except queue.Empty:
+                command, payload = None, None
+
+            if command == "stop":
+                break
+            if command == "switches":
+                source.update(payload)
+            elif command == "baselines":
+                pollers["interface"].restore_baselines(payload)
+            elif command == "poll":
+                poll_type, switch_config = payload
+                _forward_on_demand(
+                    pollers[poll_type],
+                    poll_type,
+                    switch_config,
+                    shard_index,
+                    result_queue,
+                )
+                continue
+
+            stats = {
+                f"{poll_type}_poller": poller.get_statistics()
+                for poll_type, poller in pollers.items()
+            }
+            stats["switches"] = len(source.get_all_switches())
+            result_queue.put(("stats", shard_index, None, stats))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for poller in pollers.values():
+            poller.stop()
+
+
+class _ShardWorker:
+    """主进程中对单个工作进程的记录"""
+
+    __slots__ = ("index", "process", "inbox", "assigned", "stats", "restarts")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.inbox = None
+        self.assigned: Optional[List[Dict[str, Any]]] = None
+        self.stats: Dict[str, Any] = {}
+        self.restarts = 0
+
+
+class ShardedPollerPool:
+    """
+    多进程分片轮询池
+
+    主进程中运行两个线程：分片下发线程（同步交换机列表、监控工作进程）
+    和结果处理线程（广播轮询结果、写入指标存储）。
+    """
+
+    # 轮询统计中需要跨分片累加的字段
+    SUMMED_FIELDS = (
+        "total_polls",
+        "success_count",
+        "error_count",
+        "queue_size",
+        "active_workers",
+        "current_concurrency",
+        "failed_devices",
+        "highly_failed_devices",
+        "cached_devices",
+        "on_demand_requests",
+        "on_demand_deduplicated",
+        "on_demand_rejected",
+    )
+
+    def __init__(
+        self,
+        switch_manager,
+        processes: int,
+        device_options: Optional[Dict[str, Any]] = None,
+        interface_options: Optional[Dict[str, Any]] = None,
+        metrics_manager=None,
+        poll_state_manager=None,
+        sync_interval: float = 30.0,
+        result_handler: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ):
+        """
+        初始化多进程分片轮询池
+
+        Args:
+            switch_manager: 交换机管理器实例（主进程中订阅其交换机注册表）
+            processes: 工作进程数
+            device_options: 设备轮询器参数（poll_interval、min_workers等）
+            interface_options: 接口轮询器参数
+            metrics_manager: 指标时序存储管理器（可选），在主进程中写入
+            poll_state_manager: 轮询状态存储（可选），在主进程中保存最后一次轮询结果
+                和计数器基线，并随分片向工作进程下发计数器基线
+            sync_interval: 按注册表重新核对全部分片的间隔（秒），
+                交换机变化时会立即下发，不等待该间隔
+            result_handler: 轮询结果处理函数（可选），默认通过WebSocket广播
+        """
+        self.switch_manager = switch_manager
+        self.processes = max(1, processes)
+        self.device_options = dict(device_options or {})
+        self.interface_options = dict(interface_options or {})
+        self.metrics_manager = metrics_manager
+        self.poll_state_manager = poll_state_manager
+        self.sync_interval = sync_interval
+        self.result_handler = result_handler
+
+        self._ring = ConsistentHashRing(range(self.processes))
+        self._workers = [_ShardWorker(i) for i in range(self.processes)]
+        # 使用spawn启动工作进程，避免在多线程的主进程中fork
+        self._context = multiprocessing.get_context("spawn")
+        self._result_queue = None
+
+        self._running = False
+        self._dispatch_thread: Optional[threading.Thread] = None
+        # 交换机注册表变化时唤醒分发线程
+        self._switches_changed = threading.Event()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._result_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._results_received = 0
+        self._result_errors = 0
+        # 等待工作进程回传的按需轮询 {(轮询类型, ip): Future}
+        self._pending_polls: Dict[tuple, concurrent.futures.Future] = {}
+
+    def start(self):
+        """启动工作进程和主进程中的分发/结果处理线程"""
+        if self._running:
+            logger.warning("SNMP多进程轮询池已在运行中")
+            return
+
+        self._running = True
+        self._result_queue = self._context.Queue()
+        self._unsubscribe = self.switch_manager.registry.subscribe(
+            lambda event, switch: self._switches_changed.set()
+        )
+        for worker in self._workers:
+            self._start_worker(worker)
+
+        self._result_thread = threading.Thread(
+            target=self._result_loop, name="snmp-pool-results", daemon=True
+        )
+        self._result_thread.start()
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop, name="snmp-pool-dispatch", daemon=True
+        )
+        self._dispatch_thread.start()
+        _set_active_pool(self)
+        logger.info(f"SNMP多进程轮询池已启动，工作进程数: {self.processes}")
+
+    def stop(self, timeout: float = 15.0):
+        """停止所有工作进程，处理完剩余结果"""
+        if not self._running:
+            return
+
+        logger.info("正在停止SNMP多进程轮询池...")
+        self._running = False
+        _set_active_pool(None)
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self._switches_changed.set()
+
+        for worker in self._workers:
+            if worker.inbox is not None:
+                try:
+                    worker.inbox.put(("stop", None))
+                except Exception as e:
+                    logger.debug(f"向工作进程 {worker.index} 发送停止指令失败: {e}")
+
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            process = worker.process
+            if process is None:
+                continue
+            process.join(max(0.1, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"工作进程 {worker.index} 未能按时退出，强制终止")
+                process.terminate()
+                process.join(1)
+
+        for thread in (self._dispatch_thread, self._result_thread):
+            if thread is not None and thread.is_alive():
+                thread.join(timeout=5)
+
+        if self.metrics_manager is not None:
+            self.metrics_manager.flush()
+        if self.poll_state_manager is not None:
+            self.poll_state_manager.flush()
+
+        self._fail_pending_polls("SNMP多进程轮询池已停止")
+        logger.info("SNMP多进程轮询池已停止")
+
+    def _start_worker(self, worker: _ShardWorker):
+        """启动（或重启）单个工作进程"""
+        worker.inbox = self._context.Queue()
+        worker.assigned = None
+        worker.process = self._context.Process(
+            target=_shard_process_main,
+            args=(
+                worker.index,
+                worker.inbox,
+                self._result_queue,
+                self.device_options,
+                self.interface_options,
+            ),
+            name=f"snmp-poller-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        logger.debug(
+            f"SNMP轮询工作进程 {worker.index} 已启动: pid={worker.process.pid}"
+        )
+
+    def _dispatch_loop(self):
+        """交换机注册表变化时下发分片，同时重启意外退出的工作进程"""
+        last_sync = 0.0
+        while self._running:
+            try:
+                for worker in self._workers:
+                    if worker.process is not None and not worker.process.is_alive():
+                        logger.warning(
+                            f"SNMP轮询工作进程 {worker.index} 已退出"
+                            f"(exitcode={worker.process.exitcode})，正在重启"
+                        )
+                        worker.restarts += 1
+                        self._fail_pending_polls(
+                            "轮询工作进程已退出", shard_index=worker.index
+                        )
+                        self._start_worker(worker)
+                        last_sync = 0.0
+
+                now = time.monotonic()
+                changed = self._switches_changed.is_set()
+                if changed or now - last_sync >= self.sync_interval:
+                    self._switches_changed.clear()
+                    self._dispatch_switches(self.switch_manager.registry.get_all())
+                    last_sync = now
+            except Exception as e:
+                logger.error(f"下发SNMP轮询分片出错: {e}", exc_info=True)
+            self._switches_changed.wait(1.0)
+
+    def _dispatch_switches(self, switches: List[Dict[str, Any]]):
+        """按一致性哈希分片，只向分片有变化的工作进程下发"""
+        shards = self._ring.shard(
+            (s for s in switches if s.get("ip")), lambda s: s["ip"]
+        )
+        for worker in self._workers:
+            assigned = shards.get(worker.index, [])
+            if assigned == worker.assigned:
+                continue
+            if self.poll_state_manager is not None:
+                # 新分配到该进程的交换机先下发计数器基线
+                previous = {s.get("id") for s in worker.assigned or []}
+                baselines = self.poll_state_manager.get_baselines(
+                    s["id"]
+                    for s in assigned
+                    if s.get("id") is not None and s.get("id") not in previous
+                )
+                if baselines:
+                    worker.inbox.put(("baselines", baselines))
+            worker.inbox.put(("switches", assigned))
+            worker.assigned = assigned
+            logger.debug(
+                f"向SNMP轮询工作进程 {worker.index} 下发 {len(assigned)} 台交换机"
+            )
+
+    def _result_loop(self):
+        """处理工作进程回传的轮询结果和统计信息"""
+        while self._running or not self._result_queue.empty():
+            try:
+                kind, shard_index, poll_type, payload = self._result_queue.get(
+                    timeout=1.0
+                )
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            if kind == "stats":
+                with self._lock:
+                    self._workers[shard_index].stats = payload
+                continue
+            if kind == "baselines":
+                if self.poll_state_manager is not None:
+                    self.poll_state_manager.record_baselines(*payload)
+                continue
+            if kind == "poll_result":
+                ip, result = payload
+                with self._lock:
+                    future = self._pending_polls.pop((poll_type, ip), None)
+                if future is not None and not future.done():
+                    future.set_result(result)
+                continue
+
+            try:
+                self._handle_result(poll_type, payload)
+                with self._lock:
+                    self._results_received += 1
+            except Exception as e:
+                with self._lock:
+                    self._result_errors += 1
+                logger.error(f"处理SNMP轮询结果失败: {e}")
+
+    def _handle_result(self, poll_type: str, result: Dict[str, Any]):
+        """广播单个轮询结果并写入指标存储"""
+        from src.snmp.unified_poller import broadcast_poll_result, record_poll_metrics
+
+        if self.metrics_manager is not None:
+            record_poll_metrics(self.metrics_manager, poll_type, result)
+        if self.poll_state_manager is not None:
+            self.poll_state_manager.record_result(poll_type, result)
+        if self.result_handler is not None:
+            self.result_handler(poll_type, result)
+        else:
+            broadcast_poll_result(poll_type, result)
+
+    def request_poll(
+        self, switch_config: Dict[str, Any], poll_type: str
+    ) -> concurrent.futures.Future:
+        """
+        按需立即轮询单台交换机（转发给交换机所在分片的工作进程）
+
+        同一交换机、同一轮询类型的并发请求共享同一个Future。
+
+        Args:
+            switch_config: 交换机配置
+            poll_type: 轮询类型（"device" 或 "interface"）
+
+        Returns:
+            完成时结果为轮询结果字典的Future
+
+        Raises:
+            RuntimeError: 轮询池未运行时抛出
+        """
+        ip = switch_config.get("ip")
+        shard_index = self._ring.get_node(ip) if ip else None
+        if not self._running or shard_index is None:
+            raise RuntimeError("SNMP多进程轮询池未运行")
+
+        key = (poll_type, ip)
+        with self._lock:
+            future = self._pending_polls.get(key)
+            if future is not None:
+                return future
+            future = concurrent.futures.Future()
+            self._pending_polls[key] = future
+
+        try:
+            self._workers[shard_index].inbox.put(("poll", (poll_type, switch_config)))
+        except Exception as e:
+            with self._lock:
+                self._pending_polls.pop(key, None)
+            raise RuntimeError(f"转发按需轮询请求失败: {e}") from e
+        return future
+
+    def _fail_pending_polls(
+        self, error: str, shard_index: Optional[int] = None
+    ) -> None:
+        """以错误结果结束等待中的按需轮询（指定分片时只处理该分片的交换机）"""
+        with self._lock:
+            keys = [
+                key
+                for key in self._pending_polls
+                if shard_index is None or self._ring.get_node(key[1]) == shard_index
+            ]
+            futures = [(key, self._pending_polls.pop(key)) for key in keys]
+        for (_, ip), future in futures:
+            if not future.done():
+                future.set_result(_error_result({"ip": ip}, error))
+
+    def get_shard_of(self, ip: str) -> Optional[int]:
+        """获取交换机所属的分片编号"""
+        return self._ring.get_node(ip)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取多进程轮询统计信息
+
+        Returns:
+            包含汇总后的设备/接口轮询统计和每个工作进程详情的字典
+        """
+        with self._lock:
+            shards = []
+            for worker in self._workers:
+                process = worker.process
+                shards.append(
+                    {
+                        "index": worker.index,
+                        "pid": process.pid if process is not None else None,
+                        "alive": process is not None and process.is_alive(),
+                        "restarts": worker.restarts,
+                        "switches": len(worker.assigned or []),
+                        "device_poller": worker.stats.get("device_poller", {}),
+                        "interface_poller": worker.stats.get("interface_poller", {}),
+                    }
+                )
+            stats: Dict[str, Any] = {
+                "processes": self.processes,
+                "results_received": self._results_received,
+                "result_errors": self._result_errors,
+                "shards": shards,
+            }
+
+        for poller_key in ("device_poller", "interface_poller"):
+            stats[poller_key] = self._sum_shard_stats(
+                [shard[poller_key] for shard in shards]
+            )
+        return stats
+
+    def _sum_shard_stats(self, shard_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """累加各分片的轮询统计"""
+        summary: Dict[str, Any] = {field: 0 for field in self.SUMMED_FIELDS}
+        for stats in shard_stats:
+            for field in self.SUMMED_FIELDS:
+                summary[field] += stats.get(field, 0) or 0
+        return summary
+
+
+# 运行中的多进程轮询池（按需轮询请求通过它转发给工作进程）
+_active_pool: Optional[ShardedPollerPool] = None
+
+
+def _set_active_pool(pool: Optional[ShardedPollerPool]) -> None:
+    global _active_pool
+    _active_pool = pool
+
+
+def get_active_pool() -> Optional[ShardedPollerPool]:
+    """获取运行中的多进程轮询池，未以多进程模式运行时返回None"""
+    return _active_pool
+
+
+__all__ = ["ConsistentHashRing", "ShardedPollerPool", "get_active_pool"]
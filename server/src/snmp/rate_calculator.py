@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+接口速率计算器 - 基于相邻两次计数器采样计算接口速率
+
+按 (交换机, ifIndex) 保存上一次采样，计算bps/pps/错误率/丢弃率/带宽利用率：
+- 采样间隔优先使用设备sysUpTime差值（设备侧时间），否则使用本地时间差
+- 32位计数器回绕按 2^32 取模处理；64位计数器减小视为计数器不连续，丢弃本次速率
+- sysUpTime减小视为设备重启，清空该交换机的全部基线；sysUpTime（32位，约497天）回绕时
+  按 2^32 取模计算采样间隔，不视为重启
+- 速率超过接口带宽（含余量）时视为多次回绕或计数器重置，丢弃本次速率
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 32位计数器取模值（sysUpTime的TimeTicks同样为32位）
+COUNTER32_MODULUS = 2**32
+
+# 参与速率计算的计数器字段: 计数器名 -> 输出速率字段名
+RATE_FIELDS = {
+    "in_octets": "in_bps",
+    "out_octets": "out_bps",
+    "in_pkts": "in_pps",
+    "out_pkts": "out_pps",
+    "in_errors": "in_errors_ps",
+    "out_errors": "out_errors_ps",
+    "in_discards": "in_discards_ps",
+    "out_discards": "out_discards_ps",
+}
+
+# ifTable中没有64位版本的计数器（错误/丢弃始终为Counter32）
+COUNTER32_ONLY_FIELDS = {"in_errors", "out_errors", "in_discards", "out_discards"}
+
+# 速率允许超出接口带宽的比例（统计误差余量）
+SPEED_TOLERANCE = 1.1
+
+
+class _CounterSample:
+    """单个接口的一次计数器采样"""
+
+    __slots__ = ("timestamp", "sys_uptime", "bits", "counters")
+
+    def __init__(
+        self,
+        timestamp: float,
+        sys_uptime: Optional[int],
+        bits: int,
+        counters: Dict[str, int],
+    ):
+        self.timestamp = timestamp
+        self.sys_uptime = sys_uptime
+        self.bits = bits
+        self.counters = counters
+
+
+class InterfaceRateCalculator:
+    """
+    接口速率计算器（线程安全）
+
+    每次轮询调用 update() 传入接口列表（含 counters 和 counter_bits 字段），
+    返回附加了速率字段、去掉原始计数器的接口列表。
+    """
+
+    def __init__(self, max_sample_age: float = 3600.0):
+        """
+        初始化速率计算器
+
+        Args:
+            max_sample_age: 采样基线的最长保留时间（秒），超过后不再用于计算速率
+        """
+        self.max_sample_age = max_sample_age
+        self._samples: Dict[Tuple[Hashable, int], _CounterSample] = {}
+        self._uptimes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        switch_key: Hashable,
+        interfaces: List[Dict[str, Any]],
+        sys_uptime: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        记录一次接口计数器采样并计算速率
+
+        Args:
+            switch_key: 交换机标识（交换机ID或IP）
+            interfaces: 接口列表，每项包含 index、counters、counter_bits，可选 speed
+            sys_uptime: 设备sysUpTime（百分之一秒），用于计算采样间隔和检测重启
+            timestamp: 采样时间戳，默认当前时间
+
+        Returns:
+            附加速率字段的接口列表（不含原始计数器）
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        results = []
+        with self._lock:
+            if self._detect_reboot(switch_key, sys_uptime):
+                logger.info(f"检测到交换机 {switch_key} sysUpTime回退，重置速率基线")
+                self._forget_locked(switch_key)
+            if sys_uptime is not None:
+                self._uptimes[switch_key] = sys_uptime
+
+            for interface in interfaces:
+                result = {
+                    k: v
+                    for k, v in interface.items()
+                    if k not in ("counters", "counter_bits")
+                }
+                counters = interface.get("counters")
+                if_index = interface.get("index")
+                if not counters or if_index is None:
+                    results.append(result)
+                    continue
+
+                bits = interface.get("counter_bits", 32)
+                key = (switch_key, if_index)
+                current = _CounterSample(timestamp, sys_uptime, bits, counters)
+                previous = self._samples.get(key)
+                self._samples[key] = current
+
+                rates = self._compute_rates(
+                    previous, current, interface.get("speed") or 0
+                )
+                if rates is not None:
+                    result.update(rates)
+                result["counter_bits"] = bits
+                results.append(result)
+
+        return results
+
+    @staticmethod
+    def baselines_of(
+        interfaces: List[Dict[str, Any]],
+        sys_uptime: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        将一次计数器采样转换为可JSON序列化的采样基线（用于持久化，重启后恢复）
+
+        Args:
+            interfaces: 接口列表（与update()的参数相同）
+            sys_uptime: 设备sysUpTime（百分之一秒）
+            timestamp: 采样时间戳，默认当前时间
+
+        Returns:
+            {"sys_uptime": ..., "interfaces": [[ifIndex, 时间戳, sysUpTime, 位数, 计数器], ...]}
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        return {
+            "sys_uptime": sys_uptime,
+            "interfaces": [
+                [
+                    interface["index"],
+                    timestamp,
+                    sys_uptime,
+                    interface.get("counter_bits", 32),
+                    interface["counters"],
+                ]
+                for interface in interfaces
+                if interface.get("counters") and interface.get("index") is not None
+            ],
+        }
+
+    def restore(
+        self,
+        switch_key: Hashable,
+        baselines: Dict[str, Any],
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        恢复持久化的采样基线（过期的采样和已有更新采样的接口被忽略）
+
+        Args:
+            switch_key: 交换机标识（交换机ID或IP）
+            baselines: baselines_of()生成的采样基线
+            now: 当前时间，默认time.time()
+
+        Returns:
+            恢复的接口采样数量
+        """
+        if now is None:
+            now = time.time()
+        restored = 0
+        with self._lock:
+            for if_index, timestamp, sys_uptime, bits, counters in baselines.get(
+                "interfaces", []
+            ):
+                if now - timestamp > self.max_sample_age:
+                    continue
+                key = (switch_key, if_index)
+                existing = self._samples.get(key)
+                if existing is not None and existing.timestamp >= timestamp:
+                    continue
+                self._samples[key] = _CounterSample(
+                    timestamp, sys_uptime, bits, dict(counters)
+                )
+                restored += 1
+            sys_uptime = baselines.get("sys_uptime")
+            if restored and sys_uptime is not None:
+                self._uptimes.setdefault(switch_key, sys_uptime)
+        return restored
+
+    def forget(self, switch_key: Hashable) -> None:
+        """清除指定交换机的全部采样基线"""
+        with self._lock:
+            self._forget_locked(switch_key)
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """
+        清理过期的采样基线
+
+        Returns:
+            清理的采样数量
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            expired = [
+                key
+                for key, sample in self._samples.items()
+                if now - sample.timestamp > self.max_sample_age
+            ]
+            for key in expired:
+                del self._samples[key]
+            live_switches = {key[0] for key in self._samples}
+            for switch_key in list(self._uptimes):
+                if switch_key not in live_switches:
+                    del self._uptimes[switch_key]
+        return len(expired)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取速率计算器统计信息"""
+        with self._lock:
+            return {
+                "tracked_interfaces": len(self._samples),
+                "tracked_switches": len(self._uptimes),
+            }
+
+    def _forget_locked(self, switch_key: Hashable) -> None:
+        """清除指定交换机的采样基线（调用方需持有锁）"""
+        for key in [key for key in self._samples if key[0] == switch_key]:
+            del self._samples[key]
+        self._uptimes.pop(switch_key, None)
+
+    def _detect_reboot(self, switch_key: Hashable, sys_uptime: Optional[int]) -> bool:
+        """
+        sysUpTime小于上一次采样时视为设备重启
+
+        上一次采样接近 2^32 而本次很小（按 2^32 取模的间隔不超过基线保留时间）时
+        视为sysUpTime回绕，不是重启。
+        """
+        if sys_uptime is None:
+            return False
+        previous = self._uptimes.get(switch_key)
+        if previous is None or sys_uptime >= previous:
+            return False
+        elapsed = (sys_uptime - previous) % COUNTER32_MODULUS
+        return elapsed > self.max_sample_age * 100
+
+    def _compute_rates(
+        self,
+        previous: Optional[_CounterSample],
+        current: _CounterSample,
+        speed_bps: int,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        根据相邻两次采样计算速率
+
+        Returns:
+            速率字典；无基线、间隔无效或计数器不连续时返回None
+        """
+        if previous is None or previous.bits != current.bits:
+            return None
+        if current.timestamp - previous.timestamp > self.max_sample_age:
+            return None
+
+        if current.sys_uptime is not None and previous.sys_uptime is not None:
+            # sysUpTime回绕按 2^32 取模（重启时基线已清空，不会到达这里）
+            interval = (
+                (current.sys_uptime - previous.sys_uptime) % COUNTER32_MODULUS
+            ) / 100.0
+        else:
+            interval = current.timestamp - previous.timestamp
+        if interval <= 0:
+            return None
+
+        rates: Dict[str, Any] = {"rate_interval": round(interval, 2)}
+        for counter, field in RATE_FIELDS.items():
+            if counter not in current.counters or counter not in previous.counters:
+                continue
+            bits = 32 if counter in COUNTER32_ONLY_FIELDS else current.bits
+            delta = self.counter_delta(
+                previous.counters[counter], current.counters[counter], bits
+            )
+            if delta is None:
+                logger.debug(f"计数器 {counter} 不连续，丢弃本次速率")
+                return None
+            rate = delta / interval
+            if field.endswith("_bps"):
+                rate *= 8
+            rates[field] = round(rate, 2)
+
+        if speed_bps > 0:
+            limit = speed_bps * SPEED_TOLERANCE
+            for direction in ("in", "out"):
+                bps = rates.get(f"{direction}_bps")
+                if bps is None:
+                    continue
+                if bps > limit:
+                    # 32位计数器在一个间隔内多次回绕或计数器被清零
+                    logger.debug(f"速率 {bps:.0f}bps 超过接口带宽，丢弃本次速率")
+                    return None
+                rates[f"{direction}_utilization"] = round(bps * 100.0 / speed_bps, 2)
+
+        return rates
+
+    @staticmethod
+    def counter_delta(previous: int, current: int, bits: int) -> Optional[int]:
+        """
+        计算计数器增量（处理32位回绕）
+
+        Args:
+            previous: 上一次计数值
+            current: 本次计数值
+            bits: 计数器位宽（32或64）
+
+        Returns:
+            增量；64位计数器减小时返回None（视为不连续）
+        """
+        if current >= previous:
+            return current - previous
+        if bits == 32:
+            return current + COUNTER32_MODULUS - previous
+        return None
+
+
+__all__ = ["InterfaceRateCalculator", "RATE_FIELDS"]
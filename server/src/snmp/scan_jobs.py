@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+网络扫描任务 - 可流式推送、可取消、可恢复的SNMP网段扫描
+
+- 所有扫描任务运行在同一个后台线程的事件循环中，最多 SNMP_SCAN_MAX_JOBS 个任务同时执行，
+  其余任务排队；所有任务的探测报文共享子网扫描的全局限速器（SNMP_SWEEP_RATE）
+- 网段按地址块（IPv4默认/24）记录进度：未完成的地址块合并为一次扫描（共用一个套接字，
+  最多 SWEEP_WINDOW_HOSTS 个主机），某个地址块的主机全部响应或探测超时后立即写入该块的检查点，
+  服务重启后未结束的任务只扫描未完成的地址块
+- 每发现一个设备立即通过WebSocket推送（scanTask / scan_device），
+  不需要等待整个网段扫描结束
+"""
+
+import asyncio
+import ipaddress
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.logger import logger
+from src.core.config import (
+    SNMP_SCAN_BLOCK_PREFIX,
+    SNMP_SCAN_MAX_ADDRESSES,
+    SNMP_SCAN_MAX_JOBS,
+)
+from src.database.managers.scan_job_manager import ScanJobManager
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.native_client import close_loop_native_client
+
+# IPv6网段的地址块前缀长度
+IPV6_BLOCK_PREFIX = 120
+
+# 合并为一次扫描的最大主机数（限制主机列表的内存占用）
+SWEEP_WINDOW_HOSTS = 2**18
+
+# 任务参数中不对外返回的字段
+SECRET_PARAMS = ("auth_key", "priv_key")
+
+
+def broadcast_scan_event(event: str, task_id: Optional[str], **data: Any) -> None:
+    """通过WebSocket广播扫描任务事件"""
+    from src.core.state_manager import state_manager
+
+    state_manager.broadcast_message(
+        {"type": "scanTask", "data": {"task_id": task_id, "event": event, **data}}
+    )
+
+
+def split_blocks(
+    network: str, block_prefix: int = SNMP_SCAN_BLOCK_PREFIX
+) -> List[ipaddress._BaseNetwork]:
+    """
+    将网段拆分为地址块
+
+    Args:
+        network: 网段（CIDR）
+        block_prefix: IPv4地址块前缀长度（IPv6使用IPV6_BLOCK_PREFIX）
+
+    Raises:
+        ValueError: 网段格式错误或地址数超过 SNMP_SCAN_MAX_ADDRESSES
+    """
+    network_obj = ipaddress.ip_network(network, strict=False)
+    if network_obj.num_addresses > SNMP_SCAN_MAX_ADDRESSES:
+        raise ValueError(
+            f"网段 {network} 过大（{network_obj.num_addresses} 个地址），"
+            f"最多 {SNMP_SCAN_MAX_ADDRESSES} 个地址"
+        )
+    prefix = block_prefix if network_obj.version == 4 else IPV6_BLOCK_PREFIX
+    if network_obj.prefixlen >= prefix:
+        return [network_obj]
+    return list(network_obj.subnets(new_prefix=prefix))
+
+
+def block_hosts(
+    network: ipaddress._BaseNetwork, block: ipaddress._BaseNetwork
+) -> List[str]:
+    """地址块中属于网段主机地址的部分（与 network.hosts() 的取舍一致）"""
+    if block == network:
+        return [str(ip) for ip in network.hosts()]
+    excluded = {network.network_address}
+    if network.version == 4:
+        excluded.add(network.broadcast_address)
+    return [str(ip) for ip in block if ip not in excluded]
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉认证密钥后的任务信息"""
+    params = {
+        key: value for key, value in job["params"].items() if key not in SECRET_PARAMS
+    }
+    return {**job, "params": params}
+
+
+class ScanJobRunner:
+    """
+    网络扫描任务执行器（进程内单例，见 get_scan_job_runner）
+
+    Args:
+        job_store: 扫描任务持久化管理器
+        max_jobs: 同时执行的最大任务数
+        block_prefix: IPv4地址块前缀长度
+        broadcast: 事件广播函数，签名同 broadcast_scan_event
+        snmp_manager: 执行扫描的SNMPManager，默认在第一次使用时创建
+    """
+
+    def __init__(
+        self,
+        job_store: ScanJobManager,
+        max_jobs: int = SNMP_SCAN_MAX_JOBS,
+        block_prefix: int = SNMP_SCAN_BLOCK_PREFIX,
+        broadcast: Optional[Callable[..., None]] = None,
+        snmp_manager=None,
+    ):
+        self.job_store = job_store
+        self.max_jobs = max_jobs
+        self.block_prefix = block_prefix
+        self._broadcast = broadcast or broadcast_scan_event
+        self._snmp_manager = snmp_manager
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    # -------- 事件循环线程 --------
+
+    def start(self) -> None:
+        """启动后台事件循环线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._loop = asyncio.new_event_loop()
+            self._semaphore = asyncio.Semaphore(self.max_jobs)
+            self._thread = threading.Thread(
+                target=self._run_loop, name="ScanJobRunner", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"网络扫描任务执行器已启动（最多 {self.max_jobs} 个并发任务）")
+
+    def _run_loop(self) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            close_loop_engine(loop)
+            close_loop_native_client(loop)
+            loop.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        停止执行器
+
+        正在执行和排队的任务保持未结束状态，下次启动时由 resume_interrupted() 恢复。
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._stopping = True
+
+        async def cancel_all():
+            tasks = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"停止扫描任务时出错: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        logger.info("网络扫描任务执行器已停止")
+
+    def _schedule(self, job_id: str) -> None:
+        """在后台事件循环中创建任务"""
+        self.start()
+
+        def create_task():
+            if job_id in self._tasks:
+                return
+            task = self._loop.create_task(self._run_job(job_id))
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+        self._loop.call_soon_threadsafe(create_task)
+
+    def is_active(self, job_id: str) -> bool:
+        """任务是否正在执行或排队"""
+        return job_id in self._tasks
+
+    # -------- 任务管理 --------
+
+    def submit(
+        self, network: str, version: str, params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        创建并排队执行扫描任务
+
+        Args:
+            network: 扫描网段（CIDR）
+            version: SNMP版本 (v1, v2c, v3)
+            params: v1/v2c为 {"communities": [...]}，v3为认证参数
+
+        Returns:
+            任务信息（不含认证密钥）
+
+        Raises:
+            ValueError: 网段或版本无效
+        """
+        if version not in ("v1", "v2c", "v3"):
+            raise ValueError(f"不支持的SNMP版本: {version}")
+        blocks = split_blocks(network, self.block_prefix)
+        job_id = str(uuid.uuid4())
+        job = self.job_store.create_job(job_id, network, version, params, len(blocks))
+        self._schedule(job_id)
+        logger.info(
+            f"创建扫描任务 {job_id}: {network} {version}，{len(blocks)} 个地址块"
+        )
+        return public_job(job)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消扫描任务
+
+        Returns:
+            任务存在且尚未结束时返回True
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+            return True
+
+        job = self.job_store.get_job(job_id)
+        if job is None or job["status"] not in ScanJobManager.UNFINISHED_STATUSES:
+            return False
+        # 尚未进入事件循环的任务：直接标记为已取消，任务开始时会检查状态并退出
+        self.job_store.update_job_status(job_id, ScanJobManager.STATUS_CANCELLED)
+        self._broadcast("scan_cancelled", job_id)
+        return True
+
+    def resume(self, job_id: str) -> bool:
+        """
+        恢复已取消、失败或中断的扫描任务（跳过已完成的地址块）
+
+        Returns:
+            任务已重新排队时返回True
+        """
+        job = self.job_store.get_job(job_id)
+        if (
+            job is None
+            or job["status"] == ScanJobManager.STATUS_COMPLETED
+            or self.is_active(job_id)
+        ):
+            return False
+        self.job_store.update_job_status(job_id, ScanJobManager.STATUS_PENDING)
+        self._schedule(job_id)
+        return True
+
+    def resume_interrupted(self) -> List[str]:
+        """恢复服务重启前未结束的扫描任务，返回恢复的任务ID"""
+        resumed = []
+        for job in self.job_store.get_unfinished_jobs():
+            if not self.is_active(job["job_id"]):
+                self._schedule(job["job_id"])
+                resumed.append(job["job_id"])
+        if resumed:
+            logger.info(f"恢复 {len(resumed)} 个未完成的扫描任务")
+        return resumed
+
+    def get_job(
+        self, job_id: str, include_results: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取任务信息（不含认证密钥），可附带已发现的设备"""
+        job = self.job_store.get_job(job_id)
+        if job is None:
+            return None
+        job = public_job(job)
+        if include_results:
+            job["results"] = self.job_store.get_job_results(job_id)
+        return job
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """按创建时间倒序列出任务（不含认证密钥）"""
+        return [public_job(job) for job in self.job_store.list_jobs(limit)]
+
+    # -------- 任务执行 --------
+
+    def _get_snmp_manager(self):
+        if self._snmp_manager is None:
+            from src.snmp.manager import SNMPManager
+
+            self._snmp_manager = SNMPManager()
+        return self._snmp_manager
+
+    def _iter_pending_blocks(
+        self, job: Dict[str, Any]
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """按顺序产生未完成的 (地址块, 主机列表)"""
+        network = ipaddress.ip_network(job["network"], strict=False)
+        completed = self.job_store.get_completed_blocks(job["job_id"])
+        for block in split_blocks(job["network"], self.block_prefix):
+            if str(block) not in completed:
+                yield str(block), block_hosts(network, block)
+
+    def _iter_pending_windows(
+        self, job: Dict[str, Any]
+    ) -> Iterator[List[Tuple[str, List[str]]]]:
+        """将未完成的地址块按顺序合并，每组最多 SWEEP_WINDOW_HOSTS 个主机"""
+        window: List[Tuple[str, List[str]]] = []
+        size = 0
+        for block, hosts in self._iter_pending_blocks(job):
+            if window and size + len(hosts) > SWEEP_WINDOW_HOSTS:
+                yield window
+                window, size = [], 0
+            window.append((block, hosts))
+            size += len(hosts)
+        if window:
+            yield window
+
+    async def _scan_blocks(
+        self, job: Dict[str, Any], blocks: List[Tuple[str, List[str]]]
+    ) -> None:
+        """
+        一次扫描多个地址块，发现的设备立即广播
+
+        某个地址块的主机全部结束（无响应或探测完成）后立即记录该块的检查点，
+        不等待其他地址块；扫描结束时记录其余地址块（如没有主机的地址块）。
+        """
+        job_id = job["job_id"]
+        params = dict(job["params"])
+        communities = params.pop("communities", None) or ["public"]
+
+        block_of: Dict[str, str] = {}
+        remaining: Dict[str, int] = {}
+        devices: Dict[str, List[Dict[str, Any]]] = {}
+        hosts: List[str] = []
+        for block, block_host_list in blocks:
+            remaining[block] = len(block_host_list)
+            devices[block] = []
+            for ip in block_host_list:
+                block_of[ip] = block
+            hosts.extend(block_host_list)
+
+        def complete(block: str) -> None:
+            del remaining[block]
+            progress = self.job_store.complete_block(job_id, block, devices.pop(block))
+            self._broadcast(
+                "scan_progress",
+                job_id,
+                block=block,
+                completed_blocks=progress["completed_blocks"],
+                total_blocks=progress["total_blocks"],
+                found_count=progress["found_count"],
+            )
+
+        def on_found(device: Dict[str, Any]) -> None:
+            devices[block_of[device["ip"]]].append(device)
+            self._broadcast("scan_device", job_id, device=device)
+
+        def on_host_done(ip: str) -> None:
+            block = block_of[ip]
+            remaining[block] -= 1
+            if remaining[block] == 0:
+                complete(block)
+
+        await self._get_snmp_manager().scan_network_devices(
+            hosts,
+            job["version"],
+            communities,
+            on_found=on_found,
+            on_host_done=on_host_done,
+            **params,
+        )
+        for block, _ in blocks:
+            if block in remaining:
+                complete(block)
+
+    async def _run_job(self, job_id: str) -> None:
+        from src.core.state_manager import state_manager
+
+        job = self.job_store.get_job(job_id)
+        if job is None or job["status"] not in ScanJobManager.UNFINISHED_STATUSES:
+            return
+
+        try:
+            async with self._semaphore:
+                job = self.job_store.get_job(job_id)
+                if job["status"] not in ScanJobManager.UNFINISHED_STATUSES:
+                    return
+                self.job_store.update_job_status(job_id, ScanJobManager.STATUS_RUNNING)
+                state_manager.scan_task_id = job_id
+                self._broadcast(
+                    "scan_started",
+                    job_id,
+                    network=job["network"],
+                    version=job["version"],
+                    completed_blocks=job["completed_blocks"],
+                    total_blocks=job["total_blocks"],
+                )
+
+                for blocks in self._iter_pending_windows(job):
+                    await self._scan_blocks(job, blocks)
+
+                self.job_store.update_job_status(
+                    job_id, ScanJobManager.STATUS_COMPLETED
+                )
+                results = self.job_store.get_job_results(job_id)
+                logger.info(
+                    f"扫描任务 {job_id} 完成: {job['network']}，发现 {len(results)} 个SNMP设备"
+                )
+                self._broadcast(
+                    "scan_completed", job_id, data=results, count=len(results)
+                )
+        except asyncio.CancelledError:
+            if self._stopping:
+                # 服务停止：保持未结束状态，重启后恢复
+                logger.info(f"扫描任务 {job_id} 已中断，将在下次启动时恢复")
+            else:
+                self.job_store.update_job_status(
+                    job_id, ScanJobManager.STATUS_CANCELLED
+                )
+                logger.info(f"扫描任务 {job_id} 已取消")
+                self._broadcast("scan_cancelled", job_id)
+        except Exception as e:
+            logger.error(f"扫描任务 {job_id} 执行失败: {e}", exc_info=True)
+            self.job_store.update_job_status(
+                job_id, ScanJobManager.STATUS_FAILED, error=str(e)
+            )
+            self._broadcast(
+                "scan_error", job_id, message=f"扫描过程中发生错误: {str(e)}"
+            )
+        finally:
+            if state_manager.scan_task_id == job_id:
+                state_manager.scan_task_id = None
+
+
+# 全局执行器实例
+_scan_job_runner: Optional[ScanJobRunner] = None
+_scan_job_runner_lock = threading.Lock()
+
+
+def get_scan_job_runner(
+    job_store: Optional[ScanJobManager] = None,
+) -> Optional[ScanJobRunner]:
+    """
+    获取进程内共享的扫描任务执行器
+
+    Args:
+        job_store: 第一次调用时必须提供的任务持久化管理器
+
+    Returns:
+        执行器实例；尚未创建且未提供job_store时返回None
+    """
+    global _scan_job_runner
+    if _scan_job_runner is None and job_store is not None:
+        with _scan_job_runner_lock:
+            if _scan_job_runner is None:
+                _scan_job_runner = ScanJobRunner(job_store)
+    return _scan_job_runner
+
+
+def stop_scan_job_runner() -> None:
+    """停止扫描任务执行器（未结束的任务下次启动时恢复）"""
+    if _scan_job_runner is not None:
+        _scan_job_runner.stop()
+
+
+__all__ = [
+    "ScanJobRunner",
+    "get_scan_job_runner",
+    "stop_scan_job_runner",
+    "split_blocks",
+    "block_hosts",
+]
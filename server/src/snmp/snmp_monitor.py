@@ -1,25 +1,32 @@
 import asyncio
 from pysnmp.hlapi.asyncio import (
-    SnmpEngine,
-    CommunityData,
-    UdpTransportTarget,
     ContextData,
     ObjectType,
     ObjectIdentity,
     get_cmd,
-    UsmUserData,
-    usmNoAuthProtocol,
-    usmNoPrivProtocol,
-    usmHMACMD5AuthProtocol,
-    usmHMACSHAAuthProtocol,
-    usmDESPrivProtocol,
+    next_cmd,
+    bulk_cmd,
 )
 from pysnmp.proto.rfc1902 import OctetString
-from pysnmp.smi import builder, compiler, view
-from typing import Dict, Any, Tuple, List, Optional
+from pysnmp.proto.rfc1905 import NoSuchObject, NoSuchInstance, EndOfMibView
+from typing import Dict, Any, Hashable, Tuple, List, Optional
 import logging
 import binascii
 
+from .engine_pool import DEFAULT_RETRIES, DEFAULT_TIMEOUT, get_engine_pool
+from .mib_cache import get_mib_cache
+from .ber_codec import (
+    BERDecodeError,
+    SNMPExceptionValue,
+    END_OF_MIB_VIEW,
+    PDU_GET,
+    PDU_GETNEXT,
+    PDU_GETBULK,
+)
+from .native_client import NativeSNMPClient, get_native_client
+from .interface_cache import InterfaceStaticCache
+from .poll_profile import InterfacePollProfile
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -65,25 +72,165 @@ class SNMPMonitor:
         "ifOutErrors": "1.3.6.1.2.1.2.2.1.20",
         "ifOutQLen": "1.3.6.1.2.1.2.2.1.21",
         "ifSpecific": "1.3.6.1.2.1.2.2.1.22",
+        # 接口扩展信息（IF-MIB ifXTable，64位计数器）
+        "ifName": "1.3.6.1.2.1.31.1.1.1.1",
+        "ifHCInOctets": "1.3.6.1.2.1.31.1.1.1.6",
+        "ifHCInUcastPkts": "1.3.6.1.2.1.31.1.1.1.7",
+        "ifHCInMulticastPkts": "1.3.6.1.2.1.31.1.1.1.8",
+        "ifHCInBroadcastPkts": "1.3.6.1.2.1.31.1.1.1.9",
+        "ifHCOutOctets": "1.3.6.1.2.1.31.1.1.1.10",
+        "ifHCOutUcastPkts": "1.3.6.1.2.1.31.1.1.1.11",
+        "ifHCOutMulticastPkts": "1.3.6.1.2.1.31.1.1.1.12",
+        "ifHCOutBroadcastPkts": "1.3.6.1.2.1.31.1.1.1.13",
+        "ifHighSpeed": "1.3.6.1.2.1.31.1.1.1.15",  # 接口当前带宽，单位是Mbit/s。ifSpeed达到最大值（4,294,967,295）时以此为准。
+        "ifAlias": "1.3.6.1.2.1.31.1.1.1.18",
+        "ifTableLastChange": "1.3.6.1.2.1.31.1.5.0",  # 最近一次ifTable增删接口时的sysUpTime
+    }
+
+    # 单个GET请求PDU中允许的最大变量绑定数（超过则分片发送）
+    MAX_VARBINDS = 20
+
+    # GETBULK默认max-repetitions（每个列一次返回的行数）
+    DEFAULT_MAX_REPETITIONS = 25
+
+    # 单个GETBULK响应期望的最大变量绑定数（列数较多时自动降低max-repetitions）
+    MAX_BULK_VARBINDS = 100
+
+    # SNMP编解码实现：pysnmp（默认）或原生BER编解码器（仅v1/v2c）
+    CODEC_PYSNMP = "pysnmp"
+    CODEC_NATIVE = "native"
+    DEFAULT_CODEC = CODEC_PYSNMP
+
+    # SNMP v1 错误状态码
+    ERROR_TOO_BIG = 1
+    ERROR_NO_SUCH_NAME = 2
+
+    # 接口信息轮询使用的ifTable列
+    INTERFACE_INFO_COLUMNS = [
+        "ifDescr",
+        "ifType",
+        "ifSpeed",
+        "ifPhysAddress",
+        "ifAdminStatus",
+        "ifOperStatus",
+    ]
+
+    # 几乎不变的接口属性列（使用InterfaceStaticCache时按接口缓存）
+    INTERFACE_STATIC_COLUMNS = [
+        "ifDescr",
+        "ifType",
+        "ifSpeed",
+        "ifPhysAddress",
+        "ifMtu",
+    ]
+
+    # 每次轮询都读取的接口状态列（ifLastChange用于判断静态列是否需要刷新）
+    INTERFACE_STATUS_COLUMNS = [
+        "ifAdminStatus",
+        "ifOperStatus",
+        "ifLastChange",
+    ]
+
+    # 接口流量统计使用的ifTable列
+    INTERFACE_TRAFFIC_COLUMNS = [
+        "ifDescr",
+        "ifInOctets",
+        "ifOutOctets",
+        "ifInDiscards",
+        "ifOutDiscards",
+        "ifInErrors",
+        "ifOutErrors",
+    ]
+
+    # 接口计数器轮询使用的64位ifXTable列（v2c/v3）
+    INTERFACE_HC_COUNTER_COLUMNS = [
+        "ifHighSpeed",
+        "ifHCInOctets",
+        "ifHCOutOctets",
+        "ifHCInUcastPkts",
+        "ifHCInMulticastPkts",
+        "ifHCInBroadcastPkts",
+        "ifHCOutUcastPkts",
+        "ifHCOutMulticastPkts",
+        "ifHCOutBroadcastPkts",
+    ]
+
+    # 接口计数器轮询使用的32位ifTable列（v1或设备不支持ifXTable时）
+    INTERFACE_COUNTER32_COLUMNS = [
+        "ifInOctets",
+        "ifOutOctets",
+        "ifInUcastPkts",
+        "ifInNUcastPkts",
+        "ifOutUcastPkts",
+        "ifOutNUcastPkts",
+    ]
+
+    # 错误/丢弃计数器只有32位版本
+    INTERFACE_ERROR_COLUMNS = [
+        "ifInErrors",
+        "ifOutErrors",
+        "ifInDiscards",
+        "ifOutDiscards",
+    ]
+
+    # ifSpeed的最大值，达到该值时实际带宽以ifHighSpeed为准
+    IF_SPEED_MAX = 4294967295
+
+    # 接口类型中文描述（基于IANAifType）
+    INTERFACE_TYPE_MAP = {
+        1: "其他",
+        6: "以太网",
+        23: "PPP",
+        24: "环回接口",
+        37: "ATM",
+        53: "VLAN",
+        131: "隧道接口",
+        135: "二层VLAN",
+        136: "三层VLAN",
+        161: "IEEE 802.11无线",
+        117: "千兆以太网",
+        244: "聚合接口",
+    }
+
+    # 管理状态中文描述 (1=up, 2=down, 3=testing)
+    ADMIN_STATUS_MAP = {1: "已启用", 2: "已禁用", 3: "测试中"}
+
+    # 操作状态中文描述
+    OPER_STATUS_MAP = {
+        1: "运行中",
+        2: "未运行",
+        3: "测试中",
+        4: "未知",
+        5: "休眠",
+        6: "不存在",
+        7: "下层接口未运行",
     }
 
     def __init__(self):
         """初始化SNMP监控器"""
-        # 创建MIB视图控制器
-        self.mib_builder = builder.MibBuilder()
-        self.mib_view_controller = view.MibViewController(self.mib_builder)
-
-        # 编译MIB
-        compiler.addMibCompiler(
-            self.mib_builder,
-            sources=[
-                "file:///usr/share/snmp/mibs",
-                "http://mibs.snmplabs.com/asn1/@mib@",
-            ],
-        )
+        # 共享的SNMP引擎池（每个事件循环一个引擎和一个UDP套接字）
+        self.engine_pool = get_engine_pool()
+
+        # 进程级共享的离线MIB缓存（第一次使用时才加载）
+        self.mib_cache = get_mib_cache()
+
+    @property
+    def mib_builder(self):
+        """共享的MIB构建器（访问时加载预编译MIB）"""
+        return self.mib_cache.get_mib_builder()
+
+    @property
+    def mib_view_controller(self):
+        """共享的MIB视图控制器（访问时加载预编译MIB）"""
+        return self.mib_cache.get_mib_view()
 
     async def _get_snmp_v1(
-        self, ip: str, community: str, oid: str, port: int = 161
+        self,
+        ip: str,
+        community: str,
+        oid: str,
+        port: int = 161,
+        codec: Optional[str] = None,
     ) -> Tuple[Any, bool]:
         """
         使用SNMP v1获取数据
@@ -93,21 +240,22 @@ class SNMPMonitor:
             community: 社区字符串
             oid: OID
             port: 端口号，默认161
+            codec: 编解码实现，默认DEFAULT_CODEC
 
         Returns:
             (值, 是否成功)
         """
-        snmp_engine = SnmpEngine()
         try:
-            transport_target = await UdpTransportTarget.create(
-                (ip, port), timeout=2.0, retries=0
-            )
-            error_indication, error_status, error_index, var_binds = await get_cmd(
-                snmp_engine,
-                CommunityData(community, mpModel=0),  # mpModel=0表示SNMPv1
-                transport_target,
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
+            error_indication, error_status, error_index, var_binds = (
+                await self._send_pdu(
+                    ip,
+                    "v1",
+                    PDU_GET,
+                    [oid],
+                    port=port,
+                    community=community,
+                    codec=codec,
+                )
             )
 
             if error_indication:
@@ -123,14 +271,16 @@ class SNMPMonitor:
         except Exception as e:
             logger.error(f"SNMP v1异常: {str(e)}")
             return None, False
-        finally:
-            # 确保关闭引擎
-            snmp_engine.transportDispatcher.closeDispatcher()
 
         return None, False
 
     async def _get_snmp_v2c(
-        self, ip: str, community: str, oid: str, port: int = 161
+        self,
+        ip: str,
+        community: str,
+        oid: str,
+        port: int = 161,
+        codec: Optional[str] = None,
     ) -> Tuple[Any, bool]:
         """
         使用SNMP v2c获取数据
@@ -140,21 +290,22 @@ class SNMPMonitor:
             community: 社区字符串
             oid: OID
             port: 端口号，默认161
+            codec: 编解码实现，默认DEFAULT_CODEC
 
         Returns:
             (值, 是否成功)
         """
-        snmp_engine = SnmpEngine()
         try:
-            transport_target = await UdpTransportTarget.create(
-                (ip, port), timeout=2.0, retries=0
-            )
-            error_indication, error_status, error_index, var_binds = await get_cmd(
-                snmp_engine,
-                CommunityData(community),
-                transport_target,
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
+            error_indication, error_status, error_index, var_binds = (
+                await self._send_pdu(
+                    ip,
+                    "v2c",
+                    PDU_GET,
+                    [oid],
+                    port=port,
+                    community=community,
+                    codec=codec,
+                )
             )
             if error_indication:
                 logger.debug(f"SNMP v2c错误: ip: {ip}, {error_indication}")
@@ -169,9 +320,6 @@ class SNMPMonitor:
         except Exception as e:
             logger.error(f"SNMP v2c异常: {str(e)}")
             return None, False
-        finally:
-            # 确保关闭引擎
-            snmp_engine.transportDispatcher.closeDispatcher()
 
         return None, False
 
@@ -190,19 +338,9 @@ class SNMPMonitor:
         Returns:
             (值, 是否成功)
         """
-        snmp_engine = SnmpEngine()
         try:
-            transport_target = await UdpTransportTarget.create(
-                (ip, port), timeout=2.0, retries=0
-            )
-            error_indication, error_status, error_index, var_binds = await get_cmd(
-                snmp_engine,
-                UsmUserData(
-                    user, authProtocol=usmNoAuthProtocol, privProtocol=usmNoPrivProtocol
-                ),
-                transport_target,
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
+            error_indication, error_status, error_index, var_binds = (
+                await self._send_pdu(ip, "v3", PDU_GET, [oid], port=port, user=user)
             )
 
             if error_indication:
@@ -218,9 +356,6 @@ class SNMPMonitor:
         except Exception as e:
             logger.error(f"SNMP v3无认证异常: {str(e)}")
             return None, False
-        finally:
-            # 确保关闭引擎
-            snmp_engine.transportDispatcher.closeDispatcher()
 
         return None, False
 
@@ -252,28 +387,18 @@ class SNMPMonitor:
             logger.error("SNMP v3认证模式需要提供认证密钥")
             return None, False
 
-        # 根据参数选择认证协议
-        if auth_protocol.lower() == "sha":
-            auth_proto = usmHMACSHAAuthProtocol
-        else:
-            auth_proto = usmHMACMD5AuthProtocol
-
-        snmp_engine = SnmpEngine()
         try:
-            transport_target = await UdpTransportTarget.create(
-                (ip, port), timeout=2.0, retries=0
-            )
-            error_indication, error_status, error_index, var_binds = await get_cmd(
-                snmp_engine,
-                UsmUserData(
-                    user,
-                    authKey=auth_key,
-                    authProtocol=auth_proto,
-                    privProtocol=usmNoPrivProtocol,
-                ),
-                transport_target,
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
+            error_indication, error_status, error_index, var_binds = (
+                await self._send_pdu(
+                    ip,
+                    "v3",
+                    PDU_GET,
+                    [oid],
+                    port=port,
+                    user=user,
+                    auth_key=auth_key,
+                    auth_protocol=auth_protocol,
+                )
             )
 
             if error_indication:
@@ -289,9 +414,6 @@ class SNMPMonitor:
         except Exception as e:
             logger.error(f"SNMP v3认证异常: {str(e)}")
             return None, False
-        finally:
-            # 确保关闭引擎
-            snmp_engine.transportDispatcher.closeDispatcher()
 
         return None, False
 
@@ -328,29 +450,19 @@ class SNMPMonitor:
             logger.error("SNMP v3隐私模式需要提供加密密钥")
             return None, False
 
-        # 根据参数选择认证协议
-        if auth_protocol.lower() == "sha":
-            auth_proto = usmHMACSHAAuthProtocol
-        else:
-            auth_proto = usmHMACMD5AuthProtocol
-
-        snmp_engine = SnmpEngine()
         try:
-            transport_target = await UdpTransportTarget.create(
-                (ip, port), timeout=2.0, retries=0
-            )
-            error_indication, error_status, error_index, var_binds = await get_cmd(
-                snmp_engine,
-                UsmUserData(
-                    user,
-                    authKey=auth_key,
-                    privKey=priv_key,
-                    authProtocol=auth_proto,
-                    privProtocol=usmDESPrivProtocol,
-                ),
-                transport_target,
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
+            error_indication, error_status, error_index, var_binds = (
+                await self._send_pdu(
+                    ip,
+                    "v3",
+                    PDU_GET,
+                    [oid],
+                    port=port,
+                    user=user,
+                    auth_key=auth_key,
+                    priv_key=priv_key,
+                    auth_protocol=auth_protocol,
+                )
             )
 
             if error_indication:
@@ -366,9 +478,6 @@ class SNMPMonitor:
         except Exception as e:
             logger.error(f"SNMP v3隐私异常: {str(e)}")
             return None, False
-        finally:
-            # 确保关闭引擎
-            snmp_engine.transportDispatcher.closeDispatcher()
 
         return None, False
 
@@ -383,19 +492,20 @@ class SNMPMonitor:
             version: SNMP版本 ('v1', 'v2c', 'v3')
             oid: OID
             **kwargs: 其他参数
-                对于v1/v2c: community
+                对于v1/v2c: community, codec(可选，'pysnmp'或'native'，默认DEFAULT_CODEC)
                 对于v3: user, auth_key(可选), priv_key(可选), auth_protocol(可选，默认'md5')
 
         Returns:
             (值, 是否成功)
         """
         port = kwargs.get("port", 161)
+        codec = kwargs.get("codec")
         if version.lower() == "v1":
             community = kwargs.get("community", "public")
-            return await self._get_snmp_v1(ip, community, oid, port)
+            return await self._get_snmp_v1(ip, community, oid, port, codec)
         elif version.lower() == "v2c" or version.lower() == "2c":
             community = kwargs.get("community", "public")
-            return await self._get_snmp_v2c(ip, community, oid, port)
+            return await self._get_snmp_v2c(ip, community, oid, port, codec)
         elif version.lower() == "v3":
             user = kwargs.get("user")
             if not user:
@@ -426,6 +536,208 @@ class SNMPMonitor:
             logger.error(f"不支持的SNMP版本: {version}")
             return None, False
 
+    async def _send_pdu(
+        self,
+        ip: str,
+        version: str,
+        pdu_type: int,
+        oids: List[str],
+        max_repetitions: int = 0,
+        **kwargs,
+    ) -> Tuple[Any, Any, Any, List[Any]]:
+        """
+        发送单个GET/GETNEXT/GETBULK请求
+
+        v1/v2c且指定codec='native'时使用原生BER编解码器，
+        其余情况（v3、IPv6、响应无法解码等）使用pysnmp。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            pdu_type: PDU_GET / PDU_GETNEXT / PDU_GETBULK
+            oids: OID列表
+            max_repetitions: GETBULK的max-repetitions
+            **kwargs: 认证参数，可包含port、codec、timeout和retries
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds)
+        """
+        port = kwargs.pop("port", 161)
+        codec = kwargs.pop("codec", None) or self.DEFAULT_CODEC
+        timeout = kwargs.pop("timeout", DEFAULT_TIMEOUT)
+        retries = kwargs.pop("retries", DEFAULT_RETRIES)
+
+        if codec == self.CODEC_NATIVE and NativeSNMPClient.supports(version, ip):
+            try:
+                return await get_native_client().request(
+                    ip,
+                    port,
+                    version,
+                    kwargs.get("community", "public"),
+                    pdu_type,
+                    [self._oid_to_tuple(oid) for oid in oids],
+                    max_repetitions=max_repetitions,
+                    timeout=timeout,
+                    retries=retries,
+                )
+            except BERDecodeError as e:
+                logger.debug(f"原生编解码失败，回退到pysnmp: ip: {ip}, {e}")
+
+        engine, auth_data, target = await self.engine_pool.get_session(
+            ip, version, port, timeout=timeout, retries=retries, **kwargs
+        )
+        var_types = [ObjectType(ObjectIdentity(oid)) for oid in oids]
+        if pdu_type == PDU_GETBULK:
+            result = await bulk_cmd(
+                engine,
+                auth_data,
+                target,
+                ContextData(),
+                0,
+                max_repetitions,
+                *var_types,
+                lookupMib=False,
+            )
+        else:
+            command = next_cmd if pdu_type == PDU_GETNEXT else get_cmd
+            result = await command(
+                engine, auth_data, target, ContextData(), *var_types, lookupMib=False
+            )
+
+        if result[0] and version.lower() == "v3":
+            # 时间窗口/引擎ID类错误时使设备的v3会话失效，下次请求重新发现
+            self.engine_pool.handle_v3_error(ip, result[0], port, **kwargs)
+        return result
+
+    async def get_multi(
+        self,
+        ip: str,
+        version: str,
+        oids: List[str],
+        max_varbinds: Optional[int] = None,
+        **kwargs,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        批量获取多个OID的数据（多个变量绑定放入同一个GET请求PDU）
+
+        OID数量超过max_varbinds时分片并发发送；设备上不存在的OID
+        （noSuchObject/noSuchInstance，v1为noSuchName）不会出现在结果中。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本 ('v1', 'v2c', 'v3')
+            oids: OID列表
+            max_varbinds: 单个PDU最大变量绑定数，默认MAX_VARBINDS
+            **kwargs: 认证参数（同get_data）
+
+        Returns:
+            ({OID: 值}, 是否成功)，设备不可达或请求出错时是否成功为False
+        """
+        if not oids:
+            return {}, True
+
+        if version.lower() not in ("v1", "v2c", "2c", "v3"):
+            logger.error(f"不支持的SNMP版本: {version}")
+            return {}, False
+        if version.lower() == "v3" and not kwargs.get("user"):
+            logger.error("SNMP v3需要提供用户名")
+            return {}, False
+
+        chunk_size = max(1, max_varbinds or self.MAX_VARBINDS)
+        chunks = [oids[i : i + chunk_size] for i in range(0, len(oids), chunk_size)]
+
+        chunk_results = await asyncio.gather(
+            *[self._get_multi_pdu(ip, version, chunk, **kwargs) for chunk in chunks]
+        )
+
+        results: Dict[str, Any] = {}
+        success = False
+        for values, chunk_success in chunk_results:
+            results.update(values)
+            success = success or chunk_success
+
+        return results, success
+
+    async def _get_multi_pdu(
+        self, ip: str, version: str, oids: List[str], **kwargs
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        发送单个包含多个变量绑定的GET请求
+
+        v1设备对不存在的OID返回noSuchName时剔除该OID后重试；
+        响应过大(tooBig)时拆分为两半重试。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            oids: OID列表
+            **kwargs: 认证参数
+
+        Returns:
+            ({OID: 值}, 是否成功)
+        """
+        port = kwargs.pop("port", 161)
+        pending = list(oids)
+        results: Dict[str, Any] = {}
+
+        while pending:
+            try:
+                error_indication, error_status, error_index, var_binds = (
+                    await self._send_pdu(
+                        ip, version, PDU_GET, pending, port=port, **kwargs
+                    )
+                )
+            except Exception as e:
+                logger.error(f"SNMP {version}批量获取异常: ip: {ip}, {str(e)}")
+                return results, False
+
+            if error_indication:
+                logger.debug(
+                    f"SNMP {version}批量获取错误: ip: {ip}, {error_indication}"
+                )
+                return results, False
+
+            if error_status:
+                status_code = int(error_status)
+                index = int(error_index)
+                if status_code == self.ERROR_NO_SUCH_NAME and 0 < index <= len(pending):
+                    # v1：剔除不存在的OID后重试其余OID
+                    pending.pop(index - 1)
+                    continue
+                if status_code == self.ERROR_TOO_BIG and len(pending) > 1:
+                    # 响应过大：拆分后分别请求
+                    half = len(pending) // 2
+                    parts = await asyncio.gather(
+                        self._get_multi_pdu(
+                            ip, version, pending[:half], port=port, **kwargs
+                        ),
+                        self._get_multi_pdu(
+                            ip, version, pending[half:], port=port, **kwargs
+                        ),
+                    )
+                    for values, _ in parts:
+                        results.update(values)
+                    return results, any(part_success for _, part_success in parts)
+                logger.error(
+                    f"SNMP {version}批量获取错误状态: ip: {ip}, {str(error_status)}"
+                )
+                return results, False
+
+            for oid, var_bind in zip(pending, var_binds):
+                value = var_bind[1]
+                if not self._is_missing_value(value):
+                    results[oid] = value
+            break
+
+        return results, True
+
+    @staticmethod
+    def _is_missing_value(value: Any) -> bool:
+        """判断变量绑定的值是否表示OID不存在"""
+        return value is None or isinstance(
+            value, (NoSuchObject, NoSuchInstance, EndOfMibView, SNMPExceptionValue)
+        )
+
     async def get_device_info(self, ip: str, version: str, **kwargs) -> Dict[str, Any]:
         """
         获取设备基本信息
@@ -440,332 +752,975 @@ class SNMPMonitor:
         """
         device_info = {}
 
-        # 获取系统描述（作为连通性测试）
-        value, success = await self.get_data(
-            ip, version, self.OIDS["sysDescr"], **kwargs
+        # 一次请求获取全部系统信息
+        values, success = await self.get_multi(
+            ip,
+            version,
+            [
+                self.OIDS["sysDescr"],
+                self.OIDS["sysName"],
+                self.OIDS["sysLocation"],
+                self.OIDS["sysUpTime"],
+                self.OIDS["sysObjectID"],
+                self.OIDS["ifNumber"],
+            ],
+            **kwargs,
         )
-        if not success:
-            # 第一次请求失败，设备不可达，直接返回空字典，避免后续无效请求
+        if not success or self.OIDS["sysDescr"] not in values:
+            # 设备不可达（或不支持sysDescr），直接返回空字典
             return device_info
 
+        value = values[self.OIDS["sysDescr"]]
         device_info["description"] = str(value) if value else ""
 
         # 获取系统名称
-        value, success = await self.get_data(
-            ip, version, self.OIDS["sysName"], **kwargs
-        )
-        if success:
+        if self.OIDS["sysName"] in values:
+            value = values[self.OIDS["sysName"]]
             device_info["name"] = str(value) if value else ""
 
         # 获取系统位置
-        value, success = await self.get_data(
-            ip, version, self.OIDS["sysLocation"], **kwargs
-        )
-        if success:
+        if self.OIDS["sysLocation"] in values:
+            value = values[self.OIDS["sysLocation"]]
             device_info["location"] = str(value) if value else ""
 
         # 获取系统运行时间
-        value, success = await self.get_data(
-            ip, version, self.OIDS["sysUpTime"], **kwargs
-        )
-        if success:
+        if self.OIDS["sysUpTime"] in values:
+            value = values[self.OIDS["sysUpTime"]]
             device_info["uptime"] = str(value) if value else ""
 
-        value, success = await self.get_data(
-            ip, version, self.OIDS["sysObjectID"], **kwargs
-        )
-        if success:
+        if self.OIDS["sysObjectID"] in values:
+            value = values[self.OIDS["sysObjectID"]]
             device_info["object_id"] = str(value) if value else ""
 
         # 获取端口数量
-        value, success = await self.get_data(
-            ip, version, self.OIDS["ifNumber"], **kwargs
-        )
-        if success:
+        if self.OIDS["ifNumber"] in values:
+            value = values[self.OIDS["ifNumber"]]
             device_info["if_count"] = int(value) if value else 0
 
         return device_info
 
+    async def walk_columns(
+        self,
+        ip: str,
+        version: str,
+        columns: Dict[str, str],
+        max_repetitions: Optional[int] = None,
+        **kwargs,
+    ) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """
+        按列遍历SNMP表（v2c/v3使用GETBULK，v1使用GETNEXT）
+
+        所有列放在同一个请求中并行推进，每列遍历到表外或endOfMibView即停止，
+        结果按真实的表索引（如ifIndex）组装为行，不要求索引连续。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本 ('v1', 'v2c', 'v3')
+            columns: {列名: 列OID}，如 {"ifDescr": "1.3.6.1.2.1.2.2.1.2"}
+            max_repetitions: GETBULK的max-repetitions，默认DEFAULT_MAX_REPETITIONS
+            **kwargs: 认证参数（同get_data）
+
+        Returns:
+            ({索引: {列名: 值}}, 是否成功)
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        if not columns:
+            return rows, True
+
+        version_lower = version.lower()
+        if version_lower not in ("v1", "v2c", "2c", "v3"):
+            logger.error(f"不支持的SNMP版本: {version}")
+            return rows, False
+        if version_lower == "v3" and not kwargs.get("user"):
+            logger.error("SNMP v3需要提供用户名")
+            return rows, False
+
+        use_bulk = version_lower != "v1"
+        repetitions = max(1, max_repetitions or self.DEFAULT_MAX_REPETITIONS)
+        port = kwargs.pop("port", 161)
+
+        prefixes = {name: self._oid_to_tuple(oid) for name, oid in columns.items()}
+        cursors = dict(prefixes)
+        active = list(columns.keys())
+
+        while active:
+            try:
+                request_oids = [self._tuple_to_oid(cursors[name]) for name in active]
+                if use_bulk:
+                    # 列数较多时降低max-repetitions，避免响应超出设备报文长度
+                    bulk_repetitions = max(
+                        1, min(repetitions, self.MAX_BULK_VARBINDS // len(active))
+                    )
+                    error_indication, error_status, error_index, var_binds = (
+                        await self._send_pdu(
+                            ip,
+                            version,
+                            PDU_GETBULK,
+                            request_oids,
+                            max_repetitions=bulk_repetitions,
+                            port=port,
+                            **kwargs,
+                        )
+                    )
+                else:
+                    error_indication, error_status, error_index, var_binds = (
+                        await self._send_pdu(
+                            ip, version, PDU_GETNEXT, request_oids, port=port, **kwargs
+                        )
+                    )
+            except Exception as e:
+                logger.error(f"SNMP {version}表遍历异常: ip: {ip}, {str(e)}")
+                return rows, False
+
+            if error_indication:
+                logger.debug(f"SNMP {version}表遍历错误: ip: {ip}, {error_indication}")
+                return rows, False
+
+            if error_status:
+                status_code = int(error_status)
+                index = int(error_index)
+                if (
+                    status_code == self.ERROR_TOO_BIG
+                    and use_bulk
+                    and bulk_repetitions > 1
+                ):
+                    # 响应过大：按实际发送的max-repetitions减半后重试
+                    # （GETNEXT每列只返回一行，无法缩小，直接失败）
+                    repetitions = bulk_repetitions // 2
+                    continue
+                if status_code == self.ERROR_NO_SUCH_NAME and 0 < index <= len(active):
+                    # v1：该列已遍历到MIB末尾
+                    active.pop(index - 1)
+                    continue
+                logger.error(
+                    f"SNMP {version}表遍历错误状态: ip: {ip}, {str(error_status)}"
+                )
+                return rows, False
+
+            if not var_binds:
+                break
+
+            column_count = len(active)
+            finished = set()
+            progressed = set()
+            seen = set()
+            for position, var_bind in enumerate(var_binds):
+                name = active[position % column_count]
+                seen.add(name)
+                if name in finished:
+                    continue
+                oid, value = var_bind[0], var_bind[1]
+                oid_tuple = tuple(oid)
+                prefix = prefixes[name]
+                if (
+                    isinstance(value, EndOfMibView)
+                    or value is END_OF_MIB_VIEW
+                    or oid_tuple[: len(prefix)] != prefix
+                    or oid_tuple <= cursors[name]
+                ):
+                    # 超出该列范围（或OID未递增），该列遍历结束
+                    finished.add(name)
+                    continue
+                row_index = self._tuple_to_oid(oid_tuple[len(prefix) :])
+                rows.setdefault(row_index, {})[name] = value
+                cursors[name] = oid_tuple
+                progressed.add(name)
+
+            if not progressed and not finished:
+                break
+
+            # 设备可能截断GETBULK响应，未出现在响应中的列保持活动状态
+            active = [
+                name
+                for name in active
+                if name not in finished and (name in progressed or name not in seen)
+            ]
+
+        return rows, True
+
+    @staticmethod
+    def _oid_to_tuple(oid: str) -> Tuple[int, ...]:
+        """将点分OID字符串转换为整数元组"""
+        return tuple(int(part) for part in oid.strip(".").split(".") if part)
+
+    @staticmethod
+    def _tuple_to_oid(oid: Tuple[int, ...]) -> str:
+        """将整数元组转换为点分OID字符串"""
+        return ".".join(str(part) for part in oid)
+
+    async def _walk_interface_columns(
+        self, ip: str, version: str, column_names: List[str], **kwargs
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], bool]:
+        """
+        遍历ifTable的指定列，返回按ifIndex排序的 (ifIndex, 行数据) 列表
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            column_names: 列名列表（OIDS中的键）
+            **kwargs: 认证参数，可包含max_repetitions
+
+        Returns:
+            ([(ifIndex, {列名: 值})], 是否成功)
+        """
+        max_repetitions = kwargs.pop("max_repetitions", None)
+        rows, success = await self.walk_columns(
+            ip,
+            version,
+            {name: self.OIDS[name] for name in column_names},
+            max_repetitions=max_repetitions,
+            **kwargs,
+        )
+        if not success:
+            return [], False
+
+        interface_rows = []
+        for row_index, row in rows.items():
+            try:
+                if_index = int(row_index)
+            except ValueError:
+                continue
+            interface_rows.append((if_index, row))
+        interface_rows.sort(key=lambda item: item[0])
+        return interface_rows, True
+
     async def get_interface_info(
         self, ip: str, version: str, **kwargs
     ) -> List[Dict[str, Any]]:
         """
-        获取接口信息
+        获取接口信息（基于GETBULK按列遍历ifTable，按真实ifIndex组装）
 
         Args:
             ip: 设备IP地址
             version: SNMP版本
-            **kwargs: 认证参数
+            **kwargs: 认证参数，可包含max_repetitions
 
         Returns:
             包含接口信息的列表
         """
-        interfaces = []
-
-        # 获取接口数量
-        value, success = await self.get_data(
-            ip, version, self.OIDS["ifNumber"], **kwargs
+        interface_rows, success = await self._walk_interface_columns(
+            ip, version, self.INTERFACE_INFO_COLUMNS, **kwargs
         )
         if not success:
-            return interfaces
-        if_count = int(value) if value else 0
-        if if_count <= 0:
-            return interfaces
-
-        # 获取每个接口的信息
-        for i in range(1, if_count + 1):
-            interface: Dict[str, Any] = {"index": i}
-
-            # 获取接口描述
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifDescr']}.{i}", **kwargs
-            )
-            if success:
-                interface["description"] = str(value) if value else ""
+            return []
 
-            # 获取接口类型
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifType']}.{i}", **kwargs
-            )
-            if success:
-                type_code = int(value) if value else 0
-                interface["type"] = type_code
-                # 转换为中文类型描述（基于IANAifType）
-                type_map = {
-                    1: "其他",
-                    6: "以太网",
-                    23: "PPP",
-                    24: "环回接口",
-                    37: "ATM",
-                    53: "VLAN",
-                    131: "隧道接口",
-                    135: "二层VLAN",
-                    136: "三层VLAN",
-                    161: "IEEE 802.11无线",
-                    117: "千兆以太网",
-                    244: "聚合接口",
-                }
-                interface["type_text"] = type_map.get(type_code, f"类型{type_code}")
+        return [
+            self._format_interface_row(if_index, row)
+            for if_index, row in interface_rows
+        ]
 
-            # 获取接口速度（单位：bps）
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifSpeed']}.{i}", **kwargs
+    def _format_interface_row(
+        self, if_index: int, row: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        将ifTable原始列值格式化为接口信息字典
+
+        Args:
+            if_index: 接口索引
+            row: {列名: 值}
+
+        Returns:
+            接口信息字典
+        """
+        interface: Dict[str, Any] = {"index": if_index}
+
+        # 接口描述
+        if "ifDescr" in row:
+            value = row["ifDescr"]
+            interface["description"] = str(value) if value else ""
+
+        # 接口类型
+        if "ifType" in row:
+            value = row["ifType"]
+            type_code = int(value) if value else 0
+            interface["type"] = type_code
+            interface["type_text"] = self.INTERFACE_TYPE_MAP.get(
+                type_code, f"类型{type_code}"
             )
-            if success:
-                speed_bps = int(value) if value else 0
-                interface["speed"] = speed_bps
-                # 格式化为易读的速度描述
-                if speed_bps == 0:
-                    interface["speed_text"] = "-"
-                elif speed_bps >= 1000000000:  # >= 1 Gbps
-                    speed_gbps = speed_bps / 1000000000
-                    interface["speed_text"] = f"{speed_gbps:.1f} Gbps"
-                elif speed_bps >= 1000000:  # >= 1 Mbps
-                    speed_mbps = speed_bps / 1000000
-                    interface["speed_text"] = f"{speed_mbps:.0f} Mbps"
-                elif speed_bps >= 1000:  # >= 1 Kbps
-                    speed_kbps = speed_bps / 1000
-                    interface["speed_text"] = f"{speed_kbps:.0f} Kbps"
-                else:
-                    interface["speed_text"] = f"{speed_bps} bps"
 
-            # 获取接口物理地址(对于802.x接口为MAC地址,对于串口等为空)
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifPhysAddress']}.{i}", **kwargs
+        # 接口速度（单位：bps），ifSpeed饱和时使用ifHighSpeed（单位：Mbps）
+        if "ifSpeed" in row or "ifHighSpeed" in row:
+            value = row.get("ifSpeed")
+            speed_bps = int(value) if value else 0
+            high_speed = row.get("ifHighSpeed")
+            if high_speed and (speed_bps == 0 or speed_bps >= self.IF_SPEED_MAX):
+                speed_bps = int(high_speed) * 1000000
+            interface["speed"] = speed_bps
+            interface["speed_text"] = self._format_speed(speed_bps)
+
+        # 最大传输单元
+        if "ifMtu" in row:
+            value = row["ifMtu"]
+            interface["mtu"] = int(value) if value else 0
+
+        # 接口物理地址(对于802.x接口为MAC地址,对于串口等为空)
+        interface["address"] = self._format_phys_address(row.get("ifPhysAddress"))
+
+        # 管理状态 (1=up, 2=down, 3=testing)
+        if "ifAdminStatus" in row:
+            value = row["ifAdminStatus"]
+            admin_status_code = int(value) if value else 0
+            interface["admin_status"] = admin_status_code
+            interface["admin_status_text"] = self.ADMIN_STATUS_MAP.get(
+                admin_status_code, "未知"
             )
-            if success and value:
-                try:
-                    # 将OctetString转换为bytes
-                    if hasattr(value, "prettyPrint"):
-                        # pysnmp的OctetString对象
-                        mac_bytes = bytes(value)
-                    elif isinstance(value, bytes):
-                        mac_bytes = value
-                    elif isinstance(value, str):
-                        # 如果已经是字符串,尝试转换为bytes
-                        mac_bytes = value.encode("latin-1")
-                    else:
-                        mac_bytes = bytes(str(value), "latin-1")
-
-                    # 零长度的八位字节串表示没有物理地址(如串口、loopback等)
-                    if len(mac_bytes) == 0:
-                        interface["address"] = ""
-                    # 6字节表示以太网MAC地址(802.x)
-                    elif len(mac_bytes) == 6:
-                        interface["address"] = ":".join(f"{b:02x}" for b in mac_bytes)
-                    # 其他长度的物理地址
-                    else:
-                        interface["address"] = ":".join(f"{b:02x}" for b in mac_bytes)
-                except Exception as e:
-                    logger.debug(
-                        f"转换物理地址失败: {e}, value type: {type(value)}, value: {repr(value)}"
-                    )
-                    interface["address"] = ""
-            else:
-                # 空值表示没有物理地址
-                interface["address"] = ""
 
-            # 获取管理状态 (1=up, 2=down, 3=testing)
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifAdminStatus']}.{i}", **kwargs
+        # 操作状态 (1=up, 2=down, 3=testing, 4=unknown, 5=dormant, 6=notPresent, 7=lowerLayerDown)
+        if "ifOperStatus" in row:
+            value = row["ifOperStatus"]
+            oper_status_code = int(value) if value else 0
+            interface["oper_status"] = oper_status_code
+            interface["oper_status_text"] = self.OPER_STATUS_MAP.get(
+                oper_status_code, "未知"
             )
-            if success:
-                admin_status_code = int(value) if value else 0
-                interface["admin_status"] = admin_status_code
-                # 转换为中文状态描述
-                admin_status_map = {1: "已启用", 2: "已禁用", 3: "测试中"}
-                interface["admin_status_text"] = admin_status_map.get(
-                    admin_status_code, "未知"
-                )
 
-            # 获取操作状态 (1=up, 2=down, 3=testing, 4=unknown, 5=dormant, 6=notPresent, 7=lowerLayerDown)
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifOperStatus']}.{i}", **kwargs
+        return interface
+
+    async def get_interface_counters(
+        self,
+        ip: str,
+        version: str,
+        static_cache: Optional[InterfaceStaticCache] = None,
+        cache_key: Optional[Hashable] = None,
+        profile: Optional[InterfacePollProfile] = None,
+        **kwargs,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        获取接口信息及流量计数器（用于速率计算）
+
+        v2c/v3优先使用ifXTable的64位计数器(ifHCInOctets/ifHCOutOctets)，
+        不支持ifXTable的接口回退到32位ifTable计数器；v1只使用32位计数器。
+        同时获取sysUpTime，用于计算采样间隔和检测设备重启。
+
+        提供static_cache时，静态列（INTERFACE_STATIC_COLUMNS及ifHighSpeed）从缓存读取，
+        只有缓存缺失/过期、设备重启、ifTableLastChange或ifLastChange变化时才重新读取。
+        同时提供profile时，只按接口GET被选中接口的被选中列，不再遍历整表。
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            static_cache: 接口静态属性缓存（可选）
+            cache_key: 缓存中的交换机标识，默认为IP
+            profile: 接口轮询配置（可选），选择轮询的接口和列分组
+            **kwargs: 认证参数，可包含max_repetitions
+
+        Returns:
+            (接口列表, sysUpTime)。接口项在接口信息之外包含 counters
+            （in_octets/out_octets/in_pkts/out_pkts/in_errors/out_errors/
+            in_discards/out_discards）和 counter_bits（32或64）；失败时返回 ([], None)
+        """
+        use_hc = version.lower() != "v1"
+        counter_columns = (
+            self.INTERFACE_HC_COUNTER_COLUMNS
+            if use_hc
+            else self.INTERFACE_COUNTER32_COLUMNS
+        )
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+
+        if static_cache is None:
+            columns = (
+                self.INTERFACE_INFO_COLUMNS
+                + counter_columns
+                + self.INTERFACE_ERROR_COLUMNS
             )
-            if success:
-                oper_status_code = int(value) if value else 0
-                interface["oper_status"] = oper_status_code
-                # 转换为中文状态描述
-                oper_status_map = {
-                    1: "运行中",
-                    2: "未运行",
-                    3: "测试中",
-                    4: "未知",
-                    5: "休眠",
-                    6: "不存在",
-                    7: "下层接口未运行",
-                }
-                interface["oper_status_text"] = oper_status_map.get(
-                    oper_status_code, "未知"
+            if profile is not None:
+                columns = profile.select_columns(columns)
+            (interface_rows, success), (uptime_values, _) = await asyncio.gather(
+                self._walk_interface_columns(ip, version, columns, **kwargs),
+                self.get_multi(ip, version, [self.OIDS["sysUpTime"]], **get_kwargs),
+            )
+            if not success:
+                return [], None
+            value = uptime_values.get(self.OIDS["sysUpTime"])
+            sys_uptime = int(value) if value is not None else None
+        else:
+            interface_rows, sys_uptime = await self._walk_dynamic_interface_columns(
+                ip,
+                version,
+                counter_columns,
+                static_cache,
+                ip if cache_key is None else cache_key,
+                profile,
+                **kwargs,
+            )
+            if interface_rows is None:
+                return [], None
+
+        if profile is not None and profile.filters_rows:
+            interface_rows = [
+                (if_index, row)
+                for if_index, row in interface_rows
+                if profile.matches(row)
+            ]
+
+        if use_hc and (profile is None or profile.wants("traffic")):
+            missing = [
+                (if_index, row)
+                for if_index, row in interface_rows
+                if "ifHCInOctets" not in row or "ifHCOutOctets" not in row
+            ]
+            if missing:
+                await self._fill_counter32_columns(
+                    ip, version, missing, len(missing) == len(interface_rows), **kwargs
                 )
 
-            # 获取接收字节数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifInOctets']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["in_octets"] = int(value) if value else 0
-
-            # 获取发送字节数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifOutOctets']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["out_octets"] = int(value) if value else 0
-
-            # 获取接收丢包数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifInDiscards']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["in_discards"] = int(value) if value else 0
-
-            # 获取发送丢包数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifOutDiscards']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["out_discards"] = int(value) if value else 0
-
-            # 获取接收错误数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifInErrors']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["in_errors"] = int(value) if value else 0
-
-            # 获取发送错误数
-            # value, success = await self.get_data(
-            #     ip, version, f"{self.OIDS['ifOutErrors']}.{i}", **kwargs
-            # )
-            # if success:
-            #     interface["out_errors"] = int(value) if value else 0
-
+        interfaces = []
+        for if_index, row in interface_rows:
+            interface = self._format_interface_row(if_index, row)
+            interface.update(self._extract_counters(row))
             interfaces.append(interface)
+        return interfaces, sys_uptime
 
-        return interfaces
-
-    async def get_interface_traffic(
-        self, ip: str, version: str, **kwargs
-    ) -> List[Dict[str, Any]]:
+    async def get_port_octets(
+        self,
+        ip: str,
+        version: str,
+        ports: Optional[List[int]] = None,
+        **kwargs,
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[int]]:
         """
-        获取接口流量统计信息
+        只读取接口字节计数器（用于高频实时速率）
+
+        指定端口时用一个GET请求读取这些ifIndex的计数器，未指定时用GETBULK遍历两列计数器；
+        v2c/v3优先使用64位计数器，设备不支持的端口回退为32位计数器。
 
         Args:
             ip: 设备IP地址
             version: SNMP版本
+            ports: ifIndex列表，None或空表示全部接口
             **kwargs: 认证参数
 
         Returns:
-            包含接口流量信息的列表
+            ([{"index", "counters", "counter_bits"}], sysUpTime)，失败时接口列表为None
         """
-        traffic_stats = []
-
-        # 获取接口数量
-        value, success = await self.get_data(
-            ip, version, self.OIDS["ifNumber"], **kwargs
+        use_hc = version.lower() != "v1"
+        in_column, out_column = (
+            ("ifHCInOctets", "ifHCOutOctets")
+            if use_hc
+            else ("ifInOctets", "ifOutOctets")
         )
-        if not success:
-            logger.error("无法获取接口数量")
-            return traffic_stats
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+        uptime_oid = self.OIDS["sysUpTime"]
+
+        if ports:
+            oid_map = {}
+            for if_index in ports:
+                for column in (in_column, out_column):
+                    oid_map[f"{self.OIDS[column]}.{if_index}"] = (if_index, column)
+            values, success = await self.get_multi(
+                ip, version, [uptime_oid] + list(oid_map), **get_kwargs
+            )
+            if not success:
+                return None, None
+            rows: Dict[int, Dict[str, Any]] = {if_index: {} for if_index in ports}
+            for oid, (if_index, column) in oid_map.items():
+                if oid in values:
+                    rows[if_index][column] = values[oid]
+            interface_rows = sorted(rows.items())
+        else:
+            (walked, success), (values, _) = await asyncio.gather(
+                self.walk_columns(
+                    ip,
+                    version,
+                    {column: self.OIDS[column] for column in (in_column, out_column)},
+                    **kwargs,
+                ),
+                self.get_multi(ip, version, [uptime_oid], **get_kwargs),
+            )
+            if not success:
+                return None, None
+            if use_hc and not walked:
+                # 设备不支持ifXTable时整列回退为32位计数器
+                walked, success = await self.walk_columns(
+                    ip,
+                    version,
+                    {c: self.OIDS[c] for c in ("ifInOctets", "ifOutOctets")},
+                    **kwargs,
+                )
+                if not success:
+                    return None, None
+            interface_rows = sorted(
+                (int(index), row) for index, row in walked.items() if index.isdigit()
+            )
 
-        if_count = int(value) if value else 0
-        if if_count <= 0:
-            return traffic_stats
+        if use_hc:
+            missing = [
+                (if_index, row)
+                for if_index, row in interface_rows
+                if "ifInOctets" not in row
+                and (in_column not in row or out_column not in row)
+            ]
+            if missing:
+                await self._fill_counter32_columns(
+                    ip, version, missing, False, **kwargs
+                )
 
-        # 获取每个接口的流量统计
-        for i in range(1, if_count + 1):
-            stats: Dict[str, Any] = {"index": i}
+        value = values.get(uptime_oid)
+        sys_uptime = int(value) if value is not None else None
+        interfaces = []
+        for if_index, row in interface_rows:
+            counters = self._extract_counters(row)
+            if counters:
+                interfaces.append({"index": if_index, **counters})
+        return interfaces, sys_uptime
+
+    async def get_interface_status(
+        self, ip: str, version: str, if_index: int, **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """
+        用一个GET请求读取单个接口的描述、速率和状态（收到linkUp/linkDown通知后刷新该接口）
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            if_index: 接口索引
+            **kwargs: 认证参数
+
+        Returns:
+            接口信息字典，设备无响应或接口不存在时返回None
+        """
+        columns = ["ifDescr", "ifSpeed"] + self.INTERFACE_STATUS_COLUMNS
+        if version.lower() != "v1":
+            columns.append("ifHighSpeed")
+        oid_map = {f"{self.OIDS[column]}.{if_index}": column for column in columns}
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+        values, success = await self.get_multi(ip, version, list(oid_map), **get_kwargs)
+        if not success or not values:
+            return None
+
+        row = {column: values[oid] for oid, column in oid_map.items() if oid in values}
+        interface = self._format_interface_row(if_index, row)
+        if "ifLastChange" in row:
+            interface["last_change"] = int(row["ifLastChange"])
+        return interface
+
+    async def _walk_dynamic_interface_columns(
+        self,
+        ip: str,
+        version: str,
+        counter_columns: List[str],
+        static_cache: InterfaceStaticCache,
+        cache_key: Hashable,
+        profile: Optional[InterfacePollProfile] = None,
+        **kwargs,
+    ) -> Tuple[Optional[List[Tuple[int, Dict[str, Any]]]], Optional[int]]:
+        """
+        只读取状态列和计数器列，静态列从缓存合并（必要时刷新缓存）
 
-            # 获取接口描述
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifDescr']}.{i}", **kwargs
+        Returns:
+            ([(ifIndex, 行数据)], sysUpTime)，失败时行数据为None
+        """
+        static_columns = self.INTERFACE_STATIC_COLUMNS + [
+            column for column in counter_columns if column == "ifHighSpeed"
+        ]
+        dynamic_columns = (
+            self.INTERFACE_STATUS_COLUMNS
+            + [column for column in counter_columns if column not in static_columns]
+            + self.INTERFACE_ERROR_COLUMNS
+        )
+        if profile is not None:
+            dynamic_columns = profile.select_columns(dynamic_columns)
+        scalar_oids = [self.OIDS["sysUpTime"], self.OIDS["ifTableLastChange"]]
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+
+        reason = static_cache.refresh_reason(cache_key, check_device=False)
+        if not reason and profile is not None and profile.filters_rows:
+            # 只GET缓存中被选中的接口
+            selected = static_cache.select(cache_key, profile.matches)
+            oid_map = {}
+            for if_index in selected:
+                for column in dynamic_columns:
+                    oid_map[f"{self.OIDS[column]}.{if_index}"] = (if_index, column)
+            # 管理状态不影响ifTableLastChange/ifLastChange，每次都读取全部接口的
+            # ifAdminStatus，管理员启用的接口下一次轮询即被选中
+            admin_oids = {}
+            if profile.admin_up_only:
+                admin_oids = {
+                    f"{self.OIDS['ifAdminStatus']}.{if_index}": if_index
+                    for if_index in static_cache.select(cache_key, lambda row: True)
+                }
+            values, success = await self.get_multi(
+                ip,
+                version,
+                scalar_oids
+                + list(oid_map)
+                + [oid for oid in admin_oids if oid not in oid_map],
+                **get_kwargs,
             )
-            if success:
-                stats["description"] = str(value) if value else ""
+            if not success:
+                return None, None
 
-            # 获取接收字节数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifInOctets']}.{i}", **kwargs
+            sys_uptime, table_last_change = self._interface_scalars(values)
+            reason = static_cache.refresh_reason(
+                cache_key, sys_uptime, table_last_change
             )
-            if success:
-                stats["in_octets"] = int(value) if value else 0
+            if not reason:
+                rows: Dict[int, Dict[str, Any]] = {}
+                for oid, value in values.items():
+                    if oid in oid_map:
+                        if_index, column = oid_map[oid]
+                        rows.setdefault(if_index, {})[column] = value
+                if admin_oids:
+                    rows = await self._reselect_admin_up(
+                        ip,
+                        version,
+                        values,
+                        admin_oids,
+                        rows,
+                        dynamic_columns,
+                        static_cache,
+                        cache_key,
+                        profile,
+                        **get_kwargs,
+                    )
+                interface_rows = sorted(rows.items())
+                last_changes = self._interface_last_changes(interface_rows)
+                stale = static_cache.stale_indexes(cache_key, last_changes)
+                if stale:
+                    static_cache.store(
+                        cache_key,
+                        await self._get_static_columns(
+                            ip, version, static_columns, stale, **get_kwargs
+                        ),
+                        False,
+                    )
+                static_cache.update_state(
+                    cache_key, sys_uptime, table_last_change, last_changes, prune=False
+                )
+                static_cache.merge(cache_key, interface_rows)
+                return interface_rows, sys_uptime
+            # 设备重启或接口增删：重新遍历整表并重新选择接口
+
+        # 需要刷新时，静态列与动态列并发遍历
+        walks = [
+            self._walk_interface_columns(ip, version, dynamic_columns, **kwargs),
+            self.get_multi(ip, version, scalar_oids, **get_kwargs),
+        ]
+        if reason:
+            walks.append(
+                self._walk_interface_columns(ip, version, static_columns, **kwargs)
+            )
+        results = await asyncio.gather(*walks)
+        (interface_rows, success), (scalar_values, _) = results[0], results[1]
+        if not success:
+            return None, None
 
-            # 获取发送字节数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifOutOctets']}.{i}", **kwargs
+        sys_uptime, table_last_change = self._interface_scalars(scalar_values)
+        last_changes = self._interface_last_changes(interface_rows)
+
+        if reason:
+            static_rows, static_success = results[2]
+        else:
+            reason = static_cache.refresh_reason(
+                cache_key, sys_uptime, table_last_change
             )
-            if success:
-                stats["out_octets"] = int(value) if value else 0
+            static_rows, static_success = [], True
+            if reason:
+                static_rows, static_success = await self._walk_interface_columns(
+                    ip, version, static_columns, **kwargs
+                )
+
+        full_refresh = bool(reason)
+        if not reason:
+            stale = static_cache.stale_indexes(cache_key, last_changes)
+            if len(stale) > len(interface_rows) // 2:
+                full_refresh = True
+                static_rows, static_success = await self._walk_interface_columns(
+                    ip, version, static_columns, **kwargs
+                )
+            elif stale:
+                static_cache.store(
+                    cache_key,
+                    await self._get_static_columns(
+                        ip, version, static_columns, stale, **get_kwargs
+                    ),
+                    False,
+                )
 
-            # 获取接收丢包数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifInDiscards']}.{i}", **kwargs
+        if full_refresh and static_success:
+            static = dict(static_rows)
+            if profile is not None and profile.admin_up_only:
+                # 选择接口时需要管理状态，随静态列一起缓存（本次读取的值优先）
+                for if_index, row in interface_rows:
+                    if if_index in static and "ifAdminStatus" in row:
+                        static[if_index]["ifAdminStatus"] = row["ifAdminStatus"]
+            if reason:
+                logger.debug(f"刷新接口静态列: IP={ip}, 原因={reason}")
+            static_cache.store(cache_key, static, True, reason)
+
+        if static_success:
+            static_cache.update_state(
+                cache_key, sys_uptime, table_last_change, last_changes
             )
-            if success:
-                stats["in_discards"] = int(value) if value else 0
+        static_cache.merge(cache_key, interface_rows)
+        return interface_rows, sys_uptime
 
-            # 获取发送丢包数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifOutDiscards']}.{i}", **kwargs
+    async def _reselect_admin_up(
+        self,
+        ip: str,
+        version: str,
+        values: Dict[str, Any],
+        admin_oids: Dict[str, int],
+        rows: Dict[int, Dict[str, Any]],
+        dynamic_columns: List[str],
+        static_cache: InterfaceStaticCache,
+        cache_key: Hashable,
+        profile: InterfacePollProfile,
+        **kwargs,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        用本次读取的ifAdminStatus更新缓存并重新选择接口
+
+        被禁用的接口从结果中移除，新启用的接口补读动态列
+
+        Returns:
+            重新选择后的 {ifIndex: 行数据}
+        """
+        static_cache.update_columns(
+            cache_key,
+            {
+                if_index: {"ifAdminStatus": values[oid]}
+                for oid, if_index in admin_oids.items()
+                if oid in values
+            },
+        )
+        selected = static_cache.select(cache_key, profile.matches)
+        rows = {if_index: rows[if_index] for if_index in selected if if_index in rows}
+        enabled = [if_index for if_index in selected if if_index not in rows]
+        if enabled:
+            rows.update(
+                await self._get_static_columns(
+                    ip, version, dynamic_columns, enabled, **kwargs
+                )
             )
-            if success:
-                stats["out_discards"] = int(value) if value else 0
+        return rows
+
+    def _interface_scalars(
+        self, values: Dict[str, Any]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """从GET结果中取出 (sysUpTime, ifTableLastChange)"""
+        results = []
+        for name in ("sysUpTime", "ifTableLastChange"):
+            value = values.get(self.OIDS[name])
+            results.append(int(value) if value is not None else None)
+        return results[0], results[1]
+
+    @staticmethod
+    def _interface_last_changes(
+        interface_rows: List[Tuple[int, Dict[str, Any]]]
+    ) -> Dict[int, Optional[int]]:
+        """从接口行数据中取出 {ifIndex: ifLastChange}"""
+        return {
+            if_index: int(row["ifLastChange"]) if "ifLastChange" in row else None
+            for if_index, row in interface_rows
+        }
+
+    async def _get_static_columns(
+        self,
+        ip: str,
+        version: str,
+        columns: List[str],
+        if_indexes: List[int],
+        **kwargs,
+    ) -> Dict[int, Dict[str, Any]]:
+        """按接口GET静态列，返回 {ifIndex: {列名: 值}}"""
+        oid_map = {}
+        for if_index in if_indexes:
+            for column in columns:
+                oid_map[f"{self.OIDS[column]}.{if_index}"] = (if_index, column)
+        values, _ = await self.get_multi(ip, version, list(oid_map), **kwargs)
+        rows: Dict[int, Dict[str, Any]] = {}
+        for oid, value in values.items():
+            if_index, column = oid_map[oid]
+            rows.setdefault(if_index, {})[column] = value
+        return rows
+
+    async def _fill_counter32_columns(
+        self,
+        ip: str,
+        version: str,
+        rows: List[Tuple[int, Dict[str, Any]]],
+        walk: bool,
+        **kwargs,
+    ) -> None:
+        """
+        为不支持64位计数器的接口补充32位计数器列
 
-            # 获取接收错误数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifInErrors']}.{i}", **kwargs
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            rows: 需要补充的 (ifIndex, 行数据) 列表，原地更新
+            walk: 是否遍历整列（所有接口都缺少64位计数器时），否则按接口GET
+            **kwargs: 认证参数
+        """
+        if walk:
+            fallback_rows, success = await self._walk_interface_columns(
+                ip, version, self.INTERFACE_COUNTER32_COLUMNS, **kwargs
             )
-            if success:
-                stats["in_errors"] = int(value) if value else 0
+            if not success:
+                return
+            fallback = dict(fallback_rows)
+            for if_index, row in rows:
+                row.update(fallback.get(if_index, {}))
+            return
+
+        get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+        oid_map = {}
+        for if_index, row in rows:
+            for column in self.INTERFACE_COUNTER32_COLUMNS:
+                oid_map[f"{self.OIDS[column]}.{if_index}"] = (row, column)
+        values, _ = await self.get_multi(ip, version, list(oid_map), **get_kwargs)
+        for oid, value in values.items():
+            row, column = oid_map[oid]
+            row[column] = value
+
+    def _extract_counters(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从接口行数据中提取流量计数器（优先64位）
 
-            # 获取发送错误数
-            value, success = await self.get_data(
-                ip, version, f"{self.OIDS['ifOutErrors']}.{i}", **kwargs
+        Args:
+            row: {列名: 值}
+
+        Returns:
+            {"counters": {...}, "counter_bits": 64或32}，没有流量计数器时返回空字典
+        """
+
+        def value_of(column: str) -> Optional[int]:
+            value = row.get(column)
+            return int(value) if value is not None else None
+
+        def sum_of(columns: List[str]) -> Optional[int]:
+            values = [value_of(column) for column in columns]
+            if values[0] is None:
+                return None
+            return sum(value for value in values if value is not None)
+
+        if "ifHCInOctets" in row and "ifHCOutOctets" in row:
+            bits = 64
+            counters = {
+                "in_octets": value_of("ifHCInOctets"),
+                "out_octets": value_of("ifHCOutOctets"),
+                "in_pkts": sum_of(
+                    [
+                        "ifHCInUcastPkts",
+                        "ifHCInMulticastPkts",
+                        "ifHCInBroadcastPkts",
+                    ]
+                ),
+                "out_pkts": sum_of(
+                    [
+                        "ifHCOutUcastPkts",
+                        "ifHCOutMulticastPkts",
+                        "ifHCOutBroadcastPkts",
+                    ]
+                ),
+            }
+        elif "ifInOctets" in row and "ifOutOctets" in row:
+            bits = 32
+            counters = {
+                "in_octets": value_of("ifInOctets"),
+                "out_octets": value_of("ifOutOctets"),
+                "in_pkts": sum_of(["ifInUcastPkts", "ifInNUcastPkts"]),
+                "out_pkts": sum_of(["ifOutUcastPkts", "ifOutNUcastPkts"]),
+            }
+        else:
+            return {}
+
+        for column, name in (
+            ("ifInErrors", "in_errors"),
+            ("ifOutErrors", "out_errors"),
+            ("ifInDiscards", "in_discards"),
+            ("ifOutDiscards", "out_discards"),
+        ):
+            counters[name] = value_of(column)
+
+        return {
+            "counters": {k: v for k, v in counters.items() if v is not None},
+            "counter_bits": bits,
+        }
+
+    @staticmethod
+    def _format_speed(speed_bps: int) -> str:
+        """格式化为易读的速度描述"""
+        if speed_bps == 0:
+            return "-"
+        elif speed_bps >= 1000000000:  # >= 1 Gbps
+            return f"{speed_bps / 1000000000:.1f} Gbps"
+        elif speed_bps >= 1000000:  # >= 1 Mbps
+            return f"{speed_bps / 1000000:.0f} Mbps"
+        elif speed_bps >= 1000:  # >= 1 Kbps
+            return f"{speed_bps / 1000:.0f} Kbps"
+        return f"{speed_bps} bps"
+
+    @staticmethod
+    def _format_phys_address(value: Any) -> str:
+        """格式化接口物理地址，空值表示没有物理地址"""
+        if not value:
+            return ""
+        try:
+            # 将OctetString转换为bytes
+            if hasattr(value, "prettyPrint"):
+                # pysnmp的OctetString对象
+                mac_bytes = bytes(value)
+            elif isinstance(value, bytes):
+                mac_bytes = value
+            elif isinstance(value, str):
+                # 如果已经是字符串,尝试转换为bytes
+                mac_bytes = value.encode("latin-1")
+            else:
+                mac_bytes = bytes(str(value), "latin-1")
+
+            # 零长度的八位字节串表示没有物理地址(如串口、loopback等)
+            if len(mac_bytes) == 0:
+                return ""
+            # 6字节为以太网MAC地址(802.x)，其他长度按相同格式输出
+            return ":".join(f"{b:02x}" for b in mac_bytes)
+        except Exception as e:
+            logger.debug(
+                f"转换物理地址失败: {e}, value type: {type(value)}, value: {repr(value)}"
             )
-            if success:
-                stats["out_errors"] = int(value) if value else 0
+            return ""
 
+    async def get_interface_traffic(
+        self, ip: str, version: str, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        获取接口流量统计信息（基于GETBULK按列遍历ifTable）
+
+        Args:
+            ip: 设备IP地址
+            version: SNMP版本
+            **kwargs: 认证参数，可包含max_repetitions
+
+        Returns:
+            包含接口流量信息的列表
+        """
+        interface_rows, success = await self._walk_interface_columns(
+            ip, version, self.INTERFACE_TRAFFIC_COLUMNS, **kwargs
+        )
+        if not success:
+            logger.error("无法获取接口流量统计")
+            return []
+
+        field_map = {
+            "ifInOctets": "in_octets",
+            "ifOutOctets": "out_octets",
+            "ifInDiscards": "in_discards",
+            "ifOutDiscards": "out_discards",
+            "ifInErrors": "in_errors",
+            "ifOutErrors": "out_errors",
+        }
+
+        traffic_stats = []
+        for if_index, row in interface_rows:
+            stats: Dict[str, Any] = {"index": if_index}
+            if "ifDescr" in row:
+                value = row["ifDescr"]
+                stats["description"] = str(value) if value else ""
+            for column, field in field_map.items():
+                if column in row:
+                    value = row[column]
+                    stats[field] = int(value) if value else 0
             traffic_stats.append(stats)
 
         return traffic_stats
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步单套接字SNMP子网扫描
+
+用一个UDP套接字向网段内每个主机发送sysDescr探测（v1/v2c，每个团体名一个请求并行发出），
+响应按request-id直接映射回 (主机, 团体名)，不需要为每个请求保存等待状态。
+SNMPv3网段先发送引擎发现报文（按msgID映射回主机），只对有响应的主机做带认证的探测。
+
+发送速率受进程级全局限速器约束（SNMP_SWEEP_RATE 包/秒，多个扫描任务共享），
+每个主机的探测单独计时和重发，不创建任何子进程或线程，/16网段单核即可在数十秒内完成。
+"""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.core.config import SNMP_SWEEP_RATE, SNMP_SWEEP_RETRIES, SNMP_SWEEP_TIMEOUT
+from .ber_codec import (
+    BERDecodeError,
+    PDU_GET,
+    PDU_RESPONSE,
+    VERSION_V1,
+    VERSION_V2C,
+    decode_message,
+    encode_request,
+    peek_request_id,
+)
+from .v3_session import decode_discovery_response, encode_discovery_request
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# sysDescr.0
+SYS_DESCR_OID = (1, 3, 6, 1, 2, 1, 1, 1, 0)
+
+# 单次扫描的最大地址数（防止误传超大IPv6网段）
+MAX_SWEEP_ADDRESSES = 2**20
+
+# 接收缓冲区大小，避免响应集中到达时被内核丢弃
+RECEIVE_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class PacketRateLimiter:
+    """
+    进程级发送限速器（线程安全）
+
+    按"下一个可发送时间"预约发送额度，调用方按返回的延迟等待后再发送，
+    同一进程内的所有扫描任务（可能位于不同线程的事件循环）共享总速率。
+
+    Args:
+        rate: 每秒最多发送的报文数
+    """
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self._next_send = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, packets: int) -> float:
+        """
+        预约发送 packets 个报文的额度
+
+        Returns:
+            发送前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_send)
+            self._next_send = start + packets / self.rate
+            return start - now
+
+
+_rate_limiter: Optional[PacketRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> PacketRateLimiter:
+    """获取进程级共享的扫描限速器"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = PacketRateLimiter(SNMP_SWEEP_RATE)
+    return _rate_limiter
+
+
+class _SweepProtocol(asyncio.DatagramProtocol):
+    """将收到的数据报转交给扫描任务"""
+
+    def __init__(self, on_datagram: Callable[[bytes, Tuple], None]):
+        self.on_datagram = on_datagram
+
+    def datagram_received(self, data: bytes, addr: Tuple) -> None:
+        self.on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"子网扫描套接字错误: {exc}")
+
+
+class SubnetSweeper:
+    """
+    异步单套接字SNMP子网扫描器
+
+    Args:
+        rate: 每秒发送报文上限，默认使用进程级共享限速器（SNMP_SWEEP_RATE）
+        timeout: 每次探测等待响应的时间（秒）
+        retries: 对未响应主机的重扫次数
+        port: SNMP端口
+        iface: 绑定的网络接口名称（仅Linux支持，需要相应权限）
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        timeout: float = SNMP_SWEEP_TIMEOUT,
+        retries: int = SNMP_SWEEP_RETRIES,
+        port: int = 161,
+        iface: Optional[str] = None,
+    ):
+        self.rate_limiter = (
+            PacketRateLimiter(rate) if rate is not None else get_rate_limiter()
+        )
+        self.timeout = timeout
+        self.retries = retries
+        self.port = port
+        self.iface = iface
+        self._stats = {
+            "sent": 0,
+            "received": 0,
+            "unmatched": 0,
+            "decode_errors": 0,
+            "found": 0,
+            "elapsed": 0.0,
+        }
+
+    @staticmethod
+    def expand_hosts(network: str) -> List[str]:
+        """
+        展开网段中的主机地址
+
+        Raises:
+            ValueError: 网段格式错误或地址数超过 MAX_SWEEP_ADDRESSES
+        """
+        network_obj = ipaddress.ip_network(network, strict=False)
+        if network_obj.num_addresses > MAX_SWEEP_ADDRESSES:
+            raise ValueError(
+                f"网段 {network} 过大（{network_obj.num_addresses} 个地址），"
+                f"单次扫描最多 {MAX_SWEEP_ADDRESSES} 个地址"
+            )
+        return [str(ip) for ip in network_obj.hosts()]
+
+    async def _open_transport(
+        self, hosts: List[str], on_datagram: Callable[[bytes, Tuple], None]
+    ) -> asyncio.DatagramTransport:
+        """创建扫描使用的UDP套接字（按网段地址族选择IPv4/IPv6）"""
+        family_ipv6 = bool(hosts) and ":" in hosts[0]
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _SweepProtocol(on_datagram),
+            local_addr=("::" if family_ipv6 else "0.0.0.0", 0),
+        )
+        sock = transport.get_extra_info("socket")
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_SIZE)
+        except OSError as e:
+            logger.debug(f"设置扫描套接字接收缓冲区失败: {e}")
+        if self.iface and hasattr(socket, "SO_BINDTODEVICE"):
+            try:
+                sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_BINDTODEVICE, self.iface.encode()
+                )
+            except OSError as e:
+                logger.warning(f"无法绑定网络接口 {self.iface}，使用默认路由: {e}")
+        return transport
+
+    async def _run(
+        self,
+        hosts: List[str],
+        probes_per_host: int,
+        build_packet: Callable[[int], bytes],
+        on_datagram: Callable[[bytes, Tuple], None],
+        found: Dict[int, Dict],
+        complete: asyncio.Event,
+        on_resolved: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        按限速发送所有探测并等待响应，对未响应的主机重扫
+
+        每个主机的探测单独计时：超时未响应的主机立即重发（最多retries次），
+        不需要等待整个网段发送完成。主机已响应或最后一次探测超时后调用
+        on_resolved(主机序号)，每个主机调用一次（扫描被取消时不再调用）。
+        探测编号 k 对应主机 hosts[k // probes_per_host]，build_packet(k) 生成其报文。
+        """
+        transport = await self._open_transport(hosts, on_datagram)
+        burst = max(1, int(self.rate_limiter.rate / 100))
+        start = time.perf_counter()
+        # 等待响应的主机 (超时时刻, 主机序号, 已发送次数)，发送顺序即超时顺序
+        waiting: deque = deque()
+        budget = 0
+
+        async def send(host_index: int, attempts: int) -> None:
+            nonlocal budget
+            if budget <= 0:
+                delay = self.rate_limiter.reserve(burst)
+                # 即使无需等待也让出事件循环，及时处理已到达的响应
+                await asyncio.sleep(delay)
+                budget += burst
+            address = (hosts[host_index], self.port)
+            first = host_index * probes_per_host
+            for k in range(first, first + probes_per_host):
+                transport.sendto(build_packet(k), address)
+            self._stats["sent"] += probes_per_host
+            budget -= probes_per_host
+            waiting.append((time.monotonic() + self.timeout, host_index, attempts + 1))
+
+        def resolve(host_index: int) -> None:
+            if on_resolved is not None:
+                on_resolved(host_index)
+
+        try:
+            next_host = 0
+            while (next_host < len(hosts) or waiting) and not complete.is_set():
+                # 处理已超时的主机：未响应且还有重扫次数的重发，其余结束
+                while waiting and waiting[0][0] <= time.monotonic():
+                    _, host_index, attempts = waiting.popleft()
+                    if host_index in found or attempts > self.retries:
+                        resolve(host_index)
+                    else:
+                        await send(host_index, attempts)
+
+                if next_host < len(hosts):
+                    for host_index in range(
+                        next_host, min(next_host + burst, len(hosts))
+                    ):
+                        await send(host_index, 0)
+                    next_host = host_index + 1
+                    continue
+                if not waiting:
+                    break
+
+                # 全部主机已发送，等待最早的超时时刻或全部主机响应
+                try:
+                    await asyncio.wait_for(
+                        complete.wait(), max(0.0, waiting[0][0] - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+            # 全部主机已响应时提前结束
+            for _, host_index, _ in waiting:
+                resolve(host_index)
+        finally:
+            transport.close()
+            self._stats["found"] += len(found)
+            self._stats["elapsed"] = round(time.perf_counter() - start, 3)
+
+    @staticmethod
+    def _host_resolver(
+        hosts: List[str],
+        found: Dict[int, Dict],
+        on_resolved: Optional[Callable[[str, bool], None]],
+    ) -> Optional[Callable[[int], None]]:
+        """将主机序号的结束通知转换为 on_resolved(主机地址, 是否响应)"""
+        if on_resolved is None:
+            return None
+        return lambda host_index: on_resolved(hosts[host_index], host_index in found)
+
+    def _resolve_hosts(self, network: Union[str, Sequence[str]]) -> List[str]:
+        """网段（CIDR）展开为主机列表，主机列表原样返回"""
+        if isinstance(network, str):
+            return self.expand_hosts(network)
+        return list(network)
+
+    async def sweep(
+        self,
+        network: Union[str, Sequence[str]],
+        version: str = "v2c",
+        communities: Sequence[str] = ("public",),
+        on_found: Optional[Callable[[Dict[str, str]], None]] = None,
+        on_resolved: Optional[Callable[[str, bool], None]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        扫描网段中响应SNMP v1/v2c sysDescr的设备
+
+        每个主机的所有团体名同时探测，第一个成功响应的团体名作为结果。
+
+        Args:
+            network: 网段（CIDR）或主机地址列表
+            version: 'v1' 或 'v2c'
+            communities: 候选团体名列表
+            on_found: 发现设备时立即调用的回调（参数与返回列表中的元素相同）
+            on_resolved: 主机已响应或全部探测超时后调用的回调，参数为 (主机地址, 是否响应)
+
+        Returns:
+            [{"ip": ..., "community": ..., "description": ...}]，按地址顺序排列
+        """
+        hosts = self._resolve_hosts(network)
+        communities = [community.encode("utf-8") for community in communities]
+        if not hosts or not communities:
+            return []
+        snmp_version = VERSION_V1 if version.lower() == "v1" else VERSION_V2C
+        count = len(communities)
+        total = len(hosts) * count
+        base = random.randint(1, 2**31 - 1 - total)
+        found: Dict[int, Dict] = {}
+        complete = asyncio.Event()
+
+        def build_packet(k: int) -> bytes:
+            return encode_request(
+                snmp_version, communities[k % count], PDU_GET, base + k, [SYS_DESCR_OID]
+            )
+
+        def on_datagram(data: bytes, addr: Tuple) -> None:
+            self._stats["received"] += 1
+            request_id = peek_request_id(data)
+            k = request_id - base if request_id is not None else -1
+            host_index, community_index = divmod(k, count)
+            if not 0 <= k < total or addr[0] != hosts[host_index]:
+                self._stats["unmatched"] += 1
+                return
+            if host_index in found:
+                return
+            try:
+                message = decode_message(data)
+            except BERDecodeError:
+                self._stats["decode_errors"] += 1
+                return
+            if (
+                message.pdu_type != PDU_RESPONSE
+                or message.community != communities[community_index]
+                or message.error_status != 0
+            ):
+                return
+            value = message.var_binds[0][1] if message.var_binds else None
+            found[host_index] = {
+                "ip": hosts[host_index],
+                "community": communities[community_index].decode("utf-8"),
+                "description": str(value) if value else "",
+            }
+            if on_found is not None:
+                on_found(found[host_index])
+            if len(found) == len(hosts):
+                complete.set()
+
+        await self._run(
+            hosts,
+            count,
+            build_packet,
+            on_datagram,
+            found,
+            complete,
+            self._host_resolver(hosts, found, on_resolved),
+        )
+        logger.debug(
+            f"子网扫描完成: {len(hosts)} 个主机，发现 {len(found)} 个SNMP设备，"
+            f"耗时 {self._stats['elapsed']:.2f} 秒"
+        )
+        return [found[host_index] for host_index in sorted(found)]
+
+    async def discover_v3(
+        self,
+        network: Union[str, Sequence[str]],
+        on_resolved: Optional[Callable[[str, bool], None]] = None,
+    ) -> List[Dict[str, object]]:
+        """
+        扫描网段中响应SNMPv3引擎发现的设备（不需要认证参数）
+
+        Args:
+            network: 网段（CIDR）或主机地址列表
+            on_resolved: 主机已响应或全部探测超时后调用的回调，参数为 (主机地址, 是否响应)
+
+        Returns:
+            [{"ip": ..., "engine_id": bytes}]，按地址顺序排列
+        """
+        hosts = self._resolve_hosts(network)
+        if not hosts:
+            return []
+        base = random.randint(1, 2**31 - 1 - len(hosts))
+        found: Dict[int, Dict] = {}
+        complete = asyncio.Event()
+
+        def build_packet(k: int) -> bytes:
+            return encode_discovery_request(base + k, base + k)
+
+        def on_datagram(data: bytes, addr: Tuple) -> None:
+            self._stats["received"] += 1
+            try:
+                msg_id, engine_id, _, _ = decode_discovery_response(data)
+            except BERDecodeError:
+                self._stats["decode_errors"] += 1
+                return
+            host_index = msg_id - base
+            if not 0 <= host_index < len(hosts) or addr[0] != hosts[host_index]:
+                self._stats["unmatched"] += 1
+                return
+            if host_index not in found:
+                found[host_index] = {"ip": hosts[host_index], "engine_id": engine_id}
+                if len(found) == len(hosts):
+                    complete.set()
+
+        await self._run(
+            hosts,
+            1,
+            build_packet,
+            on_datagram,
+            found,
+            complete,
+            self._host_resolver(hosts, found, on_resolved),
+        )
+        logger.debug(
+            f"SNMPv3引擎发现完成: {len(hosts)} 个主机，{len(found)} 个响应，"
+            f"耗时 {self._stats['elapsed']:.2f} 秒"
+        )
+        return [found[host_index] for host_index in sorted(found)]
+
+    def get_statistics(self) -> Dict[str, float]:
+        """获取扫描统计信息"""
+        return dict(self._stats)
+
+
+__all__ = ["SubnetSweeper", "PacketRateLimiter", "get_rate_limiter"]
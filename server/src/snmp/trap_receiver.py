@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP Trap/Inform接收器 - 接收交换机主动发送的通知，与周期轮询互补
+
+- 在一个UDP端口上同时接收v1/v2c/v3通知：v1/v2c报文由原生BER编解码器解码，
+  团体名须与交换机配置的团体名（或SNMP_TRAP_COMMUNITIES）一致；
+  v3报文交给pysnmp的通知接收器做USM认证和解密
+- 按源IP匹配交换机注册表中的交换机，未知来源的通知直接丢弃
+- 每条通知立即以snmpTrap消息广播
+- linkUp/linkDown通知只刷新受影响的接口（一个GET请求），结果以snmpInterfaceStatus消息广播；
+  coldStart/warmStart通知触发该交换机的按需轮询
+
+v3 Trap的权威引擎是发送方，USM用户须按交换机的引擎ID登记：
+添加v3交换机时先发现其引擎ID，再以该引擎ID登记用户；
+v3 Inform的权威引擎是本接收器，用户按本地引擎ID登记，
+因此多台交换机使用相同用户名但密钥不同时，只有最后登记的交换机的Inform能通过认证。
+
+接收器在独立线程的事件循环中运行。
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pyasn1.type import univ
+from pysnmp.carrier.asyncio.dgram import udp
+from pysnmp.entity import config, engine
+from pysnmp.entity.rfc3413 import ntfrcv
+
+from src.core.config import (
+    SNMP_TRAP_COMMUNITIES,
+    SNMP_TRAP_HOST,
+    SNMP_TRAP_PORT,
+)
+from src.core.logger import logger
+from src.database.switch_registry import EVENT_REMOVED
+from src.snmp.ber_codec import (
+    PDU_INFORM,
+    PDU_RESPONSE,
+    PDU_TRAP_V2,
+    VERSION_V1,
+    VERSION_V2C,
+    BERDecodeError,
+    ObjectIdentifier,
+    decode_message,
+    decode_v1_trap,
+    encode_message,
+    peek_version,
+)
+from src.snmp.snmp_monitor import SNMPMonitor
+from src.snmp.unified_poller import prepare_snmp_kwargs, request_switch_poll
+from src.snmp.v3_session import DISCOVERY_RETRY_INTERVAL, discover_engine
+
+# 通知中的标准变量
+SYS_UPTIME_OID = "1.3.6.1.2.1.1.3.0"
+SNMP_TRAP_OID = "1.3.6.1.6.3.1.1.4.1.0"
+
+# 标准通知 (SNMPv2-MIB snmpTraps / IF-MIB)
+STANDARD_TRAP_PREFIX = "1.3.6.1.6.3.1.1.5"
+TRAP_NAMES = {
+    "1.3.6.1.6.3.1.1.5.1": "coldStart",
+    "1.3.6.1.6.3.1.1.5.2": "warmStart",
+    "1.3.6.1.6.3.1.1.5.3": "linkDown",
+    "1.3.6.1.6.3.1.1.5.4": "linkUp",
+    "1.3.6.1.6.3.1.1.5.5": "authenticationFailure",
+    "1.3.6.1.6.3.1.1.5.6": "egpNeighborLoss",
+}
+LINK_TRAPS = ("linkDown", "linkUp")
+RESTART_TRAPS = ("coldStart", "warmStart")
+
+# linkUp/linkDown变量绑定中携带ifIndex的列（ifIndex、ifAdminStatus、ifOperStatus）
+IF_INDEX_COLUMNS = (
+    "1.3.6.1.2.1.2.2.1.1.",
+    "1.3.6.1.2.1.2.2.1.7.",
+    "1.3.6.1.2.1.2.2.1.8.",
+)
+
+# 消息接收函数: (消息) -> None
+MessageSink = Callable[[Dict[str, Any]], None]
+# 按需轮询函数: (交换机配置, 轮询类型) -> Future
+PollRequester = Callable[[Dict[str, Any], str], Any]
+
+
+def _broadcast(message: Dict[str, Any]) -> None:
+    """通过WebSocket广播消息"""
+    from src.core.state_manager import state_manager
+
+    state_manager.broadcast_message(message)
+
+
+def _json_value(value: Any) -> Any:
+    """将原生解码值或pysnmp值转换为可JSON序列化的值"""
+    if isinstance(value, (ObjectIdentifier, univ.ObjectIdentifier)):
+        return str(value)
+    if isinstance(value, (int, univ.Integer)):
+        return int(value)
+    if isinstance(value, bytes):
+        return str(value)
+    if hasattr(value, "prettyPrint"):
+        return value.prettyPrint()
+    return str(value)
+
+
+def v1_trap_oid(enterprise: str, generic_trap: int, specific_trap: int) -> str:
+    """按RFC 3584将v1 Trap的generic/specific字段转换为snmpTrapOID"""
+    if 0 <= generic_trap < 6:
+        return f"{STANDARD_TRAP_PREFIX}.{generic_trap + 1}"
+    return f"{enterprise}.0.{specific_trap}"
+
+
+class _TrapTransport(udp.UdpAsyncioTransport):
+    """v1/v2c报文交给接收器原生处理，v3报文交给pysnmp引擎"""
+
+    def __init__(self, receiver: "TrapReceiver", loop: asyncio.AbstractEventLoop):
+        super().__init__(loop=loop)
+        self._receiver = receiver
+
+    def datagram_received(self, datagram, transportAddress):
+        if peek_version(datagram) in (VERSION_V1, VERSION_V2C):
+            self._receiver._on_community_message(
+                datagram, transportAddress, self.transport
+            )
+        else:
+            super().datagram_received(datagram, transportAddress)
+
+
+class TrapReceiver:
+    """
+    SNMP Trap/Inform接收器
+
+    Args:
+        registry: 交换机注册表，用于按源IP匹配交换机和登记v3用户
+        host: 监听地址
+        port: 监听端口
+        communities: 额外接受的v1/v2c团体名
+        monitor: SNMP监控器（可选），用于刷新单个接口
+        sink: 消息接收函数（可选），默认通过WebSocket广播
+        request_poll: 按需轮询函数（可选），默认request_switch_poll
+    """
+
+    def __init__(
+        self,
+        registry,
+        host: str = SNMP_TRAP_HOST,
+        port: int = SNMP_TRAP_PORT,
+        communities: Optional[List[str]] = None,
+        monitor: Optional[SNMPMonitor] = None,
+        sink: Optional[MessageSink] = None,
+        request_poll: Optional[PollRequester] = None,
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.communities = set(
+            SNMP_TRAP_COMMUNITIES if communities is None else communities
+        )
+        self.monitor = monitor
+        self._sink = sink or _broadcast
+        self._request_poll = request_poll or request_switch_poll
+
+        self._switches_by_ip: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._start_error: Optional[str] = None
+        self._engine = None
+        self._transport: Optional[_TrapTransport] = None
+        self._notification_receiver = None
+
+        # v3用户（只在事件循环线程中访问）
+        # 交换机ID -> (用户名, 已登记的设备引擎ID)
+        self._v3_users: Dict[Any, Tuple[str, Optional[bytes]]] = {}
+        # 用户名 -> 按本地引擎ID登记该用户的交换机ID
+        self._local_v3_users: Dict[str, Set[Any]] = {}
+        self._v3_discoveries: Dict[Any, asyncio.Task] = {}
+
+        # (交换机ID, ifIndex) -> 刷新期间再次收到通知时待重新刷新的触发通知
+        self._refreshing: Dict[Tuple[Any, int], Optional[str]] = {}
+
+        self._stats = {
+            "received": 0,
+            "v1": 0,
+            "v2c": 0,
+            "v3": 0,
+            "informs": 0,
+            "unknown_source": 0,
+            "auth_failures": 0,
+            "decode_errors": 0,
+            "interface_refreshes": 0,
+            "restart_polls": 0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """
+        启动接收器
+
+        Returns:
+            端口监听成功时返回True
+        """
+        if self.is_running:
+            logger.warning("SNMP Trap接收器已在运行中")
+            return True
+        self._ready.clear()
+        self._start_error = None
+        self._thread = threading.Thread(
+            target=self._run, name="snmp-trap-receiver", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._start_error is not None:
+            logger.error(f"SNMP Trap接收器启动失败: {self._start_error}")
+            return False
+        logger.info(f"SNMP Trap接收器已启动，监听 {self.host}:{self.port}")
+        return True
+
+    def stop(self) -> None:
+        """停止接收器"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        loop, thread = self._loop, self._thread
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+        self._thread = None
+        logger.info("SNMP Trap接收器已停止")
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            try:
+                loop.run_until_complete(self._open())
+            except Exception as e:
+                self._start_error = str(e)
+                return
+            finally:
+                self._ready.set()
+            loop.run_forever()
+        finally:
+            self._close()
+            loop.close()
+            self._loop = None
+
+    async def _open(self) -> None:
+        """绑定端口、注册v3通知接收器并加载交换机"""
+        loop = asyncio.get_running_loop()
+        self._engine = engine.SnmpEngine()
+        self._transport = _TrapTransport(self, loop)
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: self._transport, local_addr=(self.host, self.port)
+        )
+        # 端口为0时记录系统分配的端口
+        self.port = transport.get_extra_info("sockname")[1]
+        config.add_transport(self._engine, udp.DOMAIN_NAME, self._transport)
+        self._notification_receiver = ntfrcv.NotificationReceiver(
+            self._engine, self._on_v3_notification
+        )
+
+        self._unsubscribe = self.registry.subscribe(self._on_switch_event)
+        for switch in self.registry.get_all():
+            self._index_switch(switch)
+            self._sync_v3_user(switch)
+
+    def _close(self) -> None:
+        """取消未完成的任务并关闭传输（事件循环线程中调用）"""
+        loop = self._loop
+        tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._v3_discoveries.clear()
+        self._refreshing.clear()
+        if self._notification_receiver is not None:
+            self._notification_receiver.close(self._engine)
+            self._notification_receiver = None
+        if self._transport is not None and self._transport.transport is not None:
+            self._transport.transport.close()
+        self._transport = None
+        if self._engine is not None:
+            try:
+                self._engine.close_dispatcher()
+            except Exception as e:
+                logger.debug(f"关闭Trap接收器传输时出错: {e}")
+            self._engine = None
+        # 让套接字在事件循环关闭前完成关闭
+        loop.run_until_complete(asyncio.sleep(0))
+
+    # ------------------------------------------------------------------
+    # 交换机匹配
+    # ------------------------------------------------------------------
+
+    def _on_switch_event(self, event: str, switch: Dict[str, Any]) -> None:
+        """交换机注册表变更（可能在其他线程中调用）"""
+        if event == EVENT_REMOVED:
+            with self._lock:
+                self._switches_by_ip.pop(switch.get("ip"), None)
+        else:
+            self._index_switch(switch)
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(
+                self._sync_v3_user, switch, event == EVENT_REMOVED
+            )
+
+    def _index_switch(self, switch: Dict[str, Any]) -> None:
+        with self._lock:
+            self._switches_by_ip[switch.get("ip")] = dict(switch)
+
+    def _match_switch(self, ip: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._switches_by_ip.get(ip)
+
+    def _community_accepted(self, switch: Dict[str, Any], community: bytes) -> bool:
+        """团体名须与交换机配置的团体名或额外接受的团体名一致"""
+        name = community.decode("utf-8", "replace")
+        if name in self.communities:
+            return True
+        if switch.get("snmp_version", "v2c") == "v3":
+            return False
+        return name == (switch.get("community") or "public")
+
+    # ------------------------------------------------------------------
+    # v3用户登记（事件循环线程中调用）
+    # ------------------------------------------------------------------
+
+    def _sync_v3_user(self, switch: Dict[str, Any], removed: bool = False) -> None:
+        """按交换机配置重新登记v3用户"""
+        switch_id = switch.get("id")
+        task = self._v3_discoveries.pop(switch_id, None)
+        if task is not None:
+            task.cancel()
+        self._remove_v3_user(switch_id)
+        if removed or self._engine is None:
+            return
+        if switch.get("snmp_version") != "v3" or not switch.get("user"):
+            return
+
+        user = switch["user"]
+        # Inform：按本地引擎ID登记
+        self._add_v3_user(switch, None)
+        self._local_v3_users.setdefault(user, set()).add(switch_id)
+        self._v3_users[switch_id] = (user, None)
+        # Trap：发现设备引擎ID后按其登记
+        self._v3_discoveries[switch_id] = asyncio.ensure_future(
+            self._discover_v3_engine(switch)
+        )
+
+    async def _discover_v3_engine(self, switch: Dict[str, Any]) -> None:
+        """发现交换机的引擎ID并登记用户，失败时定期重试"""
+        switch_id = switch.get("id")
+        ip = switch.get("ip")
+        try:
+            while True:
+                result = await discover_engine(ip)
+                if result is not None:
+                    engine_id = result[0]
+                    self._add_v3_user(switch, engine_id)
+                    self._v3_users[switch_id] = (switch["user"], engine_id)
+                    logger.debug(
+                        f"已登记v3 Trap用户: IP={ip}, 引擎ID={engine_id.hex()}"
+                    )
+                    return
+                logger.debug(
+                    f"v3引擎发现失败，{DISCOVERY_RETRY_INTERVAL}秒后重试: IP={ip}"
+                )
+                await asyncio.sleep(DISCOVERY_RETRY_INTERVAL)
+        finally:
+            if self._v3_discoveries.get(switch_id) is asyncio.current_task():
+                del self._v3_discoveries[switch_id]
+
+    def _add_v3_user(self, switch: Dict[str, Any], engine_id: Optional[bytes]) -> None:
+        auth_key = switch.get("auth_key")
+        priv_key = switch.get("priv_key")
+        auth_protocol = config.USM_AUTH_NONE
+        priv_protocol = config.USM_PRIV_NONE
+        if auth_key:
+            auth_protocol = (
+                config.USM_AUTH_HMAC96_SHA
+                if (switch.get("auth_protocol") or "md5").lower() == "sha"
+                else config.USM_AUTH_HMAC96_MD5
+            )
+            if priv_key:
+                priv_protocol = config.USM_PRIV_CBC56_DES
+        try:
+            config.add_v3_user(
+                self._engine,
+                switch["user"],
+                auth_protocol,
+                auth_key or None,
+                priv_protocol,
+                (priv_key or None) if auth_key else None,
+                securityEngineId=(
+                    univ.OctetString(engine_id) if engine_id is not None else None
+                ),
+            )
+        except Exception as e:
+            logger.error(f"登记v3 Trap用户失败: IP={switch.get('ip')}, {e}")
+
+    def _remove_v3_user(self, switch_id: Any) -> None:
+        registered = self._v3_users.pop(switch_id, None)
+        if registered is None:
+            return
+        user, engine_id = registered
+        try:
+            if engine_id is not None:
+                config.delete_v3_user(
+                    self._engine, user, securityEngineId=univ.OctetString(engine_id)
+                )
+            switch_ids = self._local_v3_users.get(user, set())
+            switch_ids.discard(switch_id)
+            if not switch_ids:
+                self._local_v3_users.pop(user, None)
+                config.delete_v3_user(self._engine, user)
+        except Exception as e:
+            logger.debug(f"删除v3 Trap用户时出错: {user}, {e}")
+
+    # ------------------------------------------------------------------
+    # 通知接收
+    # ------------------------------------------------------------------
+
+    def _on_community_message(self, data: bytes, address, transport) -> None:
+        """处理v1/v2c通知报文"""
+        self._stats["received"] += 1
+        ip = address[0]
+        inform = None
+        try:
+            if peek_version(data) == VERSION_V1:
+                trap = decode_v1_trap(data)
+                version = "v1"
+                community = trap.community
+                uptime = int(trap.time_stamp)
+                trap_oid = v1_trap_oid(
+                    str(trap.enterprise), trap.generic_trap, trap.specific_trap
+                )
+                var_binds = [(str(oid), _json_value(v)) for oid, v in trap.var_binds]
+            else:
+                message = decode_message(data)
+                if message.pdu_type not in (PDU_TRAP_V2, PDU_INFORM):
+                    logger.debug(
+                        f"忽略非通知报文: {ip}, PDU类型0x{message.pdu_type:02x}"
+                    )
+                    return
+                version = "v2c"
+                community = message.community
+                var_binds = [(str(oid), _json_value(v)) for oid, v in message.var_binds]
+                values = dict(var_binds)
+                uptime = values.get(SYS_UPTIME_OID)
+                trap_oid = values.get(SNMP_TRAP_OID)
+                if message.pdu_type == PDU_INFORM:
+                    inform = message
+        except BERDecodeError as e:
+            self._stats["decode_errors"] += 1
+            logger.debug(f"通知报文解码失败: {ip}, {e}")
+            return
+
+        switch = self._match_switch(ip)
+        if switch is None:
+            self._stats["unknown_source"] += 1
+            logger.debug(f"忽略未知来源的通知: {ip}")
+            return
+        if not self._community_accepted(switch, community):
+            self._stats["auth_failures"] += 1
+            logger.warning(f"通知团体名不匹配: {ip}")
+            return
+
+        if inform is not None and transport is not None:
+            # Inform需要回复Response，确认已收到
+            transport.sendto(
+                encode_message(
+                    inform.version,
+                    inform.community,
+                    PDU_RESPONSE,
+                    inform.request_id,
+                    inform.var_binds,
+                ),
+                address,
+            )
+            self._stats["informs"] += 1
+
+        self._stats[version] += 1
+        self._handle_notification(switch, version, trap_oid, uptime, var_binds)
+
+    def _on_v3_notification(
+        self,
+        snmp_engine,
+        state_reference,
+        context_engine_id,
+        context_name,
+        var_binds,
+        cb_ctx,
+    ) -> None:
+        """处理已通过USM认证的v3通知（pysnmp回调，Inform已由pysnmp回复）"""
+        self._stats["received"] += 1
+        _, address = snmp_engine.message_dispatcher.get_transport_info(state_reference)
+        ip = address[0]
+        switch = self._match_switch(ip)
+        if switch is None:
+            self._stats["unknown_source"] += 1
+            logger.debug(f"忽略未知来源的通知: {ip}")
+            return
+
+        var_binds = [(str(oid), _json_value(v)) for oid, v in var_binds]
+        values = dict(var_binds)
+        self._stats["v3"] += 1
+        self._handle_notification(
+            switch,
+            "v3",
+            values.get(SNMP_TRAP_OID),
+            values.get(SYS_UPTIME_OID),
+            var_binds,
+        )
+
+    def _handle_notification(
+        self,
+        switch: Dict[str, Any],
+        version: str,
+        trap_oid: Optional[str],
+        uptime: Optional[int],
+        var_binds: List[Tuple[str, Any]],
+    ) -> None:
+        """广播通知，并按通知类型刷新接口或触发按需轮询"""
+        trap_name = TRAP_NAMES.get(trap_oid, trap_oid)
+        if_index = None
+        for oid, _ in var_binds:
+            if oid.startswith(IF_INDEX_COLUMNS):
+                if_index = int(oid.rsplit(".", 1)[1])
+                break
+
+        event = {
+            "switch_id": switch.get("id"),
+            "ip": switch.get("ip"),
+            "version": version,
+            "trap_oid": trap_oid,
+            "trap_name": trap_name,
+            "uptime": uptime,
+            "if_index": if_index,
+            "var_binds": [{"oid": oid, "value": value} for oid, value in var_binds],
+            "received_at": time.time(),
+        }
+        logger.info(
+            f"收到SNMP通知: IP={event['ip']}, {trap_name}"
+            + (f", ifIndex={if_index}" if if_index is not None else "")
+        )
+        self._sink({"type": "snmpTrap", "data": event})
+
+        if trap_name in LINK_TRAPS and if_index is not None:
+            self._schedule_interface_refresh(switch, if_index, trap_name)
+        elif trap_name in RESTART_TRAPS:
+            self._request_restart_poll(switch)
+
+    def _schedule_interface_refresh(
+        self, switch: Dict[str, Any], if_index: int, trigger: str
+    ) -> None:
+        """刷新单个接口；刷新期间再次收到该接口的通知时，完成后再刷新一次"""
+        key = (switch.get("id"), if_index)
+        if key in self._refreshing:
+            self._refreshing[key] = trigger
+            return
+        self._refreshing[key] = None
+        asyncio.ensure_future(self._refresh_interface(key, switch, trigger))
+
+    async def _refresh_interface(
+        self, key: Tuple[Any, int], switch: Dict[str, Any], trigger: str
+    ) -> None:
+        if self.monitor is None:
+            self.monitor = SNMPMonitor()
+        switch_id, if_index = key
+        try:
+            while True:
+                self._stats["interface_refreshes"] += 1
+                data: Dict[str, Any] = {
+                    "switch_id": switch_id,
+                    "ip": switch.get("ip"),
+                    "if_index": if_index,
+                    "trigger": trigger,
+                }
+                try:
+                    interface = await self.monitor.get_interface_status(
+                        switch.get("ip", ""),
+                        switch.get("snmp_version", "v2c"),
+                        if_index,
+                        **prepare_snmp_kwargs(switch),
+                    )
+                except Exception as e:
+                    interface = None
+                    logger.debug(f"刷新接口失败: IP={switch.get('ip')}, {e}")
+                data["interface"] = interface
+                if interface is None:
+                    data["error"] = "SNMP连接超时或接口不存在"
+                data["poll_time"] = time.time()
+                self._sink({"type": "snmpInterfaceStatus", "data": data})
+
+                trigger = self._refreshing.get(key)
+                if trigger is None:
+                    return
+                self._refreshing[key] = None
+        finally:
+            self._refreshing.pop(key, None)
+
+    def _request_restart_poll(self, switch: Dict[str, Any]) -> None:
+        """设备重启后立即轮询设备信息和接口（结果由轮询器照常广播）"""
+        self._stats["restart_polls"] += 1
+        for poll_type in ("device", "interface"):
+            try:
+                self._request_poll(switch, poll_type)
+            except RuntimeError as e:
+                logger.debug(f"设备重启后按需轮询未执行: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取接收器统计信息"""
+        with self._lock:
+            switches = len(self._switches_by_ip)
+        return {
+            **self._stats,
+            "running": self.is_running,
+            "port": self.port,
+            "switches": switches,
+            "v3_users": len(self._v3_users),
+        }
+
+
+# 全局接收器实例
+_trap_receiver: Optional[TrapReceiver] = None
+
+
+def start_trap_receiver(registry, **kwargs) -> Optional[TrapReceiver]:
+    """
+    启动SNMP Trap接收器
+
+    Args:
+        registry: 交换机注册表
+        **kwargs: 传给TrapReceiver的参数
+
+    Returns:
+        接收器实例，端口监听失败时返回None
+    """
+    global _trap_receiver
+
+    if _trap_receiver is not None and _trap_receiver.is_running:
+        logger.warning("SNMP Trap接收器已在运行中")
+        return _trap_receiver
+
+    receiver = TrapReceiver(registry, **kwargs)
+    if not receiver.start():
+        receiver.stop()
+        return None
+    _trap_receiver = receiver
+    return _trap_receiver
+
+
+def stop_trap_receiver():
+    """停止SNMP Trap接收器"""
+    global _trap_receiver
+    if _trap_receiver is not None:
+        _trap_receiver.stop()
+        _trap_receiver = None
+
+
+def get_trap_receiver() -> Optional[TrapReceiver]:
+    """获取SNMP Trap接收器实例"""
+    return _trap_receiver
+
+
+__all__ = [
+    "TRAP_NAMES",
+    "TrapReceiver",
+    "start_trap_receiver",
+    "stop_trap_receiver",
+    "get_trap_receiver",
+    "v1_trap_oid",
+]
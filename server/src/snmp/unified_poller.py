@@ -3,26 +3,156 @@
 
 """
 SNMP统一轮询器 - 支持设备信息和接口信息轮询
-快进快出队列模式：为每个设备建立独立轮询，根据性能动态调整并发数
+快进快出队列模式：为每个设备建立独立轮询
+后台轮询的在途请求数按站点/子网分组限制，每个分组根据p90延迟和超时比例按AIMD独立调整，
+慢速的广域网分支不会拖慢本地机房
+每台设备按固定相位在轮询间隔内错开到期，避免所有设备同时入队造成突发负载
+连续失败的设备由熔断器按指数退避跳过，退避到期后先用单个sysUpTime请求探测再恢复轮询
+交换机列表来自内存中的交换机注册表：新增的交换机立即轮询，删除的交换机立即移出调度
+按需轮询（打开交换机详情时立即轮询）走独立的优先队列和预留并发，不占用后台轮询的并发，
+同一交换机的并发请求共享一次轮询的结果
 """
 
 import asyncio
+import concurrent.futures
 import logging
 import threading
 import time
-from typing import Dict, Any, List, Optional, Tuple, Set, Literal, TYPE_CHECKING
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    Set,
+    Literal,
+    TYPE_CHECKING,
+)
 from collections import deque
 from datetime import datetime
 import statistics
 
 from src.database.managers.switch_manager import SwitchManager
 from src.core.logger import logger
+from src.core.config import (
+    SNMP_CODEC,
+    SNMP_CONCURRENCY_DECREASE_FACTOR,
+    SNMP_CONCURRENCY_GROUP_PREFIX,
+    SNMP_CONCURRENCY_LATENCY_TARGET,
+    SNMP_CONCURRENCY_SITES,
+    SNMP_CONCURRENCY_TIMEOUT_RATIO,
+    SNMP_DELTA_ENABLED,
+    SNMP_ON_DEMAND_QUEUE_LIMIT,
+    SNMP_ON_DEMAND_TIMEOUT,
+    SNMP_ON_DEMAND_WORKERS,
+)
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.rate_calculator import InterfaceRateCalculator
+from src.snmp.interface_cache import InterfaceStaticCache
+from src.snmp.poll_profile import InterfacePollProfile, profile_interval
+from src.snmp.poll_scheduler import PollScheduler
+from src.snmp.poll_delta import get_poll_delta_encoder
+from src.snmp.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    DECISION_DECREASE,
+    DECISION_INCREASE,
+)
+from src.snmp.circuit_breaker import (
+    DeviceCircuitBreaker,
+    DECISION_SKIP,
+    STATE_OPEN,
+)
+from src.database.switch_registry import EVENT_ADDED, EVENT_REMOVED
 
 if TYPE_CHECKING:
     from src.snmp.manager import SNMPManager
+    from src.database.managers.metrics_manager import MetricsManager
+    from src.database.managers.poll_state_manager import PollStateManager
 
 PollType = Literal["device", "interface"]
 
+# 轮询结果接收函数: (轮询类型, 轮询结果) -> None
+ResultSink = Callable[[str, Dict[str, Any]], None]
+
+# 按需轮询请求中的类型参数 -> 需要轮询的类型
+ON_DEMAND_POLL_TYPES: Dict[str, Tuple[PollType, ...]] = {
+    "all": ("device", "interface"),
+    "device": ("device",),
+    "interface": ("interface",),
+}
+
+
+def broadcast_poll_result(poll_type: str, result: Dict[str, Any]):
+    """通过WebSocket广播单个轮询结果（启用增量广播时只发送相对上一次的变化）"""
+    from src.core.state_manager import state_manager
+
+    if SNMP_DELTA_ENABLED:
+        state_manager.broadcast_message(
+            get_poll_delta_encoder().encode(poll_type, result)
+        )
+        return
+
+    msg_type = "snmpDeviceUpdate" if poll_type == "device" else "snmpInterfaceUpdate"
+    state_manager.broadcast_message(
+        {
+            "type": msg_type,
+            "data": result,
+            "poll_time": time.time(),
+        }
+    )
+
+
+def record_poll_metrics(
+    metrics_manager: "MetricsManager", poll_type: str, result: Dict[str, Any]
+):
+    """将成功的轮询结果写入指标时序存储（仅写入缓冲区，不阻塞轮询）"""
+    switch_id = result.get("switch_id")
+    if switch_id is None or result.get("type") != "success":
+        return
+
+    if poll_type == "device":
+        metrics_manager.record_switch_usage(
+            switch_id,
+            result.get("cpu_usage"),
+            result.get("memory_usage"),
+            timestamp=result.get("poll_time"),
+        )
+    else:
+        metrics_manager.record_interface_rates(
+            switch_id,
+            result.get("interface_info") or [],
+            timestamp=result.get("poll_time"),
+        )
+
+
+def prepare_snmp_kwargs(switch_config: Dict[str, Any]) -> Dict[str, Any]:
+    """根据交换机配置准备SNMP认证参数"""
+    snmp_version = switch_config.get("snmp_version", "v2c")
+    kwargs = {}
+
+    if snmp_version in ["v1", "v2c", "2c"]:
+        kwargs["community"] = switch_config.get("community", "public")
+        # 编解码实现由全局配置SNMP_CODEC决定；交换机表没有snmp_codec字段，
+        # 只有模拟代理生成的测试配置（agent_simulator）会设置它
+        kwargs["codec"] = switch_config.get("snmp_codec") or SNMP_CODEC
+    elif snmp_version == "v3":
+        kwargs["user"] = switch_config.get("user", "")
+        if switch_config.get("auth_key"):
+            kwargs["auth_key"] = switch_config.get("auth_key")
+        if switch_config.get("auth_protocol"):
+            kwargs["auth_protocol"] = switch_config.get("auth_protocol", "md5")
+        if switch_config.get("priv_key"):
+            kwargs["priv_key"] = switch_config.get("priv_key")
+        if switch_config.get("priv_protocol"):
+            kwargs["priv_protocol"] = switch_config.get("priv_protocol", "des")
+
+    # 非标准SNMP端口：同样只有模拟代理生成的测试配置会设置，默认161
+    if switch_config.get("snmp_port"):
+        kwargs["port"] = int(switch_config["snmp_port"])
+
+    return kwargs
+
 
 class SNMPPoller:
     """
@@ -43,31 +173,47 @@ class SNMPPoller:
         enable_cache: bool = True,
         cache_ttl: int = 300,
         dynamic_adjustment: bool = True,
+        metrics_manager: Optional["MetricsManager"] = None,
+        result_sink: Optional[ResultSink] = None,
+        on_demand_workers: int = SNMP_ON_DEMAND_WORKERS,
+        poll_state_manager: Optional["PollStateManager"] = None,
     ):
         """
         初始化SNMP统一轮询器
 
         Args:
-            switch_manager: 交换机管理器实例
+            switch_manager: 交换机管理器实例（提供交换机注册表registry）
             poll_type: 轮询类型 ("device": 设备信息, "interface": 接口信息)
             poll_interval: 轮询间隔（秒），默认60秒
-            min_workers: 最小并发数，默认5
-            max_workers: 最大并发数，默认50
+            min_workers: 最小并发数，默认5（启用动态调整时为每个站点/子网分组的初始并发数）
+            max_workers: 最大并发数，默认50（启用动态调整时为所有分组的在途轮询总数上限）
             device_timeout: 单个设备超时时间（秒），默认5秒
             enable_cache: 是否启用结果缓存，默认True
             cache_ttl: 缓存生存时间（秒），默认300秒
-            dynamic_adjustment: 是否启用动态并发调整，默认True
+            dynamic_adjustment: 是否启用动态并发调整（按站点/子网分组的AIMD并发限制），默认True
+            metrics_manager: 指标时序存储管理器（可选），用于持久化速率和CPU/内存
+            result_sink: 轮询结果接收函数（可选），指定后结果交给该函数而不直接广播，
+                用于在工作进程中轮询、由主进程统一广播和持久化
+            on_demand_workers: 为按需轮询预留的并发数（与min_workers/max_workers分开计算）
+            poll_state_manager: 轮询状态存储（可选），保存最后一次轮询结果和计数器基线，
+                启动时恢复计数器基线，重启后第一次接口轮询即可计算速率
         """
         self.switch_manager = switch_manager
+        self.metrics_manager = metrics_manager
+        self.poll_state_manager = poll_state_manager
+        self.result_sink = result_sink
         self.poll_type = poll_type
         self.poll_interval = poll_interval
         self.min_workers = min_workers
         self.max_workers = max_workers
         self.current_workers = min_workers
         self.device_timeout = device_timeout
-        self.enable_cache = enable_cache
+        # 接口轮询依赖连续的计数器采样计算速率，不使用结果缓存
+        self.enable_cache = enable_cache and poll_type == "device"
         self.cache_ttl = cache_ttl
         self.dynamic_adjustment = dynamic_adjustment
+        self.on_demand_workers = max(1, on_demand_workers)
+        self.on_demand_queue_limit = SNMP_ON_DEMAND_QUEUE_LIMIT
 
         self.snmp_manager: Optional["SNMPManager"] = None
         self._running = False
@@ -82,7 +228,16 @@ class SNMPPoller:
         # 用于跟踪所有运行中的任务
         self._worker_tasks: List[asyncio.Task] = []
         self._enqueue_task: Optional[asyncio.Task] = None
-        self._adjustment_task: Optional[asyncio.Task] = None
+
+        # 按需轮询的优先队列和预留的工作协程
+        self._priority_queue: Optional[asyncio.Queue] = None
+        self._priority_tasks: List[asyncio.Task] = []
+        # 进行中或排队中的轮询 {ip: Future}，同一交换机的按需请求共享结果
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # 交换机注册表变更时唤醒入队协程
+        self._wakeup: Optional[asyncio.Event] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
 
         # 缓存
         self._cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
@@ -98,6 +253,9 @@ class SNMPPoller:
             "queue_size": 0,
             "active_workers": 0,
             "current_concurrency": min_workers,
+            "on_demand_requests": 0,
+            "on_demand_deduplicated": 0,
+            "on_demand_rejected": 0,
         }
         self._stats_lock = threading.Lock()
 
@@ -105,13 +263,42 @@ class SNMPPoller:
         self._response_times: deque = deque(maxlen=100)
         self._response_lock = threading.Lock()
 
-        # 失败设备跟踪
-        self._failure_tracker: Dict[str, int] = {}
-        self._failure_lock = threading.Lock()
+        # 失败设备熔断（连续失败后指数退避，退避到期后半开探测）
+        self._breaker = DeviceCircuitBreaker(
+            base_backoff=max(poll_interval, 30),
+            max_backoff=max(poll_interval * 20, 600),
+        )
+
+        # 按站点/子网分组的自适应并发限制（超时比例或p90延迟过高时乘性减小，并发打满时加性增大）
+        self._limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        if dynamic_adjustment:
+            self._limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=min_workers,
+                max_limit=max_workers,
+                latency_target=device_timeout * SNMP_CONCURRENCY_LATENCY_TARGET,
+                timeout_ratio=SNMP_CONCURRENCY_TIMEOUT_RATIO,
+                decrease_factor=SNMP_CONCURRENCY_DECREASE_FACTOR,
+                group_prefix=SNMP_CONCURRENCY_GROUP_PREFIX,
+                sites=SNMP_CONCURRENCY_SITES,
+            )
+            # 工作协程只是并发的上限，实际在途轮询数由各分组的限制决定
+            self.current_workers = max_workers
 
-        # 动态调整参数
-        self._last_adjustment_time = 0
-        self._adjustment_interval = 30
+        # 接口速率计算器（按交换机和ifIndex保存上一次计数器采样）
+        self._rate_calculator = InterfaceRateCalculator(
+            max_sample_age=max(poll_interval * 10, 600)
+        )
+        # 接口静态属性缓存（静态列只在设备重启、接口变化或过期时重新读取）
+        self._static_cache = InterfaceStaticCache()
+
+        # 按到期时间调度设备（每台设备固定相位偏移 + 少量抖动），
+        # 接口轮询使用交换机接口轮询配置中的间隔
+        self._scheduler = PollScheduler(
+            poll_interval,
+            interval_of=profile_interval if poll_type == "interface" else None,
+        )
+        # 清理过期缓存和速率基线的间隔（秒）
+        self._maintenance_interval = min(poll_interval, 30)
 
         # 根据轮询类型设置名称
         self._type_name = "设备" if poll_type == "device" else "接口"
@@ -128,6 +315,10 @@ class SNMPPoller:
 
             self.snmp_manager = SNMPManager()
 
+        # 恢复上次保存的计数器基线（重启后第一次轮询即可计算速率）
+        if self.poll_type == "interface" and self.poll_state_manager is not None:
+            self.restore_baselines(self.poll_state_manager.get_baselines())
+
         self._running = True
         self._thread = threading.Thread(target=self._run_poller, daemon=True)
         self._thread.start()
@@ -158,6 +349,12 @@ class SNMPPoller:
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=5)
 
+        # 写入缓冲区中剩余的指标和轮询状态
+        if self.metrics_manager is not None:
+            self.metrics_manager.flush()
+        if self.poll_state_manager is not None:
+            self.poll_state_manager.flush()
+
         logger.info(f"SNMP{self._type_name}轮询器已停止")
 
     def _run_poller(self):
@@ -183,12 +380,25 @@ class SNMPPoller:
             except Exception as e:
                 logger.debug(f"清理剩余任务时出错: {e}")
             finally:
+                # 关闭该事件循环上的共享SNMP引擎
+                close_loop_engine(self._loop)
                 self._loop.close()
 
     async def _polling_loop(self):
         """异步轮询循环（快进快出队列模式）"""
         self._task_queue = asyncio.Queue()
+        self._priority_queue = asyncio.Queue()
         self._active_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+        # 先订阅再读取快照，避免遗漏两者之间的变更（重复的事件是幂等的）
+        registry = self.switch_manager.registry
+        self._unsubscribe = registry.subscribe(self._on_switch_event)
+        switches = registry.get_all()
+        self._scheduler.sync(switches)
+        self._update_sample_age()
+        if not switches:
+            logger.debug("交换机注册表中没有交换机配置")
 
         logger.info(
             f"SNMP{self._type_name}轮询循环已启动（队列模式），初始并发数: {self.current_workers}"
@@ -198,19 +408,18 @@ class SNMPPoller:
         self._worker_tasks = [
             asyncio.create_task(self._worker(i)) for i in range(self.current_workers)
         ]
+        # 按需轮询使用预留的工作协程，不与后台轮询争用并发
+        self._priority_tasks = [
+            asyncio.create_task(self._priority_worker(i))
+            for i in range(self.on_demand_workers)
+        ]
 
         # 启动设备入队协程
         self._enqueue_task = asyncio.create_task(self._enqueue_devices())
 
-        # 启动动态调整协程
-        if self.dynamic_adjustment:
-            self._adjustment_task = asyncio.create_task(self._dynamic_adjust_workers())
-
         try:
             # 等待所有任务完成
-            all_tasks = [self._enqueue_task] + self._worker_tasks
-            if self._adjustment_task:
-                all_tasks.append(self._adjustment_task)
+            all_tasks = [self._enqueue_task] + self._worker_tasks + self._priority_tasks
             await asyncio.gather(*all_tasks, return_exceptions=True)
         except asyncio.CancelledError:
             logger.debug(f"SNMP{self._type_name}轮询循环被取消")
@@ -220,43 +429,59 @@ class SNMPPoller:
         logger.info(f"SNMP{self._type_name}轮询循环已退出")
 
     async def _enqueue_devices(self):
-        """持续将设备加入轮询队列"""
+        """按调度器的到期时间持续将设备加入轮询队列"""
         assert self._task_queue is not None
         assert self._active_lock is not None
 
+        last_maintenance = time.monotonic()
         while self._running:
             try:
-                switches = self.switch_manager.get_all_switches()
+                now = time.monotonic()
 
-                if not switches:
-                    logger.debug("数据库中没有交换机配置")
-                    await asyncio.sleep(self.poll_interval)
-                    continue
+                # 设备列表由注册表事件维护，这里只定期清理过期数据
+                if now - last_maintenance >= self._maintenance_interval:
+                    last_maintenance = now
+                    self._cleanup_cache()
+                    if self.poll_type == "interface":
+                        self._rate_calculator.cleanup()
+                    if self._limiter is not None:
+                        self._limiter.cleanup(max(self.poll_interval * 10, 600))
 
                 enqueued = 0
-                for switch in switches:
+                for switch, due_time in self._scheduler.pop_due(now):
                     ip = switch.get("ip")
-                    if not ip:
-                        continue
 
                     async with self._active_lock:
-                        if ip in self._active_tasks:
+                        if ip in self._active_tasks or ip in self._inflight:
+                            # 上一次轮询或按需轮询尚未结束，跳过本周期
+                            self._scheduler.record_skip(ip)
                             continue
 
-                    await self._task_queue.put(switch)
-                    enqueued += 1
-
-                with self._stats_lock:
-                    self._stats["queue_size"] = self._task_queue.qsize()
+                    # 熔断中的设备在退避期内不入队
+                    if self._breaker.acquire(ip) == DECISION_SKIP:
+                        continue
 
-                logger.debug(f"已将 {enqueued} 个设备加入{self._type_name}轮询队列")
+                    await self._task_queue.put((switch, due_time))
+                    enqueued += 1
 
-                for _ in range(self.poll_interval):
-                    if not self._running:
-                        break
-                    await asyncio.sleep(1)
+                if enqueued:
+                    with self._stats_lock:
+                        self._stats["queue_size"] = self._task_queue.qsize()
+                    logger.debug(
+                        f"已将 {enqueued} 个到期设备加入{self._type_name}轮询队列"
+                    )
 
-                self._cleanup_cache()
+                # 睡眠到下一个到期时间（最长1秒，以便及时响应停止），
+                # 交换机新增或修改时提前唤醒
+                next_due = self._scheduler.next_due_time()
+                delay = 1.0 if next_due is None else next_due - time.monotonic()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=min(max(delay, 0.01), 1.0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
 
             except asyncio.CancelledError:
                 logger.debug(f"设备入队协程被取消")
@@ -265,65 +490,338 @@ class SNMPPoller:
                 logger.error(f"设备入队过程出错: {e}", exc_info=True)
                 await asyncio.sleep(5)
 
+    def _on_switch_event(self, event: str, switch: Dict[str, Any]):
+        """交换机注册表变更回调（可能在任意线程调用），转交到轮询器的事件循环处理"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._apply_switch_event, event, switch)
+        except RuntimeError:
+            # 事件循环已关闭（轮询器正在停止）
+            pass
+
+    def _apply_switch_event(self, event: str, switch: Dict[str, Any]):
+        """在事件循环中处理交换机新增/修改/删除"""
+        ip = switch.get("ip")
+        if not ip:
+            return
+
+        if event == EVENT_REMOVED:
+            self._scheduler.remove(ip)
+            self._breaker.forget(ip)
+            with self._cache_lock:
+                self._cache.pop(ip, None)
+            if self.poll_type == "interface":
+                switch_id = switch.get("id")
+                key = switch_id if switch_id is not None else ip
+                self._rate_calculator.forget(key)
+                self._static_cache.invalidate(key)
+            logger.debug(f"交换机已移出{self._type_name}轮询调度: IP={ip}")
+        else:
+            # 新增的交换机立即轮询，修改的交换机下次轮询使用新配置
+            self._scheduler.add(switch, immediate=event == EVENT_ADDED)
+            if event == EVENT_ADDED:
+                logger.debug(f"交换机已加入{self._type_name}轮询调度: IP={ip}")
+
+        self._update_sample_age()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _update_sample_age(self):
+        """速率基线至少保留到配置了更长间隔的交换机下一次轮询之后"""
+        if self.poll_type != "interface":
+            return
+        longest = max(
+            (
+                self._scheduler.interval_for(s)
+                for s in self.switch_manager.registry.get_all()
+            ),
+            default=self.poll_interval,
+        )
+        self._rate_calculator.max_sample_age = max(
+            self.poll_interval * 10, 600, longest * 3
+        )
+
     async def _worker(self, worker_id: int):
         """工作协程，从队列中取设备并执行轮询"""
         assert self._task_queue is not None
-        assert self._active_lock is not None
 
         logger.debug(f"工作协程 {worker_id} 已启动")
 
         while self._running:
             try:
                 try:
-                    switch_config = await asyncio.wait_for(
+                    switch_config, due_time = await asyncio.wait_for(
                         self._task_queue.get(), timeout=1.0
                     )
                 except asyncio.TimeoutError:
                     continue
 
-                ip = switch_config.get("ip")
-                if not ip:
+                try:
+                    if self._limiter is None:
+                        await self._run_queued_poll(switch_config, due_time)
+                    else:
+                        await self._run_limited_polls(switch_config, due_time)
+                finally:
                     self._task_queue.task_done()
-                    continue
 
+            except asyncio.CancelledError:
+                logger.debug(f"工作协程 {worker_id} 被取消")
+                break
+            except Exception as e:
+                logger.error(f"工作协程 {worker_id} 出错: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+        logger.debug(f"工作协程 {worker_id} 已退出")
+
+    async def _run_limited_polls(self, switch_config: Dict[str, Any], due_time: float):
+        """
+        在交换机所属分组的并发限制内轮询
+
+        分组已达到限制时设备进入该分组的等待队列，工作协程立即去处理其他分组的设备；
+        轮询结束释放并发后，由同一工作协程接手该分组等待队列中最早的设备，
+        限制增大后多出的并发对应的等待设备放回任务队列由其他工作协程处理
+        """
+        assert self._limiter is not None
+        assert self._active_lock is not None
+        assert self._task_queue is not None
+
+        group = self._limiter.group_of(switch_config.get("ip", ""))
+        item: Optional[Tuple[Dict[str, Any], float]] = (switch_config, due_time)
+        front = False
+        while item is not None:
+            ip = item[0].get("ip")
+            if not self._limiter.try_acquire(group):
+                # 等待期间保持在活动集合中，避免下一周期重复入队
                 async with self._active_lock:
                     self._active_tasks.add(ip)
-                    active_count = len(self._active_tasks)
+                self._limiter.defer(group, item, front=front)
+                return
 
-                with self._stats_lock:
-                    self._stats["active_workers"] = active_count
+            latency = None
+            timed_out = False
+            try:
+                polled = await self._run_queued_poll(*item)
+                if polled is not None:
+                    result, latency = polled
+                    timed_out = self._is_timeout(result, latency)
+            except Exception as e:
+                # 继续处理等待队列，避免分组没有在途轮询时等待中的设备无人接手
+                logger.error(
+                    f"轮询交换机{self._type_name}出错: IP={ip}, 错误={e}", exc_info=True
+                )
+                async with self._active_lock:
+                    self._active_tasks.discard(ip)
+            finally:
+                decision = self._limiter.release(group, latency, timed_out)
+                if decision in (DECISION_DECREASE, DECISION_INCREASE):
+                    self._log_limit_change(group, decision)
+
+            item = self._limiter.pop_deferred(group)
+            # 从等待队列取出的设备再次达到限制（限制刚被减小）时放回队首
+            front = True
+            # 限制增大后多出的并发交给其他工作协程
+            for spare in self._limiter.pop_spare(group, reserved=int(item is not None)):
+                self._task_queue.put_nowait(spare)
+
+    async def _run_queued_poll(
+        self, switch_config: Dict[str, Any], due_time: float
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        执行一次后台轮询并发送结果
+
+        Returns:
+            (轮询结果, 耗时秒数)，设备被跳过时返回None
+        """
+        assert self._active_lock is not None
 
-                start_time = time.time()
-                result = await self._poll_single_switch(switch_config)
-                response_time = time.time() - start_time
+        ip = switch_config.get("ip")
+        if not ip:
+            return None
 
-                with self._response_lock:
-                    self._response_times.append(response_time)
+        if ip in self._inflight:
+            # 入队后该交换机已被按需轮询，本周期不再重复轮询
+            self._scheduler.record_skip(ip)
+            async with self._active_lock:
+                self._active_tasks.discard(ip)
+            return None
 
-                self._send_single_result(result)
+        # 调度漂移：实际开始轮询时间与到期时间之差（含排队等待）
+        self._scheduler.record_drift(ip, time.monotonic() - due_time)
+
+        async with self._active_lock:
+            self._active_tasks.add(ip)
+            active_count = len(self._active_tasks)
+
+        with self._stats_lock:
+            self._stats["active_workers"] = active_count
+
+        # 结果不是来自缓存时，期间到达的按需请求直接等待本次轮询
+        inflight = None
+        if not self.enable_cache or self._get_from_cache(ip) is None:
+            inflight = asyncio.get_running_loop().create_future()
+            self._inflight[ip] = inflight
+
+        start_time = time.time()
+        try:
+            result = await self._poll_single_switch(switch_config)
+        except Exception as e:
+            if inflight is not None:
+                inflight.set_exception(e)
+            raise
+        finally:
+            if inflight is not None:
+                self._inflight.pop(ip, None)
+        response_time = time.time() - start_time
+
+        with self._response_lock:
+            self._response_times.append(response_time)
+
+        if inflight is not None:
+            inflight.set_result(result)
+        self._send_single_result(result)
+
+        async with self._active_lock:
+            self._active_tasks.discard(ip)
+
+        return result, response_time
+
+    def _is_timeout(self, result: Dict[str, Any], latency: float) -> bool:
+        """判断一次轮询是否超时（整体超时，或SNMP请求无响应）"""
+        if result.get("type") == "success":
+            return False
+        if latency >= self.device_timeout * 0.9:
+            return True
+        error = str(result.get("error", "")).lower()
+        return "超时" in error or "timeout" in error
+
+    def _log_limit_change(self, group: str, decision: str):
+        """记录分组并发限制的调整"""
+        assert self._limiter is not None
+        group_stats = self._limiter.get_statistics()["groups"].get(group, {})
+        message = (
+            f"{self._type_name}轮询分组 {group} 并发调整为 {group_stats.get('limit')}"
+            f"（p90={group_stats.get('p90')}s, 超时比例={group_stats.get('timeout_ratio')}）"
+        )
+        if decision == DECISION_DECREASE:
+            logger.info(message)
+        else:
+            logger.debug(message)
+
+    def request_poll(
+        self, switch_config: Dict[str, Any]
+    ) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """
+        按需立即轮询单台交换机（线程安全，可在任意线程调用）
+
+        请求进入优先队列，由预留的工作协程处理，不使用结果缓存；
+        该交换机已有进行中或排队中的轮询时直接共享其结果。
+        轮询结果同样会广播和写入指标存储。
+
+        Args:
+            switch_config: 交换机配置
+
+        Returns:
+            完成时结果为轮询结果字典的Future
+
+        Raises:
+            RuntimeError: 轮询器未运行时抛出
+        """
+        loop = self._loop
+        if (
+            not self._running
+            or loop is None
+            or loop.is_closed()
+            or self._priority_queue is None
+        ):
+            raise RuntimeError(f"SNMP{self._type_name}轮询器未运行")
+        return asyncio.run_coroutine_threadsafe(
+            self._poll_on_demand(switch_config), loop
+        )
+
+    async def _poll_on_demand(self, switch_config: Dict[str, Any]) -> Dict[str, Any]:
+        """将按需轮询放入优先队列并等待结果（同一交换机的并发请求去重）"""
+        assert self._priority_queue is not None
+        ip = switch_config.get("ip", "")
+
+        future = self._inflight.get(ip)
+        if future is not None:
+            with self._stats_lock:
+                self._stats["on_demand_deduplicated"] += 1
+            return await asyncio.shield(future)
+
+        if self._priority_queue.qsize() >= self.on_demand_queue_limit:
+            with self._stats_lock:
+                self._stats["on_demand_rejected"] += 1
+            return {
+                "type": "error",
+                "ip": ip,
+                "switch_id": switch_config.get("id"),
+                "error": f"按需{self._type_name}轮询请求过多，请稍后重试",
+                "poll_time": time.time(),
+            }
 
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[ip] = future
+        with self._stats_lock:
+            self._stats["on_demand_requests"] += 1
+        await self._priority_queue.put(switch_config)
+        # 调用方取消等待时不影响共享该结果的其他请求
+        return await asyncio.shield(future)
+
+    async def _priority_worker(self, worker_id: int):
+        """按需轮询工作协程，只处理优先队列"""
+        assert self._priority_queue is not None
+        assert self._active_lock is not None
+
+        while self._running:
+            try:
+                try:
+                    switch_config = await asyncio.wait_for(
+                        self._priority_queue.get(), timeout=1.0
+                    )
+                except asyncio.TimeoutError:
+                    continue
+
+                ip = switch_config.get("ip", "")
+                future = self._inflight.get(ip)
                 async with self._active_lock:
-                    self._active_tasks.discard(ip)
+                    self._active_tasks.add(ip)
+                try:
+                    result = await self._poll_single_switch(
+                        switch_config, use_cache=False
+                    )
+                except Exception as e:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                    raise
+                finally:
+                    async with self._active_lock:
+                        self._active_tasks.discard(ip)
+                    if self._inflight.get(ip) is future:
+                        self._inflight.pop(ip, None)
+                    self._priority_queue.task_done()
 
-                self._task_queue.task_done()
+                if future is not None and not future.done():
+                    future.set_result(result)
+                self._send_single_result(result)
 
             except asyncio.CancelledError:
-                logger.debug(f"工作协程 {worker_id} 被取消")
+                logger.debug(f"按需轮询工作协程 {worker_id} 被取消")
                 break
             except Exception as e:
-                logger.error(f"工作协程 {worker_id} 出错: {e}", exc_info=True)
+                logger.error(f"按需轮询工作协程 {worker_id} 出错: {e}", exc_info=True)
                 await asyncio.sleep(1)
 
-        logger.debug(f"工作协程 {worker_id} 已退出")
-
     async def _poll_single_switch(
-        self, switch_config: Dict[str, Any]
+        self, switch_config: Dict[str, Any], use_cache: bool = True
     ) -> Dict[str, Any]:
-        """轮询单个交换机（带超时控制和缓存优化）"""
+        """轮询单个交换机（带超时控制和缓存优化，按需轮询不使用缓存）"""
         ip = switch_config.get("ip", "")
         switch_id = switch_config.get("id")
 
-        if self.enable_cache:
+        if self.enable_cache and use_cache:
             cached_result = self._get_from_cache(ip)
             if cached_result is not None:
                 logger.debug(f"使用缓存{self._type_name}数据: IP={ip}")
@@ -333,6 +831,12 @@ class SNMPPoller:
                 return cached_result
 
         try:
+            # 半开状态：先用单个sysUpTime请求探测，设备仍不可达则继续熔断
+            if self._breaker.is_half_open(ip) and not await asyncio.wait_for(
+                self._probe_switch(switch_config), timeout=self.device_timeout
+            ):
+                raise ConnectionError("设备仍不可达，熔断探测失败")
+
             result = await asyncio.wait_for(
                 self._do_poll_switch(switch_config), timeout=self.device_timeout
             )
@@ -348,6 +852,11 @@ class SNMPPoller:
                     self._stats["error_count"] += 1
                     self._update_failure_tracker(ip, success=False)
 
+            if result.get("type") == "success":
+                self._record_metrics(result)
+                if self.poll_state_manager is not None:
+                    self.poll_state_manager.record_result(self.poll_type, result)
+
             return result
 
         except asyncio.TimeoutError:
@@ -376,6 +885,36 @@ class SNMPPoller:
                 "poll_time": time.time(),
             }
 
+    def _poll_profile(
+        self, switch_config: Dict[str, Any]
+    ) -> Optional[InterfacePollProfile]:
+        """解析交换机的接口轮询配置（未配置或配置无效时返回None，轮询全部接口）"""
+        data = switch_config.get("poll_profile")
+        if not data:
+            return None
+        try:
+            return InterfacePollProfile.from_dict(data)
+        except ValueError as e:
+            logger.warning(
+                f"接口轮询配置无效，轮询全部接口: IP={switch_config.get('ip')}, 错误={e}"
+            )
+            return None
+
+    async def _probe_switch(self, switch_config: Dict[str, Any]) -> bool:
+        """熔断探测：只请求sysUpTime，判断设备是否恢复响应"""
+        assert self.snmp_manager is not None, "SNMP Manager未初始化"
+
+        ip = switch_config.get("ip", "")
+        snmp_version = switch_config.get("snmp_version", "v2c")
+        kwargs = self._prepare_snmp_kwargs(switch_config)
+
+        monitor = self.snmp_manager.monitor
+        values, success = await monitor.get_multi(
+            ip, snmp_version, [monitor.OIDS["sysUpTime"]], **kwargs
+        )
+        logger.debug(f"熔断探测{'成功' if success and values else '失败'}: IP={ip}")
+        return success and bool(values)
+
     async def _do_poll_switch(self, switch_config: Dict[str, Any]) -> Dict[str, Any]:
         """执行实际的轮询（不含超时控制）"""
         assert self.snmp_manager is not None, "SNMP Manager未初始化"
@@ -388,8 +927,10 @@ class SNMPPoller:
 
         # 根据轮询类型调用不同的方法
         if self.poll_type == "device":
-            data = await self.snmp_manager.monitor.get_device_info(
-                ip, snmp_version, **kwargs
+            # CPU/内存/温度使用探测到的厂商OID，合并为一个GET请求
+            data, system_metrics = await asyncio.gather(
+                self.snmp_manager.monitor.get_device_info(ip, snmp_version, **kwargs),
+                self.snmp_manager.get_system_metrics(ip, snmp_version, **kwargs),
             )
 
             if not data or not any(data.values()):
@@ -407,14 +948,25 @@ class SNMPPoller:
                 "switch_id": switch_id,
                 "snmp_version": snmp_version,
                 "device_info": data,
+                "cpu_usage": system_metrics.get("cpu", {}).get("usage"),
+                "memory_usage": system_metrics.get("memory", {}).get("usage"),
+                "temperature": system_metrics.get("temperature", {}).get("value"),
                 "poll_time": time.time(),
             }
         else:  # interface
-            data = await self.snmp_manager.monitor.get_interface_info(
-                ip, snmp_version, **kwargs
+            interfaces, sys_uptime = (
+                await self.snmp_manager.monitor.get_interface_counters(
+                    ip,
+                    snmp_version,
+                    static_cache=self._static_cache,
+                    cache_key=switch_id if switch_id is not None else ip,
+                    profile=self._poll_profile(switch_config),
+                    **kwargs,
+                )
             )
 
-            if not data:
+            # 轮询配置可能排除全部接口，此时只要sysUpTime可读即视为成功
+            if not interfaces and sys_uptime is None:
                 return {
                     "type": "error",
                     "ip": ip,
@@ -423,6 +975,23 @@ class SNMPPoller:
                     "poll_time": time.time(),
                 }
 
+            # 用计数器计算速率，广播中只携带速率而非原始计数器
+            poll_time = time.time()
+            data = self._rate_calculator.update(
+                switch_id if switch_id is not None else ip,
+                interfaces,
+                sys_uptime=sys_uptime,
+                timestamp=poll_time,
+            )
+            # 保存计数器基线，重启后恢复
+            if self.poll_state_manager is not None and switch_id is not None:
+                self.poll_state_manager.record_baselines(
+                    switch_id,
+                    InterfaceRateCalculator.baselines_of(
+                        interfaces, sys_uptime, poll_time
+                    ),
+                )
+
             return {
                 "type": "success",
                 "ip": ip,
@@ -430,28 +999,43 @@ class SNMPPoller:
                 "snmp_version": snmp_version,
                 "interface_info": data,
                 "interface_count": len(data),
-                "poll_time": time.time(),
+                "sys_uptime": sys_uptime,
+                "poll_time": poll_time,
             }
 
+    def restore_baselines(self, baselines: Dict[Any, Dict[str, Any]]) -> int:
+        """
+        恢复接口计数器基线（可在任意线程调用）
+
+        Args:
+            baselines: {交换机ID: InterfaceRateCalculator.baselines_of()生成的采样基线}
+
+        Returns:
+            恢复的接口采样数量
+        """
+        restored = sum(
+            self._rate_calculator.restore(switch_id, data)
+            for switch_id, data in baselines.items()
+        )
+        if restored:
+            logger.info(
+                f"已恢复 {len(baselines)} 台交换机的接口计数器基线（{restored} 个接口）"
+            )
+        return restored
+
+    def _record_metrics(self, result: Dict[str, Any]):
+        """将成功的轮询结果写入指标时序存储"""
+        if self.metrics_manager is None:
+            return
+
+        try:
+            record_poll_metrics(self.metrics_manager, self.poll_type, result)
+        except Exception as e:
+            logger.error(f"记录{self._type_name}指标失败: {e}")
+
     def _prepare_snmp_kwargs(self, switch_config: Dict[str, Any]) -> Dict[str, Any]:
         """准备SNMP认证参数"""
-        snmp_version = switch_config.get("snmp_version", "v2c")
-        kwargs = {}
-
-        if snmp_version in ["v1", "v2c", "2c"]:
-            kwargs["community"] = switch_config.get("community", "public")
-        elif snmp_version == "v3":
-            kwargs["user"] = switch_config.get("user", "")
-            if switch_config.get("auth_key"):
-                kwargs["auth_key"] = switch_config.get("auth_key")
-            if switch_config.get("auth_protocol"):
-                kwargs["auth_protocol"] = switch_config.get("auth_protocol", "md5")
-            if switch_config.get("priv_key"):
-                kwargs["priv_key"] = switch_config.get("priv_key")
-            if switch_config.get("priv_protocol"):
-                kwargs["priv_protocol"] = switch_config.get("priv_protocol", "des")
-
-        return kwargs
+        return prepare_snmp_kwargs(switch_config)
 
     def _get_from_cache(self, ip: str) -> Optional[Dict[str, Any]]:
         """从缓存获取数据"""
@@ -485,94 +1069,29 @@ class SNMPPoller:
                 logger.debug(f"清理 {len(expired_keys)} 个过期{self._type_name}缓存项")
 
     def _update_failure_tracker(self, ip: str, success: bool):
-        """更新设备失败跟踪"""
-        with self._failure_lock:
-            if success:
-                self._failure_tracker[ip] = 0
-            else:
-                self._failure_tracker[ip] = self._failure_tracker.get(ip, 0) + 1
-
-    async def _dynamic_adjust_workers(self):
-        """动态调整工作协程数量"""
-        assert self._task_queue is not None
-
-        while self._running:
-            try:
-                await asyncio.sleep(self._adjustment_interval)
-
-                current_time = time.time()
-                if (
-                    current_time - self._last_adjustment_time
-                    < self._adjustment_interval
-                ):
-                    continue
-
-                self._last_adjustment_time = current_time
-
-                with self._response_lock:
-                    if len(self._response_times) < 10:
-                        continue
-                    avg_response = statistics.mean(self._response_times)
-                    p95_response = statistics.quantiles(self._response_times, n=20)[18]
-
-                queue_size = self._task_queue.qsize()
-                with self._stats_lock:
-                    active_workers = self._stats.get("active_workers", 0)
-                    success_rate = (
-                        self._stats["success_count"] / self._stats["total_polls"]
-                        if self._stats["total_polls"] > 0
-                        else 0
-                    )
-
-                new_workers = self.current_workers
-
-                if queue_size > 20 and p95_response < self.device_timeout * 0.5:
-                    new_workers = min(self.current_workers + 5, self.max_workers)
-                    logger.info(
-                        f"队列积压({queue_size})，响应良好(p95={p95_response:.2f}s)，增加并发至 {new_workers}"
-                    )
-                elif p95_response > self.device_timeout * 0.8 and success_rate < 0.7:
-                    new_workers = max(self.current_workers - 3, self.min_workers)
-                    logger.info(
-                        f"响应缓慢(p95={p95_response:.2f}s)，成功率低({success_rate:.2%})，降低并发至 {new_workers}"
-                    )
-                elif queue_size < 5 and active_workers < self.current_workers * 0.3:
-                    new_workers = max(self.current_workers - 2, self.min_workers)
-                    logger.debug(f"队列空闲，降低并发至 {new_workers}")
-
-                if new_workers != self.current_workers:
-                    await self._adjust_worker_pool(new_workers)
-                    with self._stats_lock:
-                        self._stats["current_concurrency"] = new_workers
-                        self._stats["avg_response_time"] = avg_response
-
-            except asyncio.CancelledError:
-                logger.debug(f"动态调整协程被取消")
-                break
-            except Exception as e:
-                logger.error(f"动态调整并发数出错: {e}", exc_info=True)
-
-    async def _adjust_worker_pool(self, target_workers: int):
-        """调整工作协程池大小"""
-        current = self.current_workers
-        if target_workers > current:
-            for i in range(current, target_workers):
-                task = asyncio.create_task(self._worker(i))
-                self._worker_tasks.append(task)
-            logger.info(f"工作协程数增加: {current} -> {target_workers}")
-        self.current_workers = target_workers
+        """更新设备失败跟踪（驱动熔断器状态）"""
+        if success:
+            self._breaker.record_success(ip)
+        elif self._breaker.record_failure(ip):
+            logger.warning(
+                f"{self._type_name}轮询连续失败，设备已熔断: IP={ip}, "
+                f"连续失败次数={self._breaker.get_failure_count(ip)}"
+            )
 
     async def _cleanup_tasks(self):
         """清理所有异步任务"""
         logger.debug(f"开始清理{self._type_name}轮询器任务...")
 
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
         # 取消所有任务
         tasks_to_cancel = []
-        if self._adjustment_task and not self._adjustment_task.done():
-            tasks_to_cancel.append(self._adjustment_task)
         if self._enqueue_task and not self._enqueue_task.done():
             tasks_to_cancel.append(self._enqueue_task)
         tasks_to_cancel.extend([t for t in self._worker_tasks if not t.done()])
+        tasks_to_cancel.extend([t for t in self._priority_tasks if not t.done()])
 
         for task in tasks_to_cancel:
             task.cancel()
@@ -585,21 +1104,11 @@ class SNMPPoller:
 
     def _send_single_result(self, result: Dict[str, Any]):
         """立即发送单个轮询结果（快进快出）"""
-        from src.core.state_manager import state_manager
-
         try:
-            msg_type = (
-                "snmpDeviceUpdate"
-                if self.poll_type == "device"
-                else "snmpInterfaceUpdate"
-            )
-            state_manager.broadcast_message(
-                {
-                    "type": msg_type,
-                    "data": result,
-                    "poll_time": time.time(),
-                }
-            )
+            if self.result_sink is not None:
+                self.result_sink(self.poll_type, result)
+            else:
+                broadcast_poll_result(self.poll_type, result)
         except Exception as e:
             logger.error(f"发送{self._type_name}轮询结果失败: {e}")
 
@@ -608,19 +1117,33 @@ class SNMPPoller:
         with self._stats_lock:
             stats = self._stats.copy()
 
-        with self._failure_lock:
-            stats["failed_devices"] = sum(
-                1 for count in self._failure_tracker.values() if count > 0
-            )
-            stats["highly_failed_devices"] = sum(
-                1 for count in self._failure_tracker.values() if count >= 5
-            )
+        breaker_stats = self._breaker.get_statistics()
+        stats["failed_devices"] = len(breaker_stats.get("devices", {}))
+        stats["highly_failed_devices"] = sum(
+            1
+            for device in breaker_stats.get("devices", {}).values()
+            if device["state"] == STATE_OPEN
+        )
+        stats["circuit_breaker"] = breaker_stats
 
         with self._cache_lock:
             stats["cached_devices"] = len(self._cache)
 
         if self._task_queue:
             stats["queue_size"] = self._task_queue.qsize()
+        if self._priority_queue:
+            stats["on_demand_queue_size"] = self._priority_queue.qsize()
+
+        stats["schedule"] = self._scheduler.get_statistics()
+        if self._limiter is not None:
+            concurrency = self._limiter.get_statistics()
+            stats["concurrency"] = concurrency
+            stats["current_concurrency"] = min(
+                concurrency["total_limit"], self.max_workers
+            )
+            stats["deferred"] = concurrency["waiting"]
+        if self.poll_type == "interface":
+            stats["static_cache"] = self._static_cache.get_statistics()
 
         with self._response_lock:
             if self._response_times:
@@ -726,8 +1249,99 @@ def get_interface_poller() -> Optional[SNMPPoller]:
     return _interface_poller
 
 
+def request_switch_poll(
+    switch_config: Dict[str, Any], poll_type: PollType
+) -> "concurrent.futures.Future[Dict[str, Any]]":
+    """
+    按需立即轮询单台交换机（多进程模式下转发给交换机所在的工作进程）
+
+    Args:
+        switch_config: 交换机配置
+        poll_type: 轮询类型 ("device" 或 "interface")
+
+    Returns:
+        完成时结果为轮询结果字典的Future
+
+    Raises:
+        RuntimeError: 对应的轮询器未运行时抛出
+    """
+    from src.snmp.process_pool import get_active_pool
+
+    pool = get_active_pool()
+    if pool is not None:
+        return pool.request_poll(switch_config, poll_type)
+
+    poller = _device_poller if poll_type == "device" else _interface_poller
+    if poller is None:
+        type_name = "设备" if poll_type == "device" else "接口"
+        raise RuntimeError(f"SNMP{type_name}轮询器未运行")
+    return poller.request_poll(switch_config)
+
+
+async def poll_switch_now(
+    switch_config: Dict[str, Any],
+    poll_types: Tuple[PollType, ...] = ("device", "interface"),
+    timeout: float = SNMP_ON_DEMAND_TIMEOUT,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    在调用方的事件循环中发起按需轮询并等待结果（多个轮询类型并行）
+
+    超时或轮询器未运行时对应类型返回错误结果，不抛出异常；
+    超时后轮询仍会完成，结果照常广播。
+
+    Args:
+        switch_config: 交换机配置
+        poll_types: 需要轮询的类型
+        timeout: 等待结果的超时时间（秒）
+
+    Returns:
+        {轮询类型: 轮询结果}
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    waiting: Dict[asyncio.Future, str] = {}
+    for poll_type in poll_types:
+        try:
+            future = request_switch_poll(switch_config, poll_type)
+        except RuntimeError as e:
+            results[poll_type] = {
+                "type": "error",
+                "ip": switch_config.get("ip"),
+                "switch_id": switch_config.get("id"),
+                "error": str(e),
+                "poll_time": time.time(),
+            }
+            continue
+        waiting[asyncio.wrap_future(future)] = poll_type
+
+    if waiting:
+        # 使用asyncio.wait而不是wait_for，超时时不取消共享的轮询
+        await asyncio.wait(list(waiting), timeout=timeout)
+    for future, poll_type in waiting.items():
+        if future.done() and not future.cancelled() and future.exception() is None:
+            results[poll_type] = future.result()
+            continue
+        if future.done() and not future.cancelled():
+            error = f"按需轮询失败: {future.exception()}"
+        else:
+            error = f"按需轮询超时({timeout}秒)"
+        results[poll_type] = {
+            "type": "error",
+            "ip": switch_config.get("ip"),
+            "switch_id": switch_config.get("id"),
+            "error": error,
+            "poll_time": time.time(),
+        }
+    return {poll_type: results[poll_type] for poll_type in poll_types}
+
+
 __all__ = [
+    "ON_DEMAND_POLL_TYPES",
     "SNMPPoller",
+    "broadcast_poll_result",
+    "poll_switch_now",
+    "prepare_snmp_kwargs",
+    "request_switch_poll",
+    "record_poll_metrics",
     "start_device_poller",
     "start_interface_poller",
     "stop_device_poller",
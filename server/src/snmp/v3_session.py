@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SNMP v3会话缓存 - 按设备缓存权威引擎ID、boots/time和本地化密钥
+
+pysnmp的本地配置缓存以 (用户名, securityEngineId) 为键登记USM用户：
+- 未指定securityEngineId时，所有设备共用同一行，多台设备使用相同用户名但密钥不同时，
+  每次切换设备都会删除并重新登记用户（重新执行密码到密钥的哈希扩展，CPU开销约为普通请求的10倍）
+- 消息处理子系统缓存的对端引擎ID每300秒过期，过期后重新发现
+
+本模块对每个 (ip, port, 用户, 认证/加密协议和密钥) 先发送一次发现报文，
+取得设备的权威引擎ID和boots/time，再构造固定securityEngineId的UsmUserData，
+使每台设备在引擎中拥有独立的用户行，本地化密钥只计算一次。
+收到 notInTimeWindow / unknownEngineID / unknownUserName 错误时使会话失效，下次请求重新发现。
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from pysnmp.entity import config
+from pysnmp.proto import errind
+
+from .ber_codec import (
+    BERDecodeError,
+    PDU_GET,
+    TAG_INTEGER,
+    TAG_OCTET_STRING,
+    TAG_SEQUENCE,
+    _encode_integer,
+    _read_integer,
+    _read_length,
+    _tlv,
+)
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 会话有效期（秒），到期后重新发现以确认引擎ID未变化
+SESSION_TTL = 3600
+
+# 发现失败后的重试间隔（秒），期间直接使用未固定引擎ID的认证对象，避免每次请求都额外等待发现超时
+DISCOVERY_RETRY_INTERVAL = 60
+
+# 单个事件循环内缓存的会话上限，超过后整体清空
+MAX_CACHED_V3_SESSIONS = 4096
+
+# 使会话失效的错误指示
+INVALIDATING_ERRORS = (
+    errind.NotInTimeWindow,
+    errind.UnknownEngineID,
+    errind.UnknownUserName,
+)
+
+# pysnmp命令生成器本地配置缓存在引擎用户上下文中的键
+_LCD_CACHE_ID = "CommandGeneratorLcdConfigurator"
+
+# SNMP v3报文常量
+_SNMP_VERSION_3 = 3
+_USM_SECURITY_MODEL = 3
+_MAX_MESSAGE_SIZE = 65507
+# msgFlags: reportable，无认证无加密
+_DISCOVERY_FLAGS = b"\x04"
+
+# 会话缓存键: (ip, port, 用户名, 认证协议, 认证密钥, 加密协议, 加密密钥)
+V3SessionKey = Tuple[str, int, str, str, str, str, str]
+
+
+def encode_discovery_request(msg_id: int, request_id: int) -> bytes:
+    """
+    编码引擎发现报文（RFC 3414 4. 空引擎ID、空用户名的GET请求）
+
+    Args:
+        msg_id: msgID
+        request_id: PDU的request-id
+
+    Returns:
+        报文字节串
+    """
+    empty = _tlv(TAG_OCTET_STRING, b"")
+    zero = _encode_integer(TAG_INTEGER, 0)
+    global_data = _tlv(
+        TAG_SEQUENCE,
+        _encode_integer(TAG_INTEGER, msg_id)
+        + _encode_integer(TAG_INTEGER, _MAX_MESSAGE_SIZE)
+        + _tlv(TAG_OCTET_STRING, _DISCOVERY_FLAGS)
+        + _encode_integer(TAG_INTEGER, _USM_SECURITY_MODEL),
+    )
+    security_parameters = _tlv(
+        TAG_OCTET_STRING, _tlv(TAG_SEQUENCE, empty + zero + zero + empty * 3)
+    )
+    pdu = _tlv(
+        PDU_GET,
+        _encode_integer(TAG_INTEGER, request_id)
+        + zero
+        + zero
+        + _tlv(TAG_SEQUENCE, b""),
+    )
+    scoped_pdu = _tlv(TAG_SEQUENCE, empty + empty + pdu)
+    return _tlv(
+        TAG_SEQUENCE,
+        _encode_integer(TAG_INTEGER, _SNMP_VERSION_3)
+        + global_data
+        + security_parameters
+        + scoped_pdu,
+    )
+
+
+def _read_octets(data: bytes, pos: int) -> Tuple[bytes, int]:
+    """读取OCTET STRING，返回 (内容, 下一个元素偏移)"""
+    if data[pos] != TAG_OCTET_STRING:
+        raise BERDecodeError(f"期望OCTET STRING，实际标签0x{data[pos]:02x}")
+    length, pos = _read_length(data, pos + 1)
+    end = pos + length
+    if end > len(data):
+        raise BERDecodeError("OCTET STRING被截断")
+    return data[pos:end], end
+
+
+def decode_discovery_response(data: bytes) -> Tuple[int, bytes, int, int]:
+    """
+    解码发现报文的响应（通常为携带usmStatsUnknownEngineIDs的Report）
+
+    Args:
+        data: 报文字节串
+
+    Returns:
+        (msgID, 权威引擎ID, engineBoots, engineTime)
+
+    Raises:
+        BERDecodeError: 报文格式错误或不是SNMP v3报文
+    """
+    try:
+        if data[0] != TAG_SEQUENCE:
+            raise BERDecodeError("报文不是SEQUENCE")
+        _, pos = _read_length(data, 1)
+        version, pos = _read_integer(data, pos)
+        if version != _SNMP_VERSION_3:
+            raise BERDecodeError(f"不是SNMP v3报文: version={version}")
+
+        if data[pos] != TAG_SEQUENCE:
+            raise BERDecodeError("缺少msgGlobalData")
+        length, pos = _read_length(data, pos + 1)
+        global_end = pos + length
+        msg_id, _ = _read_integer(data, pos)
+
+        security_parameters, _ = _read_octets(data, global_end)
+        if security_parameters[0] != TAG_SEQUENCE:
+            raise BERDecodeError("msgSecurityParameters不是SEQUENCE")
+        _, pos = _read_length(security_parameters, 1)
+        engine_id, pos = _read_octets(security_parameters, pos)
+        engine_boots, pos = _read_integer(security_parameters, pos)
+        engine_time, _ = _read_integer(security_parameters, pos)
+    except BERDecodeError:
+        raise
+    except (IndexError, ValueError) as e:
+        raise BERDecodeError(f"报文格式错误: {e}") from e
+
+    if not engine_id:
+        raise BERDecodeError("响应中没有权威引擎ID")
+    return msg_id, engine_id, engine_boots, engine_time
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """等待与msgID匹配的发现响应"""
+
+    def __init__(self, msg_id: int, future: asyncio.Future):
+        self.msg_id = msg_id
+        self.future = future
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if self.future.done():
+            return
+        try:
+            result = decode_discovery_response(data)
+        except BERDecodeError as e:
+            logger.debug(f"忽略无法解码的v3发现响应: {addr}, {e}")
+            return
+        if result[0] == self.msg_id:
+            self.future.set_result(result)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"v3发现套接字错误: {exc}")
+
+
+async def discover_engine(
+    ip: str, port: int = 161, timeout: float = 2.0, retries: int = 0
+) -> Optional[Tuple[bytes, int, int]]:
+    """
+    发现设备的权威SNMP引擎
+
+    Args:
+        ip: 设备IP地址
+        port: 端口号，默认161
+        timeout: 每次发送的等待时间（秒）
+        retries: 超时后的重发次数
+
+    Returns:
+        (权威引擎ID, engineBoots, engineTime)，设备无响应时返回None
+    """
+    loop = asyncio.get_running_loop()
+    msg_id = random.randint(1, 2**31 - 1)
+    packet = encode_discovery_request(msg_id, random.randint(1, 2**31 - 1))
+    future = loop.create_future()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DiscoveryProtocol(msg_id, future), remote_addr=(ip, port)
+        )
+    except OSError as e:
+        logger.debug(f"v3发现无法连接: ip: {ip}, {e}")
+        return None
+
+    try:
+        for _ in range(retries + 1):
+            transport.sendto(packet)
+            try:
+                _, engine_id, engine_boots, engine_time = await asyncio.wait_for(
+                    asyncio.shield(future), timeout
+                )
+                return engine_id, engine_boots, engine_time
+            except asyncio.TimeoutError:
+                continue
+    finally:
+        transport.close()
+        if not future.done():
+            future.cancel()
+    return None
+
+
+class V3Session:
+    """单台设备的SNMP v3会话状态"""
+
+    __slots__ = (
+        "engine_id",
+        "engine_boots",
+        "engine_time",
+        "discovered_at",
+        "auth_data",
+        "hits",
+    )
+
+    def __init__(
+        self,
+        engine_id: bytes,
+        engine_boots: int,
+        engine_time: int,
+        auth_data: Any,
+        discovered_at: float,
+    ):
+        self.engine_id = engine_id
+        self.engine_boots = engine_boots
+        self.engine_time = engine_time
+        self.auth_data = auth_data
+        self.discovered_at = discovered_at
+        self.hits = 0
+
+    def estimated_engine_time(self, now: Optional[float] = None) -> int:
+        """根据发现时的engineTime估算设备当前的engineTime"""
+        if now is None:
+            now = time.monotonic()
+        return self.engine_time + int(now - self.discovered_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "engine_id": self.engine_id.hex(),
+            "engine_boots": self.engine_boots,
+            "engine_time": self.estimated_engine_time(),
+            "hits": self.hits,
+        }
+
+
+class V3SessionCache:
+    """
+    SNMP v3会话缓存（绑定到单个事件循环的共享引擎）
+
+    会话的认证对象固定了设备的securityEngineId，因此在共享引擎中每台设备
+    拥有独立的USM用户行和本地化密钥。
+    """
+
+    def __init__(
+        self,
+        session_ttl: float = SESSION_TTL,
+        max_sessions: int = MAX_CACHED_V3_SESSIONS,
+    ):
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self._sessions: Dict[V3SessionKey, V3Session] = {}
+        self._discovery_locks: Dict[V3SessionKey, asyncio.Lock] = {}
+        # 会话键 -> 最近一次发现失败的时间
+        self._failed_discoveries: Dict[V3SessionKey, float] = {}
+        self._stats = {
+            "hits": 0,
+            "discoveries": 0,
+            "discovery_failures": 0,
+            "invalidations": 0,
+            "expirations": 0,
+        }
+
+    @staticmethod
+    def make_key(ip: str, port: int, **kwargs) -> V3SessionKey:
+        """生成会话缓存键"""
+        return (
+            ip,
+            port,
+            kwargs.get("user") or "",
+            (kwargs.get("auth_protocol") or "md5").lower(),
+            kwargs.get("auth_key") or "",
+            (kwargs.get("priv_protocol") or "des").lower(),
+            kwargs.get("priv_key") or "",
+        )
+
+    @staticmethod
+    def is_invalidating_error(error_indication: Any) -> bool:
+        """错误指示是否表示会话状态（引擎ID/时间窗口/用户行）已失效"""
+        return isinstance(error_indication, INVALIDATING_ERRORS)
+
+    def get_session(self, ip: str, port: int, **kwargs) -> Optional[V3Session]:
+        """获取有效的缓存会话（不触发发现）"""
+        key = self.make_key(ip, port, **kwargs)
+        session = self._sessions.get(key)
+        if session is None:
+            return None
+        if time.monotonic() - session.discovered_at > self.session_ttl:
+            return None
+        return session
+
+    async def get_auth_data(
+        self,
+        engine: Any,
+        build_auth_data: Any,
+        ip: str,
+        port: int = 161,
+        timeout: float = 2.0,
+        retries: int = 0,
+        **kwargs,
+    ) -> Optional[Any]:
+        """
+        获取固定了设备securityEngineId的认证对象（必要时先发现引擎）
+
+        Args:
+            engine: 共享SnmpEngine（会话过期时从中删除旧的用户行）
+            build_auth_data: 构造认证对象的函数，签名为 (version, **kwargs)
+            ip: 设备IP地址
+            port: 端口号
+            timeout: 发现报文超时（秒）
+            retries: 发现报文重试次数
+            **kwargs: v3认证参数
+
+        Returns:
+            UsmUserData实例，发现失败时返回None（调用方应使用未固定引擎ID的认证对象）
+        """
+        key = self.make_key(ip, port, **kwargs)
+        session = self._sessions.get(key)
+        now = time.monotonic()
+        if session is not None and now - session.discovered_at <= self.session_ttl:
+            session.hits += 1
+            self._stats["hits"] += 1
+            return session.auth_data
+        failed_at = self._failed_discoveries.get(key)
+        if failed_at is not None and now - failed_at < DISCOVERY_RETRY_INTERVAL:
+            return None
+
+        lock = self._discovery_locks.get(key)
+        if lock is None:
+            lock = self._discovery_locks[key] = asyncio.Lock()
+        async with lock:
+            # 等待锁期间其他协程可能已完成发现
+            current = self._sessions.get(key)
+            if current is not None and current is not session:
+                current.hits += 1
+                self._stats["hits"] += 1
+                return current.auth_data
+
+            discovered = await discover_engine(ip, port, timeout, retries)
+            if discovered is None:
+                self._stats["discovery_failures"] += 1
+                if len(self._failed_discoveries) >= self.max_sessions:
+                    self._failed_discoveries.clear()
+                self._failed_discoveries[key] = time.monotonic()
+                return None
+            self._failed_discoveries.pop(key, None)
+            engine_id, engine_boots, engine_time = discovered
+            self._stats["discoveries"] += 1
+
+            if session is not None:
+                self._stats["expirations"] += 1
+                if session.engine_id == engine_id:
+                    # 引擎ID未变化，沿用已登记的用户行
+                    session.engine_boots = engine_boots
+                    session.engine_time = engine_time
+                    session.discovered_at = time.monotonic()
+                    return session.auth_data
+                logger.info(
+                    f"设备 {ip}:{port} 的SNMP引擎ID已变化: "
+                    f"{session.engine_id.hex()} -> {engine_id.hex()}"
+                )
+                self._unconfigure(engine, session)
+
+            if len(self._sessions) >= self.max_sessions:
+                self.clear(engine)
+            auth_data = build_auth_data("v3", security_engine_id=engine_id, **kwargs)
+            self._sessions[key] = V3Session(
+                engine_id, engine_boots, engine_time, auth_data, time.monotonic()
+            )
+            logger.debug(
+                f"发现设备 {ip}:{port} 的SNMP引擎: {engine_id.hex()}, "
+                f"boots={engine_boots}, time={engine_time}"
+            )
+            return auth_data
+
+    def invalidate(
+        self, engine: Any, ip: str, port: int, reason: Any = None, **kwargs
+    ) -> bool:
+        """
+        使设备会话失效（下次请求重新发现引擎ID和时间窗口）
+
+        Args:
+            engine: 共享SnmpEngine
+            ip: 设备IP地址
+            port: 端口号
+            reason: 失效原因（错误指示），仅用于日志
+            **kwargs: v3认证参数
+
+        Returns:
+            是否存在并删除了会话
+        """
+        key = self.make_key(ip, port, **kwargs)
+        session = self._sessions.pop(key, None)
+        self._discovery_locks.pop(key, None)
+        if session is None:
+            return False
+        self._stats["invalidations"] += 1
+        self._unconfigure(engine, session)
+        logger.info(f"设备 {ip}:{port} 的SNMP v3会话已失效: {reason}")
+        return True
+
+    def clear(self, engine: Any) -> None:
+        """清空所有会话"""
+        for session in self._sessions.values():
+            self._unconfigure(engine, session)
+        self._sessions.clear()
+        self._discovery_locks.clear()
+        self._failed_discoveries.clear()
+
+    @staticmethod
+    def _unconfigure(engine: Any, session: V3Session) -> None:
+        """
+        从共享引擎中删除会话登记的用户行
+
+        只删除USM用户行和命令生成器配置缓存中的对应条目，
+        目标参数和传输目标按securityName共享，仍由其他设备使用。
+        """
+        auth_data = session.auth_data
+        lcd_cache = engine.get_user_context(_LCD_CACHE_ID)
+        if (
+            not lcd_cache
+            or lcd_cache["auth"].pop(
+                (auth_data.userName, auth_data.securityEngineId), None
+            )
+            is None
+        ):
+            # 会话建立后尚未发送过请求，引擎中没有对应的用户行
+            return
+        try:
+            config.delete_v3_user(
+                engine, auth_data.userName, auth_data.securityEngineId
+            )
+        except Exception as e:
+            logger.debug(f"删除SNMP v3用户行时出错: {e}")
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取会话缓存统计信息"""
+        stats = dict(self._stats)
+        stats["sessions"] = len(self._sessions)
+        return stats
+
+
+__all__ = [
+    "V3Session",
+    "V3SessionCache",
+    "discover_engine",
+    "encode_discovery_request",
+    "decode_discovery_response",
+]
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+厂商监控配置 - 按交换机探测并缓存实际可用的CPU/内存/温度OID
+
+首次连接交换机时：
+1. 读取sysObjectID，用 OIDClassifier.identify_device_type 识别厂商
+2. 按厂商优先的顺序尝试各指标的候选OID（标量GET合并为一个请求，表格候选按列遍历）
+3. 每个指标记录第一个有值的候选及其实例OID，保存到注册表（可持久化到数据库）
+
+之后的轮询把所有指标的实例OID和sysObjectID合并为一个GET请求，
+不再为其他厂商的OID付出失败的往返。sysObjectID变化、保存的OID不再返回值
+或超过SNMP_VENDOR_PROFILE_TTL时重新探测。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import SNMP_VENDOR_PROFILE_TTL
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+SYS_OBJECT_ID_OID = "1.3.6.1.2.1.1.2.0"
+
+
+def _number(value: Any) -> Optional[float]:
+    """将SNMP值转换为数值，无法转换时返回None"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _average(rows: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """多个实例取平均值（如多块主控板的CPU使用率）"""
+    values = [row[0] for row in rows]
+    if not values:
+        return None
+    return {
+        "usage": sum(values) / len(values),
+        "details": {"instances": len(values), "max": max(values)},
+    }
+
+
+def _ucd_cpu(rows: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """UCD-SNMP-MIB: ssCpuUser/ssCpuSystem/ssCpuIdle"""
+    user_cpu, system_cpu, idle_cpu = rows[0]
+    total = user_cpu + system_cpu + idle_cpu
+    if total <= 0:
+        return None
+    return {
+        "usage": ((user_cpu + system_cpu) / total) * 100,
+        "details": {"user": user_cpu, "system": system_cpu, "idle": idle_cpu},
+    }
+
+
+def _used_free(rows: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """已用/空闲两列（如Cisco内存池）"""
+    used_mem = int(sum(row[0] for row in rows))
+    free_mem = int(sum(row[1] for row in rows))
+    total_mem = used_mem + free_mem
+    if total_mem <= 0:
+        return None
+    return {
+        "usage": (used_mem / total_mem) * 100,
+        "details": {"used": used_mem, "free": free_mem, "total": total_mem},
+    }
+
+
+def _total_available(rows: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """总量/可用两列（如UCD-SNMP-MIB的memTotalReal/memAvailReal）"""
+    total_mem, avail_mem = int(rows[0][0]), int(rows[0][1])
+    if total_mem <= 0:
+        return None
+    used_mem = total_mem - avail_mem
+    return {
+        "usage": (used_mem / total_mem) * 100,
+        "details": {"used": used_mem, "available": avail_mem, "total": total_mem},
+    }
+
+
+def _max_celsius(rows: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """多个温度传感器取最高温度（摄氏度）"""
+    values = [row[0] for row in rows]
+    if not values:
+        return None
+    return {"value": max(values), "details": {"sensors": len(values)}}
+
+
+# 各指标的候选OID，按通用顺序排列（探测时识别出的厂商的候选排在最前）
+#   vendor: identify_device_type 返回的厂商名（None表示通用MIB）
+#   oids: 标量OID（一行，按顺序传给compute）
+#   columns: 表格列OID（每个实例一行）
+#   skip_zero: 表格中第一列为0的实例不计入（实体表中没有CPU/传感器的单板）
+#   first_only: 表格只取第一个有效实例
+METRIC_SOURCES: Dict[str, List[Dict[str, Any]]] = {
+    "cpu": [
+        {
+            "name": "Cisco CPM CPU",
+            "vendor": "Cisco",
+            "columns": ["1.3.6.1.4.1.9.9.109.1.1.1.1.7"],  # cpmCPUTotal1minRev
+            "compute": _average,
+        },
+        {
+            "name": "Huawei Entity CPU",
+            "vendor": "Huawei",
+            "columns": ["1.3.6.1.4.1.2011.5.25.31.1.1.1.1.5"],  # hwEntityCpuUsage
+            "skip_zero": True,
+            "compute": _average,
+        },
+        {
+            "name": "H3C Entity CPU",
+            "vendor": "H3C",
+            "columns": ["1.3.6.1.4.1.25506.2.6.1.1.1.1.6"],  # hh3cEntityExtCpuUsage
+            "skip_zero": True,
+            "compute": _average,
+        },
+        {
+            "name": "UCD-SNMP-MIB",
+            "vendor": None,
+            "oids": [
+                "1.3.6.1.4.1.2021.11.9.0",  # 用户态CPU
+                "1.3.6.1.4.1.2021.11.10.0",  # 系统态CPU
+                "1.3.6.1.4.1.2021.11.11.0",  # 空闲CPU
+            ],
+            "compute": _ucd_cpu,
+        },
+        {
+            "name": "HOST-RESOURCES-MIB",
+            "vendor": None,
+            "columns": ["1.3.6.1.2.1.25.3.3.1.2"],  # hrProcessorLoad
+            "compute": _average,
+        },
+    ],
+    "memory": [
+        {
+            "name": "Cisco Memory Pool",
+            "vendor": "Cisco",
+            "columns": [
+                "1.3.6.1.4.1.9.9.48.1.1.1.5",  # ciscoMemoryPoolUsed
+                "1.3.6.1.4.1.9.9.48.1.1.1.6",  # ciscoMemoryPoolFree
+            ],
+            "first_only": True,
+            "compute": _used_free,
+        },
+        {
+            "name": "Huawei Entity Memory",
+            "vendor": "Huawei",
+            "columns": ["1.3.6.1.4.1.2011.5.25.31.1.1.1.1.7"],  # hwEntityMemUsage
+            "skip_zero": True,
+            "compute": _average,
+        },
+        {
+            "name": "H3C Entity Memory",
+            "vendor": "H3C",
+            "columns": ["1.3.6.1.4.1.25506.2.6.1.1.1.1.8"],  # hh3cEntityExtMemUsage
+            "skip_zero": True,
+            "compute": _average,
+        },
+        {
+            "name": "UCD-SNMP-MIB",
+            "vendor": None,
+            "oids": [
+                "1.3.6.1.4.1.2021.4.5.0",  # memTotalReal
+                "1.3.6.1.4.1.2021.4.6.0",  # memAvailReal
+            ],
+            "compute": _total_available,
+        },
+    ],
+    "temperature": [
+        {
+            "name": "Cisco Env Monitor",
+            "vendor": "Cisco",
+            # ciscoEnvMonTemperatureStatusValue
+            "columns": ["1.3.6.1.4.1.9.9.13.1.3.1.3"],
+            "compute": _max_celsius,
+        },
+        {
+            "name": "Huawei Entity Temperature",
+            "vendor": "Huawei",
+            # hwEntityTemperature
+            "columns": ["1.3.6.1.4.1.2011.5.25.31.1.1.1.1.11"],
+            "skip_zero": True,
+            "compute": _max_celsius,
+        },
+        {
+            "name": "H3C Entity Temperature",
+            "vendor": "H3C",
+            # hh3cEntityExtTemperature
+            "columns": ["1.3.6.1.4.1.25506.2.6.1.1.1.1.12"],
+            "skip_zero": True,
+            "compute": _max_celsius,
+        },
+    ],
+}
+
+_SOURCES_BY_NAME = {
+    (metric, source["name"]): source
+    for metric, sources in METRIC_SOURCES.items()
+    for source in sources
+}
+
+
+def ordered_sources(metric: str, vendor: Optional[str]) -> List[Dict[str, Any]]:
+    """识别出的厂商的候选排在最前，其次是通用MIB，最后是其他厂商"""
+    vendor = (vendor or "").lower()
+
+    def rank(source: Dict[str, Any]) -> int:
+        source_vendor = (source.get("vendor") or "").lower()
+        if source_vendor and source_vendor == vendor:
+            return 0
+        return 1 if not source_vendor else 2
+
+    return sorted(METRIC_SOURCES[metric], key=rank)
+
+
+def evaluate(
+    metric: str, source_name: str, values: Dict[str, Any], oid_rows: List[List[str]]
+) -> Optional[Dict[str, Any]]:
+    """
+    用保存的实例OID计算指标
+
+    Args:
+        metric: 指标名（cpu/memory/temperature）
+        source_name: 候选名称
+        values: {OID: 值}
+        oid_rows: 每个实例的OID列表
+
+    Returns:
+        指标字典（含source），OID没有返回值时返回None
+    """
+    source = _SOURCES_BY_NAME.get((metric, source_name))
+    if source is None:
+        return None
+    rows = []
+    for oids in oid_rows:
+        row = [_number(values.get(oid)) for oid in oids]
+        if any(value is None for value in row):
+            continue
+        rows.append(row)
+    if not rows:
+        return None
+    result = source["compute"](rows)
+    if result is None:
+        return None
+    result["source"] = source["name"]
+    return result
+
+
+def select_table_rows(
+    source: Dict[str, Any], table: Dict[str, Dict[str, Any]]
+) -> List[List[str]]:
+    """
+    从遍历得到的表格中选出有效实例
+
+    Args:
+        source: 表格候选
+        table: {实例索引: {列OID: 值}}
+
+    Returns:
+        每个有效实例的OID列表
+    """
+    columns = source["columns"]
+    oid_rows = []
+    for index in sorted(table, key=_index_key):
+        row = [_number(table[index].get(column)) for column in columns]
+        if any(value is None for value in row):
+            continue
+        if source.get("skip_zero") and row[0] == 0:
+            continue
+        oid_rows.append([f"{column}.{index}" for column in columns])
+        if source.get("first_only"):
+            break
+    return oid_rows
+
+
+def _index_key(index: str) -> tuple:
+    """按数值顺序排序实例索引"""
+    try:
+        return tuple(int(part) for part in index.split("."))
+    except ValueError:
+        return (float("inf"),)
+
+
+class VendorProfileRegistry:
+    """
+    交换机厂商监控配置注册表（线程安全）
+
+    配置格式：
+        {"sys_object_id": str, "vendor": str, "detected_at": float,
+         "metrics": {指标: {"source": 候选名称, "oids": [[实例OID]]}}}
+
+    Args:
+        store: 持久化存储（需提供 get_profile/save_profile/delete_profile），可选
+        ttl: 配置有效期（秒），过期后重新探测
+    """
+
+    def __init__(self, store=None, ttl: float = SNMP_VENDOR_PROFILE_TTL):
+        self.store = store
+        self.ttl = ttl
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "detections": 0, "invalidations": 0}
+
+    def get(self, ip: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """获取未过期的配置（内存中没有时从持久化存储加载）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            profile = self._profiles.get(ip)
+        if profile is None and self.store is not None:
+            try:
+                profile = self.store.get_profile(ip)
+            except Exception as e:
+                logger.warning(f"加载厂商监控配置失败: IP={ip}, 错误={e}")
+            if profile is not None:
+                with self._lock:
+                    self._profiles[ip] = profile
+        if profile is None or now - profile.get("detected_at", 0) >= self.ttl:
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return profile
+
+    def save(self, ip: str, profile: Dict[str, Any]) -> None:
+        """保存探测结果"""
+        with self._lock:
+            self._profiles[ip] = profile
+            self._stats["detections"] += 1
+        if self.store is not None:
+            try:
+                self.store.save_profile(ip, profile)
+            except Exception as e:
+                logger.warning(f"保存厂商监控配置失败: IP={ip}, 错误={e}")
+
+    def invalidate(self, ip: str) -> None:
+        """删除配置，下次轮询时重新探测"""
+        with self._lock:
+            self._profiles.pop(ip, None)
+            self._stats["invalidations"] += 1
+        if self.store is not None:
+            try:
+                self.store.delete_profile(ip)
+            except Exception as e:
+                logger.warning(f"删除厂商监控配置失败: IP={ip}, 错误={e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取注册表统计信息"""
+        with self._lock:
+            vendors: Dict[str, int] = {}
+            for profile in self._profiles.values():
+                vendor = profile.get("vendor") or "Unknown"
+                vendors[vendor] = vendors.get(vendor, 0) + 1
+            return {**self._stats, "switches": len(self._profiles), "vendors": vendors}
+
+
+async def detect_profile(
+    monitor,
+    identify_vendor: Callable[[str], str],
+    ip: str,
+    version: str,
+    **kwargs,
+) -> Optional[Dict[str, Any]]:
+    """
+    探测交换机实际可用的CPU/内存/温度OID
+
+    Args:
+        monitor: SNMPMonitor实例
+        identify_vendor: 根据sysObjectID识别厂商的函数
+        ip: 设备IP地址
+        version: SNMP版本
+        **kwargs: 认证参数
+
+    Returns:
+        配置字典，设备不可达时返回None
+    """
+    get_kwargs = {k: v for k, v in kwargs.items() if k != "max_repetitions"}
+
+    # sysObjectID和所有标量候选合并为一个GET请求
+    scalar_oids = [SYS_OBJECT_ID_OID]
+    for sources in METRIC_SOURCES.values():
+        for source in sources:
+            scalar_oids.extend(source.get("oids", []))
+    values, success = await monitor.get_multi(
+        ip, version, list(dict.fromkeys(scalar_oids)), **get_kwargs
+    )
+    if not success:
+        return None
+
+    sys_object_id = str(values.get(SYS_OBJECT_ID_OID) or "")
+    vendor = identify_vendor(sys_object_id) if sys_object_id else "Unknown"
+    metrics: Dict[str, Dict[str, Any]] = {}
+    tables: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+
+    async def walk(source: Dict[str, Any]) -> None:
+        key = tuple(source["columns"])
+        if key in tables:
+            return
+        rows, ok = await monitor.walk_columns(
+            ip, version, {column: column for column in source["columns"]}, **kwargs
+        )
+        tables[key] = rows if ok else {}
+
+    # 先并发遍历识别出的厂商的全部表格候选（其他候选只在需要时遍历）
+    await asyncio.gather(
+        *(
+            walk(source)
+            for sources in METRIC_SOURCES.values()
+            for source in sources
+            if "columns" in source and source.get("vendor") == vendor
+        )
+    )
+    for metric in METRIC_SOURCES:
+        for source in ordered_sources(metric, vendor):
+            if "oids" in source:
+                oid_rows = [source["oids"]]
+            else:
+                await walk(source)
+                oid_rows = select_table_rows(source, tables[tuple(source["columns"])])
+                if oid_rows:
+                    values.update(
+                        {
+                            f"{column}.{index}": value
+                            for index, row in tables[tuple(source["columns"])].items()
+                            for column, value in row.items()
+                        }
+                    )
+            if evaluate(metric, source["name"], values, oid_rows) is not None:
+                metrics[metric] = {"source": source["name"], "oids": oid_rows}
+                break
+
+    logger.info(
+        f"厂商监控OID探测完成: IP={ip}, 厂商={vendor}, "
+        + ", ".join(f"{m}={info['source']}" for m, info in metrics.items())
+    )
+    return {
+        "sys_object_id": sys_object_id,
+        "vendor": vendor,
+        "detected_at": time.time(),
+        "metrics": metrics,
+    }
+
+
+_registry: Optional[VendorProfileRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_vendor_profile_registry(store=None) -> VendorProfileRegistry:
+    """
+    获取进程内共享的厂商监控配置注册表
+
+    Args:
+        store: 持久化存储（可选），提供时挂载到注册表
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = VendorProfileRegistry()
+    if store is not None and _registry.store is None:
+        _registry.store = store
+    return _registry
+
+
+__all__ = [
+    "METRIC_SOURCES",
+    "VendorProfileRegistry",
+    "detect_profile",
+    "evaluate",
+    "get_vendor_profile_registry",
+]
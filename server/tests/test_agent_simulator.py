@@ -0,0 +1,109 @@
+import unittest
+import asyncio
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.snmp.agent_simulator import AgentSimulator
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.snmp_monitor import SNMPMonitor
+from src.snmp.unified_poller import prepare_snmp_kwargs
+
+
+class TestAgentSimulator(unittest.TestCase):
+    """模拟SNMP代理测试用例"""
+
+    def run_with_simulator(self, simulator, scenario):
+        async def run():
+            await simulator.start()
+            try:
+                return await scenario(SNMPMonitor())
+            finally:
+                simulator.stop()
+                close_loop_engine(asyncio.get_running_loop())
+
+        return asyncio.run(run())
+
+    def test_interface_counters_with_gaps(self):
+        """两种编解码器都能遍历带ifIndex间隔的接口表，计数器随时间增长"""
+        simulator = AgentSimulator(switches=2, ports=8, port=16231, if_index_gap=3)
+        results = {}
+
+        async def scenario(monitor):
+            for config in simulator.switch_configs():
+                for codec in (SNMPMonitor.CODEC_PYSNMP, SNMPMonitor.CODEC_NATIVE):
+                    kwargs = prepare_snmp_kwargs(dict(config, snmp_codec=codec))
+                    first, _ = await monitor.get_interface_counters(
+                        config['ip'], 'v2c', **kwargs
+                    )
+                    await asyncio.sleep(0.05)
+                    second, uptime = await monitor.get_interface_counters(
+                        config['ip'], 'v2c', **kwargs
+                    )
+                    results[(config['snmp_port'], codec)] = (first, second, uptime)
+
+        self.run_with_simulator(simulator, scenario)
+
+        self.assertEqual(len(results), 4)
+        for first, second, uptime in results.values():
+            self.assertEqual([i['index'] for i in first], [1, 5, 9, 13, 17, 21, 25, 29])
+            self.assertIsNotNone(uptime)
+            for before, after in zip(first[:7], second[:7]):
+                self.assertEqual(after['counter_bits'], 64)
+                self.assertGreater(
+                    after['counters']['in_octets'], before['counters']['in_octets']
+                )
+            # 每8个端口中有一个空闲端口，计数器不增长
+            self.assertEqual(first[7]['counters'], second[7]['counters'])
+        # 不同交换机的计数器互不相同
+        self.assertNotEqual(
+            results[(16231, SNMPMonitor.CODEC_NATIVE)][1][0]['counters'],
+            results[(16232, SNMPMonitor.CODEC_NATIVE)][1][0]['counters'],
+        )
+        self.assertGreater(simulator.get_statistics()['responses'], 0)
+
+    def test_v1_falls_back_to_32bit_counters(self):
+        """v1请求跳过Counter64，返回32位计数器和设备信息"""
+        simulator = AgentSimulator(switches=1, ports=4, port=16241, latency=0.005)
+        config = simulator.switch_configs(SNMPMonitor.CODEC_NATIVE)[0]
+        kwargs = prepare_snmp_kwargs(config)
+
+        async def scenario(monitor):
+            interfaces, _ = await monitor.get_interface_counters(
+                config['ip'], 'v1', **kwargs
+            )
+            device = await monitor.get_device_info(config['ip'], 'v1', **kwargs)
+            return interfaces, device
+
+        interfaces, device = self.run_with_simulator(simulator, scenario)
+        self.assertEqual(len(interfaces), 4)
+        for interface in interfaces:
+            self.assertEqual(interface['counter_bits'], 32)
+            self.assertLess(interface['counters']['in_octets'], 2 ** 32)
+        self.assertIn('sim-switch-1', str(device.get('name')))
+
+    def test_loss_drops_requests(self):
+        """丢包率为1时全部请求被丢弃，不产生响应"""
+        simulator = AgentSimulator(switches=1, ports=2, port=16251, loss=1.0)
+        config = simulator.switch_configs(SNMPMonitor.CODEC_NATIVE)[0]
+        kwargs = prepare_snmp_kwargs(config)
+
+        async def scenario(monitor):
+            return await monitor.get_multi(
+                config['ip'], 'v2c', ['1.3.6.1.2.1.1.5.0'], timeout=0.2, retries=0, **kwargs
+            )
+
+        started = time.monotonic()
+        values, ok = self.run_with_simulator(simulator, scenario)
+        self.assertFalse(ok)
+        # 原生编解码也使用调用方指定的超时（默认超时为2秒）
+        self.assertLess(time.monotonic() - started, 1.5)
+        stats = simulator.get_statistics()
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(stats['responses'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
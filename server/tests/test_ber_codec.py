@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from pyasn1.codec.ber import decoder, encoder
+from pysnmp.proto import api
+
+from snmp.ber_codec import (
+    BERDecodeError,
+    Counter32,
+    Counter64,
+    Gauge32,
+    IpAddress,
+    ObjectIdentifier,
+    OctetString,
+    TimeTicks,
+    END_OF_MIB_VIEW,
+    NO_SUCH_INSTANCE,
+    PDU_GETBULK,
+    PDU_RESPONSE,
+    decode_message,
+    encode_message,
+    encode_request,
+    peek_request_id,
+)
+
+PROTO = api.PROTOCOL_MODULES[api.SNMP_VERSION_2C]
+
+
+class TestBERCodec(unittest.TestCase):
+    """原生BER编解码器测试用例（以pysnmp/pyasn1的编解码结果为准）"""
+
+    def test_request_decodes_with_pysnmp(self):
+        """GETBULK请求可被pysnmp正确解码"""
+        oids = [(1, 3, 6, 1, 2, 1, 2, 2, 1, 2), (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6)]
+        packet = encode_request(1, b"public", PDU_GETBULK, 2**31 - 1, oids, 0, 25)
+
+        message, rest = decoder.decode(packet, asn1Spec=PROTO.Message())
+        self.assertEqual(rest, b"")
+        pdu = PROTO.apiMessage.get_pdu(message)
+        self.assertEqual(str(PROTO.apiMessage.get_community(message)), "public")
+        self.assertEqual(int(PROTO.apiBulkPDU.get_request_id(pdu)), 2**31 - 1)
+        self.assertEqual(int(PROTO.apiBulkPDU.get_max_repetitions(pdu)), 25)
+        self.assertEqual(
+            [tuple(oid) for oid, _ in PROTO.apiBulkPDU.get_varbinds(pdu)], oids
+        )
+
+    def test_decode_pysnmp_response(self):
+        """pysnmp编码的响应可被正确解码"""
+        pdu = PROTO.GetResponsePDU()
+        PROTO.apiPDU.set_defaults(pdu)
+        PROTO.apiPDU.set_request_id(pdu, 4242)
+        PROTO.apiPDU.set_varbinds(
+            pdu,
+            [
+                ((1, 3, 6, 1, 2, 1, 1, 5, 0), PROTO.OctetString("交换机".encode())),
+                ((1, 3, 6, 1, 2, 1, 1, 3, 0), PROTO.TimeTicks(123456)),
+                ((1, 3, 6, 1, 2, 1, 2, 2, 1, 10, 7), PROTO.Counter32(4294967295)),
+                ((1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6, 7), PROTO.Counter64(2**64 - 1)),
+                ((1, 3, 6, 1, 2, 1, 1, 2, 0), PROTO.ObjectIdentifier((1, 3, 6, 1, 4, 1, 9))),
+                ((1, 3, 6, 1, 2, 1, 4, 20, 1, 1, 1), PROTO.IpAddress("10.1.2.3")),
+                ((1, 3, 6, 1, 2, 1, 1, 7, 0), PROTO.Integer(-300)),
+                ((1, 3, 6, 1, 2, 1, 1, 9, 0), PROTO.NoSuchInstance()),
+            ],
+        )
+        message = PROTO.Message()
+        PROTO.apiMessage.set_defaults(message)
+        PROTO.apiMessage.set_community(message, "public")
+        PROTO.apiMessage.set_pdu(message, pdu)
+        packet = encoder.encode(message)
+
+        self.assertEqual(peek_request_id(packet), 4242)
+        decoded = decode_message(packet)
+        self.assertEqual(decoded.pdu_type, PDU_RESPONSE)
+        self.assertEqual(decoded.community, b"public")
+        values = [value for _, value in decoded.var_binds]
+        self.assertEqual(str(values[0]), "交换机")
+        self.assertIsInstance(values[1], TimeTicks)
+        self.assertEqual(int(values[1]), 123456)
+        self.assertEqual(values[2], 4294967295)
+        self.assertEqual(values[3], 2**64 - 1)
+        self.assertEqual(str(values[4]), "1.3.6.1.4.1.9")
+        self.assertEqual(values[5], "10.1.2.3")
+        self.assertEqual(values[6], -300)
+        self.assertIs(values[7], NO_SUCH_INSTANCE)
+        self.assertEqual(str(decoded.var_binds[2][0]), "1.3.6.1.2.1.2.2.1.10.7")
+
+    def test_round_trip(self):
+        """编码后再解码得到相同的变量绑定"""
+        var_binds = [
+            ((1, 3, 6, 1, 2, 1, 1, 1, 0), OctetString(b"x" * 300)),
+            ((1, 3, 6, 1, 2, 1, 2, 2, 1, 5, 1), Gauge32(0)),
+            ((1, 3, 6, 1, 2, 1, 2, 2, 1, 10, 1), Counter32(128)),
+            ((1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6, 1), Counter64(2**40)),
+            ((1, 3, 6, 1, 4, 1, 2011, 5, 25, 31, 1, 1, 1, 1, 5), 2**31 - 1),
+            ((1, 3, 6, 1, 2, 1, 4, 20, 1, 1, 1), IpAddress("192.168.0.1")),
+            ((1, 3, 6, 1, 2, 1, 1, 2, 0), ObjectIdentifier((1, 3, 6, 1, 4, 1, 200000))),
+            ((1, 3, 6, 1, 2, 1, 1, 9, 0), END_OF_MIB_VIEW),
+        ]
+        decoded = decode_message(
+            encode_message(0, b"private", PDU_RESPONSE, 7, var_binds, 2, 1)
+        )
+        self.assertEqual(decoded.version, 0)
+        self.assertEqual((decoded.error_status, decoded.error_index), (2, 1))
+        self.assertEqual(decoded.var_binds, var_binds)
+
+    def test_malformed_packets_raise(self):
+        """截断或不支持的报文抛出BERDecodeError"""
+        packet = encode_message(
+            1, b"public", PDU_RESPONSE, 1, [((1, 3, 6, 1, 2, 1, 1, 3, 0), TimeTicks(1))]
+        )
+        for broken in (packet[:-3], packet[:10], b"\x02\x01\x00"):
+            with self.assertRaises(BERDecodeError):
+                decode_message(broken)
+        self.assertIsNone(peek_request_id(b"\x30\x03\x02"))
+
+        # 不支持的值类型（如0x47）
+        unsupported = packet[:-3] + b"\x47" + packet[-2:]
+        with self.assertRaises(BERDecodeError):
+            decode_message(unsupported)
+
+
+if __name__ == '__main__':
+    unittest.main()
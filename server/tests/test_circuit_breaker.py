@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.circuit_breaker import (
+    DeviceCircuitBreaker,
+    DECISION_POLL,
+    DECISION_PROBE,
+    DECISION_SKIP,
+    STATE_CLOSED,
+    STATE_OPEN,
+    STATE_HALF_OPEN,
+)
+
+IP = "10.0.0.1"
+
+
+class TestDeviceCircuitBreaker(unittest.TestCase):
+    """设备熔断器测试用例"""
+
+    def setUp(self):
+        self.breaker = DeviceCircuitBreaker(
+            failure_threshold=3, base_backoff=30, max_backoff=120, jitter_ratio=0
+        )
+
+    def fail(self, times, now=0.0):
+        for _ in range(times):
+            opened = self.breaker.record_failure(IP, now=now)
+        return opened
+
+    def test_opens_after_threshold(self):
+        """连续失败达到阈值后熔断"""
+        self.assertFalse(self.fail(2))
+        self.assertEqual(self.breaker.acquire(IP, now=1.0), DECISION_POLL)
+        self.assertTrue(self.fail(1))
+        self.assertEqual(self.breaker.get_state(IP), STATE_OPEN)
+        self.assertEqual(self.breaker.acquire(IP, now=29.0), DECISION_SKIP)
+
+    def test_success_resets_failure_count(self):
+        """成功后连续失败计数清零"""
+        self.fail(2)
+        self.breaker.record_success(IP)
+        self.assertFalse(self.fail(2))
+        self.assertEqual(self.breaker.get_state(IP), STATE_CLOSED)
+
+    def test_probe_after_backoff_and_recover(self):
+        """退避到期后半开探测，成功后恢复正常轮询"""
+        self.fail(3, now=0.0)
+        self.assertEqual(self.breaker.acquire(IP, now=30.0), DECISION_PROBE)
+        self.assertTrue(self.breaker.is_half_open(IP))
+        # 探测进行中不会重复发起
+        self.assertEqual(self.breaker.acquire(IP, now=31.0), DECISION_SKIP)
+
+        self.breaker.record_success(IP, now=32.0)
+        self.assertEqual(self.breaker.get_state(IP), STATE_CLOSED)
+        self.assertEqual(self.breaker.acquire(IP, now=33.0), DECISION_POLL)
+
+    def test_exponential_backoff_with_cap(self):
+        """探测失败后退避时间加倍，且不超过上限"""
+        self.fail(3, now=0.0)
+        now = 0.0
+        backoffs = []
+        for _ in range(4):
+            backoffs.append(
+                self.breaker.get_statistics(now=now)["devices"][IP]["backoff"]
+            )
+            now += backoffs[-1]
+            self.assertEqual(self.breaker.acquire(IP, now=now), DECISION_PROBE)
+            self.assertEqual(self.breaker.get_state(IP), STATE_HALF_OPEN)
+            # 半开状态下一次失败即重新熔断
+            self.assertTrue(self.breaker.record_failure(IP, now=now))
+        self.assertEqual(backoffs, [30.0, 60.0, 120.0, 120.0])
+
+    def test_statistics_and_retain(self):
+        """统计信息包含熔断设备，设备删除后清理状态"""
+        self.fail(3, now=0.0)
+        self.breaker.record_failure("10.0.0.2", now=0.0)
+        self.breaker.acquire(IP, now=10.0)
+
+        stats = self.breaker.get_statistics(now=10.0)
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["skipped_polls"], 1)
+        self.assertEqual(stats["devices"][IP]["retry_in"], 20.0)
+        self.assertEqual(stats["devices"]["10.0.0.2"]["state"], STATE_CLOSED)
+
+        self.breaker.retain(["10.0.0.2"])
+        self.assertEqual(self.breaker.get_state(IP), STATE_CLOSED)
+        self.assertNotIn(IP, self.breaker.get_statistics()["devices"])
+
+
+if __name__ == '__main__':
+    unittest.main()
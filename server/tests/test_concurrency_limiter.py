@@ -0,0 +1,189 @@
+import unittest
+import asyncio
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.switch_registry import SwitchRegistry
+from src.snmp.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    DECISION_DECREASE,
+    DECISION_HOLD,
+    DECISION_INCREASE,
+    REASON_LATENCY,
+    REASON_TIMEOUT,
+)
+from src.snmp.unified_poller import SNMPPoller
+
+
+def run_window(limiter, group, latency, timed_out=False, saturate=True):
+    """占满分组的并发后完成一个采样窗口，返回最后一次释放的决策"""
+    decision = None
+    while decision is None:
+        while limiter.try_acquire(group, now=0):
+            pass
+        if not saturate:
+            limiter._groups[group].saturated = False
+        decision = limiter.release(group, latency, timed_out, now=0)
+    return decision
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    """自适应并发限制器测试用例"""
+
+    def test_aimd(self):
+        """并发打满时加1，超时或延迟过高时乘性减小，减小前发出的请求不计入新窗口"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=6, latency_target=1.0)
+        group = limiter.group_of("10.0.0.1")
+
+        self.assertEqual(run_window(limiter, group, 0.1), DECISION_INCREASE)
+        self.assertEqual(limiter.get_limit(group), 5)
+        self.assertEqual(run_window(limiter, group, 0.1, saturate=False), DECISION_HOLD)
+        self.assertEqual(limiter.get_limit(group), 5)
+
+        self.assertEqual(run_window(limiter, group, 0.1, timed_out=True), DECISION_DECREASE)
+        self.assertEqual(limiter.get_limit(group), 3)
+        stats = limiter.get_statistics()['groups'][group]
+        self.assertEqual(stats['last_reason'], REASON_TIMEOUT)
+        self.assertEqual(stats['timeout_ratio'], 1.0)
+
+        # 减小时仍在途的4个请求完成后才开始新的窗口
+        for _ in range(4):
+            self.assertIsNone(limiter.release(group, 5.0, now=0))
+        self.assertEqual(limiter.get_statistics()['groups'][group]['inflight'], 0)
+        self.assertEqual(run_window(limiter, group, 5.0), DECISION_DECREASE)
+        self.assertEqual(limiter.get_statistics()['groups'][group]['last_reason'], REASON_LATENCY)
+        self.assertEqual(limiter.get_limit(group), 2)
+
+        # 不会低于最小限制、不会超过最大限制
+        for _ in range(5):
+            run_window(limiter, group, 5.0)
+            for _ in range(limiter.get_statistics()['groups'][group]['inflight']):
+                limiter.release(group, None, now=0)
+        self.assertEqual(limiter.get_limit(group), 1)
+        for _ in range(10):
+            run_window(limiter, group, 0.1)
+        self.assertEqual(limiter.get_limit(group), 6)
+
+        decisions = limiter.get_statistics()['recent_decisions']
+        self.assertEqual(decisions[0]['from'], 4)
+        self.assertEqual(decisions[0]['to'], 5)
+        self.assertEqual(decisions[1]['reason'], REASON_TIMEOUT)
+        self.assertEqual(decisions[2]['reason'], REASON_LATENCY)
+
+    def test_groups(self):
+        """站点按最长前缀匹配，其余按子网分组，每个分组独立限制并维护等待队列"""
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=1,
+            sites={'branch': ['10.8.0.0/16'], 'branch-core': ['10.8.1.0/24']},
+        )
+        self.assertEqual(limiter.group_of('10.8.2.5'), 'branch')
+        self.assertEqual(limiter.group_of('10.8.1.5'), 'branch-core')
+        self.assertEqual(limiter.group_of('192.168.3.7'), '192.168.3.0/24')
+        self.assertEqual(limiter.group_of('switch-a.local'), 'switch-a.local')
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(sites={'bad': ['10.0.0.300/24']})
+
+        self.assertTrue(limiter.try_acquire('branch'))
+        self.assertFalse(limiter.try_acquire('branch'))
+        self.assertTrue(limiter.try_acquire('192.168.3.0/24'))
+        limiter.defer('branch', 'a')
+        limiter.defer('branch', 'b')
+        limiter.defer('branch', 'c', front=True)
+        self.assertEqual(limiter.deferred_count(), 3)
+        self.assertEqual(limiter.pop_deferred('branch'), 'c')
+        self.assertIsNone(limiter.pop_deferred('192.168.3.0/24'))
+
+        limiter.release('branch', 0.1)
+        limiter.release('192.168.3.0/24', 0.1)
+        self.assertEqual(limiter.cleanup(max_idle=60, now=time.monotonic() + 120), 1)
+        self.assertEqual(set(limiter.get_statistics()['groups']), {'branch'})
+
+
+class _FakeSNMPManager:
+    """模拟设备轮询，failing中的设备很快返回请求超时"""
+
+    def __init__(self, failing_prefix):
+        self.monitor = self
+        self.failing_prefix = failing_prefix
+        self.inflight = {}
+        self.peak = {}
+
+    async def get_device_info(self, ip, version, **kwargs):
+        subnet = ip.rsplit('.', 1)[0]
+        self.inflight[subnet] = self.inflight.get(subnet, 0) + 1
+        self.peak[subnet] = max(self.peak.get(subnet, 0), self.inflight[subnet])
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.inflight[subnet] -= 1
+        if ip.startswith(self.failing_prefix):
+            raise ConnectionError('请求超时')
+        return {'sysName': ip}
+
+    async def get_system_metrics(self, ip, version, **kwargs):
+        return {}
+
+
+class _Source:
+    """只提供交换机注册表的交换机来源"""
+
+    def __init__(self):
+        self.registry = SwitchRegistry()
+
+
+class TestPollerConcurrency(unittest.TestCase):
+    """轮询器按分组限制并发测试用例"""
+
+    def test_slow_branch_does_not_throttle_local(self):
+        """超时的分支子网并发降到1，本地子网的并发照常增大，所有设备都被轮询"""
+        source = _Source()
+        snmp = _FakeSNMPManager('10.9.0.')
+        results = []
+        poller = SNMPPoller(
+            source,
+            poll_type='device',
+            poll_interval=3600,
+            min_workers=2,
+            max_workers=8,
+            enable_cache=False,
+            result_sink=lambda poll_type, result: results.append(result),
+        )
+        poller.snmp_manager = snmp
+        poller.start()
+        try:
+            deadline = time.time() + 5
+            while poller._enqueue_task is None and time.time() < deadline:
+                time.sleep(0.01)
+            for i in range(1, 21):
+                source.registry.upsert({'id': i, 'ip': f'10.1.0.{i}', 'snmp_version': 'v2c'})
+                source.registry.upsert({'id': 100 + i, 'ip': f'10.9.0.{i}', 'snmp_version': 'v2c'})
+            # 新增的交换机立即轮询后按固定相位排期，个别设备可能很快再次到期，按设备计数；
+            # 结果先于并发释放发送，等待在途轮询都计入分组
+            while time.time() < deadline:
+                stats = poller.get_statistics()
+                groups = stats['concurrency']['groups'].values()
+                if len({r['ip'] for r in results}) == 40 and not any(g['inflight'] for g in groups):
+                    break
+                time.sleep(0.01)
+        finally:
+            poller.stop()
+
+        self.assertEqual(len({r['ip'] for r in results}), 40)
+        groups = stats['concurrency']['groups']
+        local, branch = groups['10.1.0.0/24'], groups['10.9.0.0/24']
+        self.assertGreater(local['limit'], 2)
+        self.assertEqual(local['decreases'], 0)
+        self.assertEqual(branch['limit'], 1)
+        self.assertEqual(branch['last_reason'], REASON_TIMEOUT)
+        self.assertEqual(branch['timeouts'], branch['completed'])
+        self.assertLessEqual(snmp.peak['10.9.0'], 2)
+        self.assertGreater(snmp.peak['10.1.0'], 2)
+        self.assertEqual(stats['current_concurrency'], local['limit'] + 1)
+        self.assertTrue(any(d['group'] == '10.9.0.0/24' for d in stats['concurrency']['recent_decisions']))
+
+
+if __name__ == '__main__':
+    unittest.main()
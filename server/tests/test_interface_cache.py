@@ -0,0 +1,208 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.snmp.interface_cache import InterfaceStaticCache
+from src.snmp.poll_profile import InterfacePollProfile
+from src.snmp.snmp_monitor import SNMPMonitor
+
+
+class _FakeDeviceMonitor(SNMPMonitor):
+    """用内存中的ifTable代替真实设备，记录每次读取的变量绑定数"""
+
+    def __init__(self, interface_count=4):
+        self.sys_uptime = 1000
+        self.table_last_change = 0
+        self.table = {
+            index: {
+                "ifDescr": f"GE0/0/{index}",
+                "ifType": 6,
+                "ifSpeed": 1000000000,
+                "ifPhysAddress": b"\x00\x11\x22\x33\x44" + bytes([index]),
+                "ifMtu": 1500,
+                "ifHighSpeed": 1000,
+                "ifAdminStatus": 1,
+                "ifOperStatus": 1,
+                "ifLastChange": 0,
+                "ifHCInOctets": 100 * index,
+                "ifHCOutOctets": 200 * index,
+                "ifHCInUcastPkts": 0,
+                "ifHCInMulticastPkts": 0,
+                "ifHCInBroadcastPkts": 0,
+                "ifHCOutUcastPkts": 0,
+                "ifHCOutMulticastPkts": 0,
+                "ifHCOutBroadcastPkts": 0,
+                "ifInErrors": 0,
+                "ifOutErrors": 0,
+                "ifInDiscards": 0,
+                "ifOutDiscards": 0,
+            }
+            for index in range(1, interface_count + 1)
+        }
+        self.varbinds = 0
+        self.static_reads = 0
+        self.walks = 0
+
+    async def walk_columns(self, ip, version, columns, max_repetitions=None, **kwargs):
+        self.walks += 1
+        if "ifDescr" in columns:
+            self.static_reads += 1
+        self.varbinds += len(columns) * len(self.table)
+        rows = {
+            str(index): {name: row[name] for name in columns}
+            for index, row in self.table.items()
+        }
+        return rows, True
+
+    async def get_multi(self, ip, version, oids, max_varbinds=None, **kwargs):
+        self.varbinds += len(oids)
+        scalars = {
+            self.OIDS["sysUpTime"]: self.sys_uptime,
+            self.OIDS["ifTableLastChange"]: self.table_last_change,
+        }
+        columns = {oid: name for name, oid in self.OIDS.items()}
+        values = {}
+        for oid in oids:
+            if oid in scalars:
+                values[oid] = scalars[oid]
+                continue
+            column_oid, _, index = oid.rpartition(".")
+            column = columns[column_oid]
+            if column in self.INTERFACE_STATIC_COLUMNS + ["ifHighSpeed"]:
+                self.static_reads += 1
+            values[oid] = self.table[int(index)][column]
+        return values, True
+
+
+class TestInterfaceStaticCache(unittest.TestCase):
+    """接口静态列缓存与按需刷新测试用例"""
+
+    def setUp(self):
+        self.monitor = _FakeDeviceMonitor()
+        self.cache = InterfaceStaticCache(ttl=3600)
+
+    def poll(self, profile=None):
+        self.monitor.sys_uptime += 3000
+        self.monitor.varbinds = 0
+        self.monitor.static_reads = 0
+        self.monitor.walks = 0
+        interfaces, _ = asyncio.run(
+            self.monitor.get_interface_counters(
+                "192.0.2.1", "v2c", static_cache=self.cache, cache_key=1, profile=profile
+            )
+        )
+        return interfaces
+
+    def test_static_columns_served_from_cache(self):
+        """首次轮询读取静态列，之后只读取状态列和计数器列"""
+        first = self.poll()
+        self.assertEqual(self.monitor.static_reads, 1)
+        full_varbinds = self.monitor.varbinds
+
+        second = self.poll()
+        self.assertEqual(self.monitor.static_reads, 0)
+        self.assertLess(self.monitor.varbinds, full_varbinds)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["description"], "GE0/0/1")
+        self.assertEqual(second[0]["mtu"], 1500)
+        self.assertEqual(second[0]["counters"]["in_octets"], 100)
+
+    def test_reboot_and_table_change_refresh(self):
+        """sysUpTime减小或ifTableLastChange变化时整表刷新"""
+        self.poll()
+        self.monitor.sys_uptime = 0
+        self.monitor.table[1]["ifDescr"] = "renamed"
+        self.assertEqual(self.poll()[0]["description"], "renamed")
+        self.assertEqual(self.monitor.static_reads, 1)
+
+        self.monitor.table_last_change = 5000
+        del self.monitor.table[4]
+        interfaces = self.poll()
+        self.assertEqual(self.monitor.static_reads, 1)
+        self.assertEqual([i["index"] for i in interfaces], [1, 2, 3])
+        self.assertEqual(
+            self.cache.get_statistics()["refresh_reasons"],
+            {"missing": 1, "reboot": 1, "table_changed": 1},
+        )
+
+    def test_last_change_refreshes_single_interface(self):
+        """ifLastChange变化的接口单独刷新静态列"""
+        self.poll()
+        self.monitor.table[2]["ifLastChange"] = 3500
+        self.monitor.table[2]["ifSpeed"] = 100000000
+        interfaces = self.poll()
+        # 只GET接口2的6个静态列
+        self.assertEqual(self.monitor.static_reads, 6)
+        self.assertEqual(interfaces[1]["speed"], 100000000)
+        self.assertEqual(self.poll()[1]["speed"], 100000000)
+        self.assertEqual(self.monitor.static_reads, 0)
+
+    def test_ttl_expiry(self):
+        """超过TTL后整表刷新"""
+        self.poll()
+        self.cache.ttl = 0
+        self.poll()
+        self.assertEqual(self.monitor.static_reads, 1)
+        self.assertEqual(self.cache.get_statistics()["refresh_reasons"]["expired"], 1)
+
+    def test_profile_polls_selected_rows_and_columns(self):
+        """轮询配置排除的接口和列分组不再请求"""
+        for index in (3, 4):
+            self.monitor.table[index]["ifType"] = 136
+            self.monitor.table[index]["ifDescr"] = f"Vlanif{index}"
+        profile = InterfacePollProfile(exclude_types=[136], columns=["traffic"])
+
+        first = self.poll(profile)
+        self.assertEqual([i["index"] for i in first], [1, 2])
+
+        second = self.poll(profile)
+        self.assertEqual(self.monitor.walks, 0)
+        # 2个标量 + 2个接口 x (ifLastChange + 2个字节计数器)
+        self.assertEqual(self.monitor.varbinds, 2 + 2 * 3)
+        self.assertEqual([i["index"] for i in second], [1, 2])
+        self.assertEqual(second[1]["counters"], {"in_octets": 200, "out_octets": 400})
+        self.assertNotIn("oper_status", second[1])
+
+        # 接口增删后重新遍历整表并重新选择接口
+        self.monitor.table_last_change = 9000
+        self.monitor.table[4]["ifType"] = 6
+        self.assertEqual([i["index"] for i in self.poll(profile)], [1, 2, 4])
+        self.assertEqual(self.monitor.static_reads, 1)
+
+    def test_admin_up_only_follows_admin_status(self):
+        """管理状态变化（不改变ifLastChange）后下一次轮询即重新选择接口"""
+        self.monitor.table[3]["ifAdminStatus"] = 2
+        profile = InterfacePollProfile(admin_up_only=True, columns=["traffic"])
+        self.assertEqual(profile.columns, ["status", "traffic"])
+        self.assertEqual([i["index"] for i in self.poll(profile)], [1, 2, 4])
+
+        self.monitor.table[3]["ifAdminStatus"] = 1
+        self.monitor.table[1]["ifAdminStatus"] = 2
+        interfaces = self.poll(profile)
+        self.assertEqual(self.monitor.walks, 0)
+        self.assertEqual(self.monitor.static_reads, 0)
+        self.assertEqual([i["index"] for i in interfaces], [2, 3, 4])
+        self.assertEqual(interfaces[1]["counters"], {"in_octets": 300, "out_octets": 600})
+        self.assertEqual(interfaces[1]["description"], "GE0/0/3")
+
+    def test_profile_validation(self):
+        """无效的轮询配置被拒绝"""
+        with self.assertRaises(ValueError):
+            InterfacePollProfile(include_descr="([")
+        with self.assertRaises(ValueError):
+            InterfacePollProfile(columns=["octets"])
+        with self.assertRaises(ValueError):
+            InterfacePollProfile(interval=1)
+        profile = InterfacePollProfile.from_dict(
+            {"admin_up_only": True, "exclude_descr": "^(NULL|InLoopBack)"}
+        )
+        self.assertFalse(profile.matches({"ifDescr": "NULL0", "ifAdminStatus": 1}))
+        self.assertFalse(profile.matches({"ifDescr": "GE0/0/1", "ifAdminStatus": 2}))
+        self.assertTrue(profile.matches({"ifDescr": "GE0/0/1", "ifAdminStatus": 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
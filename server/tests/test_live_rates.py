@@ -0,0 +1,98 @@
+import unittest
+import threading
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.switch_registry import SwitchRegistry
+from src.snmp.live_rates import LiveRateStreamer
+
+
+class _FakeMonitor:
+    """模拟计数器采样，每次调用计数器增加1000字节"""
+
+    def __init__(self):
+        self.calls = []
+        self.octets = 0
+
+    async def get_port_octets(self, ip, version, ports=None, **kwargs):
+        self.calls.append((ip, ports))
+        self.octets += 1000
+        interfaces = [
+            {
+                "index": index,
+                "counters": {"in_octets": self.octets, "out_octets": self.octets},
+                "counter_bits": 64,
+            }
+            for index in (ports or [1, 2, 3])
+        ]
+        return interfaces, None
+
+
+class TestLiveRateStreamer(unittest.TestCase):
+    """实时速率采样测试用例"""
+
+    def setUp(self):
+        self.monitor = _FakeMonitor()
+        self.registry = SwitchRegistry()
+        self.switch = {"id": 1, "ip": "10.0.0.1", "snmp_version": "v2c"}
+        self.registry.upsert(self.switch)
+        self.streamer = LiveRateStreamer(monitor=self.monitor, registry=self.registry)
+        self.messages = {}
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.streamer.stop()
+
+    def _collector(self, name):
+        def callback(message):
+            with self.lock:
+                self.messages.setdefault(name, []).append(message)
+
+        return callback
+
+    def _wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_shared_stream_and_port_filter(self):
+        """同一交换机的订阅共享一路采样，结果按订阅端口过滤，最后一个订阅取消后停止"""
+        first = self.streamer.subscribe(self.switch, [1], 1, self._collector("a"))
+        second = self.streamer.subscribe(self.switch, [2], 1, self._collector("b"))
+        self.assertEqual(self.streamer.get_statistics()["streams"], 1)
+
+        self.assertTrue(self._wait_for(lambda: len(self.messages.get("b", [])) >= 2))
+        self.assertIn(("10.0.0.1", [1, 2]), self.monitor.calls)
+        message = self.messages["b"][-1]
+        self.assertEqual(message["type"], "liveRates")
+        self.assertEqual(message["data"]["subscription_id"], second)
+        self.assertEqual([i["index"] for i in message["data"]["interfaces"]], [2])
+
+        self.assertTrue(self.streamer.unsubscribe(first))
+        self.assertEqual(self.streamer.get_statistics()["streams"], 1)
+        self.assertTrue(self.streamer.unsubscribe(second))
+        self.assertEqual(self.streamer.get_statistics()["streams"], 0)
+
+        calls = len(self.monitor.calls)
+        time.sleep(1.5)
+        self.assertEqual(len(self.monitor.calls), calls)
+
+    def test_invalid_interval_and_switch_removed(self):
+        """无效间隔被拒绝，交换机删除后结束采样并通知订阅者"""
+        with self.assertRaises(ValueError):
+            self.streamer.subscribe(self.switch, None, 0.1, self._collector("a"))
+
+        self.streamer.subscribe(self.switch, None, 1, self._collector("a"))
+        self.registry.remove(1)
+        self.assertEqual(self.streamer.get_statistics()["streams"], 0)
+        self.assertEqual(self.messages["a"][-1]["type"], "liveRatesEnded")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.managers.metrics_manager import MetricsManager
+
+
+class TestMetricsManager(unittest.TestCase):
+    """SNMP指标时序存储测试用例"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = MetricsManager(
+            db_path=os.path.join(self.temp_dir.name, "metrics.db")
+        )
+        # 以整点作为基准时间，便于检查时间桶
+        self.base = 1700000000 // 3600 * 3600
+
+    def tearDown(self):
+        self.manager.connection_pool.close_all_connections()
+        self.temp_dir.cleanup()
+
+    def record_minutes(self, minutes, in_bps=1000.0):
+        """每30秒记录一次两个接口的速率"""
+        for second in range(0, minutes * 60, 30):
+            interfaces = [
+                {"index": 1, "in_bps": in_bps + second, "out_bps": 10.0},
+                {"index": 2, "in_bps": 5.0, "out_bps": 5.0},
+            ]
+            self.manager.record_interface_rates(1, interfaces, self.base + second)
+            self.manager.record_switch_usage(1, 20.0, 40.0, self.base + second)
+        self.manager.flush()
+
+    def test_rollup_levels(self):
+        """原始数据逐级汇总为1分钟/5分钟/1小时"""
+        self.record_minutes(120)
+        self.manager.rollup(now=self.base + 3 * 3600)
+
+        minute = self.manager.query_interface_metrics(
+            1, self.base, self.base + 59, if_index=1, resolution=60
+        )["points"]
+        self.assertEqual(len(minute), 1)
+        self.assertEqual(minute[0]["samples"], 2)
+        self.assertEqual(minute[0]["in_bps"], 1015.0)
+        self.assertEqual(minute[0]["max_in_bps"], 1030.0)
+
+        hour = self.manager.query_interface_metrics(
+            1, self.base, self.base + 7200, resolution=3600
+        )["points"]
+        self.assertEqual(len(hour), 4)  # 2个接口 × 2小时
+        self.assertEqual(hour[0]["samples"], 120)
+
+        usage = self.manager.query_switch_metrics(
+            1, self.base, self.base + 7200, resolution=300
+        )["points"]
+        self.assertEqual(len(usage), 24)
+        self.assertEqual(usage[0]["cpu_usage"], 20.0)
+
+    def test_rollup_is_incremental(self):
+        """重复汇总不会重复计入采样"""
+        self.record_minutes(10)
+        self.manager.rollup(now=self.base + 3600)
+        self.manager.rollup(now=self.base + 3600)
+        points = self.manager.query_interface_metrics(
+            1, self.base, self.base + 600, if_index=2, resolution=300
+        )["points"]
+        self.assertEqual([p["samples"] for p in points], [10, 10])
+
+    def test_prune_in_batches(self):
+        """按保留期分批清理过期数据"""
+        self.manager.PRUNE_BATCH_SIZE = 7
+        self.manager.PRUNE_PAUSE = 0
+        self.record_minutes(10)
+        deleted = self.manager.prune(now=self.base + self.manager.retention[0] + 300)
+        self.assertEqual(deleted, 30)
+        remaining = self.manager.query_interface_metrics(
+            1, self.base, self.base + 600, resolution=0
+        )["points"]
+        self.assertEqual(len(remaining), 20)
+
+    def test_select_resolution(self):
+        """根据时间跨度和保留期自动选择粒度"""
+        now = self.base
+        self.assertEqual(self.manager.select_resolution(now - 3600, now, now=now), 0)
+        self.assertEqual(
+            self.manager.select_resolution(now - 86400, now, now=now), 60
+        )
+        self.assertEqual(
+            self.manager.select_resolution(now - 30 * 86400, now, now=now), 3600
+        )
+        # 超出原始数据保留期时使用汇总数据
+        self.assertEqual(
+            self.manager.select_resolution(now - 3 * 86400, now - 3 * 86400 + 600, now=now),
+            60,
+        )
+
+
+def main():
+    """测试入口函数"""
+    unittest.main(verbosity=2)
+
+
+if __name__ == "__main__":
+    main()
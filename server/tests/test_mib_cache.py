@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.mib_cache import MibCache
+from snmp.oid_classifier import OIDClassifier
+
+
+class TestMibCache(unittest.TestCase):
+    """离线MIB缓存测试用例"""
+
+    def test_construction_is_lazy(self):
+        """创建分类器不加载MIB，第一次解析名称时才加载"""
+        cache = MibCache(tempfile.mkdtemp())
+        classifier = OIDClassifier()
+        classifier.mib_cache = cache
+        self.assertFalse(cache.loaded)
+
+        # 预定义映射不需要MIB
+        self.assertEqual(classifier.get_oid_name('1.3.6.1.2.1.1.5.0'), 'sysName')
+        self.assertFalse(cache.loaded)
+
+        self.assertEqual(classifier.get_oid_name('1.3.6.1.2.1.1.8.0'), 'sysORLastChange')
+        self.assertTrue(cache.loaded)
+        self.assertGreater(cache.get_statistics()['modules'], 0)
+
+    def test_missing_modules_never_compile(self):
+        """缺失的模块不会触发运行时编译（不访问网络MIB源）"""
+        cache = MibCache(os.path.join(tempfile.mkdtemp(), 'missing'))
+        mib_builder = cache.get_mib_builder()
+        self.assertEqual(mib_builder.get_mib_compiler().compile('IF-MIB'), {})
+        with self.assertRaises(Exception):
+            mib_builder.load_modules('NO-SUCH-MIB')
+
+        # 无法精确解析的OID返回最近的已知节点名，结果被缓存
+        name = cache.resolve_name('1.3.6.1.4.1.99999.1.0')
+        self.assertEqual(name, 'enterprises')
+        self.assertEqual(cache.get_statistics()['cached_names'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
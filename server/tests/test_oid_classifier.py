@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.oid_classifier import OIDClassifier
+from snmp.oid_trie import OIDTrie
+
+
+class TestOIDTrie(unittest.TestCase):
+    """OID前缀树测试用例"""
+
+    def test_longest_prefix_on_arc_boundaries(self):
+        """按整段弧匹配，选择最长前缀"""
+        trie = OIDTrie([('1.3.6.1.2.1.2', 'interfaces'), ('1.3.6.1.2.1.2.2.1.10', 'ifInOctets')])
+        self.assertEqual(trie.get('1.3.6.1.2.1.2.2.1.10.7'), 'ifInOctets')
+        self.assertEqual(trie.get('1.3.6.1.2.1.2.2.1.1.7'), 'interfaces')
+        # 字符串前缀相同但弧不同（1.3.6.1.2.1.25 不属于 1.3.6.1.2.1.2）
+        self.assertIsNone(trie.get('1.3.6.1.2.1.25.1.0'))
+        self.assertEqual(trie.get('not.an.oid', 'x'), 'x')
+
+        self.assertEqual(len(trie), 2)
+        self.assertTrue(trie.remove('1.3.6.1.2.1.2.2.1.10'))
+        self.assertFalse(trie.remove('1.3.6.1.2.1.2.2.1.10'))
+        self.assertEqual(trie.get('1.3.6.1.2.1.2.2.1.10.7'), 'interfaces')
+
+
+class TestOIDClassifier(unittest.TestCase):
+    """OID分类器测试用例"""
+
+    def setUp(self):
+        self.classifier = OIDClassifier()
+
+    def test_classify_many(self):
+        """批量分类与单个查询结果一致"""
+        oids = [
+            '1.3.6.1.2.1.2.2.1.10.3',
+            '1.3.6.1.4.1.2011.6.3.4.1.1.9',
+            '1.3.6.1.2.1.1.5.0',
+            '1.3.6.1.4.1.91.1',
+        ]
+        results = self.classifier.classify_many(oids)
+        self.assertEqual(results['1.3.6.1.2.1.2.2.1.10.3']['name'], 'ifInOctets')
+        self.assertEqual(results['1.3.6.1.2.1.2.2.1.10.3']['category'], 'interfaces')
+        self.assertEqual(results['1.3.6.1.4.1.2011.6.3.4.1.1.9']['vendor'], 'Huawei')
+        self.assertEqual(results['1.3.6.1.4.1.2011.6.3.4.1.1.9']['category'], 'cpu')
+        # 企业号91不是Cisco(9)
+        self.assertEqual(results['1.3.6.1.4.1.91.1']['vendor'], 'Unknown')
+        for oid in oids:
+            self.assertEqual(results[oid]['category'], self.classifier.classify_oid(oid))
+            self.assertEqual(results[oid]['name'], self.classifier.get_oid_name(oid))
+
+        parsed = self.classifier.parse_oid_values({'1.3.6.1.2.1.2.2.1.10.3': 2048})
+        self.assertEqual(parsed['1.3.6.1.2.1.2.2.1.10.3']['formatted_value'], '2.00 KB')
+
+    def test_register_vendor_profile(self):
+        """运行时注册的厂商配置对所有分类器生效"""
+        OIDClassifier.register_vendor_profile({
+            'vendor': 'Ruijie',
+            'enterprise_oid': '1.3.6.1.4.1.4881',
+            'categories': {'cpu': ['1.3.6.1.4.1.4881.1.1.10.2.36']},
+            'names': {'1.3.6.1.4.1.4881.1.1.10.2.36.1.1.2': 'ruijieCpu5Min'},
+            'recommended_oids': ['1.3.6.1.4.1.4881.1.1.10.2.36.1.1.2.0'],
+        })
+        other = OIDClassifier()
+        self.assertEqual(other.identify_device_type('1.3.6.1.4.1.4881.1.1.10.1.1'), 'Ruijie')
+        self.assertEqual(other.classify_oid('1.3.6.1.4.1.4881.1.1.10.2.36.1.1.2.0'), 'cpu')
+        self.assertEqual(other.get_oid_name('1.3.6.1.4.1.4881.1.1.10.2.36.1.1.2.0'), 'ruijieCpu5Min')
+        self.assertEqual(
+            other.get_recommended_oids('ruijie'), ['1.3.6.1.4.1.4881.1.1.10.2.36.1.1.2.0']
+        )
+        with self.assertRaises(ValueError):
+            OIDClassifier.register_vendor_profile({'enterprise_oid': '1.3.6.1.4.1.1'})
+
+
+if __name__ == '__main__':
+    unittest.main()
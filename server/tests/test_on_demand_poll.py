@@ -0,0 +1,101 @@
+import unittest
+import asyncio
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.switch_registry import SwitchRegistry
+from src.snmp.unified_poller import SNMPPoller
+
+
+class _FakeSNMPManager:
+    """模拟设备轮询，记录每次SNMP请求，blocked中的设备一直不响应"""
+
+    def __init__(self):
+        self.monitor = self
+        self.calls = []
+        self.blocked = set()
+
+    async def get_device_info(self, ip, version, **kwargs):
+        self.calls.append(ip)
+        while ip in self.blocked:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return {"sysName": ip}
+
+    async def get_system_metrics(self, ip, version, **kwargs):
+        return {}
+
+
+class _Source:
+    """只提供交换机注册表的交换机来源"""
+
+    def __init__(self):
+        self.registry = SwitchRegistry()
+
+
+class TestOnDemandPoll(unittest.TestCase):
+    """按需轮询优先队列测试用例"""
+
+    def setUp(self):
+        self.source = _Source()
+        self.snmp = _FakeSNMPManager()
+        self.results = []
+        self.poller = SNMPPoller(
+            self.source,
+            poll_type="device",
+            poll_interval=3600,
+            min_workers=1,
+            max_workers=1,
+            dynamic_adjustment=False,
+            result_sink=lambda poll_type, result: self.results.append(result),
+            on_demand_workers=1,
+        )
+        self.poller.snmp_manager = self.snmp
+        self.poller.start()
+        deadline = time.time() + 5
+        while self.poller._priority_queue is None and time.time() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.snmp.blocked.clear()
+        self.poller.stop()
+
+    def test_concurrent_requests_are_deduplicated(self):
+        """同一交换机的并发按需请求只轮询一次并共享结果"""
+        switch = {"id": 1, "ip": "192.0.2.1"}
+        futures = [self.poller.request_poll(switch) for _ in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(self.snmp.calls, ["192.0.2.1"])
+        self.assertTrue(all(result["type"] == "success" for result in results))
+        self.assertEqual(len({id(result) for result in results}), 1)
+        stats = self.poller.get_statistics()
+        self.assertEqual(stats["on_demand_requests"], 1)
+        self.assertEqual(stats["on_demand_deduplicated"], 2)
+
+        # 完成后的新请求重新轮询，不使用缓存
+        self.poller.request_poll(switch).result(timeout=5)
+        self.assertEqual(self.snmp.calls, ["192.0.2.1", "192.0.2.1"])
+
+    def test_reserved_capacity(self):
+        """后台工作协程全部被占用时，按需轮询仍能立即完成"""
+        self.snmp.blocked.add("192.0.2.10")
+        self.source.registry.upsert({"id": 10, "ip": "192.0.2.10"})
+        deadline = time.time() + 5
+        while "192.0.2.10" not in self.snmp.calls and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIn("192.0.2.10", self.snmp.calls)
+
+        result = self.poller.request_poll({"id": 2, "ip": "192.0.2.2"}).result(
+            timeout=2
+        )
+        self.assertEqual(result["type"], "success")
+        self.assertEqual(result["ip"], "192.0.2.2")
+        self.assertEqual([r["ip"] for r in self.results], ["192.0.2.2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import copy
+import json
+import random
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.switch_registry import SwitchRegistry
+from src.snmp.poll_delta import PollDeltaEncoder
+
+
+def set_path(target, path, value=None, remove=False):
+    keys = path.split('.')
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    if remove:
+        target.pop(keys[-1], None)
+    else:
+        target[keys[-1]] = value
+
+
+def apply_fields(target, changed, removed):
+    for path, value in changed.items():
+        set_path(target, path, value)
+    for path in removed:
+        set_path(target, path, remove=True)
+
+
+def apply_delta(previous, delta):
+    """按客户端的方式把增量应用到上一次的完整结果上"""
+    result = copy.deepcopy(previous)
+    apply_fields(result, delta['set'], delta['unset'])
+    patch = delta.get('interfaces')
+    if patch:
+        rows = {row['index']: row for row in result.get('interface_info', [])}
+        for index in patch.get('removed', []):
+            rows.pop(index)
+        for change in patch.get('changed', []):
+            apply_fields(rows[change['index']], change['set'], change.get('unset', []))
+        for row in patch.get('added', []):
+            rows[row['index']] = copy.deepcopy(row)
+        order = patch.get('order') or [row['index'] for row in result['interface_info']]
+        result['interface_info'] = [rows[index] for index in order]
+    return result
+
+
+def interface_result(poll_time, rng, ports=48, extra=None):
+    rows = []
+    for index in range(1, ports + 1):
+        busy = index % 8 != 0
+        rows.append(
+            {
+                'index': index,
+                'description': f'GigabitEthernet0/0/{index}',
+                'name': f'GE0/0/{index}',
+                'type': 6,
+                'type_text': 'ethernetCsmacd',
+                'speed': 1000000000,
+                'mac_address': f'00:e0:fc:00:00:{index:02x}',
+                'admin_status': 1,
+                'admin_status_text': 'up',
+                'oper_status': 1 if busy else 2,
+                'oper_status_text': 'up' if busy else 'down',
+                'in_rate': round(rng.uniform(0, 1e6), 2) if busy else 0.0,
+                'out_rate': round(rng.uniform(0, 1e6), 2) if busy else 0.0,
+                'in_utilization': round(rng.uniform(0, 1), 2) if busy else 0.0,
+                'out_utilization': round(rng.uniform(0, 1), 2) if busy else 0.0,
+                'counter_bits': 64,
+            }
+        )
+    rows.extend(extra or [])
+    return {
+        'type': 'success',
+        'ip': '192.0.2.1',
+        'switch_id': 1,
+        'snmp_version': 'v2c',
+        'interface_info': rows,
+        'interface_count': len(rows),
+        'sys_uptime': int(poll_time * 100),
+        'poll_time': poll_time,
+    }
+
+
+class TestPollDeltaEncoder(unittest.TestCase):
+    """轮询结果增量广播测试用例"""
+
+    def test_deltas_rebuild_full_results(self):
+        """增量可以还原完整结果，按间隔发送关键帧，接口表增量远小于完整结果"""
+        encoder = PollDeltaEncoder(keyframe_interval=5, keyframe_max_age=3600)
+        rng = random.Random(1)
+        client = None
+        full_bytes = delta_bytes = 0
+
+        for poll in range(10):
+            extra = None
+            if poll == 3:
+                # 新增接口
+                extra = [dict(interface_result(0, rng)['interface_info'][0], index=100)]
+            result = interface_result(1000 + poll * 30, rng, extra=extra)
+            if poll == 6:
+                # 接口删除、字段删除、状态变化
+                del result['interface_info'][5]
+                del result['interface_info'][0]['mac_address']
+                result['interface_info'][1]['oper_status_text'] = 'down'
+            message = encoder.encode('interface', result, now=poll * 30)
+            self.assertEqual(message['seq'], poll + 1)
+
+            if poll in (0, 5):
+                self.assertTrue(message['keyframe'])
+                self.assertEqual(message['type'], 'snmpInterfaceUpdate')
+                client = copy.deepcopy(message['data'])
+            else:
+                self.assertFalse(message['keyframe'])
+                self.assertEqual(message['type'], 'snmpInterfaceDelta')
+                client = apply_delta(client, json.loads(json.dumps(message['data'])))
+                full_bytes += len(json.dumps(result))
+                delta_bytes += len(json.dumps(message))
+            self.assertEqual(client, result)
+
+        # 每个接口的速率都在变化时仍只发送变化的字段
+        self.assertLess(delta_bytes, full_bytes * 0.5)
+
+    def test_unchanged_device_result_is_tiny(self):
+        """设备结果只有运行时间和轮询时间变化时增量只包含这两个字段"""
+        encoder = PollDeltaEncoder(keyframe_interval=100, keyframe_max_age=60)
+        device = {
+            'type': 'success',
+            'ip': '192.0.2.1',
+            'switch_id': 1,
+            'device_info': {'name': 'core', 'description': 'x' * 200, 'uptime': '1'},
+            'cpu_usage': 10,
+            'poll_time': 1.0,
+        }
+        encoder.encode('device', device, now=0)
+        updated = dict(device, device_info=dict(device['device_info'], uptime='2'), poll_time=2.0)
+        message = encoder.encode('device', updated, now=10)
+        self.assertEqual(message['type'], 'snmpDeviceDelta')
+        self.assertEqual(
+            message['data']['set'], {'device_info.uptime': '2', 'poll_time': 2.0}
+        )
+        self.assertEqual(message['data']['unset'], [])
+
+        # 超过关键帧最长间隔后发送完整结果
+        message = encoder.encode('device', updated, now=61)
+        self.assertTrue(message['keyframe'])
+
+    def test_snapshot_and_switch_removal(self):
+        """快照返回当前完整结果和当前序号，交换机删除后重新从关键帧开始"""
+        registry = SwitchRegistry()
+        registry.upsert({'id': 1, 'ip': '192.0.2.1'})
+        encoder = PollDeltaEncoder(registry=registry)
+        rng = random.Random(2)
+        for poll in range(3):
+            encoder.encode('interface', interface_result(poll, rng), now=poll)
+        encoder.encode('device', {'switch_id': 2, 'ip': '192.0.2.2', 'type': 'error'})
+
+        snapshot = encoder.snapshot(['interface'], [1])
+        self.assertEqual(len(snapshot), 1)
+        self.assertEqual(snapshot[0]['seq'], 3)
+        self.assertTrue(snapshot[0]['keyframe'])
+        self.assertEqual(snapshot[0]['data']['poll_time'], 2)
+        self.assertEqual(len(encoder.snapshot()), 2)
+
+        registry.remove(1)
+        self.assertEqual(encoder.snapshot(['interface']), [])
+        message = encoder.encode('interface', interface_result(3, rng), now=3)
+        self.assertTrue(message['keyframe'])
+        self.assertEqual(message['seq'], 1)
+        encoder.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.poll_scheduler import PollScheduler
+
+
+def make_switches(count):
+    """构造交换机配置列表"""
+    return [{"ip": f"10.0.{i // 256}.{i % 256}"} for i in range(count)]
+
+
+class TestPollScheduler(unittest.TestCase):
+    """轮询调度器测试用例"""
+
+    def test_load_is_spread_across_interval(self):
+        """设备按相位分散到整个轮询间隔，而不是同时到期"""
+        scheduler = PollScheduler(60, jitter_ratio=0)
+        scheduler.sync(make_switches(600), now=0.0)
+
+        per_second = [len(scheduler.pop_due(now=float(t))) for t in range(1, 61)]
+        self.assertEqual(sum(per_second), 600)
+        # 均匀分布时每秒约10台，任何一秒都不应出现大规模突发
+        self.assertLess(max(per_second), 30)
+
+    def test_each_switch_polled_once_per_interval(self):
+        """每台设备每个周期只到期一次"""
+        scheduler = PollScheduler(10, jitter_ratio=0)
+        scheduler.sync(make_switches(20), now=0.0)
+        dispatched = []
+        for t in range(1, 31):
+            dispatched.extend(config["ip"] for config, _ in scheduler.pop_due(float(t)))
+        self.assertEqual(len(dispatched), 60)
+        self.assertEqual(len(set(dispatched)), 20)
+
+    def test_phase_is_stable(self):
+        """相位由IP决定，与加入顺序无关"""
+        first = PollScheduler(30)
+        second = PollScheduler(30)
+        self.assertEqual(first.phase_of("10.0.0.1"), second.phase_of("10.0.0.1"))
+        self.assertNotEqual(first.phase_of("10.0.0.1"), first.phase_of("10.0.0.2"))
+
+    def test_removed_switch_is_not_dispatched(self):
+        """已删除的设备不再到期"""
+        scheduler = PollScheduler(10, jitter_ratio=0)
+        scheduler.sync(make_switches(5), now=0.0)
+        scheduler.sync(make_switches(5)[1:], now=0.0)
+        dispatched = [config["ip"] for config, _ in scheduler.pop_due(10.0)]
+        self.assertEqual(len(dispatched), 4)
+        self.assertNotIn("10.0.0.0", dispatched)
+
+    def test_missed_cycles_are_skipped_and_drift_reported(self):
+        """落后超过一个周期时跳过错过的周期，并统计漂移"""
+        scheduler = PollScheduler(10, jitter_ratio=0)
+        scheduler.sync([{"ip": "10.0.0.1"}], now=0.0)
+        items = scheduler.pop_due(now=35.0)
+        self.assertEqual(len(items), 1)
+        _, due = items[0]
+        scheduler.record_drift("10.0.0.1", 35.0 - due)
+
+        stats = scheduler.get_statistics()
+        switch_stats = stats["switches"]["10.0.0.1"]
+        self.assertGreater(switch_stats["skipped_cycles"], 0)
+        self.assertEqual(switch_stats["late_count"], 1)
+        self.assertGreater(stats["max_drift"], 20)
+        self.assertGreater(scheduler.next_due_time(), 35.0)
+
+        # 之后按时轮询，汇总的最大漂移仍是历史最大值
+        scheduler.record_drift("10.0.0.1", 0.1)
+        stats = scheduler.get_statistics()
+        self.assertAlmostEqual(stats["switches"]["10.0.0.1"]["last_drift"], 0.1)
+        self.assertEqual(stats["max_drift"], stats["switches"]["10.0.0.1"]["max_drift"])
+        self.assertGreater(stats["max_drift"], 20)
+
+    def test_per_switch_interval(self):
+        """交换机配置中的间隔覆盖默认间隔，修改后按新间隔调度"""
+        scheduler = PollScheduler(
+            10, jitter_ratio=0, interval_of=lambda config: config.get("interval")
+        )
+        switches = [{"ip": "10.0.0.1"}, {"ip": "10.0.0.2", "interval": 30}]
+        scheduler.sync(switches, now=0.0)
+        dispatched = []
+        for t in range(1, 61):
+            dispatched.extend(config["ip"] for config, _ in scheduler.pop_due(float(t)))
+        self.assertEqual(dispatched.count("10.0.0.1"), 6)
+        self.assertEqual(dispatched.count("10.0.0.2"), 2)
+
+        scheduler.sync([{"ip": "10.0.0.2", "interval": 5}], now=60.0)
+        dispatched = [
+            config["ip"] for t in range(61, 81) for config, _ in scheduler.pop_due(float(t))
+        ]
+        self.assertEqual(len(dispatched), 4)
+        self.assertEqual(scheduler.get_statistics()["switches"]["10.0.0.2"]["interval"], 5)
+
+    def test_immediate_add(self):
+        """新增的交换机立即到期，之后回到按相位对齐的周期"""
+        scheduler = PollScheduler(60, jitter_ratio=0)
+        config = {"ip": "10.0.0.1"}
+        scheduler.add(config, now=100.0, immediate=True)
+        self.assertEqual(len(scheduler.pop_due(now=100.0)), 1)
+
+        phase = scheduler.phase_of("10.0.0.1")
+        next_due = scheduler.next_due_time()
+        self.assertAlmostEqual(next_due % 60, phase)
+        self.assertLessEqual(next_due, 160.0)
+
+
+def main():
+    """测试入口函数"""
+    unittest.main(verbosity=2)
+
+
+if __name__ == "__main__":
+    main()
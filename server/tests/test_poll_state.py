@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.managers.poll_state_manager import PollStateManager
+from src.snmp.agent_simulator import AgentSimulator
+from src.snmp.engine_pool import close_loop_engine
+from src.snmp.manager import SNMPManager
+from src.snmp.rate_calculator import InterfaceRateCalculator
+from src.snmp.unified_poller import SNMPPoller
+
+
+class TestPollState(unittest.TestCase):
+    """轮询状态持久化与重启恢复测试用例"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "state.db")
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.connection_pool.close_all_connections()
+        self.temp_dir.cleanup()
+
+    def open_manager(self):
+        manager = PollStateManager(db_path=self.db_path)
+        self.managers.append(manager)
+        return manager
+
+    def test_state_survives_restart(self):
+        """结果和基线批量写入后由新实例加载，失败结果不覆盖，删除的交换机被清除"""
+        manager = self.open_manager()
+        device = {'type': 'success', 'switch_id': 1, 'ip': '192.0.2.1', 'cpu_usage': 5, 'poll_time': 10.0}
+        self.assertTrue(manager.record_result('device', device))
+        self.assertFalse(manager.record_result('device', {'type': 'error', 'switch_id': 1}))
+        self.assertFalse(manager.record_result('device', dict(device, switch_id=None)))
+        baselines = InterfaceRateCalculator.baselines_of(
+            [{'index': 1, 'counters': {'in_octets': 100}, 'counter_bits': 64}], 500, 10.0
+        )
+        manager.record_baselines(1, baselines)
+        manager.record_result('device', dict(device, switch_id=2))
+        manager.record_baselines(2, baselines)
+        self.assertEqual(manager.flush(), 4)
+        self.assertEqual(manager.flush(), 0)
+
+        manager.forget(2)
+        manager.flush()
+
+        restarted = self.open_manager()
+        self.assertEqual(restarted.get_result(1, 'device'), device)
+        self.assertIsNone(restarted.get_result(1, 'interface'))
+        self.assertEqual(restarted.get_baselines(), {1: baselines})
+        self.assertEqual(restarted.get_results(), [('device', device)])
+
+    def test_restored_baselines_give_rates(self):
+        """恢复的基线在过期前可直接计算速率，过期的基线被忽略"""
+        interfaces = [{'index': 1, 'counters': {'in_octets': 1000}, 'counter_bits': 64, 'speed': 10**9}]
+        baselines = InterfaceRateCalculator.baselines_of(interfaces, 1000, 100.0)
+
+        calculator = InterfaceRateCalculator(max_sample_age=600)
+        self.assertEqual(calculator.restore(1, baselines, now=200.0), 1)
+        later = [dict(interfaces[0], counters={'in_octets': 2000})]
+        rates = calculator.update(1, later, sys_uptime=11000, timestamp=200.0)
+        self.assertEqual(rates[0]['in_bps'], 80.0)
+
+        # 设备在服务停机期间重启（sysUpTime回退）时丢弃恢复的基线
+        calculator = InterfaceRateCalculator(max_sample_age=600)
+        calculator.restore(1, baselines, now=200.0)
+        rates = calculator.update(1, later, sys_uptime=500, timestamp=200.0)
+        self.assertNotIn('in_bps', rates[0])
+
+        expired = InterfaceRateCalculator(max_sample_age=600)
+        self.assertEqual(expired.restore(1, baselines, now=1000.0), 0)
+
+    def test_interface_poller_warm_start(self):
+        """接口轮询器重启后第一次轮询即计算出速率"""
+        simulator = AgentSimulator(switches=1, ports=4, port=16261)
+        switch = simulator.switch_configs('native')[0]
+
+        def make_poller(manager):
+            poller = SNMPPoller(
+                None,
+                poll_type='interface',
+                enable_cache=False,
+                dynamic_adjustment=False,
+                poll_state_manager=manager,
+            )
+            poller.snmp_manager = SNMPManager()
+            poller.restore_baselines(manager.get_baselines())
+            return poller
+
+        async def run():
+            await simulator.start()
+            try:
+                manager = self.open_manager()
+                first = await make_poller(manager)._poll_single_switch(switch)
+                manager.flush()
+                await asyncio.sleep(0.1)
+                # 模拟服务重启：新的状态存储实例和新的轮询器
+                restarted = self.open_manager()
+                second = await make_poller(restarted)._poll_single_switch(switch)
+                return first, second, restarted
+            finally:
+                simulator.stop()
+                close_loop_engine(asyncio.get_running_loop())
+
+        first, second, restarted = asyncio.run(run())
+        self.assertEqual(first['type'], 'success')
+        self.assertNotIn('in_bps', first['interface_info'][0])
+        self.assertIn('in_bps', second['interface_info'][0])
+        self.assertGreater(second['interface_info'][0]['in_bps'], 0)
+        self.assertEqual(restarted.get_result(1, 'interface'), second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.process_pool import ConsistentHashRing
+
+IPS = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(3000)]
+
+
+class TestConsistentHashRing(unittest.TestCase):
+    """一致性哈希分片测试用例"""
+
+    def test_assignment_is_stable(self):
+        """相同节点集合下分片结果确定（跨进程一致）"""
+        first = ConsistentHashRing(range(4))
+        second = ConsistentHashRing(range(4))
+        self.assertEqual(
+            [first.get_node(ip) for ip in IPS], [second.get_node(ip) for ip in IPS]
+        )
+
+    def test_load_is_balanced(self):
+        """各节点分到的交换机数量大致均衡"""
+        ring = ConsistentHashRing(range(4))
+        shards = ring.shard(IPS, lambda ip: ip)
+        self.assertEqual(sum(len(items) for items in shards.values()), len(IPS))
+        for items in shards.values():
+            self.assertGreater(len(items), len(IPS) / 4 * 0.7)
+            self.assertLess(len(items), len(IPS) / 4 * 1.3)
+
+    def test_adding_node_moves_few_keys(self):
+        """增加节点时只有约1/N的交换机迁移，且只迁移到新节点"""
+        ring = ConsistentHashRing(range(4))
+        before = {ip: ring.get_node(ip) for ip in IPS}
+        ring.add_node(4)
+        after = {ip: ring.get_node(ip) for ip in IPS}
+
+        moved = [ip for ip in IPS if before[ip] != after[ip]]
+        self.assertTrue(all(after[ip] == 4 for ip in moved))
+        self.assertLess(len(moved), len(IPS) * 0.3)
+
+        ring.remove_node(4)
+        self.assertEqual({ip: ring.get_node(ip) for ip in IPS}, before)
+
+    def test_empty_ring(self):
+        """没有节点时不分配"""
+        ring = ConsistentHashRing()
+        self.assertIsNone(ring.get_node("10.0.0.1"))
+        self.assertEqual(ring.shard(IPS, lambda ip: ip), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.rate_calculator import InterfaceRateCalculator
+
+
+def make_interface(in_octets, out_octets, bits=64, speed=1000000000, index=1):
+    """构造带计数器的接口数据"""
+    return {
+        "index": index,
+        "speed": speed,
+        "counters": {
+            "in_octets": in_octets,
+            "out_octets": out_octets,
+            "in_pkts": in_octets // 1000,
+            "out_pkts": out_octets // 1000,
+            "in_errors": 0,
+            "out_errors": 0,
+        },
+        "counter_bits": bits,
+    }
+
+
+class TestInterfaceRateCalculator(unittest.TestCase):
+    """接口速率计算器测试用例"""
+
+    def setUp(self):
+        self.calculator = InterfaceRateCalculator()
+
+    def test_first_sample_has_no_rate(self):
+        """首次采样只建立基线，不输出速率且不携带原始计数器"""
+        result = self.calculator.update("sw1", [make_interface(0, 0)], 1000, 0.0)
+        self.assertNotIn("in_bps", result[0])
+        self.assertNotIn("counters", result[0])
+
+    def test_rate_uses_sys_uptime_interval(self):
+        """采样间隔以sysUpTime差值为准"""
+        self.calculator.update("sw1", [make_interface(0, 0)], 1000, 0.0)
+        # 本地时间间隔35秒，设备sysUpTime间隔30秒
+        result = self.calculator.update(
+            "sw1", [make_interface(3750000, 1875000)], 4000, 35.0
+        )[0]
+        self.assertEqual(result["rate_interval"], 30.0)
+        self.assertEqual(result["in_bps"], 1000000.0)
+        self.assertEqual(result["out_bps"], 500000.0)
+        self.assertEqual(result["in_pps"], 125.0)
+        self.assertEqual(result["in_utilization"], 0.1)
+
+    def test_counter32_wrap(self):
+        """32位计数器回绕后按2^32取模计算增量"""
+        start = 2**32 - 1000
+        self.calculator.update("sw1", [make_interface(start, 0, bits=32)], 0, 0.0)
+        result = self.calculator.update(
+            "sw1", [make_interface(2000, 0, bits=32)], 100, 1.0
+        )[0]
+        self.assertEqual(result["in_bps"], 3000 * 8)
+
+    def test_counter64_decrease_is_discontinuity(self):
+        """64位计数器减小视为计数器不连续，不输出速率"""
+        self.calculator.update("sw1", [make_interface(5000, 5000)], 0, 0.0)
+        result = self.calculator.update("sw1", [make_interface(10, 10)], 100, 1.0)[0]
+        self.assertNotIn("in_bps", result)
+
+    def test_reboot_resets_baseline(self):
+        """sysUpTime回退视为设备重启，重新建立基线"""
+        self.calculator.update("sw1", [make_interface(10**9, 10**9)], 500000, 0.0)
+        result = self.calculator.update("sw1", [make_interface(100, 100)], 200, 30.0)[0]
+        self.assertNotIn("in_bps", result)
+        result = self.calculator.update("sw1", [make_interface(1100, 100)], 300, 31.0)[0]
+        self.assertEqual(result["in_bps"], 8000.0)
+
+    def test_sys_uptime_wrap_is_not_reboot(self):
+        """sysUpTime约497天回绕时按2^32取模计算间隔，保留基线"""
+        self.calculator.update("sw1", [make_interface(0, 0)], 2**32 - 1000, 0.0)
+        result = self.calculator.update(
+            "sw1", [make_interface(3750000, 0)], 2000, 30.0
+        )[0]
+        self.assertEqual(result["rate_interval"], 30.0)
+        self.assertEqual(result["in_bps"], 1000000.0)
+
+    def test_rate_above_speed_is_dropped(self):
+        """速率超过接口带宽时丢弃本次速率（32位计数器多次回绕）"""
+        self.calculator.update(
+            "sw1", [make_interface(0, 0, bits=32, speed=10000000)], 0, 0.0
+        )
+        result = self.calculator.update(
+            "sw1", [make_interface(10**9, 0, bits=32, speed=10000000)], 100, 1.0
+        )[0]
+        self.assertNotIn("in_bps", result)
+
+    def test_forget_and_cleanup(self):
+        """清除交换机基线与过期基线"""
+        self.calculator.update("sw1", [make_interface(0, 0)], 0, 0.0)
+        self.calculator.update("sw2", [make_interface(0, 0, index=2)], 0, 0.0)
+        self.calculator.forget("sw1")
+        self.assertEqual(self.calculator.get_statistics()["tracked_interfaces"], 1)
+        self.assertEqual(self.calculator.cleanup(now=10**6), 1)
+        self.assertEqual(self.calculator.get_statistics()["tracked_switches"], 0)
+
+
+def main():
+    """测试入口函数"""
+    unittest.main(verbosity=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.managers.scan_job_manager import ScanJobManager
+from src.snmp.scan_jobs import ScanJobRunner
+
+
+class _FakeSNMPManager:
+    """按IP返回固定结果的扫描器，可阻塞以模拟长时间扫描"""
+
+    def __init__(self, devices, block=False, pause_after=None):
+        self.devices = devices
+        self.block = block
+        self.pause_after = pause_after
+        self.calls = 0
+        self.scanned_hosts = []
+        self.started = threading.Event()
+        self.paused = threading.Event()
+
+    async def scan_network_devices(
+        self, hosts, version, communities, on_found=None, on_host_done=None, **kwargs
+    ):
+        self.calls += 1
+        self.scanned_hosts.extend(hosts)
+        self.started.set()
+        if self.block:
+            await asyncio.Event().wait()
+        found = []
+        for done, ip in enumerate(hosts):
+            if done == self.pause_after:
+                self.paused.set()
+                await asyncio.Event().wait()
+            if ip in self.devices:
+                device = {"ip": ip, "community": communities[0], "description": self.devices[ip]}
+                on_found(device)
+                found.append(device)
+            on_host_done(ip)
+        return found
+
+
+class TestScanJobs(unittest.TestCase):
+    """可恢复、可取消的网络扫描任务测试用例"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ScanJobManager(db_path=os.path.join(self.temp_dir.name, "scan.db"))
+        self.events = []
+        self.runner = None
+
+    def tearDown(self):
+        if self.runner is not None:
+            self.runner.stop()
+        self.store.connection_pool.close_all_connections()
+        self.temp_dir.cleanup()
+
+    def make_runner(self, snmp_manager):
+        self.runner = ScanJobRunner(
+            self.store,
+            broadcast=lambda event, task_id, **data: self.events.append((event, task_id, data)),
+            snmp_manager=snmp_manager,
+        )
+        return self.runner
+
+    def wait_finished(self, job_id, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.store.get_job(job_id)
+            if job["status"] not in ScanJobManager.UNFINISHED_STATUSES and not self.runner.is_active(job_id):
+                return job
+            time.sleep(0.01)
+        self.fail(f"扫描任务 {job_id} 未在 {timeout} 秒内结束")
+
+    def test_streams_devices_and_checkpoints_blocks(self):
+        """发现的设备逐个推送，每个地址块记录检查点"""
+        scanner = _FakeSNMPManager({"10.0.0.5": "switch-a", "10.0.1.7": "switch-b"})
+        runner = self.make_runner(scanner)
+        job = runner.submit("10.0.0.0/23", "v2c", {"communities": ["public"]})
+        job = self.wait_finished(job["job_id"])
+
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual((job["completed_blocks"], job["total_blocks"]), (2, 2))
+        self.assertEqual(job["found_count"], 2)
+        # /23拆分为两个/24，只排除整个网段的网络地址和广播地址
+        self.assertEqual(len(scanner.scanned_hosts), 510)
+        self.assertIn("10.0.0.255", scanner.scanned_hosts)
+        # 两个地址块合并为一次扫描
+        self.assertEqual(scanner.calls, 1)
+
+        events = [event for event, _, _ in self.events]
+        self.assertEqual(events[0], "scan_started")
+        self.assertEqual(events[-1], "scan_completed")
+        self.assertLess(events.index("scan_device"), events.index("scan_progress"))
+        self.assertEqual(self.events[-1][2]["count"], 2)
+        self.assertEqual(
+            [device["ip"] for device in runner.get_job(job["job_id"])["results"]],
+            ["10.0.0.5", "10.0.1.7"],
+        )
+
+    def test_checkpoints_block_before_sweep_finishes(self):
+        """地址块的主机全部结束后立即记录检查点，不等待同一次扫描中的其他地址块"""
+        scanner = _FakeSNMPManager({"10.0.0.5": "switch-a"}, pause_after=255)
+        runner = self.make_runner(scanner)
+        job = runner.submit("10.0.0.0/23", "v2c", {"communities": ["public"]})
+        self.assertTrue(scanner.paused.wait(5))
+
+        self.assertEqual(self.store.get_completed_blocks(job["job_id"]), {"10.0.0.0/24"})
+        self.assertEqual(self.store.get_job(job["job_id"])["found_count"], 1)
+        progress = [data for event, _, data in self.events if event == "scan_progress"]
+        self.assertEqual([data["block"] for data in progress], ["10.0.0.0/24"])
+
+        # 取消后恢复只扫描未完成的地址块
+        self.assertTrue(runner.cancel(job["job_id"]))
+        self.wait_finished(job["job_id"])
+        scanner.pause_after = None
+        scanner.scanned_hosts = []
+        self.assertTrue(runner.resume(job["job_id"]))
+        job = self.wait_finished(job["job_id"])
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(len(scanner.scanned_hosts), 255)
+        self.assertTrue(all(ip.startswith("10.0.1.") for ip in scanner.scanned_hosts))
+
+    def test_resume_skips_completed_blocks(self):
+        """中断的任务从第一个未完成的地址块继续，且不返回认证密钥"""
+        params = {"user": "admin", "auth_key": "secret123", "auth_protocol": "sha"}
+        self.store.create_job("job-1", "10.0.0.0/23", "v3", params, 2)
+        self.store.update_job_status("job-1", ScanJobManager.STATUS_RUNNING)
+        self.store.complete_block("job-1", "10.0.0.0/24", [{"ip": "10.0.0.5", "user": "admin"}])
+
+        scanner = _FakeSNMPManager({"10.0.1.7": "switch-b"})
+        runner = self.make_runner(scanner)
+        self.assertEqual(runner.resume_interrupted(), ["job-1"])
+        job = self.wait_finished("job-1")
+
+        self.assertEqual(job["status"], "completed")
+        self.assertTrue(all(ip.startswith("10.0.1.") for ip in scanner.scanned_hosts))
+        public = runner.get_job("job-1")
+        self.assertNotIn("auth_key", public["params"])
+        self.assertEqual([device["ip"] for device in public["results"]], ["10.0.0.5", "10.0.1.7"])
+
+    def test_cancel_running_job(self):
+        """取消执行中的任务，状态记录为已取消并可再次恢复"""
+        scanner = _FakeSNMPManager({}, block=True)
+        runner = self.make_runner(scanner)
+        job = runner.submit("10.0.0.0/24", "v2c", {"communities": ["public"]})
+        self.assertTrue(scanner.started.wait(5))
+
+        self.assertTrue(runner.cancel(job["job_id"]))
+        job = self.wait_finished(job["job_id"])
+        self.assertEqual(job["status"], "cancelled")
+        self.assertEqual(self.events[-1][0], "scan_cancelled")
+        self.assertFalse(runner.cancel(job["job_id"]))
+
+        scanner.block = False
+        self.assertTrue(runner.resume(job["job_id"]))
+        self.assertEqual(self.wait_finished(job["job_id"])["status"], "completed")
+
+
+if __name__ == '__main__':
+    unittest.main()
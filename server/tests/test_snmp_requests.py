@@ -0,0 +1,251 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.snmp.ber_codec import END_OF_MIB_VIEW, PDU_GET, PDU_GETBULK, PDU_GETNEXT
+from src.snmp.snmp_monitor import SNMPMonitor
+from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchInstance
+
+IF_DESCR = '1.3.6.1.2.1.2.2.1.2'
+IF_TYPE = '1.3.6.1.2.1.2.2.1.3'
+IF_ALIAS = '1.3.6.1.2.1.31.1.1.1.18'
+IF_MTU = '1.3.6.1.2.1.2.2.1.4'
+SYS_NAME = '1.3.6.1.2.1.1.5.0'
+
+
+def oid_tuple(oid):
+    return tuple(int(part) for part in oid.split('.'))
+
+
+class _ScriptedMonitor(SNMPMonitor):
+    """用内存中的MIB代替设备响应_send_pdu，记录每个请求"""
+
+    def __init__(self, mib, too_big_above=None, bulk_limit=None, fail_gets=0):
+        self.mib = {oid_tuple(oid): value for oid, value in mib.items()}
+        self.oids = sorted(self.mib)
+        self.too_big_above = too_big_above
+        self.bulk_limit = bulk_limit
+        self.fail_gets = fail_gets
+        self.requests = []
+
+    def next_of(self, oid):
+        return next((candidate for candidate in self.oids if candidate > oid), None)
+
+    async def _send_pdu(self, ip, version, pdu_type, oids, max_repetitions=0, **kwargs):
+        self.requests.append((pdu_type, list(oids), max_repetitions))
+        v1 = version == 'v1'
+        cursors = [oid_tuple(oid) for oid in oids]
+
+        if pdu_type == PDU_GET:
+            if self.fail_gets:
+                self.fail_gets -= 1
+                return 'No SNMP response received before timeout', 0, 0, []
+            if self.too_big_above is not None and len(oids) > self.too_big_above:
+                return None, SNMPMonitor.ERROR_TOO_BIG, 0, []
+            var_binds = []
+            for position, oid in enumerate(cursors, 1):
+                if oid in self.mib:
+                    var_binds.append((oid, self.mib[oid]))
+                elif v1:
+                    return None, SNMPMonitor.ERROR_NO_SUCH_NAME, position, []
+                else:
+                    var_binds.append((oid, NoSuchInstance()))
+            return None, 0, 0, var_binds
+
+        repetitions = max_repetitions if pdu_type == PDU_GETBULK else 1
+        if self.too_big_above is not None and len(oids) * repetitions > self.too_big_above:
+            return None, SNMPMonitor.ERROR_TOO_BIG, 0, []
+        var_binds = []
+        for _ in range(repetitions):
+            for column, oid in enumerate(cursors):
+                following = self.next_of(oid)
+                if following is None:
+                    if v1:
+                        return None, SNMPMonitor.ERROR_NO_SUCH_NAME, column + 1, []
+                    var_binds.append((oid, END_OF_MIB_VIEW))
+                    continue
+                var_binds.append((following, self.mib[following]))
+                cursors[column] = following
+        if self.bulk_limit is not None:
+            var_binds = var_binds[: self.bulk_limit]
+        return None, 0, 0, var_binds
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestGetMulti(unittest.TestCase):
+    """多变量绑定GET测试用例"""
+
+    def test_chunking(self):
+        """超过max_varbinds的OID分片发送，结果合并"""
+        mib = {f'{IF_DESCR}.{index}': f'GE0/0/{index}' for index in range(1, 8)}
+        monitor = _ScriptedMonitor(mib)
+        values, ok = run(monitor.get_multi('192.0.2.1', 'v2c', list(mib), max_varbinds=3))
+        self.assertTrue(ok)
+        self.assertEqual(values, mib)
+        self.assertEqual([len(oids) for _, oids, _ in monitor.requests], [3, 3, 1])
+        self.assertTrue(all(pdu_type == PDU_GET for pdu_type, _, _ in monitor.requests))
+
+    def test_missing_oids(self):
+        """v2c的noSuchInstance被忽略；v1的noSuchName剔除对应OID后重试其余OID"""
+        mib = {f'{IF_DESCR}.1': 'GE0/0/1', f'{IF_DESCR}.3': 'GE0/0/3'}
+        oids = [f'{IF_DESCR}.1', f'{IF_DESCR}.2', f'{IF_DESCR}.3', f'{IF_DESCR}.4']
+
+        monitor = _ScriptedMonitor(mib)
+        values, ok = run(monitor.get_multi('192.0.2.1', 'v2c', oids))
+        self.assertTrue(ok)
+        self.assertEqual(values, mib)
+        self.assertEqual(len(monitor.requests), 1)
+
+        monitor = _ScriptedMonitor(mib)
+        values, ok = run(monitor.get_multi('192.0.2.1', 'v1', oids))
+        self.assertTrue(ok)
+        self.assertEqual(values, mib)
+        self.assertEqual(
+            [oids_sent for _, oids_sent, _ in monitor.requests],
+            [oids, [oids[0], oids[2], oids[3]], [oids[0], oids[2]]],
+        )
+
+        # 全部OID都不存在时成功但没有结果
+        monitor = _ScriptedMonitor({})
+        self.assertEqual(run(monitor.get_multi('192.0.2.1', 'v1', oids[:2])), ({}, True))
+
+    def test_too_big_split(self):
+        """tooBig时拆分为两半分别请求，直到设备可以响应"""
+        mib = {f'{IF_DESCR}.{index}': f'GE0/0/{index}' for index in range(1, 9)}
+        monitor = _ScriptedMonitor(mib, too_big_above=2)
+        values, ok = run(monitor.get_multi('192.0.2.1', 'v2c', list(mib)))
+        self.assertTrue(ok)
+        self.assertEqual(values, mib)
+        sizes = sorted(len(oids) for _, oids, _ in monitor.requests)
+        self.assertEqual(sizes, [2, 2, 2, 2, 4, 4, 8])
+
+        # 单个OID仍然tooBig时失败
+        monitor = _ScriptedMonitor(mib, too_big_above=0)
+        self.assertEqual(run(monitor.get_multi('192.0.2.1', 'v2c', list(mib)[:1])), ({}, False))
+
+    def test_unreachable_chunk(self):
+        """部分分片无响应时返回其余分片的结果，全部无响应时失败"""
+        mib = {f'{IF_DESCR}.{index}': f'GE0/0/{index}' for index in range(1, 5)}
+        monitor = _ScriptedMonitor(mib, fail_gets=1)
+        values, ok = run(monitor.get_multi('192.0.2.1', 'v2c', list(mib), max_varbinds=2))
+        self.assertTrue(ok)
+        self.assertEqual(len(values), 2)
+
+        monitor = _ScriptedMonitor(mib, fail_gets=2)
+        self.assertEqual(
+            run(monitor.get_multi('192.0.2.1', 'v2c', list(mib), max_varbinds=2)), ({}, False)
+        )
+
+
+
+def interface_mib(indexes, alias_indexes=()):
+    """ifDescr/ifType在indexes上有值，ifAlias只在alias_indexes上有值，ifType之后是ifMtu列"""
+    mib = {SYS_NAME: 'core-1'}
+    for index in indexes:
+        mib[f'{IF_DESCR}.{index}'] = f'GE0/0/{index}'
+        mib[f'{IF_TYPE}.{index}'] = 6
+        mib[f'{IF_MTU}.{index}'] = 1500
+    for index in alias_indexes:
+        mib[f'{IF_ALIAS}.{index}'] = f'uplink-{index}'
+    return mib
+
+
+class TestWalkColumns(unittest.TestCase):
+    """按列遍历SNMP表测试用例"""
+
+    COLUMNS = {'descr': IF_DESCR, 'type': IF_TYPE}
+
+    def assert_rows(self, rows, indexes):
+        self.assertEqual(list(rows), [str(index) for index in indexes])
+        for index in indexes:
+            self.assertEqual(rows[str(index)], {'descr': f'GE0/0/{index}', 'type': 6})
+
+    def test_index_gaps(self):
+        """不连续的ifIndex按真实索引组装，遍历到下一列时停止"""
+        indexes = [1, 2, 5, 100, 4097]
+        monitor = _ScriptedMonitor(interface_mib(indexes))
+        rows, ok = run(monitor.walk_columns('192.0.2.1', 'v2c', self.COLUMNS, max_repetitions=2))
+        self.assertTrue(ok)
+        self.assert_rows(rows, indexes)
+        self.assertTrue(all(pdu_type == PDU_GETBULK for pdu_type, _, _ in monitor.requests))
+        # 每次推进2行，第3次请求遍历到列外
+        self.assertEqual(len(monitor.requests), 3)
+
+    def test_truncated_bulk_response(self):
+        """GETBULK响应在列中间被截断时，未出现在响应中的列继续遍历"""
+        indexes = list(range(1, 8))
+        for limit in (1, 3, 5):
+            monitor = _ScriptedMonitor(interface_mib(indexes), bulk_limit=limit)
+            rows, ok = run(monitor.walk_columns('192.0.2.1', 'v2c', self.COLUMNS, max_repetitions=4))
+            self.assertTrue(ok)
+            self.assert_rows(rows, indexes)
+
+    def test_unequal_columns(self):
+        """列长度不同时短列先结束，其余列继续；最后一列遍历到MIB末尾时以endOfMibView结束"""
+        columns = {'descr': IF_DESCR, 'alias': IF_ALIAS}
+        monitor = _ScriptedMonitor(interface_mib([1, 2, 3, 4, 5, 6], alias_indexes=[2, 6]))
+        rows, ok = run(monitor.walk_columns('192.0.2.1', 'v2c', columns, max_repetitions=3))
+        self.assertTrue(ok)
+        self.assertEqual(sorted(rows, key=int), ['1', '2', '3', '4', '5', '6'])
+        self.assertEqual(rows['2'], {'descr': 'GE0/0/2', 'alias': 'uplink-2'})
+        self.assertEqual(rows['3'], {'descr': 'GE0/0/3'})
+        self.assertEqual(rows['6']['alias'], 'uplink-6')
+
+        # pysnmp的endOfMibView同样结束遍历
+        monitor = _ScriptedMonitor({f'{IF_ALIAS}.1': 'a'})
+        original = monitor._send_pdu
+
+        async def pysnmp_end_of_mib(*args, **kwargs):
+            error_indication, error_status, error_index, var_binds = await original(*args, **kwargs)
+            return error_indication, error_status, error_index, [
+                (oid, EndOfMibView() if value is END_OF_MIB_VIEW else value)
+                for oid, value in var_binds
+            ]
+
+        monitor._send_pdu = pysnmp_end_of_mib
+        rows, ok = run(monitor.walk_columns('192.0.2.1', 'v2c', {'alias': IF_ALIAS}))
+        self.assertEqual((rows, ok), ({'1': {'alias': 'a'}}, True))
+
+    def test_too_big(self):
+        """tooBig时按实际发送的max-repetitions减半；GETNEXT无法缩小，直接失败"""
+        columns = {f'col{index}': f'{IF_DESCR}.{index}' for index in range(8)}
+        mib = {f'{IF_DESCR}.{index}.1': index for index in range(8)}
+        monitor = _ScriptedMonitor(mib, too_big_above=40)
+        rows, ok = run(monitor.walk_columns('192.0.2.1', 'v2c', columns, max_repetitions=50))
+        self.assertTrue(ok)
+        self.assertEqual(rows, {'1': {f'col{index}': index for index in range(8)}})
+        # 8列时实际发送的max-repetitions为100 // 8 = 12，之后6、3，不重复发送相同的请求
+        self.assertEqual([repetitions for _, _, repetitions in monitor.requests[:3]], [12, 6, 3])
+
+        monitor = _ScriptedMonitor(mib, too_big_above=4)
+        self.assertEqual(run(monitor.walk_columns('192.0.2.1', 'v1', columns)), ({}, False))
+        self.assertEqual(len(monitor.requests), 1)
+
+    def test_v1_getnext(self):
+        """v1使用GETNEXT逐行推进，遍历到MIB末尾时设备返回noSuchName，只结束对应的列"""
+        columns = {'descr': IF_DESCR, 'alias': IF_ALIAS}
+        monitor = _ScriptedMonitor(interface_mib([1, 3, 4], alias_indexes=[3]))
+        rows, ok = run(monitor.walk_columns('192.0.2.1', 'v1', columns))
+        self.assertTrue(ok)
+        self.assertEqual(rows, {
+            '1': {'descr': 'GE0/0/1'},
+            '3': {'descr': 'GE0/0/3', 'alias': 'uplink-3'},
+            '4': {'descr': 'GE0/0/4'},
+        })
+        self.assertTrue(all(pdu_type == PDU_GETNEXT for pdu_type, _, _ in monitor.requests))
+        # 第2次请求时ifAlias已到MIB末尾：noSuchName后只带ifDescr重试
+        self.assertEqual(len(monitor.requests[2][1]), 1)
+
+        # 空表：第一列之后就是其他列
+        monitor = _ScriptedMonitor({SYS_NAME: 'core-1', f'{IF_MTU}.1': 1500})
+        self.assertEqual(run(monitor.walk_columns('192.0.2.1', 'v1', self.COLUMNS)), ({}, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import asyncio
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from snmp.ber_codec import (
+    NO_SUCH_OBJECT,
+    OctetString,
+    PDU_RESPONSE,
+    decode_message,
+    encode_message,
+)
+from snmp.subnet_sweep import PacketRateLimiter, SubnetSweeper
+
+
+class _Agent(asyncio.DatagramProtocol):
+    """只接受指定团体名的模拟代理"""
+
+    def __init__(self, community: bytes, description: bytes):
+        self.community = community
+        self.description = description
+        self.requests = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        request = decode_message(data)
+        if request.community != self.community:
+            return
+        value = OctetString(self.description) if self.description else NO_SUCH_OBJECT
+        self.transport.sendto(
+            encode_message(
+                request.version,
+                request.community,
+                PDU_RESPONSE,
+                request.request_id,
+                [(request.var_binds[0][0], value)],
+            ),
+            addr,
+        )
+
+
+class TestSubnetSweep(unittest.TestCase):
+    """单套接字子网扫描测试用例"""
+
+    def test_rate_limiter(self):
+        """预约的额度按速率顺延"""
+        limiter = PacketRateLimiter(1000)
+        self.assertAlmostEqual(limiter.reserve(100), 0.0, places=2)
+        self.assertAlmostEqual(limiter.reserve(100), 0.1, places=2)
+        self.assertAlmostEqual(limiter.reserve(100), 0.2, places=2)
+
+    def test_sweep_matches_hosts_and_communities(self):
+        """响应按request-id映射回主机和团体名，不响应的主机不在结果中"""
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            try:
+                first, agent = await loop.create_datagram_endpoint(
+                    lambda: _Agent(b"private", "交换机".encode()),
+                    local_addr=("127.0.0.2", 0),
+                )
+                port = first.get_extra_info("sockname")[1]
+                second, _ = await loop.create_datagram_endpoint(
+                    lambda: _Agent(b"public", b""), local_addr=("127.0.0.5", port)
+                )
+            except OSError as e:
+                self.skipTest(f"无法绑定回环地址: {e}")
+            try:
+                sweeper = SubnetSweeper(rate=10000, timeout=0.3, retries=1, port=port)
+                start = time.perf_counter()
+                resolved = []
+                devices = await sweeper.sweep(
+                    "127.0.0.0/29",
+                    "v2c",
+                    ["public", "private"],
+                    on_resolved=lambda ip, responded: resolved.append((ip, responded)),
+                )
+                self.assertEqual(
+                    devices,
+                    [
+                        {"ip": "127.0.0.2", "community": "private", "description": "交换机"},
+                        {"ip": "127.0.0.5", "community": "public", "description": ""},
+                    ],
+                )
+                # 6个主机 x 2个团体名，重扫时只探测未响应的4个主机
+                stats = sweeper.get_statistics()
+                self.assertEqual(stats["sent"], 12 + 8)
+                self.assertEqual(stats["found"], 2)
+                self.assertEqual(agent.requests, 2)
+                # 每个主机在响应或重扫超时后结束一次
+                self.assertEqual(
+                    sorted(resolved),
+                    [(f"127.0.0.{i}", i in (2, 5)) for i in range(1, 7)],
+                )
+                self.assertLess(time.perf_counter() - start, 2)
+            finally:
+                first.close()
+                second.close()
+
+        asyncio.run(run())
+
+    def test_expand_hosts_limit(self):
+        """超大网段拒绝扫描"""
+        self.assertEqual(len(SubnetSweeper.expand_hosts("10.0.0.0/16")), 65534)
+        with self.assertRaises(ValueError):
+            SubnetSweeper.expand_hosts("fd00::/64")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.managers.switch_manager import SwitchManager
+from src.database.switch_registry import SwitchRegistry
+from src.models.switch_info import SwitchInfo
+
+
+class TestSwitchRegistry(unittest.TestCase):
+    """交换机注册表测试用例"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = SwitchManager(db_path=os.path.join(self.temp_dir.name, "test.db"))
+        self.events = []
+        self.manager.registry.subscribe(
+            lambda event, switch: self.events.append((event, switch["ip"]))
+        )
+
+    def tearDown(self):
+        self.manager.connection_pool.close_all_connections()
+        self.temp_dir.cleanup()
+
+    def test_manager_changes_are_published(self):
+        """增删改和轮询配置变化都同步到注册表并发布事件"""
+        self.manager.add_switch(SwitchInfo(ip="192.0.2.1", snmp_version="v2c"))
+        switch = self.manager.registry.get_all()[0]
+        self.assertEqual(self.events, [("added", "192.0.2.1")])
+
+        self.manager.set_poll_profile(switch["id"], {"interval": 30})
+        self.assertEqual(self.events[-1], ("updated", "192.0.2.1"))
+        self.assertEqual(
+            self.manager.registry.get(switch["id"])["poll_profile"], {"interval": 30}
+        )
+
+        # 修改IP拆分为旧IP删除和新IP新增
+        self.manager.update_switch(
+            SwitchInfo(id=switch["id"], ip="192.0.2.2", snmp_version="v2c")
+        )
+        self.assertEqual(
+            self.events[-2:], [("removed", "192.0.2.1"), ("added", "192.0.2.2")]
+        )
+
+        self.manager.delete_switch(switch["id"])
+        self.assertEqual(self.events[-1], ("removed", "192.0.2.2"))
+        self.assertEqual(len(self.manager.registry), 0)
+
+    def test_loaded_once_and_replace_diffs(self):
+        """只在首次访问时加载，整表替换时只发布有差异的事件"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [{"id": 1, "ip": "10.0.0.1"}, {"id": 2, "ip": "10.0.0.2"}]
+
+        registry = SwitchRegistry(loader)
+        events = []
+        registry.subscribe(lambda event, switch: events.append((event, switch["id"])))
+        registry.get_all()
+        registry.get_all()
+        self.assertEqual(len(calls), 1)
+
+        registry.replace(
+            [{"id": 2, "ip": "10.0.0.2", "community": "x"}, {"id": 3, "ip": "10.0.0.3"}]
+        )
+        self.assertEqual(events, [("removed", 1), ("updated", 2), ("added", 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+import asyncio
+import socket
+import time
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pysnmp.hlapi.v3arch.asyncio import (
+    CommunityData,
+    ContextData,
+    NotificationType,
+    ObjectIdentity,
+    SnmpEngine,
+    UdpTransportTarget,
+    UsmUserData,
+    send_notification,
+    usmHMACSHAAuthProtocol,
+)
+from src.database.switch_registry import SwitchRegistry
+from src.snmp.ber_codec import (
+    PDU_INFORM,
+    PDU_RESPONSE,
+    PDU_TRAP_V2,
+    VERSION_V2C,
+    ObjectIdentifier,
+    TimeTicks,
+    decode_message,
+    encode_message,
+)
+from src.snmp.trap_receiver import TrapReceiver
+
+LINK_DOWN = ObjectIdentifier((1, 3, 6, 1, 6, 3, 1, 1, 5, 3))
+COLD_START = ObjectIdentifier((1, 3, 6, 1, 6, 3, 1, 1, 5, 1))
+
+
+def _notification(pdu_type, trap_oid, community=b"public", extra=()):
+    var_binds = [
+        ((1, 3, 6, 1, 2, 1, 1, 3, 0), TimeTicks(12345)),
+        ((1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0), trap_oid),
+    ] + list(extra)
+    return encode_message(VERSION_V2C, community, pdu_type, 42, var_binds)
+
+
+class _FakeMonitor:
+    """模拟单接口刷新"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_interface_status(self, ip, version, if_index, **kwargs):
+        self.calls.append((ip, if_index))
+        return {"index": if_index, "oper_status": 2}
+
+
+class TestTrapReceiver(unittest.TestCase):
+    """SNMP Trap/Inform接收器测试用例"""
+
+    def setUp(self):
+        self.registry = SwitchRegistry()
+        self.registry.upsert(
+            {"id": 1, "ip": "127.0.0.1", "snmp_version": "v2c", "community": "public"}
+        )
+        self.messages = []
+        self.polls = []
+        self.monitor = _FakeMonitor()
+        self.receiver = TrapReceiver(
+            self.registry,
+            host="127.0.0.1",
+            port=0,
+            communities=[],
+            monitor=self.monitor,
+            sink=self.messages.append,
+            request_poll=lambda switch, poll_type: self.polls.append(poll_type),
+        )
+        self.assertTrue(self.receiver.start())
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(2)
+
+    def tearDown(self):
+        self.sock.close()
+        self.receiver.stop()
+
+    def _wait_for(self, condition, timeout=3):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def _of_type(self, msg_type):
+        return [m["data"] for m in self.messages if m["type"] == msg_type]
+
+    def test_link_trap_refreshes_interface(self):
+        """v2c linkDown广播通知并只刷新受影响的接口，团体名错误的通知被丢弃"""
+        port = self.receiver.port
+        self.sock.sendto(
+            _notification(PDU_TRAP_V2, LINK_DOWN, b"wrong"), ("127.0.0.1", port)
+        )
+        self.sock.sendto(
+            _notification(
+                PDU_TRAP_V2,
+                LINK_DOWN,
+                extra=[((1, 3, 6, 1, 2, 1, 2, 2, 1, 1, 5), 5)],
+            ),
+            ("127.0.0.1", port),
+        )
+        self.assertTrue(self._wait_for(lambda: self._of_type("snmpInterfaceStatus")))
+
+        traps = self._of_type("snmpTrap")
+        self.assertEqual(len(traps), 1)
+        self.assertEqual(traps[0]["trap_name"], "linkDown")
+        self.assertEqual(traps[0]["if_index"], 5)
+        self.assertEqual(traps[0]["uptime"], 12345)
+        status = self._of_type("snmpInterfaceStatus")[0]
+        self.assertEqual(status["interface"]["index"], 5)
+        self.assertEqual(self.monitor.calls, [("127.0.0.1", 5)])
+        self.assertEqual(self.receiver.get_statistics()["auth_failures"], 1)
+
+    def test_inform_acknowledged_and_restart_polled(self):
+        """v2c Inform回复Response，coldStart触发按需轮询"""
+        self.sock.sendto(
+            _notification(PDU_INFORM, COLD_START), ("127.0.0.1", self.receiver.port)
+        )
+        response = decode_message(self.sock.recvfrom(4096)[0])
+        self.assertEqual(response.pdu_type, PDU_RESPONSE)
+        self.assertEqual(response.request_id, 42)
+        self.assertTrue(self._wait_for(lambda: len(self.polls) == 2))
+        self.assertEqual(sorted(self.polls), ["device", "interface"])
+
+    def test_v1_trap_and_v3_inform(self):
+        """v1 Trap按RFC 3584转换通知OID，v3 Inform经USM认证后处理"""
+        self.registry.upsert(
+            {
+                "id": 1,
+                "ip": "127.0.0.1",
+                "snmp_version": "v3",
+                "user": "trapuser",
+                "auth_key": "authpass123",
+                "auth_protocol": "sha",
+            }
+        )
+        self.receiver.communities.add("public")
+
+        async def send():
+            target = await UdpTransportTarget.create(
+                ("127.0.0.1", self.receiver.port), timeout=2, retries=0
+            )
+            engines = [SnmpEngine(), SnmpEngine()]
+            await send_notification(
+                engines[0],
+                CommunityData("public", mpModel=0),
+                target,
+                ContextData(),
+                "trap",
+                NotificationType(ObjectIdentity("1.3.6.1.6.3.1.1.5.4")),
+            )
+            result = await send_notification(
+                engines[1],
+                UsmUserData("trapuser", "authpass123", authProtocol=usmHMACSHAAuthProtocol),
+                target,
+                ContextData(),
+                "inform",
+                NotificationType(ObjectIdentity("1.3.6.1.6.3.1.1.5.2")),
+            )
+            for snmp_engine in engines:
+                snmp_engine.close_dispatcher()
+            return result
+
+        # 等待v3用户在接收器线程中登记
+        time.sleep(0.2)
+        error_indication = asyncio.run(send())[0]
+        self.assertIsNone(error_indication)
+        self.assertTrue(self._wait_for(lambda: len(self._of_type("snmpTrap")) == 2))
+        traps = {t["version"]: t["trap_name"] for t in self._of_type("snmpTrap")}
+        self.assertEqual(traps, {"v1": "linkUp", "v3": "warmStart"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from pyasn1.codec.ber import decoder, encoder
+from pysnmp.hlapi.asyncio import SnmpEngine
+from pysnmp.proto import errind
+from pysnmp.proto.mpmod.rfc3412 import SNMPv3Message
+from pysnmp.proto.secmod.rfc3414.service import UsmSecurityParameters
+
+from snmp.ber_codec import BERDecodeError
+from snmp.v3_session import (
+    V3SessionCache,
+    decode_discovery_response,
+    encode_discovery_request,
+)
+
+ENGINE_ID = bytes.fromhex("80001f888056565656")
+
+
+def build_report(msg_id: int, engine_id: bytes = ENGINE_ID, boots: int = 7) -> bytes:
+    """用pysnmp/pyasn1构造代理返回的发现Report"""
+    message, _ = decoder.decode(
+        encode_discovery_request(msg_id, 1), asn1Spec=SNMPv3Message()
+    )
+    security_parameters = UsmSecurityParameters()
+    security_parameters["msgAuthoritativeEngineId"] = engine_id
+    security_parameters["msgAuthoritativeEngineBoots"] = boots
+    security_parameters["msgAuthoritativeEngineTime"] = 86400
+    security_parameters["msgUserName"] = b""
+    security_parameters["msgAuthenticationParameters"] = b""
+    security_parameters["msgPrivacyParameters"] = b""
+    message["msgSecurityParameters"] = encoder.encode(security_parameters)
+    return encoder.encode(message)
+
+
+class _Agent(asyncio.DatagramProtocol):
+    """只响应发现报文的模拟代理"""
+
+    def __init__(self):
+        self.engine_id = ENGINE_ID
+        self.requests = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        message, _ = decoder.decode(data, asn1Spec=SNMPv3Message())
+        msg_id = int(message["msgGlobalData"]["msgID"])
+        self.transport.sendto(build_report(msg_id, self.engine_id), addr)
+
+
+def build_auth_data(version, **kwargs):
+    return (kwargs["user"], kwargs["security_engine_id"])
+
+
+class TestV3Session(unittest.TestCase):
+    """SNMP v3会话缓存测试用例"""
+
+    def test_discovery_packets(self):
+        """发现报文可被pysnmp解码，Report可被正确解析"""
+        message, rest = decoder.decode(
+            encode_discovery_request(4242, 99), asn1Spec=SNMPv3Message()
+        )
+        self.assertEqual(rest, b"")
+        self.assertEqual(int(message["msgVersion"]), 3)
+        self.assertEqual(int(message["msgGlobalData"]["msgID"]), 4242)
+        self.assertEqual(bytes(message["msgGlobalData"]["msgFlags"]), b"\x04")
+
+        self.assertEqual(
+            decode_discovery_response(build_report(4242)),
+            (4242, ENGINE_ID, 7, 86400),
+        )
+        with self.assertRaises(BERDecodeError):
+            decode_discovery_response(build_report(4242)[:20])
+        with self.assertRaises(BERDecodeError):
+            decode_discovery_response(build_report(1, engine_id=b""))
+
+    def test_session_cache_and_invalidation(self):
+        """会话按设备缓存，时间窗口错误时失效并重新发现"""
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            transport, agent = await loop.create_datagram_endpoint(
+                _Agent, local_addr=("127.0.0.1", 0)
+            )
+            port = transport.get_extra_info("sockname")[1]
+            cache = V3SessionCache()
+            engine = SnmpEngine()
+            credentials = {"user": "admin", "auth_key": "authkey123"}
+            try:
+                first = await cache.get_auth_data(
+                    engine, build_auth_data, "127.0.0.1", port, **credentials
+                )
+                second = await cache.get_auth_data(
+                    engine, build_auth_data, "127.0.0.1", port, **credentials
+                )
+                self.assertEqual(first, ("admin", ENGINE_ID))
+                self.assertIs(first, second)
+                self.assertEqual(agent.requests, 1)
+                session = cache.get_session("127.0.0.1", port, **credentials)
+                self.assertEqual(session.engine_boots, 7)
+
+                # 其他错误不影响会话
+                self.assertFalse(cache.is_invalidating_error(errind.requestTimedOut))
+                self.assertTrue(cache.is_invalidating_error(errind.notInTimeWindow))
+                self.assertTrue(
+                    cache.invalidate(
+                        engine, "127.0.0.1", port, errind.notInTimeWindow, **credentials
+                    )
+                )
+                agent.engine_id = b"\x80\x00\x00\x01\x02"
+                third = await cache.get_auth_data(
+                    engine, build_auth_data, "127.0.0.1", port, **credentials
+                )
+                self.assertEqual(third, ("admin", b"\x80\x00\x00\x01\x02"))
+                self.assertEqual(agent.requests, 2)
+
+                stats = cache.get_statistics()
+                self.assertEqual(stats["hits"], 1)
+                self.assertEqual(stats["discoveries"], 2)
+                self.assertEqual(stats["invalidations"], 1)
+            finally:
+                transport.close()
+
+        asyncio.run(run())
+
+    def test_failed_discovery_falls_back(self):
+        """设备无响应时返回None，重试间隔内不再重复发现"""
+
+        async def run():
+            cache = V3SessionCache()
+            first = await cache.get_auth_data(
+                None, build_auth_data, "127.0.0.1", 9, timeout=0.1, user="admin"
+            )
+            second = await cache.get_auth_data(
+                None, build_auth_data, "127.0.0.1", 9, timeout=0.1, user="admin"
+            )
+            self.assertIsNone(first)
+            self.assertIsNone(second)
+            self.assertEqual(cache.get_statistics()["discovery_failures"], 1)
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.managers.vendor_profile_manager import VendorProfileManager
+from src.snmp.manager import SNMPManager
+from src.snmp.vendor_profiles import SYS_OBJECT_ID_OID, VendorProfileRegistry
+
+HW_CPU = "1.3.6.1.4.1.2011.5.25.31.1.1.1.1.5"
+HW_MEM = "1.3.6.1.4.1.2011.5.25.31.1.1.1.1.7"
+HW_TEMP = "1.3.6.1.4.1.2011.5.25.31.1.1.1.1.11"
+
+
+class _FakeHuaweiMonitor:
+    """只支持华为实体MIB的模拟设备，记录请求次数和OID"""
+
+    def __init__(self):
+        self.sys_object_id = "1.3.6.1.4.1.2011.2.23.96"
+        # 实体16777216和16777217为主控板，其余实体没有CPU（值为0）
+        self.tables = {
+            HW_CPU: {"16777216": 10, "16777217": 30, "16842752": 0},
+            HW_MEM: {"16777216": 40, "16777217": 60, "16842752": 0},
+            HW_TEMP: {"16777216": 45, "16777217": 52, "16842752": 0},
+        }
+        self.gets = []
+        self.walks = []
+
+    def _values(self):
+        values = {SYS_OBJECT_ID_OID: self.sys_object_id}
+        for column, rows in self.tables.items():
+            for index, value in rows.items():
+                values[f"{column}.{index}"] = value
+        return values
+
+    async def get_multi(self, ip, version, oids, **kwargs):
+        self.gets.append(list(oids))
+        values = self._values()
+        return {oid: values[oid] for oid in oids if oid in values}, True
+
+    async def walk_columns(self, ip, version, columns, max_repetitions=None, **kwargs):
+        self.walks.append(list(columns))
+        rows = {}
+        for name, column in columns.items():
+            for index, value in self.tables.get(column, {}).items():
+                rows.setdefault(index, {})[name] = value
+        return rows, True
+
+
+class TestVendorProfiles(unittest.TestCase):
+    """厂商监控OID探测与缓存测试用例"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = VendorProfileManager(db_path=os.path.join(self.temp_dir.name, "v.db"))
+        self.manager = SNMPManager()
+        self.manager.monitor = _FakeHuaweiMonitor()
+        self.manager.vendor_profiles = VendorProfileRegistry(self.store)
+
+    def tearDown(self):
+        self.store.connection_pool.close_all_connections()
+        self.temp_dir.cleanup()
+
+    def metrics(self):
+        return asyncio.run(self.manager.get_system_metrics("192.0.2.1", "v2c", community="public"))
+
+    def test_detect_then_single_get(self):
+        """首次探测华为实体MIB，之后每次只发一个GET且不含其他厂商OID"""
+        metrics = self.metrics()
+        self.assertEqual(metrics["cpu"]["usage"], 20)
+        self.assertEqual(metrics["cpu"]["source"], "Huawei Entity CPU")
+        self.assertEqual(metrics["memory"]["usage"], 50)
+        self.assertEqual(metrics["temperature"]["value"], 52)
+
+        monitor = self.manager.monitor
+        monitor.gets.clear()
+        monitor.walks.clear()
+        self.assertEqual(self.metrics(), metrics)
+        self.assertEqual(len(monitor.gets), 1)
+        self.assertEqual(monitor.walks, [])
+        # sysObjectID + 3个指标 x 2块主控板
+        self.assertEqual(len(monitor.gets[0]), 7)
+        self.assertTrue(all(".2011." in oid for oid in monitor.gets[0][1:]))
+
+    def test_profile_persisted_and_redetected_on_change(self):
+        """探测结果持久化，sysObjectID变化后重新探测"""
+        self.metrics()
+        self.manager.vendor_profiles = VendorProfileRegistry(self.store)
+        self.manager.monitor.walks.clear()
+        self.metrics()
+        self.assertEqual(self.manager.monitor.walks, [])
+
+        self.manager.monitor.sys_object_id = "1.3.6.1.4.1.2011.2.23.97"
+        self.metrics()
+        self.assertIsNone(self.store.get_profile("192.0.2.1"))
+        self.metrics()
+        self.assertNotEqual(self.manager.monitor.walks, [])
+        self.assertEqual(
+            self.store.get_profile("192.0.2.1")["sys_object_id"], "1.3.6.1.4.1.2011.2.23.97"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()